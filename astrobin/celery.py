@@ -3,6 +3,7 @@
 import os
 
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
 
 
 # set the default Django settings module for the 'celery' program.
@@ -18,6 +19,23 @@ app.config_from_object('django.conf:settings')
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
+# Each task gets its own request cache. Tokens are kept per task id so that eagerly executed tasks restore the cache
+# of the request that called them.
+_request_cache_tokens = {}
+
+
+@task_prerun.connect
+def start_task_request_cache(task_id=None, **kwargs):
+    from common.request_cache import start_request_cache
+    _request_cache_tokens[task_id] = start_request_cache()
+
+
+@task_postrun.connect
+def end_task_request_cache(task_id=None, **kwargs):
+    from common.request_cache import end_request_cache
+    end_request_cache(_request_cache_tokens.pop(task_id, None))
+
+
 @app.task(bind=True)
 def debug_task(self):
     print('Request: {0!r}'.format(self.request))
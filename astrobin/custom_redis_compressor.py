@@ -0,0 +1,114 @@
+import logging
+import zlib
+
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+log = logging.getLogger(__name__)
+
+# Compressed values are prefixed with MAGIC followed by one byte identifying the algorithm. Neither pickled values
+# (which start with b'\x80') nor JSON documents can start with a NUL byte, so anything without the marker is a value
+# written before compression was enabled, or one that was too small to be worth compressing, and is returned as-is.
+MAGIC = b'\x00AB'
+
+ALGORITHM_ZLIB = 'zlib'
+ALGORITHM_LZ4 = 'lz4'
+ALGORITHM_ZSTD = 'zstd'
+
+ALGORITHM_MARKERS = {
+    ALGORITHM_ZLIB: b'z',
+    ALGORITHM_LZ4: b'l',
+    ALGORITHM_ZSTD: b's',
+}
+
+DEFAULT_MIN_LENGTH = 1024
+
+
+def available_algorithms():
+    algorithms = [ALGORITHM_ZLIB]
+    if lz4_frame is not None:
+        algorithms.append(ALGORITHM_LZ4)
+    if zstandard is not None:
+        algorithms.append(ALGORITHM_ZSTD)
+    return algorithms
+
+
+def best_available_algorithm():
+    if zstandard is not None:
+        return ALGORITHM_ZSTD
+    if lz4_frame is not None:
+        return ALGORITHM_LZ4
+    return ALGORITHM_ZLIB
+
+
+class CustomRedisCompressor(BaseCompressor):
+    """
+    Compresses values longer than COMPRESSOR_MIN_LENGTH bytes with COMPRESSOR_ALGORITHM (zstd, lz4 or zlib; defaults
+    to the best one installed). Every compressed value carries a format marker, so values written with a different
+    algorithm, or before compression was enabled, can still be read.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+
+        self.min_length = int(options.get('COMPRESSOR_MIN_LENGTH', DEFAULT_MIN_LENGTH))
+        self.level = options.get('COMPRESSOR_LEVEL')
+        self.algorithm = options.get('COMPRESSOR_ALGORITHM') or best_available_algorithm()
+
+        if self.algorithm not in available_algorithms():
+            log.warning(f"Cache compression algorithm {self.algorithm} is not available, falling back to zlib")
+            self.algorithm = ALGORITHM_ZLIB
+
+    def _compress_with(self, algorithm: str, value: bytes) -> bytes:
+        if algorithm == ALGORITHM_ZSTD:
+            level = self.level if self.level is not None else 3
+            return zstandard.ZstdCompressor(level=level).compress(value)
+
+        if algorithm == ALGORITHM_LZ4:
+            level = self.level if self.level is not None else 0
+            return lz4_frame.compress(value, compression_level=level)
+
+        level = self.level if self.level is not None else 6
+        return zlib.compress(value, level)
+
+    def compress(self, value: bytes) -> bytes:
+        if len(value) <= self.min_length:
+            return value
+
+        compressed = self._compress_with(self.algorithm, value)
+
+        if len(compressed) + len(MAGIC) + 1 >= len(value):
+            # Incompressible payload: storing it raw is both smaller and cheaper to read back.
+            return value
+
+        return MAGIC + ALGORITHM_MARKERS[self.algorithm] + compressed
+
+    def decompress(self, value: bytes) -> bytes:
+        if not isinstance(value, (bytes, bytearray, memoryview)) or value[:len(MAGIC)] != MAGIC:
+            # django_redis treats CompressorError as "this value was stored uncompressed".
+            raise CompressorError("Value has no compression marker")
+
+        marker = bytes(value[len(MAGIC):len(MAGIC) + 1])
+        payload = value[len(MAGIC) + 1:]
+
+        try:
+            if marker == ALGORITHM_MARKERS[ALGORITHM_ZLIB]:
+                return zlib.decompress(payload)
+            if marker == ALGORITHM_MARKERS[ALGORITHM_ZSTD] and zstandard is not None:
+                return zstandard.ZstdDecompressor().decompress(payload)
+            if marker == ALGORITHM_MARKERS[ALGORITHM_LZ4] and lz4_frame is not None:
+                return lz4_frame.decompress(payload)
+        except Exception as e:
+            raise CompressorError(e)
+
+        raise CompressorError(f"Unsupported compression marker {marker}")
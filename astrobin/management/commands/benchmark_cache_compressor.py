@@ -0,0 +1,97 @@
+import json
+import pickle
+import random
+import string
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from astrobin.custom_redis_compressor import CustomRedisCompressor, available_algorithms
+
+
+def _random_text(length):
+    return ''.join(random.choice(string.ascii_letters + ' ') for _ in range(length))
+
+
+def _image_payload(pk):
+    return {
+        'pk': pk,
+        'hash': ''.join(random.choice(string.ascii_lowercase + string.digits) for _ in range(6)),
+        'title': _random_text(40),
+        'description': _random_text(600),
+        'user': random.randint(1, 100000),
+        'username': _random_text(12),
+        'published': '2024-05-12T21:13:44.123456',
+        'subject_type': 'DEEP_SKY',
+        'solar_system_main_subject': None,
+        'imaging_telescopes': [random.randint(1, 5000) for _ in range(2)],
+        'imaging_cameras': [random.randint(1, 5000) for _ in range(2)],
+        'mounts': [random.randint(1, 5000)],
+        'filters': [random.randint(1, 5000) for _ in range(7)],
+        'keyvaluetags': 'a=1\nb=2',
+        'link': None,
+        'link_to_fits': None,
+        'license': 'ALL_RIGHTS_RESERVED',
+        'thumbnails': [
+            {
+                'alias': alias,
+                'revision': 'final',
+                'url': f'https://cdn.astrobin.com/thumbs/{_random_text(24).replace(" ", "")}_{alias}.jpg',
+            } for alias in ('gallery', 'story', 'regular', 'hd', 'real')
+        ],
+        'like_count': random.randint(0, 500),
+        'bookmark_count': random.randint(0, 50),
+        'comment_count': random.randint(0, 50),
+    }
+
+
+def _realistic_payloads():
+    random.seed(0)
+    return {
+        'single image': _image_payload(1),
+        'feed page (50 images)': {
+            'count': 123456,
+            'next': 'https://www.astrobin.com/api/v2/images/image/?page=2',
+            'previous': None,
+            'results': [_image_payload(pk) for pk in range(50)],
+        },
+        'search results (100 ids)': [random.randint(1, 2000000) for _ in range(100)],
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the cache compressor on realistic payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--min-length', type=int, default=1024)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        for name, payload in _realistic_payloads().items():
+            for serializer_name, serialized in (
+                    ('pickle', pickle.dumps(payload, 5)),
+                    ('json', json.dumps(payload).encode()),
+            ):
+                self.stdout.write(f"{name} / {serializer_name}: {len(serialized)} bytes uncompressed")
+
+                for algorithm in available_algorithms():
+                    compressor = CustomRedisCompressor({
+                        'COMPRESSOR_ALGORITHM': algorithm,
+                        'COMPRESSOR_MIN_LENGTH': options['min_length'],
+                    })
+                    compressed = compressor.compress(serialized)
+                    compress_time = timeit.timeit(lambda: compressor.compress(serialized), number=iterations)
+
+                    if compressed is serialized:
+                        decompress_time = 0
+                    else:
+                        decompress_time = timeit.timeit(lambda: compressor.decompress(compressed), number=iterations)
+
+                    self.stdout.write(
+                        f"    {algorithm:5}: {len(compressed):8} bytes "
+                        f"({100 * len(compressed) / len(serialized):5.1f}%), "
+                        f"compress {1e6 * compress_time / iterations:8.1f} us, "
+                        f"decompress {1e6 * decompress_time / iterations:8.1f} us"
+                    )
@@ -0,0 +1,36 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from common.services.constellations_service import ConstellationsService
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the constellation lookups on random coordinates."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        count = options['count']
+
+        random.seed(0)
+        ras = [random.uniform(0, 24) for _ in range(count)]
+        decs = [random.uniform(-90, 90) for _ in range(count)]
+        coordinates = ['%f %+f' % (ra, dec) for ra, dec in zip(ras, decs)]
+
+        # Build the index outside of the timings.
+        ConstellationsService.get_constellations(ras[:1], decs[:1])
+
+        single_time = timeit.timeit(
+            lambda: [ConstellationsService.get_constellation(x) for x in coordinates], number=1
+        )
+        batch_time = timeit.timeit(lambda: ConstellationsService.get_constellations(ras, decs), number=1)
+
+        self.stdout.write(
+            f"get_constellation:  {count / single_time:12.0f} lookups/s ({1e6 * single_time / count:6.2f} us/lookup)"
+        )
+        self.stdout.write(
+            f"get_constellations: {count / batch_time:12.0f} lookups/s ({1e6 * batch_time / count:6.2f} us/lookup)"
+        )
@@ -0,0 +1,79 @@
+import random
+import timeit
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from astrobin_apps_equipment.services.marketplace_service import MarketplaceService
+from common.services.geohash_service import GeohashService
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the marketplace proximity search on a synthetic corpus of listings: a scan of all listings against "
+        "the geohash cells lookup, both refined by exact distance. Runs in memory, without the database or the cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listings', type=int, default=50000)
+        parser.add_argument('--queries', type=int, default=1000)
+        parser.add_argument('--cities', type=int, default=500)
+
+    def handle(self, *args, **options):
+        random.seed(0)
+
+        # Listings are clustered around cities, like real ones.
+        cities = [(random.uniform(-55, 65), random.uniform(-180, 180)) for _ in range(options['cities'])]
+        listings = []
+        for pk in range(options['listings']):
+            latitude, longitude = random.choice(cities)
+            listings.append((pk, latitude + random.gauss(0, .5), (longitude + random.gauss(0, .5) + 180) % 360 - 180))
+
+        cells = dict((precision, defaultdict(list)) for precision in MarketplaceService.GEOHASH_PRECISIONS)
+        for listing in listings:
+            for precision in MarketplaceService.GEOHASH_PRECISIONS:
+                cells[precision][GeohashService.encode(listing[1], listing[2], precision)].append(listing)
+
+        queries = []
+        for _ in range(options['queries']):
+            latitude, longitude = random.choice(cities)
+            queries.append((latitude, longitude, random.choice((10, 25, 50, 100, 250, 500, 1000))))
+
+        def scan(latitude, longitude, distance):
+            return [
+                pk for pk, listing_latitude, listing_longitude in listings
+                if GeohashService.get_distance(latitude, longitude, listing_latitude, listing_longitude) <= distance
+            ]
+
+        candidate_counts = []
+
+        def lookup(latitude, longitude, distance):
+            precision = MarketplaceService.get_geohash_precision(latitude, longitude, distance)
+            if precision is None:
+                return scan(latitude, longitude, distance)
+
+            candidates = [
+                listing
+                for cell in GeohashService.get_covering_cells(latitude, longitude, distance, precision)
+                for listing in cells[precision].get(cell, ())
+            ]
+            candidate_counts.append(len(candidates))
+            return [
+                pk for pk, listing_latitude, listing_longitude in candidates
+                if GeohashService.get_distance(latitude, longitude, listing_latitude, listing_longitude) <= distance
+            ]
+
+        for query in queries:
+            if sorted(scan(*query)) != sorted(lookup(*query)):
+                self.stderr.write(f"Mismatch for {query}")
+
+        candidate_counts.clear()
+        scan_time = timeit.timeit(lambda: [scan(*x) for x in queries], number=1)
+        lookup_time = timeit.timeit(lambda: [lookup(*x) for x in queries], number=1)
+        count = len(queries)
+
+        self.stdout.write(f"scan:   {1e3 * scan_time / count:8.3f} ms/query ({len(listings)} listings)")
+        self.stdout.write(
+            f"lookup: {1e3 * lookup_time / count:8.3f} ms/query "
+            f"({sum(candidate_counts) / max(len(candidate_counts), 1):.0f} candidates on average)"
+        )
@@ -0,0 +1,41 @@
+import random
+import re
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from astrobin.services.search_synonyms_matcher import SEARCH_SYNONYMS, get_search_synonyms_matcher
+
+
+def _legacy_get_row(text):
+    for row in SEARCH_SYNONYMS.strip().split('\n'):
+        for synonym in row.split(','):
+            if re.search(r'\b' + re.escape(synonym) + r'\b', text, re.IGNORECASE):
+                return row
+
+    return None
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the search synonyms matcher against the per-synonym regex search."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200)
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        names = [name for row in SEARCH_SYNONYMS.strip().split('\n') for name in row.split(',')]
+        words = ['the', 'galaxy', 'nebula', 'of', 'and', 'widefield', 'HaRGB', 'region', 'core']
+        texts = [
+            ' '.join(random.choice(names) if random.random() < .2 else random.choice(words) for _ in range(8))
+            for _ in range(options['count'])
+        ]
+
+        mismatches = len([x for x in texts if _legacy_get_row(x) != get_search_synonyms_matcher().get_row(x)])
+
+        legacy_time = timeit.timeit(lambda: [_legacy_get_row(x) for x in texts], number=1)
+        matcher_time = timeit.timeit(lambda: [get_search_synonyms_matcher().get_row(x) for x in texts], number=1)
+
+        self.stdout.write(f"regex search: {1e6 * legacy_time / len(texts):10.1f} us/text")
+        self.stdout.write(f"matcher:      {1e6 * matcher_time / len(texts):10.1f} us/text")
+        self.stdout.write(f"mismatches:   {mismatches}")
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.services.gazetteer_service import GazetteerService
+
+
+class Command(BaseCommand):
+    help = "Loads the cities of a GeoNames dump into the gazetteer used to geocode marketplace listings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', type=str, default=settings.GAZETTEER_PATH)
+        parser.add_argument(
+            '--no-alternate-names',
+            action='store_true',
+            help="Only load the names and ASCII names of the cities."
+        )
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding='utf-8', newline='') as f:
+            count = GazetteerService.load(f, alternate_names=not options['no_alternate_names'])
+
+        self.stdout.write(f"Loaded {count} names")
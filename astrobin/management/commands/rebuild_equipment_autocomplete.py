@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from astrobin_apps_equipment.services.equipment_autocomplete_service import EquipmentAutocompleteService
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the snapshots of the in-memory equipment autocomplete indexes."
+
+    def handle(self, *args, **options):
+        for klass in EquipmentAutocompleteService.KLASSES:
+            EquipmentAutocompleteService.rebuild(klass)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from astrobin_apps_equipment.services.equipment_contributors_service import EquipmentContributorsService
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the equipment contributor stats of all users."
+
+    def handle(self, *args, **options):
+        EquipmentContributorsService.rebuild()
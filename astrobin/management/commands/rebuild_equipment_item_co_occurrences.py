@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from astrobin_apps_equipment.services.equipment_item_co_occurrence_service import EquipmentItemCoOccurrenceService
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the table of the equipment items most often used together."
+
+    def handle(self, *args, **options):
+        EquipmentItemCoOccurrenceService.rebuild()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from astrobin_apps_equipment.services.equipment_stats_service import EquipmentStatsService
+
+
+class Command(BaseCommand):
+    help = "Recomputes the user count, image count and last use of all equipment items and brands."
+
+    def handle(self, *args, **options):
+        EquipmentStatsService.rebuild()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from astrobin_apps_equipment.services.marketplace_feedback_stats_service import MarketplaceFeedbackStatsService
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the marketplace feedback stats of all users."
+
+    def handle(self, *args, **options):
+        MarketplaceFeedbackStatsService.rebuild()
@@ -0,0 +1,155 @@
+import json
+import random
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.services.search_replay_service import SearchReplayService
+
+WORDS = (
+    'M31 M42 M45 M51 M101 NGC7000 IC1396 Andromeda Orion Pleiades Whirlpool Pinwheel North America Elephant Trunk '
+    'nebula galaxy cluster comet moon sun jupiter saturn mosaic widefield HOO SHO LRGB narrowband Ha OIII SII'
+).split()
+
+SUBJECT_TYPES = ('DEEP_SKY', 'SOLAR_SYSTEM', 'WIDE_FIELD', 'STAR_TRAILS', 'NORTHERN_LIGHTS', 'LANDSCAPE')
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays recorded image search parameters against the configured search backend and reports latency "
+        "percentiles, query complexity and result counts by parameter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--input', help="JSON lines file of parameter sets. Defaults to the live recording.")
+        parser.add_argument('--dump', help="Writes the live recording to this JSON lines file and exits.")
+        parser.add_argument(
+            '--create-corpus', type=int, default=0,
+            help="Creates this many synthetic images, with users and equipment, before replaying. DEBUG only."
+        )
+        parser.add_argument('--limit', type=int, default=None, help="Replays at most this many parameter sets.")
+        parser.add_argument('--repeat', type=int, default=1, help="Replays each parameter set this many times.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def create_corpus(self, count: int, rng: random.Random):
+        from io import BytesIO
+
+        from django.contrib.auth.models import User
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from PIL import Image as PILImage
+
+        from astrobin.models import Image
+        from astrobin_apps_equipment.models import Camera, EquipmentBrand, Telescope
+        from astrobin_apps_equipment.models.camera_base_model import CameraType
+        from astrobin_apps_equipment.models.telescope_base_model import TelescopeType
+
+        if not settings.DEBUG:
+            raise CommandError("Refusing to create a synthetic corpus with DEBUG off.")
+
+        # Names are unique per run, so that the command can create more than one corpus.
+        run = uuid.uuid4().hex[:8]
+
+        # All the images share one file: the search doesn't look at it.
+        image_io = BytesIO()
+        PILImage.new('RGB', (100, 100), 'red').save(image_io, format='JPEG')
+        image_file = default_storage.save(f'images/replay-searches-{run}.jpg', ContentFile(image_io.getvalue()))
+
+        creator = User.objects.create_user(username=f'replay-{run}', email=f'replay-{run}@example.com')
+        brand = EquipmentBrand.objects.create(created_by=creator, name=f'Replay brand {run}')
+        telescopes = [
+            Telescope.objects.create(
+                created_by=creator,
+                brand=brand,
+                name=f'Replay telescope {run} {i}',
+                type=rng.choice((TelescopeType.REFRACTOR_ACHROMATIC, TelescopeType.REFRACTOR_APOCHROMATIC)),
+            ) for i in range(max(1, count // 20))
+        ]
+        cameras = [
+            Camera.objects.create(
+                created_by=creator,
+                brand=brand,
+                name=f'Replay camera {run} {i}',
+                type=rng.choice((CameraType.DEDICATED_DEEP_SKY, CameraType.DSLR_MIRRORLESS)),
+            ) for i in range(max(1, count // 20))
+        ]
+        users = [
+            User.objects.create_user(username=f'replay-{run}-{i}', email=f'replay-{run}-{i}@example.com')
+            for i in range(max(1, count // 10))
+        ]
+
+        for i in range(count):
+            image = Image.objects.create(
+                user=rng.choice(users),
+                title=' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))),
+                image_file=image_file,
+                w=100,
+                h=100,
+                subject_type=rng.choice(SUBJECT_TYPES),
+            )
+            image.imaging_telescopes_2.add(rng.choice(telescopes))
+            image.imaging_cameras_2.add(rng.choice(cameras))
+
+            if (i + 1) % 100 == 0:
+                self.stdout.write(f"Created {i + 1}/{count} images...")
+
+        if 'simple_backend' not in settings.HAYSTACK_CONNECTIONS['default']['ENGINE']:
+            self.stdout.write("Run `update_index` before replaying: the corpus is not indexed yet.")
+
+    def load(self, path: str):
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        if options['dump']:
+            recording = SearchReplayService.get_recording()
+            with open(options['dump'], 'w') as f:
+                for params in recording:
+                    f.write(json.dumps(params) + '\n')
+            self.stdout.write(f"Wrote {len(recording)} parameter sets to {options['dump']}.")
+            return
+
+        if options['create_corpus']:
+            self.create_corpus(options['create_corpus'], rng)
+
+        recorded = self.load(options['input']) if options['input'] else SearchReplayService.get_recording()
+        recorded = recorded[:options['limit']]
+        corpus = SearchReplayService.get_corpus()
+
+        param_sets = []
+        results = []
+        skipped = 0
+
+        for params in recorded:
+            resolved = SearchReplayService.resolve(params, corpus, rng)
+            if resolved is None:
+                skipped += 1
+                continue
+
+            for _ in range(options['repeat']):
+                param_sets.append(params)
+                results.append(SearchReplayService.replay_one(resolved))
+
+        if not results:
+            raise CommandError(f"Nothing to replay ({skipped} parameter sets skipped).")
+
+        self.stdout.write(
+            f"Replayed {len(results)} searches on {settings.HAYSTACK_CONNECTIONS['default']['ENGINE']} "
+            f"({skipped} parameter sets skipped). Times in ms.\n"
+        )
+        self.stdout.write(
+            f"{'parameter':<28}{'searches':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'filter p50':>12}{'filter p95':>12}"
+            f"{'clauses':>9}{'length':>9}{'results':>9}"
+        )
+
+        for key, row in SearchReplayService.summarize(results, param_sets).items():
+            filter_p50 = f"{1000 * row['filter_p50']:12.2f}" if 'filter_p50' in row else f"{'-':>12}"
+            filter_p95 = f"{1000 * row['filter_p95']:12.2f}" if 'filter_p95' in row else f"{'-':>12}"
+            self.stdout.write(
+                f"{key:<28}{row['searches']:>9}{1000 * row['p50']:9.2f}{1000 * row['p95']:9.2f}"
+                f"{1000 * row['p99']:9.2f}{filter_p50}{filter_p95}{row['clauses']:9.1f}{row['query_length']:9.0f}"
+                f"{row['count']:9.1f}"
+            )
@@ -0,0 +1,55 @@
+import multiprocessing
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from common.services import DateTimeService
+
+
+def update_chunk(image_ids):
+    from astrobin.search_indexes import ImageIndex
+    return ImageIndex().update_batch(image_ids)
+
+
+class Command(BaseCommand):
+    help = "Updates the image search index in chunks of image ids, with bulk-fetched data and one backend call per " \
+           "chunk."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.SEARCH_INDEX_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.SEARCH_INDEX_WORKERS)
+        parser.add_argument('--age', type=int, default=None, help="Only update images updated in the last N hours.")
+        parser.add_argument('--start-id', type=int, default=None)
+
+    def handle(self, *args, **options):
+        from astrobin.search_indexes import ImageIndex
+
+        batch_size = options['batch_size']
+        workers = options['workers']
+
+        queryset = ImageIndex().index_queryset().prefetch_related(None).select_related(None)
+
+        if options['age']:
+            queryset = queryset.filter(updated__gte=DateTimeService.now() - timedelta(hours=options['age']))
+
+        if options['start_id']:
+            queryset = queryset.filter(pk__gte=options['start_id'])
+
+        image_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        chunks = [image_ids[i:i + batch_size] for i in range(0, len(image_ids), batch_size)]
+
+        self.stdout.write(f"Indexing {len(image_ids)} images in {len(chunks)} chunks with {workers} worker(s).")
+
+        if workers > 1:
+            # Connections must not be shared with the forked workers.
+            connections.close_all()
+            with multiprocessing.Pool(workers) as pool:
+                results = pool.imap_unordered(update_chunk, chunks)
+                for done, count in enumerate(results, start=1):
+                    self.stdout.write(f"Chunk {done}/{len(chunks)}: {count} images indexed.")
+        else:
+            for done, chunk in enumerate(chunks, start=1):
+                count = update_chunk(chunk)
+                self.stdout.write(f"Chunk {done}/{len(chunks)}: {count} images indexed.")
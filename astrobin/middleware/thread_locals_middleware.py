@@ -1,13 +1,4 @@
-import threading
-
-
-_thread_locals = threading.local()
-
-
-def get_request_cache():
-    if not hasattr(_thread_locals, 'request_cache'):
-        _thread_locals.request_cache = {}
-    return _thread_locals.request_cache
+from common.request_cache import end_request_cache, get_request_cache, start_request_cache  # noqa: F401
 
 
 class ThreadLocalsMiddleware:
@@ -15,12 +6,13 @@ class ThreadLocalsMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        _thread_locals.request_cache = {
+        token = start_request_cache({
             'user': getattr(request, 'user', None),
-        }
-
-        response = self.get_response(request)
+        })
 
-        _thread_locals.request_cache = {}
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request_cache(token)
 
         return response
@@ -31,6 +31,7 @@ from astrobin_apps_equipment.models.equipment_item_listing import EquipmentItemL
 from astrobin_apps_notifications.services import NotificationsService
 from astrobin_apps_users.services import UserService
 from common.constants import GroupName
+from common.request_cache import request_memoize
 from common.services import DateTimeService
 from common.upload_paths import (
     data_download_upload_path, image_upload_path, uncompressed_source_upload_path,
@@ -96,19 +97,12 @@ class HasSolutionMixin(object):
                 if self._prefetched_objects_cache['solutions'] \
                 else None
 
-        # Then try request cache.
-        from common.services.caching_service import CachingService
+        # Then try the database, memoized for the duration of the request.
+        return self._get_first_solution()
 
-        cache_key = f'astrobin_solution_{self.__class__.__name__}_{self.pk}'
-        solution = CachingService.get_from_request_cache(cache_key)
-        if solution is not None or CachingService.is_in_request_cache(cache_key):
-            return solution
-
-        # Finally try the database
-        solution = self.solutions.first()
-        CachingService.set_in_request_cache(cache_key, solution)
-
-        return solution
+    @request_memoize(lambda self: (self._meta.model_name, self.pk))
+    def _get_first_solution(self):
+        return self.solutions.first()
 
 
 def image_hash() -> str:
@@ -0,0 +1,117 @@
+"""Daily lookup table of the moon's illumination and age.
+
+`astrobin.moon.phase` only depends on the calendar date, so the values for every day between TABLE_START and
+TABLE_END are computed once per process, with the same formulas vectorized over all days, and then looked up by day
+index. Dates outside of the table fall back to `MoonPhase`.
+"""
+
+import datetime
+import threading
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from astrobin.moon import MoonPhase, c, tojdn
+
+TABLE_START = datetime.date(1900, 1, 1)
+TABLE_END = datetime.date(2100, 12, 31)
+
+_lock = threading.Lock()
+_table = None
+
+
+def _fixangle(a):
+    return a - 360.0 * np.floor(a / 360.0)
+
+
+def _kepler(m, ecc):
+    m = np.radians(m)
+    e = m.copy()
+
+    # Newton's method converges in a handful of iterations for the Earth's eccentricity; iterate until every day is
+    # within the tolerance used by `astrobin.moon.kepler`.
+    for _ in range(50):
+        delta = e - ecc * np.sin(e) - m
+        e = e - delta / (1.0 - ecc * np.cos(e))
+        if np.all(np.abs(delta) <= 1e-6):
+            break
+
+    return e
+
+
+def _compute_table():
+    day = np.arange(
+        tojdn(TABLE_START.year, TABLE_START.month, TABLE_START.day),
+        tojdn(TABLE_END.year, TABLE_END.month, TABLE_END.day) + 1,
+        dtype=np.float64
+    ) - c.epoch
+
+    # See `astrobin.moon.phase` for the meaning of each term.
+    n = _fixangle((360 / 365.2422) * day)
+    m = _fixangle(n + c.ecliptic_longitude_epoch - c.ecliptic_longitude_perigee)
+
+    ec = _kepler(m, c.eccentricity)
+    ec = np.sqrt((1 + c.eccentricity) / (1 - c.eccentricity)) * np.tan(ec / 2.0)
+    ec = 2 * np.degrees(np.arctan(ec))
+    lambda_sun = _fixangle(ec + c.ecliptic_longitude_perigee)
+
+    moon_longitude = _fixangle(13.1763966 * day + c.moon_mean_longitude_epoch)
+    mm = _fixangle(moon_longitude - 0.1114041 * day - c.moon_mean_perigee_epoch)
+
+    evection = 1.2739 * np.sin(np.radians(2 * (moon_longitude - lambda_sun) - mm))
+    annual_eq = 0.1858 * np.sin(np.radians(m))
+    a3 = 0.37 * np.sin(np.radians(m))
+    mmp = mm + evection - annual_eq - a3
+    m_ec = 6.2886 * np.sin(np.radians(mmp))
+    a4 = 0.214 * np.sin(np.radians(2 * mmp))
+    lp = moon_longitude + evection + m_ec - annual_eq + a4
+    variation = 0.6583 * np.sin(np.radians(2 * (lp - lambda_sun)))
+    lpp = lp + variation
+
+    moon_age = lpp - lambda_sun
+
+    return dict(
+        illuminated=(1 - np.cos(np.radians(moon_age))) / 2.0,
+        age=c.synodic_month * _fixangle(moon_age) / 360.0,
+    )
+
+
+def _get_table():
+    global _table
+
+    if _table is None:
+        with _lock:
+            if _table is None:
+                _table = _compute_table()
+
+    return _table
+
+
+def _lookup(dates: Iterable[Optional[datetime.date]], key: str) -> List[Optional[float]]:
+    table = _get_table()[key]
+    start = TABLE_START.toordinal()
+    size = len(table)
+    result = []
+
+    for date in dates:
+        if date is None:
+            result.append(None)
+            continue
+
+        index = date.toordinal() - start
+        if 0 <= index < size:
+            result.append(float(table[index]))
+        else:
+            result.append(getattr(MoonPhase(date), key))
+
+    return result
+
+
+def get_illuminated(dates: Iterable[Optional[datetime.date]]) -> List[Optional[float]]:
+    """Illuminated fraction (0..1) of the moon for each date, None for None dates."""
+    return _lookup(dates, 'illuminated')
+
+
+def get_age(dates: Iterable[Optional[datetime.date]]) -> List[Optional[float]]:
+    """Age of the moon in days for each date, None for None dates."""
+    return _lookup(dates, 'age')
@@ -1,7 +1,7 @@
 import datetime
 import logging
 import sys
-from functools import reduce
+from collections import defaultdict
 from typing import Optional
 
 from avatar.templatetags.avatar_tags import avatar_url
@@ -9,7 +9,7 @@ from celery_haystack.indexes import CelerySearchIndex
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
-from django.db.models import Count, Q
+from django.db.models import Count, Q, prefetch_related_objects
 from django.template.defaultfilters import striptags
 from haystack.constants import Indexable
 from haystack.fields import (
@@ -27,15 +27,17 @@ from astrobin.models import (
     Camera as LegacyCamera, DeepSky_Acquisition, GearUserInfo, Image, ImageRevision,
     SolarSystem_Acquisition,
 )
-from astrobin.services.utils_service import UtilsService
+from astrobin.services.search_synonyms_matcher import get_search_synonyms_matcher
 from astrobin_apps_equipment.models import (
     Camera, EquipmentItemMarketplaceListing,
 )
 from astrobin_apps_equipment.models.sensor_base_model import ColorOrMono
 from astrobin_apps_images.services import ImageService
 from astrobin_apps_iotd.services import IotdService
+from astrobin_apps_platesolving import healpix
 from astrobin_apps_platesolving.services import SolutionService
-from astrobin_apps_users.services import UserService
+from astrobin_apps_users.services import UserStatsService
+from common.services.search_result_cache_service import SearchResultCacheService
 from common.utils import get_segregated_reader_database
 from nested_comments.models import NestedComment
 from toggleproperties.models import ToggleProperty
@@ -51,25 +53,76 @@ PREPARED_COMMENTS_CACHE_KEY = 'search_index_prepared_comments.%d'
 PREPARED_INTEGRATION_CACHE_KEY = 'search_index_prepared_integration.%d'
 
 
-def _prepare_integration(obj):
-    deep_sky_acquisitions = DeepSky_Acquisition.objects.using(get_segregated_reader_database()).filter(image=obj)
-    solar_system_acquisition = None
+def _get_deep_sky_acquisitions(obj):
+    return list(DeepSky_Acquisition.objects.using(get_segregated_reader_database()).filter(image=obj).order_by('pk'))
+
+
+def _get_solar_system_acquisitions(obj):
+    return list(SolarSystem_Acquisition.objects.filter(image=obj).order_by('pk'))
+
+
+def _get_integration(deep_sky_acquisitions) -> float:
     integration = 0
 
-    try:
-        solar_system_acquisition = SolarSystem_Acquisition.objects.get(image=obj)
-    except (SolarSystem_Acquisition.DoesNotExist, SolarSystem_Acquisition.MultipleObjectsReturned):
-        pass
+    for a in deep_sky_acquisitions:
+        if a.duration and a.number:
+            integration += (a.duration * a.number)
+
+    return float(integration)
+
+
+def _get_moon_phase(deep_sky_acquisitions) -> Optional[float]:
+    from .moon_table import get_illuminated
+
+    moon_illuminated_list = [
+        x * 100.0 for x in get_illuminated([a.date for a in deep_sky_acquisitions if a.date is not None])
+    ]
+
+    if len(moon_illuminated_list) == 0:
+        return None
+
+    return sum(moon_illuminated_list) / float(len(moon_illuminated_list))
+
+
+def _get_acquisition_date(deep_sky_acquisitions, solar_system_acquisitions, pick):
+    date = None
 
     if deep_sky_acquisitions:
+        date = deep_sky_acquisitions[0].date
         for a in deep_sky_acquisitions:
-            if a.duration and a.number:
-                integration += (a.duration * a.number)
-    elif solar_system_acquisition:
-        integration = 0
+            if a.date is not None and date is not None:
+                date = pick(a.date, date)
+    elif len(solar_system_acquisitions) == 1:
+        date = solar_system_acquisitions[0].date
 
-    cache.set(PREPARED_INTEGRATION_CACHE_KEY % obj.pk, float(integration), PREPARED_FIELD_CACHE_EXPIRATION)
-    return float(integration)
+    return date if date else datetime.date.min
+
+
+def _get_acquisition_months(deep_sky_acquisitions, solar_system_acquisitions):
+    dated_deep_sky_acquisitions = [x for x in deep_sky_acquisitions if x.date is not None]
+
+    if dated_deep_sky_acquisitions:
+        return list(set([x.date.strftime('%b') for x in dated_deep_sky_acquisitions]))
+
+    if solar_system_acquisitions and solar_system_acquisitions[0].date:
+        return [solar_system_acquisitions[0].date.strftime('%b')]
+
+    return None
+
+
+def _get_bortle_scale(deep_sky_acquisitions):
+    values = [float(x.bortle) for x in deep_sky_acquisitions if x.bortle is not None]
+
+    if values:
+        return sum(values) / float(len(values))
+
+    return None
+
+
+def _prepare_integration(obj):
+    integration = _get_integration(_get_deep_sky_acquisitions(obj))
+    cache.set(PREPARED_INTEGRATION_CACHE_KEY % obj.pk, integration, PREPARED_FIELD_CACHE_EXPIRATION)
+    return integration
 
 
 def _prepare_likes(obj):
@@ -85,68 +138,23 @@ def _prepare_bookmarks(obj):
 
 
 def _prepare_moon_phase(obj):
-    from .moon import MoonPhase
-
-    deep_sky_acquisitions = DeepSky_Acquisition.objects.using(get_segregated_reader_database()).filter(image=obj)
-    moon_illuminated_list = []
-    if deep_sky_acquisitions:
-        for a in deep_sky_acquisitions:
-            if a.date is not None:
-                m = MoonPhase(a.date)
-                moon_illuminated_list.append(m.illuminated * 100.0)
+    result = _get_moon_phase(_get_deep_sky_acquisitions(obj))
 
-    if len(moon_illuminated_list) == 0:
+    if result is None:
         # We must make an assumption between 0 and 100, or this won't
         # show up in any searches.
         return 0
 
-    result = sum(moon_illuminated_list) / float(len(moon_illuminated_list))
     cache.set(PREPARED_MOON_PHASE_CACHE_KEY % obj.pk, result, PREPARED_FIELD_CACHE_EXPIRATION)
     return result
 
 
 def _prepare_first_acquisition_date(obj):
-    deep_sky_acquisitions = DeepSky_Acquisition.objects.using(get_segregated_reader_database()).filter(image=obj)
-    solar_system_acquisition = None
-
-    try:
-        solar_system_acquisition = SolarSystem_Acquisition.objects.get(image=obj)
-    except:
-        pass
-
-    date = None
-    if deep_sky_acquisitions:
-        date = deep_sky_acquisitions[0].date
-        for a in deep_sky_acquisitions:
-            if a.date is not None and date is not None:
-                if a.date < date:
-                    date = a.date
-    elif solar_system_acquisition:
-        date = solar_system_acquisition.date
-
-    return date if date else datetime.date.min
+    return _get_acquisition_date(_get_deep_sky_acquisitions(obj), _get_solar_system_acquisitions(obj), min)
 
 
 def _prepare_last_acquisition_date(obj):
-    deep_sky_acquisitions = DeepSky_Acquisition.objects.using(get_segregated_reader_database()).filter(image=obj)
-    solar_system_acquisition = None
-
-    try:
-        solar_system_acquisition = SolarSystem_Acquisition.objects.get(image=obj)
-    except:
-        pass
-
-    date = None
-    if deep_sky_acquisitions:
-        date = deep_sky_acquisitions[0].date
-        for a in deep_sky_acquisitions:
-            if a.date is not None and date is not None:
-                if a.date > date:
-                    date = a.date
-    elif solar_system_acquisition:
-        date = solar_system_acquisition.date
-
-    return date if date else datetime.date.min
+    return _get_acquisition_date(_get_deep_sky_acquisitions(obj), _get_solar_system_acquisitions(obj), max)
 
 
 def _prepare_views(obj, content_type):
@@ -162,11 +170,11 @@ def _prepare_views(obj, content_type):
 def _prepare_min_aperture(obj):
     value = 0
 
-    for telescope in obj.imaging_telescopes.filter(aperture__isnull=False):
+    for telescope in [x for x in obj.imaging_telescopes.all() if x.aperture is not None]:
         if value == 0 or telescope.aperture < value:
             value = int(telescope.aperture)
 
-    for telescope in obj.imaging_telescopes_2.filter(aperture__isnull=False):
+    for telescope in [x for x in obj.imaging_telescopes_2.all() if x.aperture is not None]:
         if value == 0 or telescope.aperture < value:
             value = int(telescope.aperture)
 
@@ -177,11 +185,11 @@ def _prepare_max_aperture(obj):
     import sys
     value = sys.maxsize
 
-    for telescope in obj.imaging_telescopes.filter(aperture__isnull=False):
+    for telescope in [x for x in obj.imaging_telescopes.all() if x.aperture is not None]:
         if value == sys.maxsize or telescope.aperture > value:
             value = int(telescope.aperture)
 
-    for telescope in obj.imaging_telescopes_2.filter(aperture__isnull=False):
+    for telescope in [x for x in obj.imaging_telescopes_2.all() if x.aperture is not None]:
         if value == sys.maxsize or telescope.aperture > value:
             value = int(telescope.aperture)
 
@@ -191,11 +199,11 @@ def _prepare_max_aperture(obj):
 def _prepare_min_focal_length(obj):
     value = 0
 
-    for telescope in obj.imaging_telescopes.filter(focal_length__isnull=False):
+    for telescope in [x for x in obj.imaging_telescopes.all() if x.focal_length is not None]:
         if value == 0 or telescope.focal_length < value:
             value = int(telescope.focal_length)
 
-    for telescope in obj.imaging_telescopes_2.filter(min_focal_length__isnull=False):
+    for telescope in [x for x in obj.imaging_telescopes_2.all() if x.min_focal_length is not None]:
         if value == 0 or telescope.min_focal_length < value:
             value = int(telescope.min_focal_length)
 
@@ -206,11 +214,11 @@ def _prepare_max_focal_length(obj):
     import sys
     value = sys.maxsize
 
-    for telescope in obj.imaging_telescopes.filter(focal_length__isnull=False):
+    for telescope in [x for x in obj.imaging_telescopes.all() if x.focal_length is not None]:
         if value == sys.maxsize or telescope.focal_length > value:
             value = int(telescope.focal_length)
 
-    for telescope in obj.imaging_telescopes_2.filter(max_focal_length__isnull=False):
+    for telescope in [x for x in obj.imaging_telescopes_2.all() if x.max_focal_length is not None]:
         if value == sys.maxsize or telescope.max_focal_length > value:
             value = int(telescope.max_focal_length)
 
@@ -220,11 +228,11 @@ def _prepare_max_focal_length(obj):
 def _prepare_min_camera_pixel_size(obj):
     value = 0
 
-    for camera in obj.imaging_cameras.filter(pixel_size__isnull=False):
+    for camera in [x for x in obj.imaging_cameras.all() if x.pixel_size is not None]:
         if value == 0 or camera.pixel_size < value:
             value = float(camera.pixel_size)
 
-    for camera in obj.imaging_cameras_2.filter(sensor__isnull=False, sensor__pixel_size__isnull=False):
+    for camera in [x for x in obj.imaging_cameras_2.all() if x.sensor and x.sensor.pixel_size is not None]:
         if value == 0 or camera.sensor.pixel_size < value:
             value = float(camera.sensor.pixel_size)
 
@@ -235,11 +243,11 @@ def _prepare_max_camera_pixel_size(obj):
     import sys
     value = sys.maxsize
 
-    for camera in obj.imaging_cameras.filter(pixel_size__isnull=False):
+    for camera in [x for x in obj.imaging_cameras.all() if x.pixel_size is not None]:
         if value == sys.maxsize or camera.pixel_size > value:
             value = float(camera.pixel_size)
 
-    for camera in obj.imaging_cameras_2.filter(sensor__isnull=False, sensor__pixel_size__isnull=False):
+    for camera in [x for x in obj.imaging_cameras_2.all() if x.sensor and x.sensor.pixel_size is not None]:
         if value == sys.maxsize or camera.sensor.pixel_size > value:
             value = float(camera.sensor.pixel_size)
 
@@ -355,27 +363,28 @@ class UserIndex(CelerySearchIndex, Indexable):
     def prepare_avatar_url(self, obj: User):
         return avatar_url(obj, 200)
 
+    def prepare(self, obj):
+        # All the image aggregates are computed at once, see `_get_user_stats`.
+        self._user_stats = UserStatsService(obj).get_search_index_stats()
+        try:
+            return super().prepare(obj)
+        finally:
+            self._user_stats = None
+
+    def _get_user_stats(self, obj):
+        stats = getattr(self, '_user_stats', None)
+        if stats is None:
+            stats = UserStatsService(obj).get_search_index_stats()
+        return stats
+
     def prepare_images(self, obj):
-        return UserService(obj).get_public_images().count()
+        return self._get_user_stats(obj)['images']
 
     def prepare_avg_integration(self, obj):
-        integration = 0
-        images = 0
-        for i in UserService(obj).get_public_images():
-            cached = cache.get(PREPARED_INTEGRATION_CACHE_KEY % i.pk)
-            image_integration = cached if cached is not None else _prepare_integration(i)
-            if image_integration:
-                images += 1
-                integration += image_integration
-
-        return (integration / 3600.0) / images if images else 0
+        return self._get_user_stats(obj)['avg_integration']
 
     def prepare_likes(self, obj):
-        likes = 0
-        for i in UserService(obj).get_public_images():
-            cached = cache.get(PREPARED_LIKES_CACHE_KEY % i.pk)
-            likes += cached if cached is not None else _prepare_likes(i)
-        return likes
+        return self._get_user_stats(obj)['likes']
 
     def prepare_likes_given(self, obj):
         return ToggleProperty.objects.toggleproperties_for_model('like', Image, obj).count()
@@ -384,20 +393,10 @@ class UserIndex(CelerySearchIndex, Indexable):
         return obj.userprofile.image_index
 
     def prepare_comment_likes_received(self, obj):
-        comments = NestedComment.objects.using(get_segregated_reader_database()).filter(author=obj)
-        likes = 0
-        for comment in comments.iterator():
-            likes += ToggleProperty.objects.toggleproperties_for_object('like', comment).count()
-
-        return likes
+        return self._get_user_stats(obj)['comment_likes_received']
 
     def prepare_forum_post_likes_received(self, obj):
-        posts = Post.objects.using(get_segregated_reader_database()).filter(user=obj)
-        likes = 0
-        for post in posts.iterator():
-            likes += ToggleProperty.objects.toggleproperties_for_object('like', post).count()
-
-        return likes
+        return self._get_user_stats(obj)['forum_post_likes_received']
 
     def prepare_total_likes_received(self, obj):
         likes = self.prepared_data.get('likes')
@@ -422,42 +421,19 @@ class UserIndex(CelerySearchIndex, Indexable):
         ).count()
 
     def prepare_integration(self, obj):
-        integration = 0
-        for i in UserService(obj).get_public_images():
-            cached = cache.get(PREPARED_INTEGRATION_CACHE_KEY % i.pk)
-            integration += cached if cached is not None else _prepare_integration(i)
-
-        return integration / 3600.0
+        return self._get_user_stats(obj)['integration']
 
     def prepare_moon_phase(self, obj):
-        l = []
-        for i in UserService(obj).get_public_images():
-            cached = cache.get(PREPARED_MOON_PHASE_CACHE_KEY % i.pk)
-            l.append(cached if cached is not None else _prepare_moon_phase(i))
-        if len(l) == 0:
-            return 0
-        return reduce(lambda x, y: x + y, l) / len(l)
+        return self._get_user_stats(obj)['moon_phase']
 
     def prepare_views(self, obj):
-        views = 0
-        for i in UserService(obj).get_public_images():
-            cached = cache.get(PREPARED_VIEWS_CACHE_KEY % i.pk)
-            views += cached if cached is not None else _prepare_views(i, 'image')
-        return views
+        return self._get_user_stats(obj)['views']
 
     def prepare_bookmarks(self, obj):
-        bookmarks = 0
-        for i in UserService(obj).get_public_images():
-            cached = cache.get(PREPARED_BOOKMARKS_CACHE_KEY % i.pk)
-            bookmarks += cached if cached is not None else _prepare_bookmarks(i)
-        return bookmarks
+        return self._get_user_stats(obj)['bookmarks']
 
     def prepare_comments(self, obj):
-        comments = 0
-        for i in UserService(obj).get_public_images():
-            cached = cache.get(PREPARED_COMMENTS_CACHE_KEY % i.pk)
-            comments += cached if cached is not None else _prepare_comments(i)
-        return comments
+        return self._get_user_stats(obj)['comments']
 
     def prepare_comments_written(self, obj):
         return NestedComment.objects.using(get_segregated_reader_database()).filter(author=obj, deleted=False).count()
@@ -479,6 +455,85 @@ class UserIndex(CelerySearchIndex, Indexable):
         return IotdService().get_iotds().filter(Q(image__user=obj) | Q(image__collaborators=obj)).distinct().count()
 
 
+class ImageIndexBatch:
+    """
+    Data needed to prepare a chunk of images for the ImageIndex, fetched with one query per kind of data instead of
+    several queries per image. See `ImageIndex.update_batch`.
+    """
+
+    EQUIPMENT_PREFETCH = (
+        'imaging_telescopes',
+        'guiding_telescopes',
+        'mounts',
+        'imaging_cameras',
+        'guiding_cameras',
+        'imaging_telescopes_2',
+        'guiding_telescopes_2',
+        'imaging_cameras_2__sensor',
+        'guiding_cameras_2__sensor',
+        'mounts_2',
+        'filters_2',
+        'accessories_2',
+        'software_2',
+    )
+
+    OTHER_PREFETCH = (
+        'solutions',
+        'locations',
+        'part_of_group_set',
+    )
+
+    def __init__(self, images, using=None):
+        using = using or get_segregated_reader_database()
+        image_ids = [x.pk for x in images]
+        user_ids = set([x.user_id for x in images])
+        image_content_type = ContentType.objects.get_for_model(Image)
+
+        prefetch_related_objects(images, *(self.EQUIPMENT_PREFETCH + self.OTHER_PREFETCH))
+
+        self.deep_sky_acquisitions = defaultdict(list)
+        for acquisition in DeepSky_Acquisition.objects.using(using).filter(image_id__in=image_ids).order_by('pk'):
+            self.deep_sky_acquisitions[acquisition.image_id].append(acquisition)
+
+        self.solar_system_acquisitions = defaultdict(list)
+        for acquisition in SolarSystem_Acquisition.objects.using(using).filter(image_id__in=image_ids).order_by('pk'):
+            self.solar_system_acquisitions[acquisition.image_id].append(acquisition)
+
+        self.toggleproperty_users = defaultdict(list)
+        for object_id, property_type, user_id in ToggleProperty.objects.using(using).filter(
+                content_type=image_content_type,
+                property_type__in=('like', 'bookmark'),
+                object_id__in=image_ids,
+        ).values_list('object_id', 'property_type', 'user_id'):
+            self.toggleproperty_users[(property_type, object_id)].append(user_id)
+
+        self.user_followers = defaultdict(list)
+        for object_id, user_id in ToggleProperty.objects.using(using).filter(
+                content_type=ContentType.objects.get_for_model(User),
+                property_type='follow',
+                object_id__in=user_ids,
+        ).values_list('object_id', 'user_id'):
+            self.user_followers[object_id].append(user_id)
+
+        self.views = dict(
+            (int(object_pk), hits) for object_pk, hits in HitCount.objects.using(using).filter(
+                content_type=image_content_type,
+                object_pk__in=image_ids,
+            ).values_list('object_pk', 'hits')
+        )
+
+        self.comments = dict(
+            NestedComment.objects.using(using).filter(
+                content_type=image_content_type,
+                object_id__in=image_ids,
+                deleted=False,
+            ).values('object_id').annotate(count=Count('id')).order_by().values_list('object_id', 'count')
+        )
+
+    def get_toggleproperty_users(self, property_type, image):
+        return self.toggleproperty_users.get((property_type, image.pk), [])
+
+
 class ImageIndex(CelerySearchIndex, Indexable):
     text = CharField(document=True, use_template=True)
 
@@ -542,6 +597,8 @@ class ImageIndex(CelerySearchIndex, Indexable):
     coord_dec_max = FloatField()
     pixel_scale = FloatField()
     field_radius = FloatField()
+    footprint_healpix_32 = MultiValueField()
+    footprint_healpix_256 = MultiValueField()
     countries = CharField()
 
     animated = BooleanField(model_attr='animated')
@@ -638,6 +695,53 @@ class ImageIndex(CelerySearchIndex, Indexable):
     def should_update(self, instance, **kwargs):
         return not instance.is_wip and instance.moderator_decision == ModeratorDecision.APPROVED
 
+    def update_batch(self, image_ids, using=None):
+        """
+        Prepares the given images with bulk-fetched data (see ImageIndexBatch) and sends them to the backend in a
+        single call. Images that should not be in the index are removed from it.
+        """
+        backend = self.get_backend(using)
+        images = list(self.index_queryset(using).filter(pk__in=image_ids))
+        indexable = [x for x in images if self.should_update(x)]
+        missing = set(image_ids) - set([x.pk for x in indexable])
+
+        if indexable:
+            self._batch = ImageIndexBatch(indexable)
+            try:
+                backend.update(self, indexable)
+            finally:
+                self._batch = None
+
+        for image_id in missing:
+            backend.remove(f'astrobin.image.{image_id}')
+
+        SearchResultCacheService.invalidate()
+
+        return len(indexable)
+
+    def update_object(self, instance, using=None, **kwargs):
+        super().update_object(instance, using, **kwargs)
+        SearchResultCacheService.invalidate()
+
+    def remove_object(self, instance, using=None, **kwargs):
+        super().remove_object(instance, using, **kwargs)
+        SearchResultCacheService.invalidate()
+
+    def _get_batch(self, obj) -> Optional[ImageIndexBatch]:
+        return getattr(self, '_batch', None)
+
+    def _get_deep_sky_acquisitions(self, obj):
+        batch = self._get_batch(obj)
+        if batch:
+            return batch.deep_sky_acquisitions.get(obj.pk, [])
+        return _get_deep_sky_acquisitions(obj)
+
+    def _get_solar_system_acquisitions(self, obj):
+        batch = self._get_batch(obj)
+        if batch:
+            return batch.solar_system_acquisitions.get(obj.pk, [])
+        return _get_solar_system_acquisitions(obj)
+
     def get_model(self):
         return Image
 
@@ -661,20 +765,16 @@ class ImageIndex(CelerySearchIndex, Indexable):
     ###################################################################################################################
 
     def prepare_imaging_telescopes(self, obj):
-        return [
-            f"{x.get('make')} {x.get('name')}" for x in obj.imaging_telescopes.all().values('make', 'name')
-        ]
+        return [f"{x.make} {x.name}" for x in obj.imaging_telescopes.all()]
 
     def prepare_guiding_telescopes(self, obj):
-        return [f"{x.get('make')} {x.get('name')}" for x in obj.guiding_telescopes.all().values('make', 'name')]
+        return [f"{x.make} {x.name}" for x in obj.guiding_telescopes.all()]
 
     def prepare_mounts(self, obj):
-        return [f"{x.get('make')} {x.get('name')}" for x in obj.mounts.all().values('make', 'name')]
+        return [f"{x.make} {x.name}" for x in obj.mounts.all()]
 
     def prepare_imaging_cameras(self, obj):
-        return [
-            f"{x.get('make')} {x.get('name')}" for x in obj.imaging_cameras.all().values('make', 'name', 'type')
-        ]
+        return [f"{x.make} {x.name}" for x in obj.imaging_cameras.all()]
 
     def prepare_guiding_cameras(self, obj):
         return [f"{x}" for x in obj.guiding_cameras.all()]
@@ -782,7 +882,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
 
     def prepare_has_modified_camera(self, obj):
         legacy_camera: LegacyCamera
-        for legacy_camera in obj.imaging_cameras.all().iterator():
+        for legacy_camera in obj.imaging_cameras.all():
             try:
                 info: GearUserInfo = GearUserInfo.objects.get(gear=legacy_camera, user=obj.user)
                 if info.modded:
@@ -790,7 +890,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
             except GearUserInfo.DoesNotExist:
                 continue
         camera: Camera
-        for camera in obj.imaging_cameras_2.all().iterator():
+        for camera in obj.imaging_cameras_2.all():
             if camera.modified:
                 return True
 
@@ -798,7 +898,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
 
     def prepare_has_color_camera(self, obj):
         camera: Camera
-        for camera in obj.imaging_cameras_2.all().iterator():
+        for camera in obj.imaging_cameras_2.all():
             if camera.sensor and camera.sensor.color_or_mono == ColorOrMono.COLOR.value:
                 return True
 
@@ -806,7 +906,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
 
     def prepare_has_mono_camera(self, obj):
         camera: Camera
-        for camera in obj.imaging_cameras_2.all().iterator():
+        for camera in obj.imaging_cameras_2.all():
             if camera.sensor and camera.sensor.color_or_mono == ColorOrMono.MONO.value:
                 return True
 
@@ -827,7 +927,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
     def prepare_min_telescope_weight(self, obj):
         value = 0
 
-        for telescope in obj.imaging_telescopes_2.filter(weight__isnull=False):
+        for telescope in [x for x in obj.imaging_telescopes_2.all() if x.weight is not None]:
             if value == 0 or telescope.weight < value:
                 value = telescope.weight
 
@@ -836,7 +936,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
     def prepare_max_telescope_weight(self, obj):
         value = sys.maxsize
 
-        for telescope in obj.imaging_telescopes_2.filter(weight__isnull=False):
+        for telescope in [x for x in obj.imaging_telescopes_2.all() if x.weight is not None]:
             if value == sys.maxsize or telescope.weight > value:
                 value = int(telescope.weight)
 
@@ -845,7 +945,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
     def prepare_min_mount_weight(self, obj):
         value = 0
 
-        for mount in obj.mounts_2.filter(weight__isnull=False):
+        for mount in [x for x in obj.mounts_2.all() if x.weight is not None]:
             if value == 0 or mount.weight < value:
                 value = mount.weight
 
@@ -854,7 +954,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
     def prepare_max_mount_weight(self, obj):
         value = sys.maxsize
 
-        for mount in obj.mounts_2.filter(weight__isnull=False):
+        for mount in [x for x in obj.mounts_2.all() if x.weight is not None]:
             if value == sys.maxsize or mount.weight > value:
                 value = int(mount.weight)
 
@@ -863,11 +963,11 @@ class ImageIndex(CelerySearchIndex, Indexable):
     def prepare_min_mount_max_payload(self, obj):
         value = 0
 
-        for mount in obj.mounts.filter(max_payload__isnull=False):
+        for mount in [x for x in obj.mounts.all() if x.max_payload is not None]:
             if value == 0 or mount.max_payload < value:
                 value = mount.max_payload
 
-        for mount in obj.mounts_2.filter(max_payload__isnull=False):
+        for mount in [x for x in obj.mounts_2.all() if x.max_payload is not None]:
             if value == 0 or mount.max_payload < value:
                 value = mount.max_payload
 
@@ -876,11 +976,11 @@ class ImageIndex(CelerySearchIndex, Indexable):
     def prepare_max_mount_max_payload(self, obj):
         value = sys.maxsize
 
-        for mount in obj.mounts.filter(max_payload__isnull=False):
+        for mount in [x for x in obj.mounts.all() if x.max_payload is not None]:
             if value == sys.maxsize or mount.max_payload > value:
                 value = int(mount.max_payload)
 
-        for mount in obj.mounts_2.filter(max_payload__isnull=False):
+        for mount in [x for x in obj.mounts_2.all() if x.max_payload is not None]:
             if value == sys.maxsize or mount.max_payload > value:
                 value = int(mount.max_payload)
 
@@ -915,6 +1015,27 @@ class ImageIndex(CelerySearchIndex, Indexable):
     def prepare_pixel_scale(self, obj):
         return obj.solution.pixscale if obj.solution else None
 
+    def _prepare_footprint(self, obj, nside: int):
+        if obj.solution is None:
+            return None
+
+        footprint = getattr(obj.solution, f'footprint_healpix_{nside}')
+        if footprint is None and obj.solution.footprint_healpix_32 is None:
+            # Not backfilled yet.
+            footprint = SolutionService(obj.solution).get_footprints()[nside]
+
+        if footprint is None and nside == healpix.FINE_NSIDE and obj.solution.ra is not None:
+            # Too large for a fine footprint: see SearchService.filter_by_cone.
+            return [healpix.OMITTED]
+
+        return footprint
+
+    def prepare_footprint_healpix_32(self, obj):
+        return self._prepare_footprint(obj, healpix.COARSE_NSIDE)
+
+    def prepare_footprint_healpix_256(self, obj):
+        return self._prepare_footprint(obj, healpix.FINE_NSIDE)
+
     def prepare_field_radius(self, obj):
         return obj.solution.radius if obj.solution else None
 
@@ -931,47 +1052,47 @@ class ImageIndex(CelerySearchIndex, Indexable):
         return obj.loop_video if obj.loop_video else False
 
     def prepare_likes(self, obj):
+        batch = self._get_batch(obj)
+        if batch:
+            return len(batch.get_toggleproperty_users('like', obj))
         return _prepare_likes(obj)
 
     def prepare_liked_by(self, obj):
+        batch = self._get_batch(obj)
+        if batch:
+            return [x for x in batch.get_toggleproperty_users('like', obj) if x is not None]
         likes = ToggleProperty.objects.toggleproperties_for_object("like", obj).filter(user__isnull=False)
         return [x.user.pk for x in likes.all()]
 
     def prepare_integration(self, obj):
+        if self._get_batch(obj):
+            return _get_integration(self._get_deep_sky_acquisitions(obj))
         return _prepare_integration(obj)
 
     def prepare_moon_phase(self, obj):
+        if self._get_batch(obj):
+            return _get_moon_phase(self._get_deep_sky_acquisitions(obj)) or 0
         return _prepare_moon_phase(obj)
 
     def prepare_first_acquisition_date(self, obj):
-        return _prepare_first_acquisition_date(obj)
+        return _get_acquisition_date(
+            self._get_deep_sky_acquisitions(obj), self._get_solar_system_acquisitions(obj), min
+        )
 
     def prepare_last_acquisition_date(self, obj):
-        return _prepare_last_acquisition_date(obj)
+        return _get_acquisition_date(
+            self._get_deep_sky_acquisitions(obj), self._get_solar_system_acquisitions(obj), max
+        )
 
     def prepare_acquisition_months(self, obj):
-        deep_sky_acquisitions = DeepSky_Acquisition.objects.using(get_segregated_reader_database()).filter(
-            image=obj, date__isnull=False
+        return _get_acquisition_months(
+            self._get_deep_sky_acquisitions(obj), self._get_solar_system_acquisitions(obj)
         )
 
-        if deep_sky_acquisitions.exists():
-            return list(set([x.date.strftime('%b') for x in deep_sky_acquisitions.all()]))
-        else:
-            try:
-                solar_system_acquisition = SolarSystem_Acquisition.objects.get(image=obj)
-            except SolarSystem_Acquisition.MultipleObjectsReturned:
-                solar_system_acquisition = SolarSystem_Acquisition.objects.filter(image=obj).first()
-            except SolarSystem_Acquisition.DoesNotExist:
-                return None
-
-            if solar_system_acquisition.date:
-                return [solar_system_acquisition.date.strftime('%b')]
-            else:
-                return None
-
-        return None
-
     def prepare_views(self, obj):
+        batch = self._get_batch(obj)
+        if batch:
+            return batch.views.get(obj.pk, 0)
         return _prepare_views(obj, 'image')
 
     def prepare_final_w(self, obj):
@@ -994,9 +1115,15 @@ class ImageIndex(CelerySearchIndex, Indexable):
         return obj.license
 
     def prepare_bookmarks(self, obj):
+        batch = self._get_batch(obj)
+        if batch:
+            return len(batch.get_toggleproperty_users('bookmark', obj))
         return _prepare_bookmarks(obj)
 
     def prepare_bookmarked_by(self, obj):
+        batch = self._get_batch(obj)
+        if batch:
+            return batch.get_toggleproperty_users('bookmark', obj)
         bookmarks = ToggleProperty.objects.toggleproperties_for_object("bookmark", obj)
         return [x.user.pk for x in bookmarks.all()]
 
@@ -1013,6 +1140,9 @@ class ImageIndex(CelerySearchIndex, Indexable):
         return _prepare_camera_types(obj)
 
     def prepare_comments(self, obj):
+        batch = self._get_batch(obj)
+        if batch:
+            return batch.comments.get(obj.pk, 0)
         return _prepare_comments(obj)
 
     def prepare_is_iotd(self, obj):
@@ -1027,14 +1157,16 @@ class ImageIndex(CelerySearchIndex, Indexable):
             not IotdService().is_iotd(obj)
 
     def prepare_objects_in_field(self, obj):
+        search_synonyms_matcher = get_search_synonyms_matcher()
+
         def process_solution(solution):
             if solution and (solution.objects_in_field or solution.advanced_annotations):
                 objects = SolutionService(solution).get_objects_in_field()
                 result = ' '.join(SolutionService(solution).duplicate_objects_in_field_by_catalog_space()).strip()
                 for x in objects:
-                    synonyms = UtilsService.get_search_synonyms_text(x.strip())
+                    synonyms = search_synonyms_matcher.get_synonyms(x.strip())
                     if synonyms:
-                        result = f'{result} {" ".join(synonyms.split(","))}'.strip()
+                        result = f'{result} {" ".join(synonyms)}'.strip()
                 return result
             return ""
 
@@ -1053,14 +1185,7 @@ class ImageIndex(CelerySearchIndex, Indexable):
         return ' '.join([f'__{x.pk}__' for x in obj.part_of_group_set.all()]).strip() or None
 
     def prepare_bortle_scale(self, obj):
-        deep_sky_acquisitions = DeepSky_Acquisition.objects.using(get_segregated_reader_database()).filter(
-            image=obj, bortle__isnull=False
-        )
-
-        if deep_sky_acquisitions.exists():
-            return sum([float(x.bortle) for x in deep_sky_acquisitions]) / float(deep_sky_acquisitions.count())
-
-        return None
+        return _get_bortle_scale(self._get_deep_sky_acquisitions(obj))
 
     def prepare_gallery_thumbnail(self, obj: Image):
         return obj.thumbnail('gallery', 'final', sync=True)
@@ -1069,6 +1194,9 @@ class ImageIndex(CelerySearchIndex, Indexable):
         return obj.thumbnail('regular', 'final', sync=True)
 
     def prepare_user_followed_by(self, obj: Image):
+        batch = self._get_batch(obj)
+        if batch:
+            return batch.user_followers.get(obj.user_id, [])
         follows = ToggleProperty.objects.toggleproperties_for_object("follow", obj.user)
         return [x.user.pk for x in follows.all()]
 
@@ -47,6 +47,7 @@ include(
     'components/sentry.py',
 
     # AstroBin settings
+    'components/equipment.py',
     'components/flickr.py',
     'components/iotd.py',
     'components/platesolving.py',
@@ -54,6 +54,11 @@ SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 GEOIP_PATH = os.path.abspath(os.path.dirname(__name__)) + "/astrobin/geoip2"
 
+# GeoNames cities dump loaded by `load_gazetteer`, see astrobin/gazetteer/COPYRIGHT.txt.
+GAZETTEER_PATH = os.environ.get(
+    'GAZETTEER_PATH', os.path.abspath(os.path.dirname(__name__)) + "/astrobin/gazetteer/cities15000.txt"
+)
+
 from django.utils.translation import ugettext_lazy as _
 
 ALL_LANGUAGE_CHOICES = (
@@ -1,6 +1,8 @@
 import os
 
 CACHE_TYPE = os.environ.get('CACHE_TYPE', 'redis').strip()
+CACHE_COMPRESSOR_ALGORITHM = os.environ.get('CACHE_COMPRESSOR_ALGORITHM', '').strip() or None
+CACHE_COMPRESSOR_MIN_LENGTH = int(os.environ.get('CACHE_COMPRESSOR_MIN_LENGTH', '1024'))
 
 if CACHE_TYPE == 'redis':
     CACHES = {
@@ -9,6 +11,9 @@ if CACHE_TYPE == 'redis':
             'LOCATION': os.environ.get('CACHE_URL', 'redis://redis:6379/1').strip(),
             'OPTIONS': {
                 'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'COMPRESSOR': 'astrobin.custom_redis_compressor.CustomRedisCompressor',
+                'COMPRESSOR_ALGORITHM': CACHE_COMPRESSOR_ALGORITHM,
+                'COMPRESSOR_MIN_LENGTH': CACHE_COMPRESSOR_MIN_LENGTH,
                 'PICKLE_VERSION': 5,
                 'PARSER_CLASS': 'redis.connection._HiredisParser',
                 'CONNECTION_POOL_KWARGS': {
@@ -23,6 +28,9 @@ if CACHE_TYPE == 'redis':
             'LOCATION': os.environ.get('CACHE_URL_JSON', 'redis://redis:6379/3').strip(),
             'OPTIONS': {
                 'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'COMPRESSOR': 'astrobin.custom_redis_compressor.CustomRedisCompressor',
+                'COMPRESSOR_ALGORITHM': CACHE_COMPRESSOR_ALGORITHM,
+                'COMPRESSOR_MIN_LENGTH': CACHE_COMPRESSOR_MIN_LENGTH,
                 "SERIALIZER": "django_redis.serializers.json.JSONSerializer",
                 'CONNECTION_POOL_KWARGS': {
                     'max_connections': 100,
@@ -55,4 +55,12 @@ CELERY_ROUTES = {
         'queue': 'haystack',
         'routing_key': 'haystack',
     },
+    'astrobin.tasks.process_search_index_update_queue': {
+        'queue': 'haystack',
+        'routing_key': 'haystack',
+    },
+    'astrobin.tasks.refresh_search_facet_counts': {
+        'queue': 'haystack',
+        'routing_key': 'haystack',
+    },
 }
@@ -0,0 +1,5 @@
+import os
+
+# Serve the equipment item autocomplete from an in-memory index, see EquipmentAutocompleteService.
+EQUIPMENT_AUTOCOMPLETE_IN_MEMORY_ENABLED = \
+    os.environ.get('EQUIPMENT_AUTOCOMPLETE_IN_MEMORY_ENABLED', 'false').strip() == 'true'
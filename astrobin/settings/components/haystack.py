@@ -1,3 +1,4 @@
+import json
 import os
 
 import boto3
@@ -57,3 +58,48 @@ if not TESTING:
     HAYSTACK_SIGNAL_PROCESSOR = 'celery_haystack.signals.CelerySignalProcessor'
 else:
     HAYSTACK_SIGNAL_PROCESSOR = 'haystack.signals.BaseSignalProcessor'
+
+# Used by the `update_image_index` management command.
+SEARCH_INDEX_BATCH_SIZE = int(os.environ.get('SEARCH_INDEX_BATCH_SIZE', '500'))
+SEARCH_INDEX_WORKERS = int(os.environ.get('SEARCH_INDEX_WORKERS', '1'))
+
+# Coalescing queue for search index updates, see SearchIndexUpdateService. It requires the default cache to be Redis.
+SEARCH_INDEX_UPDATE_QUEUE_ENABLED = \
+    os.environ.get('SEARCH_INDEX_UPDATE_QUEUE_ENABLED', 'false').strip() == 'true' and not TESTING
+SEARCH_INDEX_UPDATE_QUEUE_DELAY = int(os.environ.get('SEARCH_INDEX_UPDATE_QUEUE_DELAY', '30'))
+SEARCH_INDEX_UPDATE_QUEUE_BATCH_SIZE = int(os.environ.get('SEARCH_INDEX_UPDATE_QUEUE_BATCH_SIZE', '200'))
+SEARCH_INDEX_UPDATE_QUEUE_MAX_RUN_TIME = int(os.environ.get('SEARCH_INDEX_UPDATE_QUEUE_MAX_RUN_TIME', '50'))
+SEARCH_INDEX_UPDATE_QUEUE_HIGH_WATER_MARK = int(os.environ.get('SEARCH_INDEX_UPDATE_QUEUE_HIGH_WATER_MARK', '50000'))
+SEARCH_INDEX_UPDATE_QUEUE_BACKOFF = int(os.environ.get('SEARCH_INDEX_UPDATE_QUEUE_BACKOFF', '300'))
+# Seconds after which the updates claimed by a drainer that didn't finish are queued again. Longer than the time limit
+# of `process_search_index_update_queue`.
+SEARCH_INDEX_UPDATE_QUEUE_LEASE = int(os.environ.get('SEARCH_INDEX_UPDATE_QUEUE_LEASE', '120'))
+
+# Cache of the ordered result ids of the image search, see SearchResultCacheService.
+SEARCH_RESULT_CACHE_ENABLED = os.environ.get('SEARCH_RESULT_CACHE_ENABLED', 'true').strip() == 'true' and not TESTING
+SEARCH_RESULT_CACHE_TIMEOUT = int(os.environ.get('SEARCH_RESULT_CACHE_TIMEOUT', '120'))
+SEARCH_RESULT_CACHE_WINDOW = int(os.environ.get('SEARCH_RESULT_CACHE_WINDOW', '200'))
+SEARCH_RESULT_CACHE_INVALIDATION_INTERVAL = int(os.environ.get('SEARCH_RESULT_CACHE_INVALIDATION_INTERVAL', '10'))
+
+# Facet counts of the image search, see FacetCountService. The unfiltered state is always precomputed.
+SEARCH_FACET_PRECOMPUTED_STATES = json.loads(
+    os.environ.get(
+        'SEARCH_FACET_PRECOMPUTED_STATES',
+        '[{"subject_type": "DEEP_SKY"}, {"subject_type": "SOLAR_SYSTEM"}, {"subject_type": "WIDE_FIELD"}]'
+    )
+)
+SEARCH_FACET_COUNTS_TIMEOUT = int(os.environ.get('SEARCH_FACET_COUNTS_TIMEOUT', str(60 * 60 * 6)))
+SEARCH_FACET_LIVE_COUNTS_TIMEOUT = int(os.environ.get('SEARCH_FACET_LIVE_COUNTS_TIMEOUT', '300'))
+# Each value of a live facet is a search of its own: a live request counts at most this many values.
+SEARCH_FACET_LIVE_MAX_COUNTS = int(os.environ.get('SEARCH_FACET_LIVE_MAX_COUNTS', '40'))
+
+# Cone and similar-image searches on the HEALPix footprints of the image index. Requires a reindex of the images
+# after the footprints are backfilled, until then the RA/Dec bounding boxes are used.
+SEARCH_HEALPIX_FOOTPRINTS_ENABLED = os.environ.get('SEARCH_HEALPIX_FOOTPRINTS_ENABLED', 'false').strip() == 'true'
+# Elasticsearch refuses queries with more than 1024 clauses.
+SEARCH_HEALPIX_MAX_QUERY_PIXELS = int(os.environ.get('SEARCH_HEALPIX_MAX_QUERY_PIXELS', '500'))
+
+# Sampling of anonymized image search parameters, replayed by `manage.py replay_searches`.
+SEARCH_REPLAY_RECORDING_ENABLED = os.environ.get('SEARCH_REPLAY_RECORDING_ENABLED', 'false').strip() == 'true'
+SEARCH_REPLAY_RECORDING_SAMPLE_RATE = float(os.environ.get('SEARCH_REPLAY_RECORDING_SAMPLE_RATE', '0.01'))
+SEARCH_REPLAY_RECORDING_MAX_SIZE = int(os.environ.get('SEARCH_REPLAY_RECORDING_MAX_SIZE', '10000'))
@@ -4,3 +4,5 @@ NOTIFICATION_BACKENDS = (
     ("email", "astrobin_apps_notifications.backends.EmailBackend"),
 )
 
+# How many recipients of the same notice are loaded, rendered for and delivered to at once.
+NOTIFICATION_FAN_OUT_CHUNK_SIZE = 500
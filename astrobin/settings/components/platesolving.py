@@ -10,3 +10,9 @@ PLATESOLVING_BACKENDS = (
 ASTROMETRY_NET_API_KEY = os.environ.get('ASTROMETRY_NET_API_KEY', 'platesolving').strip()
 PIXINSIGHT_USERNAME = os.environ.get('PIXINSIGHT_USERNAME', '').strip()
 PIXINSIGHT_PASSWORD = os.environ.get('PIXINSIGHT_PASSWORD', '').strip()
+
+# HEALPix footprints of solutions, see `astrobin_apps_platesolving.healpix`. They're stored in PostgreSQL arrays, and
+# computed when a solution is saved if enabled. Fine footprints with more pixels than this are not stored: those fields
+# are only matched at the coarse resolution.
+PLATESOLVING_FOOTPRINTS_ENABLED = os.environ.get('PLATESOLVING_FOOTPRINTS_ENABLED', 'true').strip() == 'true'
+PLATESOLVING_FOOTPRINT_MAX_PIXELS = int(os.environ.get('PLATESOLVING_FOOTPRINT_MAX_PIXELS', '2048'))
@@ -64,6 +64,9 @@ if TESTING:
     PREMIUM_MAX_IMAGES_FREE = 20
     PREMIUM_MAX_IMAGES_LITE = 20
 
+    # The footprints are PostgreSQL arrays, and the tests run on SQLite.
+    PLATESOLVING_FOOTPRINTS_ENABLED = False
+
     CELERY_ALWAYS_EAGER = True
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_RESULT_BACKEND = 'cache'
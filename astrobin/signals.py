@@ -42,6 +42,8 @@ from astrobin.tasks import (
 )
 from astrobin_apps_equipment.models import EquipmentBrand, EquipmentItem, EquipmentPreset
 from astrobin_apps_equipment.services import EquipmentItemService
+from astrobin_apps_equipment.services.equipment_item_co_occurrence_service import EquipmentItemCoOccurrenceService
+from astrobin_apps_equipment.services.equipment_stats_service import EquipmentStatsService
 from astrobin_apps_equipment.tasks import (
     approve_migration_strategy, update_equipment_preset_image_count,
     update_equipment_preset_total_integration,
@@ -85,7 +87,7 @@ from toggleproperties.models import ToggleProperty
 from .enums.moderator_decision import ModeratorDecision
 from .models import (
     Accessory, Camera, CameraRenameProposal, Collection, DeepSky_Acquisition, Filter, FocalReducer, Gear,
-    GearMigrationStrategy, Image,
+    GearMigrationStrategy, HasSolutionMixin, Image,
     ImageEquipmentLog, ImageRevision,
     Mount,
     Software, Telescope,
@@ -150,6 +152,10 @@ def image_pre_save(sender, instance, **kwargs):
             # This image is being published
             instance.published = datetime.datetime.now()
 
+        if instance.is_wip != image.is_wip:
+            EquipmentItemCoOccurrenceService.enqueue_update(EquipmentItemCoOccurrenceService.get_image_items(instance))
+            EquipmentStatsService.enqueue_update(EquipmentStatsService.get_image_items(instance))
+
         previous_mentions = MentionsService.get_mentions(image.description_bbcode)
         current_mentions = MentionsService.get_mentions(instance.description_bbcode)
         mentions = [item for item in current_mentions if item not in previous_mentions]
@@ -184,6 +190,8 @@ pre_save.connect(image_pre_save_invalidate_thumbnails, sender=Image)
 
 @receiver(post_save, sender=Image)
 def image_post_save(sender, instance: Image, created: bool, **kwargs):
+    ImageService.get_final_revision_label.forget_key(instance.pk)
+
     if kwargs.get('update_fields', None):
         return
 
@@ -315,6 +323,8 @@ def image_post_softdelete(sender, instance, **kwargs):
     ImageIndex().remove_object(instance)
     UserService(instance.user).clear_gallery_image_list_cache()
     ImageService(instance).delete_stories()
+    EquipmentItemCoOccurrenceService.enqueue_update(EquipmentItemCoOccurrenceService.get_image_items(instance))
+    EquipmentStatsService.enqueue_update(EquipmentStatsService.get_image_items(instance))
 
     if instance.moderator_decision == ModeratorDecision.APPROVED:
         UserService(instance.user).update_image_count()
@@ -403,6 +413,8 @@ def imagerevision_pre_save(sender, instance: ImageRevision, **kwargs):
 
 
 def imagerevision_post_save(sender, instance: ImageRevision, created: bool, **kwargs):
+    ImageService.get_final_revision_label.forget_key(instance.image_id)
+
     if kwargs.get('update_fields', None):
         return
 
@@ -473,6 +485,7 @@ def imagerevision_post_softdelete(sender, instance, **kwargs):
             is_final=True,
             updated=timezone.now()
         )
+        ImageService.get_final_revision_label.forget_key(instance.image_id)
 
 
 @receiver(pre_delete, sender=ImageRevision)
@@ -800,6 +813,8 @@ pre_save.connect(solution_pre_save, sender=Solution)
 
 @receiver(post_save, sender=Solution)
 def solution_post_save(sender, instance, created, **kwargs):
+    HasSolutionMixin._get_first_solution.forget_key((instance.content_type.model, int(instance.object_id)))
+
     is_solved: bool = instance.status >= Solver.SUCCESS
     model: str = instance.content_type.model
     is_image: bool = model == 'image'
@@ -846,6 +861,8 @@ def solution_post_save(sender, instance, created, **kwargs):
 
 @receiver(pre_delete, sender=Solution)
 def solution_pre_delete(sender, instance, **kwargs):
+    HasSolutionMixin._get_first_solution.forget_key((instance.content_type.model, int(instance.object_id)))
+
     if instance.content_type.model == 'image':
         log.debug(f"Removing constellation for image {instance.object_id}")
         Image.objects_including_wip.filter(pk=instance.object_id).update(constellation=None)
@@ -1240,12 +1257,19 @@ def new_equipment_changed(sender, instance: Image, **kwargs):
         SearchIndexUpdateService.update_index(instance)
         SearchIndexUpdateService.update_index(instance.user)
 
+    co_occurrence_klass = EquipmentItemCoOccurrenceService.get_klass_by_through_model(sender)
+    stats_klass = EquipmentStatsService.get_klass_by_model(model_class)
+
     if action == 'pre_clear':
         item_ids = sender.objects.filter(image=instance).values_list(model_class.__name__.lower(), flat=True)
         items = model_class.objects.filter(pk__in=list(item_ids))
         for item in items.iterator():
             update_indexes(item)
         items.update(last_added_or_removed_from_image=now)
+        if co_occurrence_klass:
+            EquipmentItemCoOccurrenceService.enqueue_update([(co_occurrence_klass, x) for x in item_ids])
+        if stats_klass:
+            EquipmentStatsService.enqueue_update([(stats_klass, x) for x in item_ids])
     elif action == 'post_remove':
         for pk in pk_set:
             item = get_object_or_None(model_class, pk=pk)
@@ -1271,6 +1295,12 @@ def new_equipment_changed(sender, instance: Image, **kwargs):
                 if not item.last_added_or_removed_from_image or item.last_added_or_removed_from_image < update_deadline:
                     model_class.objects.filter(pk=pk).update(last_added_or_removed_from_image=now)
 
+    if action in ('post_add', 'post_remove') and co_occurrence_klass:
+        EquipmentItemCoOccurrenceService.enqueue_update([(co_occurrence_klass, x) for x in pk_set])
+
+    if action in ('post_add', 'post_remove') and stats_klass:
+        EquipmentStatsService.enqueue_update([(stats_klass, x) for x in pk_set])
+
 
 m2m_changed.connect(new_equipment_changed, sender=Image.imaging_telescopes_2.through)
 m2m_changed.connect(new_equipment_changed, sender=Image.imaging_cameras_2.through)
@@ -69,7 +69,8 @@ from astrobin_apps_groups.models import Group as AstroBinGroup
 from astrobin_apps_images.services import ImageService
 from astrobin_apps_notifications.utils import push_notification
 from astrobin_apps_users.services import UserService
-from common.services import DateTimeService
+from common.services import DateTimeService, SearchIndexUpdateService
+from common.services.facet_count_service import FacetCountService
 from common.utils import get_segregated_reader_database
 from nested_comments.models import NestedComment
 
@@ -994,6 +995,21 @@ def update_index(content_type_pk, object_pk):
     signal_processor.enqueue_save(model_class, instance)
 
 
+@shared_task(time_limit=90, acks_late=False)
+def process_search_index_update_queue():
+    lock_id = 'process_search_index_update_queue_lock'
+
+    # Only one drainer at a time, or batches would be split between workers.
+    if not cache.add(lock_id, 'true', 90):
+        logger.debug("process_search_index_update_queue: already running")
+        return
+
+    try:
+        SearchIndexUpdateService.process_queue()
+    finally:
+        cache.delete(lock_id)
+
+
 @shared_task(time_limit=3600, acks_late=False)
 def hard_delete_deleted_users():
     profiles = UserProfile.deleted_objects.filter(
@@ -1177,3 +1193,17 @@ def invalidate_all_image_thumbnails(pk: int):
     image = get_object_or_None(Image.all_objects, pk=pk)
     if image:
         ImageService(image).invalidate_all_thumbnails()
+
+
+@shared_task(time_limit=1800, acks_late=False)
+def refresh_search_facet_counts():
+    lock_id = 'refresh_search_facet_counts_lock'
+
+    if not cache.add(lock_id, 'true', 1800):
+        logger.debug("refresh_search_facet_counts: already running")
+        return
+
+    try:
+        FacetCountService.refresh_precomputed()
+    finally:
+        cache.delete(lock_id)
@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.test import TestCase
+
+from astrobin.search_indexes import ImageIndex, ImageIndexBatch
+from astrobin.tests.generators import Generators
+from nested_comments.tests.nested_comments_generators import NestedCommentsGenerators
+
+
+class ImageIndexTest(TestCase):
+    BATCHED_FIELDS = (
+        'likes',
+        'liked_by',
+        'bookmarks',
+        'integration',
+        'moon_phase',
+        'first_acquisition_date',
+        'last_acquisition_date',
+        'acquisition_months',
+        'views',
+        'comments',
+        'bortle_scale',
+        'user_followed_by',
+        'min_aperture',
+        'max_aperture',
+        'min_focal_length',
+        'max_focal_length',
+        'telescope_types',
+        'camera_types',
+        'imaging_telescopes_2',
+        'imaging_cameras_2',
+        'has_color_camera',
+        'has_mono_camera',
+    )
+
+    def _prepare(self, index, image):
+        return dict((field, getattr(index, f'prepare_{field}')(image)) for field in self.BATCHED_FIELDS)
+
+    def test_batch_preparation_matches_single_preparation(self):
+        user = Generators.user()
+        Generators.follow(user)
+
+        image1 = Generators.image(user=user)
+        image1.imaging_telescopes.add(Generators.telescope())
+        Generators.deep_sky_acquisition(image1, number=10, duration=300, date=date(2020, 1, 1))
+        Generators.deep_sky_acquisition(image1, number=5, duration=600, date=date(2020, 3, 10))
+        Generators.like(image1)
+        Generators.like(image1)
+        NestedCommentsGenerators.comment(target=image1)
+
+        image2 = Generators.image(user=user)
+        Generators.solar_system_acquisition(image2)
+
+        image3 = Generators.image()
+
+        index = ImageIndex()
+        images = [image1, image2, image3]
+        expected = dict((image.pk, self._prepare(index, image)) for image in images)
+
+        index._batch = ImageIndexBatch(images)
+        try:
+            for image in images:
+                actual = self._prepare(index, image)
+                for field in self.BATCHED_FIELDS:
+                    value = actual[field]
+                    if isinstance(value, list):
+                        self.assertEqual(sorted(expected[image.pk][field]), sorted(value), field)
+                    else:
+                        self.assertEqual(expected[image.pk][field], value, field)
+        finally:
+            index._batch = None
@@ -0,0 +1,52 @@
+import re
+
+from django.test import TestCase
+
+from astrobin.services.search_synonyms_matcher import SEARCH_SYNONYMS, SearchSynonymsMatcher
+
+
+def _legacy_get_row(text):
+    # The per-synonym regex search that the matcher replaces, used as reference.
+    for row in SEARCH_SYNONYMS.strip().split('\n'):
+        for synonym in row.split(','):
+            if re.search(r'\b' + re.escape(synonym) + r'\b', text, re.IGNORECASE):
+                return row
+
+    return None
+
+
+class SearchSynonymsMatcherTest(TestCase):
+    def test_get_row(self):
+        matcher = SearchSynonymsMatcher('a 1,alpha\nb 2,beta,alpha')
+
+        self.assertEqual('a 1,alpha', matcher.get_row('Alpha'))
+        self.assertEqual('b 2,beta,alpha', matcher.get_row('the beta and B 2'))
+        self.assertEqual('a 1,alpha', matcher.get_row('beta and alpha'))
+        self.assertIsNone(matcher.get_row('alphabet'))
+        self.assertIsNone(matcher.get_row('a 12'))
+        self.assertIsNone(matcher.get_row('_beta'))
+        self.assertIsNone(matcher.get_row(''))
+
+    def test_get_synonyms(self):
+        matcher = SearchSynonymsMatcher('a 1,alpha\nb 2,beta')
+
+        self.assertEqual(['b 2', 'beta'], matcher.get_synonyms('(Beta)'))
+        self.assertEqual([], matcher.get_synonyms('gamma'))
+
+    def test_matches_legacy_implementation(self):
+        matcher = SearchSynonymsMatcher()
+        texts = [
+            'A beautiful view of the Crab Nebula',
+            'This image shows the famous Andromeda Galaxy',
+            'Galactic Core',
+            'Galaxy NGC',
+            'M31',
+            'M 31, M 32 and M 110',
+            'crab_nebula',
+            "Ptolemy's Cluster",
+            'İC 434 and the Horsehead',
+            'Sh2-155',
+        ]
+
+        for text in texts:
+            self.assertEqual(_legacy_get_row(text), matcher.get_row(text), text)
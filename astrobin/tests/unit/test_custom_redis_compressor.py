@@ -0,0 +1,44 @@
+import pickle
+import zlib
+
+from django.test import TestCase
+from django_redis.exceptions import CompressorError
+
+from astrobin.custom_redis_compressor import (
+    ALGORITHM_ZLIB, CustomRedisCompressor, MAGIC, available_algorithms,
+)
+
+
+class CustomRedisCompressorTest(TestCase):
+    def _payload(self):
+        return pickle.dumps({'results': [{'pk': pk, 'title': 'M31 Andromeda galaxy'} for pk in range(200)]}, 5)
+
+    def test_small_values_are_not_compressed(self):
+        compressor = CustomRedisCompressor({'COMPRESSOR_MIN_LENGTH': 1024})
+        value = pickle.dumps({'pk': 1}, 5)
+        self.assertEqual(value, compressor.compress(value))
+
+    def test_round_trip_with_every_available_algorithm(self):
+        value = self._payload()
+        for algorithm in available_algorithms():
+            compressor = CustomRedisCompressor({'COMPRESSOR_ALGORITHM': algorithm})
+            compressed = compressor.compress(value)
+            self.assertTrue(compressed.startswith(MAGIC))
+            self.assertLess(len(compressed), len(value))
+            self.assertEqual(value, compressor.decompress(compressed))
+
+    def test_values_compressed_with_another_algorithm_can_be_read(self):
+        value = self._payload()
+        compressed = CustomRedisCompressor({'COMPRESSOR_ALGORITHM': ALGORITHM_ZLIB}).compress(value)
+        for algorithm in available_algorithms():
+            self.assertEqual(value, CustomRedisCompressor({'COMPRESSOR_ALGORITHM': algorithm}).decompress(compressed))
+
+    def test_legacy_values_raise_compressor_error(self):
+        compressor = CustomRedisCompressor({})
+        with self.assertRaises(CompressorError):
+            compressor.decompress(self._payload())
+        with self.assertRaises(CompressorError):
+            compressor.decompress(zlib.compress(self._payload()))
+
+    def test_unknown_algorithm_falls_back_to_zlib(self):
+        self.assertEqual(ALGORITHM_ZLIB, CustomRedisCompressor({'COMPRESSOR_ALGORITHM': 'foo'}).algorithm)
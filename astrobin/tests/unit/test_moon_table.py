@@ -0,0 +1,35 @@
+from datetime import date, datetime, timedelta
+
+from django.test import TestCase
+
+from astrobin.moon import MoonPhase
+from astrobin.moon_table import TABLE_END, TABLE_START, get_age, get_illuminated
+
+
+class MoonTableTest(TestCase):
+    def test_matches_moon_phase(self):
+        dates = []
+        current = TABLE_START
+        while current <= TABLE_END:
+            dates.append(current)
+            current += timedelta(days=97)
+        dates.append(TABLE_END)
+
+        for d, illuminated, age in zip(dates, get_illuminated(dates), get_age(dates)):
+            phase = MoonPhase(d)
+            self.assertAlmostEqual(phase.illuminated, illuminated, places=9, msg=d)
+            self.assertAlmostEqual(phase.age, age, places=6, msg=d)
+
+    def test_none(self):
+        self.assertEqual([None], get_illuminated([None]))
+        self.assertEqual([None], get_age([None]))
+
+    def test_datetime(self):
+        self.assertEqual(get_illuminated([date(2020, 1, 1)]), get_illuminated([datetime(2020, 1, 1, 22, 30)]))
+
+    def test_out_of_range(self):
+        d = TABLE_START - timedelta(days=1)
+        self.assertEqual([MoonPhase(d).illuminated], get_illuminated([d]))
+
+        d = TABLE_END + timedelta(days=1)
+        self.assertEqual([MoonPhase(d).age], get_age([d]))
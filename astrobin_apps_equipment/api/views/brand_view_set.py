@@ -1,5 +1,5 @@
 from django.contrib.postgres.search import TrigramDistance
-from django.db.models import Count, Q
+from django.db.models import Count, F, Q
 from django.db.models.functions import Lower
 from djangorestframework_camel_case.render import CamelCaseJSONRenderer
 from rest_framework import viewsets
@@ -67,6 +67,10 @@ class BrandViewSet(viewsets.ModelViewSet):
             queryset = queryset.order_by('image_count', Lower('name'))
         elif sort == '-images':
             queryset = queryset.order_by('-image_count', Lower('name'))
+        elif sort == 'last-used':
+            queryset = queryset.order_by(F('last_used').asc(nulls_first=True), Lower('name'))
+        elif sort == '-last-used':
+            queryset = queryset.order_by(F('last_used').desc(nulls_last=True), Lower('name'))
         return queryset
 
     @action(detail=True, methods=['GET'])
@@ -162,6 +162,12 @@ class EquipmentItemMarketplaceListingViewSet(viewsets.ModelViewSet):
 
             if distance_unit == 'mi':
                 max_distance *= 1.60934  # Convert miles to kilometers
+
+            listing_ids = MarketplaceService.get_listing_ids_within_distance(latitude, longitude, max_distance)
+            if listing_ids is not None:
+                return queryset.filter(pk__in=listing_ids)
+
+            # The area is too large for the geohash cells, or includes a pole.
             max_distance *= 1000  # Convert kilometers to meters
 
             return queryset.extra(
@@ -1,14 +1,12 @@
 import logging
-from collections import Counter
 from typing import List
 
-import simplejson
 from annoying.functions import get_object_or_None
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.postgres.search import TrigramDistance
 from django.core.cache import cache
-from django.db.models import IntegerField, Q, QuerySet, Value
+from django.db.models import Case, F, IntegerField, Q, QuerySet, Value, When
 from django.db.models.functions import Concat, Lower
 from django.urls import reverse
 from django.utils import timezone
@@ -17,7 +15,6 @@ from django.utils.translation import ugettext_lazy as _
 from django.views.decorators.cache import cache_page
 from djangorestframework_camel_case.parser import CamelCaseJSONParser
 from djangorestframework_camel_case.render import CamelCaseJSONRenderer
-from haystack.query import SearchQuerySet
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
@@ -36,6 +33,8 @@ from astrobin_apps_equipment.api.throttle import EquipmentCreateThrottle
 from astrobin_apps_equipment.models import EquipmentBrand, EquipmentItem
 from astrobin_apps_equipment.models.equipment_item import EquipmentItemReviewerDecision
 from astrobin_apps_equipment.services import EquipmentService
+from astrobin_apps_equipment.services.equipment_autocomplete_service import EquipmentAutocompleteService
+from astrobin_apps_equipment.services.equipment_item_co_occurrence_service import EquipmentItemCoOccurrenceService
 from astrobin_apps_equipment.services.equipment_item_service import EquipmentItemService
 from astrobin_apps_equipment.tasks import reject_item
 from astrobin_apps_notifications.utils import build_notification_url, push_notification
@@ -73,15 +72,19 @@ class EquipmentItemViewSet(viewsets.ModelViewSet):
         except ValueError:
             limit = 50
 
-        manager = self.get_serializer().Meta.model.objects
+        model = self.get_serializer().Meta.model
+        manager = model.objects
         queryset = manager.all().select_related('brand')
+        include_variants = not (
+            'include-variants' in self.request.query_params and
+            self.request.query_params.get('include-variants').lower() == 'false'
+        )
+        is_equipment_moderator = False
 
-        if 'include-variants' in self.request.query_params and self.request.query_params.get(
-                'include-variants'
-        ).lower() == 'false':
+        if not include_variants:
             queryset = queryset.filter(variant_of__isnull=True)
 
-        if 'EditProposal' not in str(self.get_serializer().Meta.model):
+        if 'EditProposal' not in str(model):
             is_equipment_moderator = (
                 UserService(self.request.user).is_in_group(GroupName.EQUIPMENT_MODERATORS)
                 if self.request.user.is_authenticated
@@ -100,7 +103,37 @@ class EquipmentItemViewSet(viewsets.ModelViewSet):
                 )
             )
 
-        if q:
+        autocomplete = None
+        if (
+                q and
+                settings.EQUIPMENT_AUTOCOMPLETE_IN_MEMORY_ENABLED and
+                EquipmentAutocompleteService.get_klass_by_model(model) and
+                (brand_from_query is None or brand_from_query.isdigit())
+        ):
+            autocomplete = EquipmentAutocompleteService.search(
+                EquipmentAutocompleteService.get_klass_by_model(model),
+                q,
+                self.request.user,
+                is_equipment_moderator,
+                allow_unapproved,
+                allow_diy,
+                include_variants,
+                int(brand_from_query) if brand_from_query else None,
+                limit
+            )
+
+        if autocomplete is not None:
+            ids, is_brand = autocomplete
+            if is_brand:
+                self.paginator.page_size = len(ids)
+                ids = ids[:limit]
+            queryset = queryset.filter(pk__in=ids).order_by(
+                Case(
+                    *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+                    output_field=IntegerField()
+                )
+            ) if ids else queryset.none()
+        elif q:
             brand = get_object_or_None(EquipmentBrand, name__iexact=q)
             brand_queryset: QuerySet = queryset.none()
             if brand:
@@ -176,6 +209,10 @@ class EquipmentItemViewSet(viewsets.ModelViewSet):
             queryset = queryset.order_by('image_count', Lower('search_friendly_name'))
         elif sort == '-images':
             queryset = queryset.order_by('-image_count', Lower('search_friendly_name'))
+        elif sort == 'last-used':
+            queryset = queryset.order_by(F('last_used').asc(nulls_first=True), Lower('search_friendly_name'))
+        elif sort == '-last-used':
+            queryset = queryset.order_by(F('last_used').desc(nulls_last=True), Lower('search_friendly_name'))
 
         if brand_from_query is not None:
             queryset = queryset.filter(brand=brand_from_query)
@@ -669,25 +706,18 @@ class EquipmentItemViewSet(viewsets.ModelViewSet):
     def most_often_used_with(self, request, pk: int) -> Response:
         valid_subscription = PremiumService(request.user).get_valid_usersubscription()
         can_access = can_access_full_search(valid_subscription)
-        cache_key: str = f'equipment_item_view_set_{self.get_object().__class__.__name__}_{pk}_most_often_used_with_{can_access}'
+        item: EquipmentItem = self.get_object()
+        cache_key: str = f'equipment_item_view_set_{item.__class__.__name__}_{pk}_most_often_used_with_{can_access}'
         data = cache.get(cache_key)
 
         if data is None:
-            sqs: SearchQuerySet = SearchQuerySet().models(self.get_serializer().Meta.model).filter(django_id=pk)
-
-            if sqs.count() > 0:
-                data = sqs[0].equipment_item_most_often_used_with
-            else:
-                data = '{}'
-
-            if not can_access:
-                # Restrict to the top item.
-                parsed = dict(Counter(simplejson.loads(data)).most_common(1))
-                data = simplejson.dumps(parsed)
-
-            cache.set(cache_key, data, 60 * 60 * 12)
+            # Restrict to the top item for users without full search.
+            data = EquipmentItemCoOccurrenceService.get_most_often_used_with(
+                item.klass, item.pk, limit=10 if can_access else 1
+            )
+            cache.set(cache_key, data, 60 * 60)
 
-        return Response(simplejson.loads(data))
+        return Response(data)
 
     @action(detail=True, methods=['GET'])
     def listings(self, request, pk: int) -> Response:
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.24 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astrobin_apps_equipment', '0171_increase_max_digits_of_mount_weight_and_max_payload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentItemCoOccurrence',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_klass', models.CharField(editable=False, max_length=16)),
+                ('item_id', models.PositiveIntegerField(editable=False)),
+                ('other_klass', models.CharField(editable=False, max_length=16)),
+                ('other_id', models.PositiveIntegerField(editable=False)),
+                ('count', models.PositiveIntegerField(editable=False)),
+            ],
+            options={
+                'unique_together': {('item_klass', 'item_id', 'other_klass', 'other_id')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='equipmentitemcooccurrence',
+            index=models.Index(fields=['item_klass', 'item_id', '-count'], name='equipment_co_occurrence_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.24 on 2026-10-19 14:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('astrobin_apps_equipment', '0173_add_last_used_to_equipment_items_and_brands'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentItemMarketplaceFeedbackStats',
+            fields=[
+                ('user', models.OneToOneField(editable=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='equipment_item_marketplace_feedback_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('buyer_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('buyer_communication_sum', models.IntegerField(default=0, editable=False)),
+                ('buyer_speed_sum', models.IntegerField(default=0, editable=False)),
+                ('seller_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('seller_communication_sum', models.IntegerField(default=0, editable=False)),
+                ('seller_speed_sum', models.IntegerField(default=0, editable=False)),
+                ('seller_packaging_sum', models.IntegerField(default=0, editable=False)),
+                ('seller_accuracy_sum', models.IntegerField(default=0, editable=False)),
+            ],
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.24 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+from common.services.geohash_service import GeohashService
+
+
+def fill_in_geohashes(apps, schema_editor):
+    EquipmentItemMarketplaceListing = apps.get_model('astrobin_apps_equipment', 'EquipmentItemMarketplaceListing')
+
+    listings = EquipmentItemMarketplaceListing.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for listing in listings.only('pk', 'latitude', 'longitude').iterator():
+        EquipmentItemMarketplaceListing.objects.filter(pk=listing.pk).update(
+            **dict(
+                (f'geohash_{precision}', GeohashService.encode(listing.latitude, listing.longitude, precision))
+                for precision in (2, 3, 4, 5)
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astrobin_apps_equipment', '0174_equipmentitemmarketplacefeedbackstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentitemmarketplacelisting',
+            name='geohash_2',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='equipmentitemmarketplacelisting',
+            name='geohash_3',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='equipmentitemmarketplacelisting',
+            name='geohash_4',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='equipmentitemmarketplacelisting',
+            name='geohash_5',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=5, null=True),
+        ),
+        migrations.RunPython(fill_in_geohashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.24 on 2026-10-19 16:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('astrobin_apps_equipment', '0175_add_geohashes_to_equipmentitemmarketplacelisting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentContributorStats',
+            fields=[
+                ('user', models.OneToOneField(editable=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='equipment_contributor_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('contributions', models.PositiveIntegerField(db_index=True, default=0, editable=False)),
+                ('recent_contributions', models.PositiveIntegerField(db_index=True, default=0, editable=False)),
+            ],
+        ),
+    ]
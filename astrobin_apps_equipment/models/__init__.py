@@ -3,6 +3,7 @@ from .equipment_brand import EquipmentBrand # noqa
 from .equipment_retailer import EquipmentRetailer # noqa
 from .equipment_item_listing import EquipmentItemListing # noqa
 from .equipment_item_marketplace_feedback import EquipmentItemMarketplaceFeedback # noqa
+from .equipment_item_marketplace_feedback_stats import EquipmentItemMarketplaceFeedbackStats # noqa
 from .equipment_item_marketplace_listing import EquipmentItemMarketplaceListing # noqa
 from .equipment_item_marketplace_listing_line_item import EquipmentItemMarketplaceListingLineItem # noqa
 from .equipment_item_marketplace_listing_line_item_image import EquipmentItemMarketplaceListingLineItemImage # noqa
@@ -26,6 +27,8 @@ from .accessory_edit_proposal import AccessoryEditProposal # noqa
 from .software import Software # noqa
 from .software_edit_proposal import SoftwareEditProposal # noqa
 from .equipment_preset import EquipmentPreset # noqa
+from .equipment_item_co_occurrence import EquipmentItemCoOccurrence # noqa
+from .equipment_contributor_stats import EquipmentContributorStats # noqa
 
 from .migration_record_base_model import MigrationRecordBaseModel # noqa
 from .migration_usage_type import MigrationUsageType # noqa
@@ -59,7 +59,7 @@ class EquipmentBrand(SafeDeleteModel):
     )
 
     ####################################################################################################################
-    # This items are synced back from the search index.                                                                #
+    # These items are maintained by EquipmentStatsService.                                                             #
     ####################################################################################################################
 
     user_count = models.PositiveIntegerField(
@@ -72,5 +72,12 @@ class EquipmentBrand(SafeDeleteModel):
         default=0
     )
 
+    # Publication date of the most recent image that features this.
+    last_used = models.DateTimeField(
+        editable=False,
+        null=True,
+        blank=True,
+    )
+
     def __str__(self):
         return self.name
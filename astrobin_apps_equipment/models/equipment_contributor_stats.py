@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class EquipmentContributorStats(models.Model):
+    # The number of equipment edit proposals a user made or reviewed, of all time and of the last days. Maintained by
+    # EquipmentContributorsService.
+
+    user = models.OneToOneField(
+        User,
+        related_name='equipment_contributor_stats',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        editable=False,
+    )
+
+    contributions = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+    recent_contributions = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+
+    class Meta:
+        app_label = 'astrobin_apps_equipment'
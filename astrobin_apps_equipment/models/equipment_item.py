@@ -264,7 +264,7 @@ class EquipmentItem(SafeDeleteModel, ThumbnailMixin):
     )
 
     ####################################################################################################################
-    # This items are synced back from the search index.                                                                #
+    # These items are maintained by EquipmentStatsService.                                                             #
     ####################################################################################################################
 
     user_count = models.PositiveIntegerField(
@@ -277,6 +277,13 @@ class EquipmentItem(SafeDeleteModel, ThumbnailMixin):
         default=0
     )
 
+    # Publication date of the most recent image that features this.
+    last_used = models.DateTimeField(
+        editable=False,
+        null=True,
+        blank=True,
+    )
+
     ####################################################################################################################
     ####################################################################################################################
 
@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class EquipmentItemCoOccurrence(models.Model):
+    # Number of public images that feature both `item` and `other`, for the pairs of classes in
+    # EquipmentItemCoOccurrenceService.PAIRS. Each pair is stored in both directions, so that the items most often used
+    # with an item are a lookup on (item_klass, item_id). Maintained by EquipmentItemCoOccurrenceService.
+
+    item_klass = models.CharField(max_length=16, editable=False)
+    item_id = models.PositiveIntegerField(editable=False)
+    other_klass = models.CharField(max_length=16, editable=False)
+    other_id = models.PositiveIntegerField(editable=False)
+    count = models.PositiveIntegerField(editable=False)
+
+    class Meta:
+        app_label = 'astrobin_apps_equipment'
+        unique_together = ('item_klass', 'item_id', 'other_klass', 'other_id')
+        indexes = [
+            models.Index(fields=['item_klass', 'item_id', '-count'], name='equipment_co_occurrence_idx'),
+        ]
@@ -0,0 +1,29 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class EquipmentItemMarketplaceFeedbackStats(models.Model):
+    # Aggregates of the marketplace feedback received by a user, per role: the number of feedbacks, and the sum of the
+    # scores (positive: 1, neutral: 0, negative: -1) of each of their values. Maintained by
+    # MarketplaceFeedbackStatsService.
+
+    user = models.OneToOneField(
+        User,
+        related_name='equipment_item_marketplace_feedback_stats',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        editable=False,
+    )
+
+    buyer_count = models.PositiveIntegerField(default=0, editable=False)
+    buyer_communication_sum = models.IntegerField(default=0, editable=False)
+    buyer_speed_sum = models.IntegerField(default=0, editable=False)
+
+    seller_count = models.PositiveIntegerField(default=0, editable=False)
+    seller_communication_sum = models.IntegerField(default=0, editable=False)
+    seller_speed_sum = models.IntegerField(default=0, editable=False)
+    seller_packaging_sum = models.IntegerField(default=0, editable=False)
+    seller_accuracy_sum = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        app_label = 'astrobin_apps_equipment'
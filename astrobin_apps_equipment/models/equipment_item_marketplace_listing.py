@@ -118,6 +118,12 @@ class EquipmentItemMarketplaceListing(HashedSafeDeleteModel):
         blank=True,
     )
 
+    # Geohash cells of the location at the precisions of MarketplaceService.GEOHASH_PRECISIONS, for the proximity search.
+    geohash_2 = models.CharField(max_length=2, null=True, blank=True, editable=False, db_index=True)
+    geohash_3 = models.CharField(max_length=3, null=True, blank=True, editable=False, db_index=True)
+    geohash_4 = models.CharField(max_length=4, null=True, blank=True, editable=False, db_index=True)
+    geohash_5 = models.CharField(max_length=5, null=True, blank=True, editable=False, db_index=True)
+
     country = models.CharField(
         max_length=2,
         null=True,
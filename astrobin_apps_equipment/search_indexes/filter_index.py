@@ -1,4 +1,3 @@
-from django.db.models import Q
 from haystack.constants import Indexable
 
 from astrobin_apps_equipment.models import Filter
@@ -9,10 +8,3 @@ class FilterIndex(EquipmentItemIndex, Indexable):
     def get_model(self):
         return Filter
 
-    # noinspection PyMethodMayBeStatic
-    def image_queryset(self, obj: Filter) -> Q:
-        return Q(filters_2=obj) | Q(filters_2__in=obj.variants.all())
-
-    # noinspection PyMethodMayBeStatic
-    def user_queryset(self, obj: Filter) -> Q:
-        return Q(image__filters_2=obj) | Q(image__filters_2__in=obj.variants.all())
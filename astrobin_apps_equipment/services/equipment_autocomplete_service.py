@@ -0,0 +1,432 @@
+import json
+import logging
+import re
+import uuid
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from django.core.cache import cache
+
+from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
+
+log = logging.getLogger(__name__)
+
+
+class AutocompleteEntry(NamedTuple):
+    pk: int
+    brand_id: Optional[int]
+    brand_name: Optional[str]
+    variant_of_id: Optional[int]
+    created_by_id: Optional[int]
+    approved: bool
+    name: str
+    search_friendly_name: str
+
+    @property
+    def full_name(self) -> str:
+        # Like `Concat('brand__name', Value(' '), 'name')`.
+        return f'{self.brand_name or ""} {self.name}'
+
+
+class EquipmentAutocompleteIndex:
+    """
+    An in-memory index of the equipment items of a class, matching a query the way EquipmentItemViewSet does in
+    PostgreSQL: items whose name contains it come first, then items whose name is similar to it, both ranked by pg_trgm
+    distance. Similarity is computed from trigram postings, so only the items that share a trigram with the query are
+    looked at.
+    """
+
+    # pg_trgm's TrigramDistance threshold used by EquipmentItemViewSet.
+    MAX_DISTANCE = .85
+
+    def __init__(self, entries: Iterable[AutocompleteEntry], version: Optional[str] = None):
+        self.version = version
+        self.entries: Dict[int, AutocompleteEntry] = {}
+        self.brands: Dict[str, int] = {}
+        self._sizes: Dict[int, tuple] = {}
+        self._postings = (defaultdict(list), defaultdict(list))
+
+        for entry in entries:
+            self.add(entry)
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        # Like pg_trgm's `show_trgm`: the trigrams of each lower case alphanumeric word, padded with two spaces before
+        # and one after.
+        result = set()
+        for word in re.findall(r'[^\W_]+', (text or '').lower()):
+            padded = f'  {word} '
+            result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return result
+
+    def _texts(self, entry: AutocompleteEntry):
+        return entry.search_friendly_name, entry.full_name
+
+    def add(self, entry: AutocompleteEntry):
+        self.remove(entry.pk)
+
+        self.entries[entry.pk] = entry
+        if entry.brand_id and entry.brand_name:
+            self.brands[entry.brand_name.lower()] = entry.brand_id
+
+        sizes = []
+        for postings, text in zip(self._postings, self._texts(entry)):
+            trigrams = self.trigrams(text)
+            for trigram in trigrams:
+                postings[trigram].append(entry.pk)
+            sizes.append(len(trigrams))
+        self._sizes[entry.pk] = tuple(sizes)
+
+    def remove(self, pk: int):
+        entry = self.entries.pop(pk, None)
+        if entry is None:
+            return
+
+        self._sizes.pop(pk, None)
+
+        for postings, text in zip(self._postings, self._texts(entry)):
+            for trigram in self.trigrams(text):
+                pks = postings.get(trigram)
+                if pks is not None:
+                    pks.remove(pk)
+                    if not pks:
+                        del postings[trigram]
+
+    def _distances(self, q: str) -> Dict[int, tuple]:
+        query_trigrams = self.trigrams(q)
+        counters = []
+
+        for postings in self._postings:
+            counter = Counter()
+            for trigram in query_trigrams:
+                counter.update(postings.get(trigram, ()))
+            counters.append(counter)
+
+        distances = {}
+        for pk in set(counters[0]) | set(counters[1]):
+            distances[pk] = tuple(
+                1 - shared / (len(query_trigrams) + size - shared) if shared else 1
+                for shared, size in ((counter[pk], size) for counter, size in zip(counters, self._sizes[pk]))
+            )
+
+        return distances
+
+    def _contains(self, q: str, candidates: Optional[Iterable[int]]) -> Set[int]:
+        q = q.lower()
+        pks = self.entries.keys() if candidates is None else candidates
+        matches = set(
+            pk for pk in pks
+            if q in self.entries[pk].search_friendly_name.lower() or q in self.entries[pk].full_name.lower()
+        )
+
+        # Items also match through their variants.
+        for pk in list(matches):
+            variant_of_id = self.entries[pk].variant_of_id
+            if variant_of_id in self.entries:
+                matches.add(variant_of_id)
+
+        return matches
+
+    def search(self, q: str, is_visible, limit: int) -> List[int]:
+        distances = self._distances(q)
+
+        # A substring of at least a trigram shares all its inner trigrams with the text, so it's among the items with a
+        # similarity; shorter queries are matched against all items.
+        inner = [x for x in re.findall(r'[^\W_]+', q.lower()) if len(x) >= 3]
+        contains = self._contains(q, distances.keys() if inner else None)
+
+        def key(pk):
+            search_friendly_distance, full_name_distance = distances.get(pk, (1, 1))
+            return search_friendly_distance, full_name_distance, self.entries[pk].search_friendly_name.lower(), pk
+
+        similar = [
+            pk for pk, distance in distances.items()
+            if pk not in contains and min(distance) <= self.MAX_DISTANCE
+        ]
+
+        result = []
+        for pk in sorted(contains, key=key) + sorted(similar, key=key):
+            if is_visible(self.entries[pk]):
+                result.append(pk)
+                if len(result) >= limit:
+                    break
+
+        return result
+
+    def search_brand(self, q: str, is_visible) -> Optional[List[int]]:
+        """
+        The items of the brand named exactly like the query, sorted by name, or None if there's no such brand.
+        """
+        brand_id = self.brands.get(q.lower())
+        if brand_id is None:
+            return None
+
+        entries = [x for x in self.entries.values() if x.brand_id == brand_id and is_visible(x)]
+        return [x.pk for x in sorted(entries, key=lambda x: (x.name.lower(), x.pk))]
+
+    def serialize(self) -> bytes:
+        return zlib.compress(json.dumps(list(self.entries.values()), separators=(',', ':')).encode('utf-8'))
+
+    @staticmethod
+    def deserialize(data: bytes, version: Optional[str] = None) -> 'EquipmentAutocompleteIndex':
+        return EquipmentAutocompleteIndex(
+            (AutocompleteEntry(*x) for x in json.loads(zlib.decompress(data).decode('utf-8'))),
+            version
+        )
+
+
+class EquipmentAutocompleteService:
+    """
+    Serves the equipment item autocomplete (EquipmentItemViewSet with `q`) from a per-process
+    EquipmentAutocompleteIndex, instead of trigram queries in PostgreSQL.
+
+    The index of each class is shared between processes as a compressed snapshot in the cache. Item and brand changes
+    (the `update_equipment_autocomplete` task) don't rewrite the snapshot: each is stored as a small patch (the entries
+    to upsert and the ids to delete) under the next version, and processes apply the patches since their version to
+    their copy, which costs a cache read per query when nothing changed. The snapshot is rewritten every
+    PATCHES_PER_SNAPSHOT patches, and rebuilt from the database by `rebuild_equipment_autocomplete`; a process that
+    misses a patch reloads the snapshot.
+
+    A version is (lineage, number): each rebuild starts a new lineage, so that patches of an older snapshot are never
+    applied to a newer one.
+    """
+
+    KLASSES = (
+        EquipmentItemKlass.SENSOR,
+        EquipmentItemKlass.CAMERA,
+        EquipmentItemKlass.TELESCOPE,
+        EquipmentItemKlass.MOUNT,
+        EquipmentItemKlass.FILTER,
+        EquipmentItemKlass.ACCESSORY,
+        EquipmentItemKlass.SOFTWARE,
+    )
+
+    SNAPSHOT_CACHE_KEY = 'equipment_autocomplete_snapshot_%s'
+    VERSION_CACHE_KEY = 'equipment_autocomplete_version_%s'
+    PATCH_CACHE_KEY = 'equipment_autocomplete_patch_%s_%s_%d'
+    LOCK_CACHE_KEY = 'equipment_autocomplete_lock_%s'
+    REBUILD_SCHEDULED_CACHE_KEY = 'equipment_autocomplete_rebuild_scheduled_%s'
+    CACHE_TIMEOUT = 60 * 60 * 24 * 7
+    PATCHES_PER_SNAPSHOT = 100
+
+    # Per-process indexes, by class.
+    _indexes: Dict[str, EquipmentAutocompleteIndex] = {}
+
+    @staticmethod
+    def get_model(klass: str):
+        from astrobin_apps_equipment.services.equipment_stats_service import EquipmentStatsService
+        return EquipmentStatsService.get_model(klass)
+
+    @staticmethod
+    def get_klass_by_model(Model) -> Optional[str]:
+        for klass in EquipmentAutocompleteService.KLASSES:
+            if EquipmentAutocompleteService.get_model(klass) is Model:
+                return klass
+        return None
+
+    @staticmethod
+    def get_entries(klass: str, ids: Optional[Iterable[int]] = None) -> List[AutocompleteEntry]:
+        from astrobin_apps_equipment.models.equipment_item import EquipmentItemReviewerDecision
+
+        queryset = EquipmentAutocompleteService.get_model(klass).objects.all()
+        if ids is not None:
+            queryset = queryset.filter(pk__in=list(ids))
+
+        return [
+            AutocompleteEntry(
+                pk, brand_id, brand_name, variant_of_id, created_by_id,
+                reviewer_decision == EquipmentItemReviewerDecision.APPROVED, name or '', search_friendly_name or ''
+            )
+            for pk, brand_id, brand_name, variant_of_id, created_by_id, reviewer_decision, name, search_friendly_name
+            in queryset.values_list(
+                'pk', 'brand_id', 'brand__name', 'variant_of_id', 'created_by_id', 'reviewer_decision', 'name',
+                'search_friendly_name'
+            ).iterator()
+        ]
+
+    @staticmethod
+    def _store(klass: str, index: EquipmentAutocompleteIndex):
+        cache.set(
+            EquipmentAutocompleteService.SNAPSHOT_CACHE_KEY % klass,
+            (index.version, index.serialize()),
+            EquipmentAutocompleteService.CACHE_TIMEOUT
+        )
+        cache.set(
+            EquipmentAutocompleteService.VERSION_CACHE_KEY % klass,
+            index.version,
+            EquipmentAutocompleteService.CACHE_TIMEOUT
+        )
+        EquipmentAutocompleteService._indexes[klass] = index
+
+    @staticmethod
+    def _load_snapshot(klass: str) -> Optional[EquipmentAutocompleteIndex]:
+        snapshot = cache.get(EquipmentAutocompleteService.SNAPSHOT_CACHE_KEY % klass)
+        if snapshot is None:
+            return None
+
+        version, data = snapshot
+        return EquipmentAutocompleteIndex.deserialize(data, version)
+
+    @staticmethod
+    def _apply_patches(klass: str, index: EquipmentAutocompleteIndex, version: tuple) -> bool:
+        """
+        Brings the index to the version with the patches since its own version. False if it can't be done, because
+        the index belongs to another lineage or a patch is gone. All the patches are fetched before the index is
+        touched, so requests served by other greenlets never see it half patched.
+        """
+        lineage, number = version
+        index_lineage, index_number = index.version
+
+        if index_lineage != lineage or index_number > number:
+            return False
+
+        keys = [
+            EquipmentAutocompleteService.PATCH_CACHE_KEY % (klass, lineage, x)
+            for x in range(index_number + 1, number + 1)
+        ]
+        patches = cache.get_many(keys) if keys else {}
+        if len(patches) != len(keys):
+            return False
+
+        for key in keys:
+            upserts, deletes = patches[key]
+            for pk in deletes:
+                index.remove(pk)
+            for entry in upserts:
+                index.add(AutocompleteEntry(*entry))
+
+        index.version = version
+        return True
+
+    @staticmethod
+    def _get_current(klass: str, version: tuple) -> Optional[EquipmentAutocompleteIndex]:
+        # This process' index if it can be patched to the version, otherwise the snapshot patched to the version.
+        index = EquipmentAutocompleteService._indexes.get(klass)
+        if index is not None and EquipmentAutocompleteService._apply_patches(klass, index, version):
+            return index
+
+        snapshot = EquipmentAutocompleteService._load_snapshot(klass)
+        if snapshot is None:
+            return None
+
+        if not EquipmentAutocompleteService._apply_patches(klass, snapshot, version):
+            # A patch was evicted: serve the snapshot as it is until the rebuild, and patch it from this version on.
+            log.warning(f"Missing {klass} autocomplete patches between {snapshot.version} and {version}")
+            EquipmentAutocompleteService.schedule_rebuild(klass)
+            snapshot.version = version
+
+        EquipmentAutocompleteService._indexes[klass] = snapshot
+        return snapshot
+
+    @staticmethod
+    def rebuild(klass: str) -> EquipmentAutocompleteIndex:
+        index = EquipmentAutocompleteIndex(EquipmentAutocompleteService.get_entries(klass), (uuid.uuid4().hex, 0))
+        EquipmentAutocompleteService._store(klass, index)
+        log.info(f"Rebuilt {klass} autocomplete index: {len(index.entries)} items")
+        return index
+
+    @staticmethod
+    def update(klass: str, ids: Iterable[int]):
+        ids = set(ids)
+        version = cache.get(EquipmentAutocompleteService.VERSION_CACHE_KEY % klass)
+
+        if version is None:
+            # Nothing to patch: the index is built in full the first time it's needed.
+            return
+
+        upserts = EquipmentAutocompleteService.get_entries(klass, ids)
+        deletes = sorted(ids - set(x.pk for x in upserts))
+        lineage, number = version
+        version = (lineage, number + 1)
+
+        cache.set(
+            EquipmentAutocompleteService.PATCH_CACHE_KEY % (klass, lineage, number + 1),
+            ([tuple(x) for x in upserts], deletes),
+            EquipmentAutocompleteService.CACHE_TIMEOUT
+        )
+        cache.set(
+            EquipmentAutocompleteService.VERSION_CACHE_KEY % klass,
+            version,
+            EquipmentAutocompleteService.CACHE_TIMEOUT
+        )
+
+        if version[1] % EquipmentAutocompleteService.PATCHES_PER_SNAPSHOT == 0:
+            index = EquipmentAutocompleteService._get_current(klass, version)
+            if index is not None and index.version == version:
+                EquipmentAutocompleteService._store(klass, index)
+
+    @staticmethod
+    def enqueue_update(klass: str, ids: Iterable[int]):
+        from astrobin_apps_equipment.tasks import update_equipment_autocomplete
+
+        ids = sorted(set(ids))
+        if klass in EquipmentAutocompleteService.KLASSES and ids:
+            # The snapshot is kept up to date even while the feature is off, so that it's not stale when turned on.
+            update_equipment_autocomplete.apply_async(args=(klass, ids), countdown=5)
+
+    @staticmethod
+    def get_index(klass: str) -> Optional[EquipmentAutocompleteIndex]:
+        """
+        This process' index of a class, patched or reloaded from the snapshot if it changed. None if there is no
+        snapshot yet: a rebuild is then scheduled, and the caller should fall back to the database.
+        """
+        version = cache.get(EquipmentAutocompleteService.VERSION_CACHE_KEY % klass)
+        index = EquipmentAutocompleteService._indexes.get(klass)
+
+        if version is not None and index is not None and index.version == version:
+            return index
+
+        current = EquipmentAutocompleteService._get_current(klass, version) if version is not None else None
+        if current is not None:
+            return current
+
+        EquipmentAutocompleteService.schedule_rebuild(klass)
+
+        return index
+
+    @staticmethod
+    def schedule_rebuild(klass: str):
+        from astrobin_apps_equipment.tasks import rebuild_equipment_autocomplete
+
+        if cache.add(EquipmentAutocompleteService.REBUILD_SCHEDULED_CACHE_KEY % klass, 'true', 60 * 5):
+            rebuild_equipment_autocomplete.apply_async(args=(klass,))
+
+    @staticmethod
+    def search(
+            klass: str,
+            q: str,
+            user,
+            is_equipment_moderator: bool,
+            allow_unapproved: bool,
+            allow_diy: bool,
+            include_variants: bool,
+            brand_id: Optional[int],
+            limit: int
+    ) -> Optional[tuple]:
+        """
+        Returns (ids, whether the query named a brand), or None if the index is not available. Items are visible under
+        the same conditions as `EquipmentItemService.approved_or_creator_or_moderator_queryset` and
+        `EquipmentItemService.non_diy_or_creator_or_moderator_queryset`.
+        """
+        index = EquipmentAutocompleteService.get_index(klass)
+        if index is None:
+            return None
+
+        user_id = user.pk if user and user.is_authenticated else None
+        privileged = user_id is not None and is_equipment_moderator
+
+        def is_visible(entry: AutocompleteEntry) -> bool:
+            own = user_id is not None and entry.created_by_id == user_id
+            return (
+                (allow_unapproved or privileged or entry.approved or own) and
+                (allow_diy or privileged or entry.brand_id is not None or own) and
+                (include_variants or entry.variant_of_id is None) and
+                (brand_id is None or entry.brand_id == brand_id)
+            )
+
+        brand_ids = index.search_brand(q, is_visible)
+        if brand_ids:
+            return brand_ids, True
+
+        return index.search(q, is_visible, limit), False
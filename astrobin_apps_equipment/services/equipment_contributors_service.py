@@ -0,0 +1,141 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from astrobin_apps_equipment.models import (
+    AccessoryEditProposal, CameraEditProposal, EquipmentContributorStats, FilterEditProposal, MountEditProposal,
+    SoftwareEditProposal, TelescopeEditProposal,
+)
+from common.services import DateTimeService
+
+log = logging.getLogger(__name__)
+
+
+class EquipmentContributorsService:
+    """
+    Maintains EquipmentContributorStats, so that the equipment contributors leaderboard is read with one indexed query.
+    A contribution is an edit proposal made, or reviewed, by a user.
+
+    - `update(user_ids)` recomputes the stats of some users with a count query per class. It runs when an edit
+      proposal is created, reviewed, deleted or restored.
+    - `rebuild()` recomputes the stats of all users with grouped queries. It runs daily (from the
+      `rebuild_equipment_contributors` task), so that contributions leave the recent window as they age.
+    """
+
+    MODELS = (
+        TelescopeEditProposal,
+        CameraEditProposal,
+        MountEditProposal,
+        FilterEditProposal,
+        AccessoryEditProposal,
+        SoftwareEditProposal,
+    )
+
+    # (user field, timestamp field) of each kind of contribution.
+    CONTRIBUTIONS = (
+        ('edit_proposal_by', 'edit_proposal_created'),
+        ('edit_proposal_reviewed_by', 'edit_proposal_review_timestamp'),
+    )
+
+    RECENT_DAYS = 30
+
+    # Leaderboard period: stats field.
+    PERIODS = {
+        'all-time': 'contributions',
+        'last-30-days': 'recent_contributions',
+    }
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def compute(user_ids: Optional[Iterable[int]] = None, since: Optional[datetime] = None) -> Dict[int, int]:
+        """
+        The number of contributions of the users that contributed (since a date, if given), by user id.
+        """
+        user_ids = list(user_ids) if user_ids is not None else None
+        counter = Counter()
+
+        for Model in EquipmentContributorsService.MODELS:
+            for user_field, timestamp_field in EquipmentContributorsService.CONTRIBUTIONS:
+                queryset = Model.objects.filter(**{f'{user_field}__isnull': False})
+                if user_ids is not None:
+                    queryset = queryset.filter(**{f'{user_field}__in': user_ids})
+                if since is not None:
+                    queryset = queryset.filter(**{f'{timestamp_field}__gte': since})
+
+                for user_id, count in queryset.order_by().values(user_field).annotate(
+                        count=Count('pk')
+                ).values_list(user_field, 'count'):
+                    counter[user_id] += count
+
+        return dict(counter)
+
+    @staticmethod
+    def get_recent_since() -> datetime:
+        return DateTimeService.now() - timedelta(days=EquipmentContributorsService.RECENT_DAYS)
+
+    @staticmethod
+    def update(user_ids: Iterable[int]):
+        user_ids = sorted(set(x for x in user_ids if x))
+        if not user_ids:
+            return
+
+        contributions = EquipmentContributorsService.compute(user_ids)
+        recent_contributions = EquipmentContributorsService.compute(
+            user_ids, EquipmentContributorsService.get_recent_since()
+        )
+
+        with transaction.atomic():
+            for user_id in user_ids:
+                EquipmentContributorStats.objects.update_or_create(
+                    user_id=user_id,
+                    defaults=dict(
+                        contributions=contributions.get(user_id, 0),
+                        recent_contributions=recent_contributions.get(user_id, 0),
+                    )
+                )
+
+    @staticmethod
+    def rebuild():
+        contributions = EquipmentContributorsService.compute()
+        recent_contributions = EquipmentContributorsService.compute(
+            since=EquipmentContributorsService.get_recent_since()
+        )
+
+        with transaction.atomic():
+            EquipmentContributorStats.objects.all().delete()
+            EquipmentContributorStats.objects.bulk_create(
+                [
+                    EquipmentContributorStats(
+                        user_id=user_id,
+                        contributions=count,
+                        recent_contributions=recent_contributions.get(user_id, 0),
+                    ) for user_id, count in contributions.items()
+                ],
+                batch_size=EquipmentContributorsService.BATCH_SIZE
+            )
+
+        log.info(f"Rebuilt equipment contributor stats of {len(contributions)} users")
+
+    @staticmethod
+    def get_top(period: str = 'all-time', limit: int = 50) -> List[Tuple[int, int]]:
+        """
+        The (user id, contributions) of the top contributors of a period, superusers excluded.
+        """
+        field = EquipmentContributorsService.PERIODS[period]
+
+        return list(
+            EquipmentContributorStats.objects.filter(
+                **{f'{field}__gt': 0}
+            ).exclude(
+                user__is_superuser=True
+            ).order_by(
+                f'-{field}', 'user_id'
+            ).values_list(
+                'user_id', field
+            )[:limit]
+        )
@@ -0,0 +1,189 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import connection
+from django.db.models import Count
+
+from astrobin_apps_equipment.models import EquipmentItemCoOccurrence
+from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
+
+log = logging.getLogger(__name__)
+
+ItemKey = Tuple[str, int]
+
+
+class EquipmentItemCoOccurrenceService:
+    """
+    Maintains EquipmentItemCoOccurrence, the number of public images that feature each pair of items:
+
+    - `update(items)` recomputes the pairs of some items with one grouped query per related class. It runs (from the
+      `update_equipment_item_co_occurrences` task) when an image's equipment changes, for the items that were added or
+      removed, and when an image is published, moved to staging or deleted, for all its items.
+    - `rebuild()` recomputes the whole table with one grouped query per pair of classes.
+
+    Both write the counts with upserts and then delete the pairs that are gone, so that concurrent updates of items
+    that share pairs (e.g. a camera and a telescope used with it) don't need a lock: they write the same rows, and the
+    last count written wins.
+    """
+
+    REBUILD_LOCK_CACHE_KEY = 'rebuild_equipment_item_co_occurrences_lock'
+
+    # Image relation of each class.
+    RELATIONS = {
+        EquipmentItemKlass.CAMERA: 'imaging_cameras_2',
+        EquipmentItemKlass.TELESCOPE: 'imaging_telescopes_2',
+        EquipmentItemKlass.MOUNT: 'mounts_2',
+        EquipmentItemKlass.FILTER: 'filters_2',
+    }
+
+    # Pairs of classes whose co-occurrences are tracked, see EquipmentItemIndex.equipment_item_most_often_used_with.
+    PAIRS = (
+        (EquipmentItemKlass.CAMERA, EquipmentItemKlass.TELESCOPE),
+        (EquipmentItemKlass.CAMERA, EquipmentItemKlass.FILTER),
+        (EquipmentItemKlass.TELESCOPE, EquipmentItemKlass.MOUNT),
+    )
+
+    BATCH_SIZE = 1000
+
+    # Rows per upsert statement: each row is 5 parameters, and SQLite allows 999 per statement.
+    UPSERT_BATCH_SIZE = 100
+
+    @staticmethod
+    def get_related_klasses(klass: str) -> List[str]:
+        return [b if a == klass else a for a, b in EquipmentItemCoOccurrenceService.PAIRS if klass in (a, b)]
+
+    @staticmethod
+    def get_klass_by_through_model(through) -> Optional[str]:
+        from astrobin.models import Image
+
+        for klass, relation in EquipmentItemCoOccurrenceService.RELATIONS.items():
+            if getattr(Image, relation).through is through:
+                return klass
+
+        return None
+
+    @staticmethod
+    def get_image_items(image) -> Set[ItemKey]:
+        items = set()
+
+        for klass, relation in EquipmentItemCoOccurrenceService.RELATIONS.items():
+            for pk in getattr(image, relation).values_list('pk', flat=True):
+                items.add((klass, pk))
+
+        return items
+
+    @staticmethod
+    def _count(klass: str, item_id: int, other_klass: str) -> Dict[int, int]:
+        from astrobin.models import Image
+
+        relation = EquipmentItemCoOccurrenceService.RELATIONS[klass]
+        other_relation = EquipmentItemCoOccurrenceService.RELATIONS[other_klass]
+
+        return dict(
+            Image.objects.filter(**{relation: item_id, f'{other_relation}__isnull': False})
+            .order_by()
+            .values_list(other_relation)
+            .annotate(count=Count('pk', distinct=True))
+        )
+
+    @staticmethod
+    def _upsert(rows: List[Tuple[str, int, str, int, int]]):
+        table = connection.ops.quote_name(EquipmentItemCoOccurrence._meta.db_table)
+        count = connection.ops.quote_name('count')
+
+        for start in range(0, len(rows), EquipmentItemCoOccurrenceService.UPSERT_BATCH_SIZE):
+            batch = rows[start:start + EquipmentItemCoOccurrenceService.UPSERT_BATCH_SIZE]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {table} (item_klass, item_id, other_klass, other_id, {count}) '
+                    f'VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))} '
+                    f'ON CONFLICT (item_klass, item_id, other_klass, other_id) '
+                    f'DO UPDATE SET {count} = EXCLUDED.{count}',
+                    [value for row in batch for value in row]
+                )
+
+    @staticmethod
+    def _update_item(klass: str, item_id: int):
+        for other_klass in EquipmentItemCoOccurrenceService.get_related_klasses(klass):
+            counts = EquipmentItemCoOccurrenceService._count(klass, item_id, other_klass)
+
+            rows = []
+            for other_id, count in counts.items():
+                rows.append((klass, item_id, other_klass, other_id, count))
+                rows.append((other_klass, other_id, klass, item_id, count))
+
+            EquipmentItemCoOccurrenceService._upsert(rows)
+
+            EquipmentItemCoOccurrence.objects.filter(
+                item_klass=klass, item_id=item_id, other_klass=other_klass
+            ).exclude(other_id__in=list(counts.keys())).delete()
+            EquipmentItemCoOccurrence.objects.filter(
+                item_klass=other_klass, other_klass=klass, other_id=item_id
+            ).exclude(item_id__in=list(counts.keys())).delete()
+
+    @staticmethod
+    def update(items: Iterable[ItemKey]):
+        for klass, item_id in set((klass, int(item_id)) for klass, item_id in items):
+            if klass in EquipmentItemCoOccurrenceService.RELATIONS:
+                EquipmentItemCoOccurrenceService._update_item(klass, item_id)
+
+    @staticmethod
+    def enqueue_update(items: Iterable[ItemKey]):
+        from astrobin_apps_equipment.tasks import update_equipment_item_co_occurrences
+
+        items = sorted(set(x for x in items if x[0] in EquipmentItemCoOccurrenceService.RELATIONS))
+
+        if items:
+            # Delay so that all the m2m stages of the image's update are done.
+            update_equipment_item_co_occurrences.apply_async(args=([list(x) for x in items],), countdown=30)
+
+    @staticmethod
+    def rebuild():
+        from astrobin.models import Image
+
+        for klass, other_klass in EquipmentItemCoOccurrenceService.PAIRS:
+            relation = EquipmentItemCoOccurrenceService.RELATIONS[klass]
+            other_relation = EquipmentItemCoOccurrenceService.RELATIONS[other_klass]
+
+            counts = list(
+                Image.objects.filter(**{f'{relation}__isnull': False, f'{other_relation}__isnull': False})
+                .order_by()
+                .values_list(relation, other_relation)
+                .annotate(count=Count('pk', distinct=True))
+            )
+
+            rows = []
+            for item_id, other_id, count in counts:
+                rows.append((klass, item_id, other_klass, other_id, count))
+                rows.append((other_klass, other_id, klass, item_id, count))
+
+            EquipmentItemCoOccurrenceService._upsert(rows)
+
+            # The pairs that are gone are deleted by primary key, so that the rows the updates wrote meanwhile stay.
+            current = set((row[0], row[1], row[2], row[3]) for row in rows)
+            stale = [
+                pk for pk, item_klass, item_id, row_other_klass, other_id in
+                EquipmentItemCoOccurrence.objects.filter(
+                    item_klass__in=(klass, other_klass), other_klass__in=(klass, other_klass)
+                ).values_list('pk', 'item_klass', 'item_id', 'other_klass', 'other_id').iterator()
+                if (item_klass, item_id, row_other_klass, other_id) not in current
+            ]
+
+            for start in range(0, len(stale), EquipmentItemCoOccurrenceService.BATCH_SIZE):
+                EquipmentItemCoOccurrence.objects.filter(
+                    pk__in=stale[start:start + EquipmentItemCoOccurrenceService.BATCH_SIZE]
+                ).delete()
+
+            log.info(f"Rebuilt {len(counts)} {klass}/{other_klass} equipment co-occurrences")
+
+    @staticmethod
+    def get_most_often_used_with(klass: str, item_id: int, limit: int = 10) -> Dict[str, int]:
+        """
+        The items most often used with an item, as {"<KLASS>-<id>": number of images}. Pairs that only appear on
+        one image are left out.
+        """
+        rows = EquipmentItemCoOccurrence.objects.filter(
+            item_klass=klass, item_id=item_id, count__gt=1
+        ).order_by('-count', 'other_klass', 'other_id').values_list('other_klass', 'other_id', 'count')[:limit]
+
+        return dict((f'{other_klass}-{other_id}', count) for other_klass, other_id, count in rows)
@@ -0,0 +1,207 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import connections
+from django.db.models import F
+
+from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
+from common.utils import get_segregated_reader_database
+
+log = logging.getLogger(__name__)
+
+ItemKey = Tuple[str, int]
+
+# (image_count, user_count, last_used)
+Stats = Tuple[int, int, Optional[datetime]]
+
+BRAND = 'BRAND'
+
+
+class EquipmentStatsService:
+    """
+    Maintains the `user_count`, `image_count` and `last_used` columns of equipment items and brands: the number of
+    users with public images that feature them, the number of such images, and the publication date of the most recent
+    one. An item's stats include those of its variants, and a sensor's those of the cameras that use it.
+
+    - `update(items)` recomputes the stats of some items, and of the variants' parents, sensors and brands they count
+      towards. It runs (from the `update_equipment_stats` task) when an image's equipment changes, and when an image is
+      published, moved to staging or deleted.
+    - `rebuild()` recomputes the stats of all items and brands, with one grouped query per class.
+    """
+
+    # Image relations that feature items of each class.
+    PATHS = {
+        EquipmentItemKlass.TELESCOPE: ('imaging_telescopes_2', 'guiding_telescopes_2'),
+        EquipmentItemKlass.CAMERA: ('imaging_cameras_2', 'guiding_cameras_2'),
+        EquipmentItemKlass.SENSOR: ('imaging_cameras_2__sensor', 'guiding_cameras_2__sensor'),
+        EquipmentItemKlass.MOUNT: ('mounts_2',),
+        EquipmentItemKlass.FILTER: ('filters_2',),
+        EquipmentItemKlass.ACCESSORY: ('accessories_2',),
+        EquipmentItemKlass.SOFTWARE: ('software_2',),
+    }
+
+    BRAND_PATHS = tuple(
+        f'{path}__brand' for klass, paths in PATHS.items() if klass != EquipmentItemKlass.SENSOR for path in paths
+    )
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def get_model(klass: str):
+        from astrobin_apps_equipment.models import (
+            Accessory, Camera, EquipmentBrand, Filter, Mount, Sensor, Software, Telescope,
+        )
+
+        return {
+            EquipmentItemKlass.TELESCOPE: Telescope,
+            EquipmentItemKlass.CAMERA: Camera,
+            EquipmentItemKlass.SENSOR: Sensor,
+            EquipmentItemKlass.MOUNT: Mount,
+            EquipmentItemKlass.FILTER: Filter,
+            EquipmentItemKlass.ACCESSORY: Accessory,
+            EquipmentItemKlass.SOFTWARE: Software,
+            BRAND: EquipmentBrand,
+        }[klass]
+
+    @staticmethod
+    def get_klass_by_model(Model) -> Optional[str]:
+        for klass in EquipmentStatsService.PATHS:
+            if EquipmentStatsService.get_model(klass) is Model:
+                return klass
+
+        return None
+
+    @staticmethod
+    def get_image_items(image) -> Set[ItemKey]:
+        items = set()
+
+        for klass, paths in EquipmentStatsService.PATHS.items():
+            if klass == EquipmentItemKlass.SENSOR:
+                # Sensors are reached through the cameras.
+                continue
+            for path in paths:
+                for pk in getattr(image, path).values_list('pk', flat=True):
+                    items.add((klass, pk))
+
+        return items
+
+    @staticmethod
+    def get_paths(klass: str) -> List[str]:
+        if klass == BRAND:
+            return list(EquipmentStatsService.BRAND_PATHS)
+
+        paths = EquipmentStatsService.PATHS[klass]
+        return list(paths) + [f'{path}__variant_of' for path in paths]
+
+    @staticmethod
+    def compute(klass: str, ids: Optional[Iterable[int]] = None) -> Dict[int, Stats]:
+        """
+        The stats of the items of a class (or BRAND), by id. Items that no public image features are left out.
+        """
+        from astrobin.models import Image
+
+        database = get_segregated_reader_database()
+        ids = list(ids) if ids is not None else None
+        parts = []
+        params = []
+
+        for path in EquipmentStatsService.get_paths(klass):
+            if ids is not None:
+                queryset = Image.objects_plain.using(database).filter(**{f'{path}__in': ids})
+            else:
+                queryset = Image.objects_plain.using(database).filter(**{f'{path}__isnull': False})
+
+            # All parts select the same columns, named item_id, id, user_id and published.
+            queryset = queryset.order_by().annotate(item_id=F(path)).values_list(
+                'item_id', 'pk', 'user_id', 'published'
+            )
+            sql, part_params = queryset.query.sql_with_params()
+            parts.append(sql)
+            params.extend(part_params)
+
+        # An image can feature an item through more than one path (e.g. two variants, or imaging and guiding), so the
+        # paths are united before counting distinct images and users.
+        sql = (
+            'SELECT item_id, COUNT(DISTINCT id), COUNT(DISTINCT user_id), MAX(published) '
+            f'FROM ({" UNION ALL ".join(parts)}) AS features '
+            'GROUP BY item_id'
+        )
+
+        with connections[database].cursor() as cursor:
+            cursor.execute(sql, params)
+            return dict((row[0], (row[1], row[2], row[3])) for row in cursor.fetchall())
+
+    @staticmethod
+    def _save(klass: str, stats: Dict[int, Stats], ids: Optional[Iterable[int]] = None) -> List:
+        Model = EquipmentStatsService.get_model(klass)
+        queryset = Model.objects.all() if ids is None else Model.objects.filter(pk__in=list(ids))
+        changed = []
+
+        for obj in queryset.only('pk', 'user_count', 'image_count', 'last_used').iterator():
+            image_count, user_count, last_used = stats.get(obj.pk, (0, 0, None))
+            if (obj.image_count, obj.user_count, obj.last_used) != (image_count, user_count, last_used):
+                obj.image_count = image_count
+                obj.user_count = user_count
+                obj.last_used = last_used
+                changed.append(obj)
+
+        Model.objects.bulk_update(
+            changed, ['image_count', 'user_count', 'last_used'], batch_size=EquipmentStatsService.BATCH_SIZE
+        )
+
+        return changed
+
+    @staticmethod
+    def get_affected(items: Iterable[ItemKey]) -> Dict[str, Set[int]]:
+        """
+        The items and brands whose stats depend on the given items.
+        """
+        affected = defaultdict(set)
+
+        for klass, item_id in items:
+            if klass not in EquipmentStatsService.PATHS:
+                continue
+
+            Model = EquipmentStatsService.get_model(klass)
+            fields = ['variant_of', 'brand']
+            if klass == EquipmentItemKlass.CAMERA:
+                fields += ['sensor', 'sensor__variant_of']
+
+            affected[klass].add(int(item_id))
+
+            for values in Model.all_objects.filter(pk=item_id).values(*fields):
+                if values['variant_of']:
+                    affected[klass].add(values['variant_of'])
+                if values['brand']:
+                    affected[BRAND].add(values['brand'])
+                for field in ('sensor', 'sensor__variant_of'):
+                    if values.get(field):
+                        affected[EquipmentItemKlass.SENSOR].add(values[field])
+
+        return affected
+
+    @staticmethod
+    def update(items: Iterable[ItemKey]):
+        from common.services.search_index_update_service import SearchIndexUpdateService
+
+        for klass, ids in EquipmentStatsService.get_affected(items).items():
+            for obj in EquipmentStatsService._save(klass, EquipmentStatsService.compute(klass, ids), ids):
+                SearchIndexUpdateService.update_index(obj)
+
+    @staticmethod
+    def enqueue_update(items: Iterable[ItemKey]):
+        from astrobin_apps_equipment.tasks import update_equipment_stats
+
+        items = sorted(set((klass, int(item_id)) for klass, item_id in items if klass in EquipmentStatsService.PATHS))
+
+        if items:
+            # Delay so that all the m2m stages of the image's update are done.
+            update_equipment_stats.apply_async(args=([list(x) for x in items],), countdown=30)
+
+    @staticmethod
+    def rebuild():
+        for klass in list(EquipmentStatsService.PATHS.keys()) + [BRAND]:
+            changed = EquipmentStatsService._save(klass, EquipmentStatsService.compute(klass))
+            log.info(f"Rebuilt {klass} equipment stats: {len(changed)} changed")
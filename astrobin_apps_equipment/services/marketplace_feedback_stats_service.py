@@ -0,0 +1,146 @@
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+
+from astrobin_apps_equipment.models import EquipmentItemMarketplaceFeedback, EquipmentItemMarketplaceFeedbackStats
+from astrobin_apps_equipment.types.marketplace_feedback import MarketplaceFeedback
+from astrobin_apps_equipment.types.marketplace_feedback_target_type import MarketplaceFeedbackTargetType
+
+log = logging.getLogger(__name__)
+
+
+class MarketplaceFeedbackStatsService:
+    """
+    Maintains EquipmentItemMarketplaceFeedbackStats, so that a user's marketplace feedback score and count are read
+    from one row:
+
+    - `update(user_id)` recomputes the stats of a user with one grouped query. It runs when a feedback they received is
+      created, edited, deleted or restored, in the same transaction.
+    - `rebuild()` recomputes the stats of all users with one grouped query.
+    """
+
+    # Stats field prefix and feedback values of each role.
+    ROLES = {
+        MarketplaceFeedbackTargetType.BUYER.value: ('buyer', ('communication', 'speed')),
+        MarketplaceFeedbackTargetType.SELLER.value: ('seller', ('communication', 'speed', 'packaging', 'accuracy')),
+    }
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def _score(field: str) -> Case:
+        return Case(
+            When(**{field: MarketplaceFeedback.POSITIVE.value}, then=Value(1)),
+            When(**{field: MarketplaceFeedback.NEGATIVE.value}, then=Value(-1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+    @staticmethod
+    def compute(user_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, int]]:
+        """
+        The stats fields of the users that received feedback, by user id.
+        """
+        queryset = EquipmentItemMarketplaceFeedback.objects.filter(recipient__isnull=False)
+        if user_ids is not None:
+            queryset = queryset.filter(recipient__in=list(user_ids))
+
+        rows = queryset.order_by().values('recipient', 'target_type').annotate(
+            count=Count('pk'),
+            communication=Sum(MarketplaceFeedbackStatsService._score('communication_value')),
+            speed=Sum(MarketplaceFeedbackStatsService._score('speed_value')),
+            packaging=Sum(MarketplaceFeedbackStatsService._score('packaging_value')),
+            accuracy=Sum(MarketplaceFeedbackStatsService._score('accuracy_value')),
+        )
+
+        stats = {}
+        for row in rows:
+            if row['target_type'] not in MarketplaceFeedbackStatsService.ROLES:
+                continue
+
+            prefix, values = MarketplaceFeedbackStatsService.ROLES[row['target_type']]
+            fields = stats.setdefault(row['recipient'], {})
+            fields[f'{prefix}_count'] = row['count']
+            for value in values:
+                fields[f'{prefix}_{value}_sum'] = row[value]
+
+        return stats
+
+    @staticmethod
+    def update(user_id: int) -> EquipmentItemMarketplaceFeedbackStats:
+        with transaction.atomic():
+            EquipmentItemMarketplaceFeedbackStats.objects.get_or_create(user_id=user_id)
+
+            # Lock the row, so that concurrent updates for the same user are applied one after the other.
+            stats = EquipmentItemMarketplaceFeedbackStats.objects.select_for_update().get(user_id=user_id)
+            fields = MarketplaceFeedbackStatsService.compute([user_id]).get(user_id, {})
+
+            for prefix, values in MarketplaceFeedbackStatsService.ROLES.values():
+                setattr(stats, f'{prefix}_count', fields.get(f'{prefix}_count', 0))
+                for value in values:
+                    setattr(stats, f'{prefix}_{value}_sum', fields.get(f'{prefix}_{value}_sum', 0))
+
+            stats.save()
+
+        return stats
+
+    @staticmethod
+    def update_on_commit(user_id: int):
+        def _update():
+            # The user might have been deleted together with the feedback.
+            if User.objects.filter(pk=user_id).exists():
+                MarketplaceFeedbackStatsService.update(user_id)
+
+        transaction.on_commit(_update)
+
+    @staticmethod
+    def rebuild():
+        stats = MarketplaceFeedbackStatsService.compute()
+
+        with transaction.atomic():
+            EquipmentItemMarketplaceFeedbackStats.objects.all().delete()
+            EquipmentItemMarketplaceFeedbackStats.objects.bulk_create(
+                [EquipmentItemMarketplaceFeedbackStats(user_id=user_id, **fields) for user_id, fields in stats.items()],
+                batch_size=MarketplaceFeedbackStatsService.BATCH_SIZE
+            )
+
+        log.info(f"Rebuilt marketplace feedback stats of {len(stats)} users")
+
+    @staticmethod
+    def get(user: User) -> EquipmentItemMarketplaceFeedbackStats:
+        try:
+            return user.equipment_item_marketplace_feedback_stats
+        except EquipmentItemMarketplaceFeedbackStats.DoesNotExist:
+            # Not computed yet, e.g. before the first rebuild.
+            return MarketplaceFeedbackStatsService.update(user.pk)
+
+    @staticmethod
+    def get_score(stats: EquipmentItemMarketplaceFeedbackStats) -> int:
+        if stats.buyer_count == 0 and stats.seller_count == 0:
+            return 0
+
+        # Average score of each role, between -1 and 1.
+        buyer_score = (
+            (stats.buyer_communication_sum + stats.buyer_speed_sum) / (2 * stats.buyer_count)
+        ) if stats.buyer_count > 0 else 0
+        seller_score = (
+            (
+                stats.seller_communication_sum + stats.seller_speed_sum +
+                stats.seller_packaging_sum + stats.seller_accuracy_sum
+            ) / (4 * stats.seller_count)
+        ) if stats.seller_count > 0 else 0
+
+        # Weighted by the number of feedbacks of each role, and normalized to 0-100.
+        total_feedbacks = stats.buyer_count + stats.seller_count
+        weighted_average_score = (
+            buyer_score * stats.buyer_count + seller_score * stats.seller_count
+        ) / total_feedbacks
+
+        return int((weighted_average_score + 1) / 2 * 100)
+
+    @staticmethod
+    def get_count(stats: EquipmentItemMarketplaceFeedbackStats) -> int:
+        return stats.buyer_count + stats.seller_count
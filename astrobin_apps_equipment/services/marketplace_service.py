@@ -1,32 +1,39 @@
 import logging
 from datetime import timedelta
-from typing import Optional
+from typing import List, Optional
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.urls import reverse
 from geopy import Nominatim
-from geopy.exc import GeocoderServiceError, GeocoderTimedOut
 from rest_framework.renderers import JSONRenderer
 from safedelete.config import FIELD_NAME as DELETED_FIELD_NAME
 
 from astrobin_apps_equipment.models import (
-    EquipmentItemMarketplaceFeedback, EquipmentItemMarketplaceListing, EquipmentItemMarketplaceListingLineItem,
-    EquipmentItemMarketplaceOffer,
+    EquipmentItemMarketplaceListing, EquipmentItemMarketplaceListingLineItem, EquipmentItemMarketplaceOffer,
 )
 from astrobin_apps_equipment.models.equipment_item_marketplace_offer import EquipmentItemMarketplaceOfferStatus
-from astrobin_apps_equipment.types.marketplace_feedback import MarketplaceFeedback
-from astrobin_apps_equipment.types.marketplace_feedback_target_type import MarketplaceFeedbackTargetType
+from astrobin_apps_equipment.services.marketplace_feedback_stats_service import MarketplaceFeedbackStatsService
 from astrobin_apps_notifications.utils import build_notification_url
 from astrobin_apps_users.services import UserService
 from common.constants import GroupName
 from common.services import AppRedirectionService, DateTimeService
+from common.services.gazetteer_service import GazetteerService
+from common.services.geohash_service import GeohashService
 
 log = logging.getLogger(__name__)
 marketplace_logger = logging.getLogger("marketplace")
 
 class MarketplaceService:
+    # Precisions of the geohash cells stored on listings (from ~1250 km to ~5 km wide), and the most cells a proximity
+    # search looks up: it uses the finest precision whose cells covering the search area are no more than that.
+    GEOHASH_PRECISIONS = (2, 3, 4, 5)
+    GEOHASH_MAX_CELLS = 32
+    GEOHASH_CELL_CACHE_KEY = 'marketplace_listing_geohash_cell_%s'
+    GEOHASH_CELL_CACHE_TIMEOUT = 60 * 60 * 24
+
     @staticmethod
     def offer_notification_params(
             listing: EquipmentItemMarketplaceListing,
@@ -106,75 +113,11 @@ class MarketplaceService:
 
     @staticmethod
     def calculate_received_feedback_score(user: User) -> Optional[int]:
-        score_map = {
-            MarketplaceFeedback.POSITIVE.value: 1,
-            MarketplaceFeedback.NEUTRAL.value: 0,
-            MarketplaceFeedback.NEGATIVE.value: -1,
-        }
-
-        buyer_feedback = EquipmentItemMarketplaceFeedback.objects.filter(
-            recipient=user,
-            target_type=MarketplaceFeedbackTargetType.BUYER.value
-        )
-        buyer_feedback_count = buyer_feedback.count()
-
-        seller_feedback = EquipmentItemMarketplaceFeedback.objects.filter(
-            recipient=user,
-            target_type=MarketplaceFeedbackTargetType.SELLER.value
-        )
-        seller_feedback_count = seller_feedback.count()
-
-        if buyer_feedback_count == 0 and seller_feedback_count == 0:
-            return 0
-
-        # Define scores for different feedback types
-        seller_scores = {
-            'communication': 0,
-            'speed': 0,
-            'packaging': 0,
-            'accuracy': 0,
-        }
-        buyer_scores = {
-            'communication': 0,
-            'speed': 0,
-        }
-
-        # Aggregate scores by feedback type
-        for feedback in buyer_feedback:
-            buyer_scores['communication'] += score_map.get(feedback.communication_value, 0)
-            buyer_scores['speed'] += score_map.get(feedback.speed_value, 0)
-        for feedback in seller_feedback:
-            seller_scores['communication'] += score_map.get(feedback.communication_value, 0)
-            seller_scores['speed'] += score_map.get(feedback.speed_value, 0)
-            seller_scores['packaging'] += score_map.get(feedback.packaging_value, 0)
-            seller_scores['accuracy'] += score_map.get(feedback.accuracy_value, 0)
-
-        # Calculate total scores for buyer and seller separately
-        buyer_score = (
-            sum(buyer_scores.values()) / (2 * buyer_feedback_count)
-        ) if buyer_feedback_count > 0 else 0
-        seller_score = (
-            sum(seller_scores.values()) / (4 * seller_feedback_count)
-        ) if seller_feedback_count > 0 else 0
-
-        # Calculate weighted average score based on feedback counts
-        total_feedbacks = buyer_feedback_count + seller_feedback_count
-        weighted_average_score = (
-            (buyer_score * buyer_feedback_count + seller_score * seller_feedback_count) /
-            total_feedbacks
-        ) if total_feedbacks > 0 else 0
-
-        # Normalize to 0-100 scale
-        max_score = 1  # As scores are normalized to not exceed 1
-        min_score = -1  # Minimum possible normalized score
-        score_range = max_score - min_score
-        normalized_score = ((weighted_average_score - min_score) / score_range) * 100
-
-        return int(normalized_score)
+        return MarketplaceFeedbackStatsService.get_score(MarketplaceFeedbackStatsService.get(user))
 
     @staticmethod
     def received_feedback_count(user: User) -> int:
-        return EquipmentItemMarketplaceFeedback.objects.filter(recipient=user).count()
+        return MarketplaceFeedbackStatsService.get_count(MarketplaceFeedbackStatsService.get(user))
 
     @staticmethod
     def approve_listing(listing: EquipmentItemMarketplaceListing, moderator: User):
@@ -217,24 +160,125 @@ class MarketplaceService:
 
     @staticmethod
     def fill_in_listing_lat_lon(listing: EquipmentItemMarketplaceListing):
+        """
+        Fills in the location from the local gazetteer. Cities that are not in it are left to `geocode_listing`, so
+        that saving a listing never waits for a geocoding service.
+        """
         if not listing.city or not listing.country:
             return
 
         if listing.latitude and listing.longitude:
             return
 
-        geolocator = Nominatim(user_agent="astrobin")
-        location = None
+        location = GazetteerService.get_location(listing.country, listing.city)
+        if location:
+            listing.latitude, listing.longitude = location
 
-        try:
-            location = geolocator.geocode(f"{listing.city}, {listing.country}")
-        except (GeocoderTimedOut, GeocoderServiceError) as e:
-            log.error(f"Error while geocoding {listing.city}, {listing.country}: {str(e)}")
+    @staticmethod
+    def geocode_listing(listing_id: int):
+        """
+        Fills in the location of a listing with Nominatim. Raises GeocoderTimedOut and GeocoderServiceError.
+        """
+        listing = EquipmentItemMarketplaceListing.objects.filter(pk=listing_id).first()
+        if listing is None or not listing.city or not listing.country:
+            return
 
-        if location:
-            listing.latitude = location.latitude
-            listing.longitude = location.longitude
+        if listing.latitude and listing.longitude:
+            return
 
+        location = Nominatim(user_agent="astrobin").geocode(f"{listing.city}, {listing.country}", timeout=10)
+        if location is None:
+            log.warning(f"Unable to geocode {listing.city}, {listing.country}")
+            return
+
+        listing.latitude = location.latitude
+        listing.longitude = location.longitude
+        MarketplaceService.fill_in_listing_geohashes(listing)
+
+        # Not saved, so that updating the location doesn't count as an edit of the listing (e.g. for its approval).
+        EquipmentItemMarketplaceListing.objects.filter(pk=listing.pk).update(
+            latitude=listing.latitude,
+            longitude=listing.longitude,
+            **dict(
+                (f'geohash_{precision}', getattr(listing, f'geohash_{precision}'))
+                for precision in MarketplaceService.GEOHASH_PRECISIONS
+            )
+        )
+        MarketplaceService.invalidate_listing_geohash_cells(MarketplaceService.get_listing_geohash_cells(listing))
+
+    @staticmethod
+    def fill_in_listing_geohashes(listing: EquipmentItemMarketplaceListing):
+        for precision in MarketplaceService.GEOHASH_PRECISIONS:
+            if listing.latitude is not None and listing.longitude is not None:
+                value = GeohashService.encode(listing.latitude, listing.longitude, precision)
+            else:
+                value = None
+            setattr(listing, f'geohash_{precision}', value)
+
+    @staticmethod
+    def get_listing_geohash_cells(listing: EquipmentItemMarketplaceListing) -> List[str]:
+        cells = [getattr(listing, f'geohash_{precision}') for precision in MarketplaceService.GEOHASH_PRECISIONS]
+        return [x for x in cells if x]
+
+    @staticmethod
+    def invalidate_listing_geohash_cells(cells: List[str]):
+        if cells:
+            cache.delete_many([MarketplaceService.GEOHASH_CELL_CACHE_KEY % x for x in set(cells)])
+
+    @staticmethod
+    def get_listing_locations_in_geohash_cells(precision: int, cells: List[str]) -> List[tuple]:
+        """
+        The (pk, latitude, longitude) of the listings in some cells of a precision. The listings of each cell are cached
+        until a listing in it is saved or deleted.
+        """
+        keys = dict((x, MarketplaceService.GEOHASH_CELL_CACHE_KEY % x) for x in cells)
+        cached = cache.get_many(list(keys.values()))
+        missing = dict((cell, []) for cell, key in keys.items() if key not in cached)
+
+        if missing:
+            for pk, latitude, longitude, cell in EquipmentItemMarketplaceListing.objects.filter(
+                    **{f'geohash_{precision}__in': list(missing.keys())}
+            ).values_list('pk', 'latitude', 'longitude', f'geohash_{precision}'):
+                missing[cell].append((pk, latitude, longitude))
+
+            cache.set_many(
+                dict((keys[cell], locations) for cell, locations in missing.items()),
+                MarketplaceService.GEOHASH_CELL_CACHE_TIMEOUT
+            )
+
+        return [x for locations in list(cached.values()) + list(missing.values()) for x in locations]
+
+    @staticmethod
+    def get_geohash_precision(latitude: float, longitude: float, distance: float) -> Optional[int]:
+        """
+        The finest precision whose cells can cover the area within a distance (in kilometers) of a point, or None if the
+        area is too large, or includes a pole.
+        """
+        for precision in reversed(MarketplaceService.GEOHASH_PRECISIONS):
+            count = GeohashService.count_covering_cells(latitude, longitude, distance, precision)
+            if count is None:
+                return None
+            if count <= MarketplaceService.GEOHASH_MAX_CELLS:
+                return precision
+
+        return None
+
+    @staticmethod
+    def get_listing_ids_within_distance(latitude: float, longitude: float, distance: float) -> Optional[List[int]]:
+        """
+        The ids of the listings within a distance (in kilometers) of a point: the listings in the geohash cells that
+        cover the area, refined by their exact distance. None if the cells can't cover the area.
+        """
+        precision = MarketplaceService.get_geohash_precision(latitude, longitude, distance)
+        if precision is None:
+            return None
+
+        cells = GeohashService.get_covering_cells(latitude, longitude, distance, precision)
+        return [
+            pk for pk, listing_latitude, listing_longitude
+            in MarketplaceService.get_listing_locations_in_geohash_cells(precision, list(cells))
+            if GeohashService.get_distance(latitude, longitude, listing_latitude, listing_longitude) <= distance
+        ]
 
     @staticmethod
     def log_event(user: User, event: str, serializer_class, instance, context=None):
@@ -1,6 +1,6 @@
 import logging
 import os
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 from xml.etree import ElementTree
 
 import requests
@@ -59,41 +59,59 @@ class AgenaStockImporterPlugin(StockImporterPluginInterface):
             log.error(f'Invalid stock status: {stock_status_str}')
             raise e
 
-    def __parse(self, xml_str: bytes) -> List[StockInterface]:
-        root = ElementTree.fromstring(xml_str)
-        products = root.find('channel').find('products').findall("product")
-        stock_list = []
+    def __parse_product(self, product: ElementTree.Element) -> StockInterface:
+        astrobin_id = product.find('ca_astrobin_product_id').text
+        pk, klass = self.parse_astrobin_id(astrobin_id)
+        name = product.find('name').text
+        sku = product.find('sku').text
+        url = product.find('product_url').text
+        stock_status_str = product.find('stock_status').text
+        stock_status = self.parse_stock_status(stock_status_str)
+        stock_amount = int(product.find('stock_qty').text)
+
+        url = add_url_params(url, {'rfsn': self.rfsn})
+
+        return StockInterface(pk, klass, name, sku, url, stock_status, stock_amount)
+
+    def __parse(self, source) -> Iterator[StockInterface]:
+        # The products are parsed as they are read, and discarded once parsed.
+        products = None
+
+        for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                if element.tag == 'products':
+                    products = element
+                continue
+
+            if element.tag != 'product':
+                continue
 
-        for product in products:
             try:
-                astrobin_id = product.find('ca_astrobin_product_id').text
-                pk, klass = self.parse_astrobin_id(astrobin_id)
-                name = product.find('name').text
-                sku = product.find('sku').text
-                url = product.find('product_url').text
-                stock_status_str = product.find('stock_status').text
-                stock_status = self.parse_stock_status(stock_status_str)
-                stock_amount = int(product.find('stock_qty').text)
-
-                url = add_url_params(url, {'rfsn': self.rfsn})
-
-                stock_obj = StockInterface(pk, klass, name, sku, url, stock_status, stock_amount)
-                stock_list.append(stock_obj)
+                stock_item = self.__parse_product(element)
             except Exception as e:
                 log.error(str(e))
-                continue
+                stock_item = None
 
-        return stock_list
+            if products is not None:
+                products.clear()
 
-    def fetch_data(self) -> List[StockInterface]:
-        if not self.url:
-            log.error('No URL set for Agena Astro')
-            return []
+            if stock_item is not None:
+                yield stock_item
 
+    def fetch_data(self) -> List[StockInterface]:
         try:
-            response = requests.get(self.url)
-            return self.__parse(response.content)
+            return list(self.iterate_data())
         except Exception as e:
             log.error(e)
             return []
 
+    def iterate_data(self) -> Iterator[StockInterface]:
+        # Raises if the feed can't be fetched or is malformed, so that a partial feed can be told from a complete one.
+        if not self.url:
+            log.error('No URL set for Agena Astro')
+            return
+
+        with requests.get(self.url, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield from self.__parse(response.raw)
@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
 from astrobin_apps_equipment.types import StockStatus
@@ -16,3 +16,7 @@ class StockImporterPluginInterface:
 
     def fetch_data(self) -> List[StockInterface]:
         pass
+
+    def iterate_data(self) -> Iterator[StockInterface]:
+        # Plugins that can parse their feed incrementally override this, so that the feed is never held in memory.
+        yield from self.fetch_data()
@@ -1,9 +1,10 @@
 import logging
-from datetime import datetime
-from typing import Dict
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Model
+from django.db import transaction
+from django.db.models import Q
 
 from astrobin.utils import add_url_params
 from astrobin_apps_equipment.models import (
@@ -12,18 +13,51 @@ from astrobin_apps_equipment.models import (
 )
 from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
 from astrobin_apps_equipment.services.stock.plugins import StockImporterPluginInterface
+from astrobin_apps_equipment.types import StockStatus
+from astrobin_apps_equipment.types.stock_interface import StockInterface
+from common.services import DateTimeService
 
 log = logging.getLogger(__name__)
 
+# (content type id, item id)
+ListingKey = Tuple[int, int]
+
+
+class StockImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.skipped = 0
+        self.complete = True
+
+    def __str__(self):
+        return f'{self.inserted} inserted, {self.updated} updated, {self.unchanged} unchanged, ' \
+               f'{self.removed} removed, {self.skipped} skipped' + ('' if self.complete else ' (incomplete feed)')
+
 
 class StockImporterService:
+    """
+    Imports a retailer's stock feed into EquipmentItemListing. The feed is read from the plugin as a stream and
+    processed in chunks: the items and listings of a chunk are fetched with one query per class, and only the listings
+    that changed are written, with bulk_create/bulk_update. Listings that are no longer in a complete feed get an
+    UNKNOWN stock status.
+    """
+
     plugin: StockImporterPluginInterface = None
 
+    CHUNK_SIZE = 1000
+
+    # Listing fields that come from the feed.
+    FIELDS = ('item_full_name', 'name', 'sku', 'url', 'stock_status', 'stock_amount')
+
     def __init__(self, plugin):
         self.plugin = plugin
 
-    def import_stock(self):
-        content_type_map: Dict[EquipmentItemKlass, ContentType] = {
+    @staticmethod
+    def get_content_types() -> Dict[EquipmentItemKlass, ContentType]:
+        return {
             EquipmentItemKlass.TELESCOPE: ContentType.objects.get_for_model(Telescope),
             EquipmentItemKlass.CAMERA: ContentType.objects.get_for_model(Camera),
             EquipmentItemKlass.MOUNT: ContentType.objects.get_for_model(Mount),
@@ -32,62 +66,191 @@ class StockImporterService:
             EquipmentItemKlass.SOFTWARE: ContentType.objects.get_for_model(Software),
         }
 
-        data = self.plugin.fetch_data()
+    @staticmethod
+    def get_values(stock_item: StockInterface, item) -> Dict:
+        return dict(
+            item_full_name=str(item),
+            name=stock_item.name,
+            sku=stock_item.sku,
+            url=add_url_params(stock_item.url, {
+                'utm_source': 'astrobin',
+                'utm_medium': 'link',
+                'utm_campaign': 'webshop-integration'
+            }),
+            stock_status=stock_item.stock_status.value,
+            stock_amount=max(0, stock_item.stock_amount),
+        )
 
-        if len(data) == 0:
-            log.debug('No data found.')
-            return
+    @staticmethod
+    def _chunks(data: Iterable[StockInterface], result: StockImportResult) -> Iterable[List[StockInterface]]:
+        chunk = []
 
         try:
-            retailer = EquipmentRetailer.objects.get(name=self.plugin.retailer_name)
-        except EquipmentRetailer.DoesNotExist:
-            log.error(f'Retailer {self.plugin.retailer_name} does not exist')
-            return
-
-        for stock_item in data:
-            equipment_item_model_class: Model = content_type_map[stock_item.klass].model_class()
-            try:
-                # Just to check if the item exists.
-                item = equipment_item_model_class.objects.get(pk=stock_item.pk)
-            except equipment_item_model_class.DoesNotExist:
+            for stock_item in data:
+                chunk.append(stock_item)
+                if len(chunk) >= StockImporterService.CHUNK_SIZE:
+                    yield chunk
+                    chunk = []
+        except Exception as e:
+            log.error(f'Error while reading the stock feed: {str(e)}')
+            result.complete = False
+
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _get_claimed_names(retailer: EquipmentRetailer, claims: Dict[str, Optional[int]]) -> Dict[str, int]:
+        # The listings that already have the names that new or renamed listings are about to take (names are unique
+        # per retailer, deleted listings included).
+        return dict(
+            EquipmentItemListing.all_objects.filter(
+                retailer=retailer, name__in=list(claims.keys())
+            ).values_list('name', 'pk')
+        )
+
+    def _import_chunk(
+            self,
+            retailer: EquipmentRetailer,
+            content_types: Dict[EquipmentItemKlass, ContentType],
+            chunk: List[StockInterface],
+            seen: Set[ListingKey],
+            result: StockImportResult,
+    ):
+        # A later row for the same item wins.
+        rows: Dict[ListingKey, Tuple[ContentType, StockInterface]] = {}
+        for stock_item in chunk:
+            content_type = content_types.get(stock_item.klass)
+            if content_type is None:
+                log.error(f'Unsupported equipment item class {stock_item.klass} for pk {stock_item.pk}')
+                result.skipped += 1
+                continue
+            rows[(content_type.pk, stock_item.pk)] = (content_type, stock_item)
+
+        ids_by_content_type: Dict[ContentType, Set[int]] = defaultdict(set)
+        for content_type, stock_item in rows.values():
+            ids_by_content_type[content_type].add(stock_item.pk)
+
+        items = {}
+        listings_filter = Q()
+        for content_type, ids in ids_by_content_type.items():
+            for item in content_type.model_class().objects.filter(pk__in=ids).select_related('brand'):
+                items[(content_type.pk, item.pk)] = item
+            listings_filter |= Q(item_content_type=content_type, item_object_id__in=ids)
+
+        listings: Dict[ListingKey, EquipmentItemListing] = {}
+        if ids_by_content_type:
+            for listing in EquipmentItemListing.objects.filter(listings_filter, retailer=retailer).order_by('pk'):
+                listings.setdefault((listing.item_content_type_id, listing.item_object_id), listing)
+
+        to_create: List[EquipmentItemListing] = []
+        to_update: List[EquipmentItemListing] = []
+        claims: Dict[str, Optional[int]] = {}
+
+        for key, (content_type, stock_item) in rows.items():
+            item = items.get(key)
+            if item is None:
                 log.error(f"Unable to find equipment item of class {stock_item.klass} and pk {stock_item.pk}")
+                result.skipped += 1
                 continue
 
-            url = add_url_params(stock_item.url, {
-                'utm_source': 'astrobin',
-                'utm_medium': 'link',
-                'utm_campaign': 'webshop-integration'
-            })
+            seen.add(key)
+            values = StockImporterService.get_values(stock_item, item)
+            listing = listings.get(key)
 
-            try:
-                listing = EquipmentItemListing.objects.get(
-                    retailer=retailer,
-                    item_content_type = content_type_map[stock_item.klass],
-                    item_object_id=stock_item.pk,
-                )
-
-                log.debug(f'Updating item listing {listing.pk}')
-
-                EquipmentItemListing.objects.filter(pk=listing.pk).update(
-                    item_full_name=str(item),
-                    name=stock_item.name,
-                    sku=stock_item.sku,
-                    url=url,
-                    stock_status=stock_item.stock_status.value,
-                    stock_amount=max(0, stock_item.stock_amount),
-                    updated=datetime.now(),
-                )
-            except EquipmentItemListing.DoesNotExist:
-                log.debug(f'Creating item listing')
-
-                EquipmentItemListing.objects.create(
+            if listing is None:
+                if values['name'] in claims:
+                    log.error(f'Duplicate listing name in the stock feed: {values["name"]}')
+                    result.skipped += 1
+                    continue
+                claims[values['name']] = None
+                to_create.append(EquipmentItemListing(
                     retailer=retailer,
-                    item_content_type=content_type_map[stock_item.klass],
+                    item_content_type=content_type,
                     item_object_id=stock_item.pk,
-                    item_full_name=str(item),
-                    name=stock_item.name,
-                    sku=stock_item.sku,
-                    url=url,
-                    stock_status=stock_item.stock_status.value,
-                    stock_amount=max(0, stock_item.stock_amount),
-                )
+                    **values
+                ))
+            elif any(getattr(listing, field) != value for field, value in values.items()):
+                if listing.name != values['name']:
+                    if values['name'] in claims:
+                        log.error(f'Duplicate listing name in the stock feed: {values["name"]}')
+                        result.skipped += 1
+                        continue
+                    claims[values['name']] = listing.pk
+                for field, value in values.items():
+                    setattr(listing, field, value)
+                to_update.append(listing)
+            else:
+                result.unchanged += 1
+
+        if claims:
+            claimed = StockImporterService._get_claimed_names(retailer, claims)
+            conflicts = set(name for name, pk in claims.items() if name in claimed and claimed[name] != pk)
+
+            if conflicts:
+                for name in conflicts:
+                    log.error(f'Another listing of {retailer} is already named {name}')
+
+                def is_conflicting(listing: EquipmentItemListing) -> bool:
+                    return listing.name in conflicts and claims[listing.name] == listing.pk
+
+                result.skipped += len([x for x in to_create + to_update if is_conflicting(x)])
+                to_create = [x for x in to_create if not is_conflicting(x)]
+                to_update = [x for x in to_update if not is_conflicting(x)]
+
+        now = DateTimeService.now()
+        for listing in to_update:
+            listing.updated = now
+
+        with transaction.atomic():
+            EquipmentItemListing.objects.bulk_create(to_create, batch_size=StockImporterService.CHUNK_SIZE)
+            EquipmentItemListing.objects.bulk_update(
+                to_update,
+                list(StockImporterService.FIELDS) + ['updated'],
+                batch_size=StockImporterService.CHUNK_SIZE
+            )
+
+        result.inserted += len(to_create)
+        result.updated += len(to_update)
+
+    def _remove_missing(self, retailer: EquipmentRetailer, seen: Set[ListingKey], result: StockImportResult):
+        listings = EquipmentItemListing.objects.filter(
+            retailer=retailer, stock_status__isnull=False
+        ).exclude(
+            stock_status=StockStatus.UNKNOWN.value
+        ).values_list('pk', 'item_content_type_id', 'item_object_id')
+
+        missing = [
+            pk for pk, content_type_id, object_id in listings.iterator() if (content_type_id, object_id) not in seen
+        ]
+
+        for i in range(0, len(missing), StockImporterService.CHUNK_SIZE):
+            EquipmentItemListing.objects.filter(pk__in=missing[i:i + StockImporterService.CHUNK_SIZE]).update(
+                stock_status=StockStatus.UNKNOWN.value,
+                stock_amount=None,
+                updated=DateTimeService.now(),
+            )
+
+        result.removed = len(missing)
+
+    def import_stock(self) -> Optional[StockImportResult]:
+        try:
+            retailer = EquipmentRetailer.objects.get(name=self.plugin.retailer_name)
+        except EquipmentRetailer.DoesNotExist:
+            log.error(f'Retailer {self.plugin.retailer_name} does not exist')
+            return None
+
+        content_types = StockImporterService.get_content_types()
+        result = StockImportResult()
+        seen: Set[ListingKey] = set()
+
+        for chunk in StockImporterService._chunks(self.plugin.iterate_data(), result):
+            self._import_chunk(retailer, content_types, chunk, seen, result)
+
+        if not seen:
+            log.debug('No data found.')
+        elif result.complete:
+            # Only a complete feed tells which items the retailer no longer lists.
+            self._remove_missing(retailer, seen, result)
+
+        log.info(f'Imported stock of {retailer}: {result}')
+        return result
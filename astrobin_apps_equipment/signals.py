@@ -12,7 +12,7 @@ from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
 from notification import models as notification
 from pybb.models import Category, Forum, Topic
-from safedelete.signals import post_softdelete
+from safedelete.signals import post_softdelete, post_undelete
 
 from astrobin.services.utils_service import UtilsService
 from astrobin.stories import ACTSTREAM_VERB_CREATED_MARKETPLACE_LISTING, add_story
@@ -37,8 +37,11 @@ from astrobin_apps_equipment.models.sensor_edit_proposal import SensorEditPropos
 from astrobin_apps_equipment.models.software_edit_proposal import SoftwareEditProposal
 from astrobin_apps_equipment.models.telescope_edit_proposal import TelescopeEditProposal
 from astrobin_apps_equipment.notice_types import EQUIPMENT_NOTICE_TYPES
+from astrobin_apps_equipment.services.equipment_autocomplete_service import EquipmentAutocompleteService
+from astrobin_apps_equipment.services.equipment_contributors_service import EquipmentContributorsService
+from astrobin_apps_equipment.services.marketplace_feedback_stats_service import MarketplaceFeedbackStatsService
 from astrobin_apps_equipment.services.marketplace_service import MarketplaceService
-from astrobin_apps_equipment.tasks import send_offer_notifications
+from astrobin_apps_equipment.tasks import geocode_marketplace_listing, send_offer_notifications
 from astrobin_apps_notifications.utils import build_notification_url, push_notification
 from astrobin_apps_users.services import UserService
 from common.constants import GroupName
@@ -282,6 +285,34 @@ def rename_equipment_preset_after_deletion(sender, instance: EquipmentPreset, **
         instance.save(keep_deleted=True)
 
 
+@receiver(post_save, sender=Sensor)
+@receiver(post_save, sender=Camera)
+@receiver(post_save, sender=Telescope)
+@receiver(post_save, sender=Mount)
+@receiver(post_save, sender=Filter)
+@receiver(post_save, sender=Accessory)
+@receiver(post_save, sender=Software)
+@receiver(post_softdelete, sender=Sensor)
+@receiver(post_softdelete, sender=Camera)
+@receiver(post_softdelete, sender=Telescope)
+@receiver(post_softdelete, sender=Mount)
+@receiver(post_softdelete, sender=Filter)
+@receiver(post_softdelete, sender=Accessory)
+@receiver(post_softdelete, sender=Software)
+def update_equipment_autocomplete_after_item_change(sender, instance: EquipmentItem, **kwargs):
+    EquipmentAutocompleteService.enqueue_update(EquipmentAutocompleteService.get_klass_by_model(sender), [instance.pk])
+
+
+@receiver(post_save, sender=EquipmentBrand)
+@receiver(post_softdelete, sender=EquipmentBrand)
+def update_equipment_autocomplete_after_brand_change(sender, instance: EquipmentBrand, **kwargs):
+    for klass in EquipmentAutocompleteService.KLASSES:
+        Model = EquipmentAutocompleteService.get_model(klass)
+        EquipmentAutocompleteService.enqueue_update(
+            klass, Model.all_objects.filter(brand=instance).values_list('pk', flat=True)
+        )
+
+
 @receiver(post_save, sender=Sensor)
 @receiver(post_save, sender=Camera)
 @receiver(post_save, sender=Telescope)
@@ -722,6 +753,7 @@ def send_master_offer_notifications(sender, instance: EquipmentItemMarketplaceMa
 def marketplace_listing_pre_save(sender, instance: EquipmentItemMarketplaceListing, **kwargs):
     if instance.pk:
         pre_save_instance = EquipmentItemMarketplaceListing.objects.get(pk=instance.pk)
+        instance.pre_save_geohash_cells = MarketplaceService.get_listing_geohash_cells(pre_save_instance)
 
         # The item is being approved.
         if (
@@ -921,6 +953,26 @@ def marketplace_listing_line_item_post_save(sender, instance: EquipmentItemMarke
 def fill_in_listing_lat_lon(sender, instance: EquipmentItemMarketplaceListing, **kwargs):
     if instance.country and instance.city and not instance.latitude and not instance.longitude:
         MarketplaceService.fill_in_listing_lat_lon(instance)
+        # Not in the gazetteer: geocoded once saved, see `geocode_listing`.
+        instance.pre_save_geocode = not instance.latitude or not instance.longitude
+
+    MarketplaceService.fill_in_listing_geohashes(instance)
+
+
+@receiver(post_save, sender=EquipmentItemMarketplaceListing)
+def geocode_listing(sender, instance: EquipmentItemMarketplaceListing, **kwargs):
+    if getattr(instance, 'pre_save_geocode', False):
+        geocode_marketplace_listing.apply_async(args=(instance.pk,), countdown=5)
+        del instance.pre_save_geocode
+
+
+@receiver(post_save, sender=EquipmentItemMarketplaceListing)
+@receiver(post_softdelete, sender=EquipmentItemMarketplaceListing)
+@receiver(post_delete, sender=EquipmentItemMarketplaceListing)
+def invalidate_listing_geohash_cells(sender, instance: EquipmentItemMarketplaceListing, **kwargs):
+    MarketplaceService.invalidate_listing_geohash_cells(
+        MarketplaceService.get_listing_geohash_cells(instance) + getattr(instance, 'pre_save_geohash_cells', [])
+    )
 
 
 @receiver(post_save, sender=EquipmentItemMarketplaceFeedback)
@@ -961,6 +1013,70 @@ def send_marketplace_feedback_notifications(
         )
 
 
+@receiver(pre_save, sender=CameraEditProposal)
+@receiver(pre_save, sender=TelescopeEditProposal)
+@receiver(pre_save, sender=MountEditProposal)
+@receiver(pre_save, sender=FilterEditProposal)
+@receiver(pre_save, sender=AccessoryEditProposal)
+@receiver(pre_save, sender=SoftwareEditProposal)
+def edit_proposal_pre_save(sender, instance, **kwargs):
+    if instance.pk:
+        instance.pre_save_edit_proposal_reviewed_by_id = sender.all_objects.filter(
+            pk=instance.pk
+        ).values_list('edit_proposal_reviewed_by', flat=True).first()
+    else:
+        instance.pre_save_edit_proposal_reviewed_by_id = None
+
+
+@receiver(post_save, sender=CameraEditProposal)
+@receiver(post_save, sender=TelescopeEditProposal)
+@receiver(post_save, sender=MountEditProposal)
+@receiver(post_save, sender=FilterEditProposal)
+@receiver(post_save, sender=AccessoryEditProposal)
+@receiver(post_save, sender=SoftwareEditProposal)
+def update_equipment_contributor_stats(sender, instance, created, **kwargs):
+    user_ids = []
+
+    if created:
+        user_ids.append(instance.edit_proposal_by_id)
+
+    previous_reviewer_id = getattr(instance, 'pre_save_edit_proposal_reviewed_by_id', None)
+    if instance.edit_proposal_reviewed_by_id != previous_reviewer_id:
+        user_ids.extend([instance.edit_proposal_reviewed_by_id, previous_reviewer_id])
+
+    EquipmentContributorsService.update(user_ids)
+
+
+@receiver(post_softdelete, sender=CameraEditProposal)
+@receiver(post_softdelete, sender=TelescopeEditProposal)
+@receiver(post_softdelete, sender=MountEditProposal)
+@receiver(post_softdelete, sender=FilterEditProposal)
+@receiver(post_softdelete, sender=AccessoryEditProposal)
+@receiver(post_softdelete, sender=SoftwareEditProposal)
+@receiver(post_undelete, sender=CameraEditProposal)
+@receiver(post_undelete, sender=TelescopeEditProposal)
+@receiver(post_undelete, sender=MountEditProposal)
+@receiver(post_undelete, sender=FilterEditProposal)
+@receiver(post_undelete, sender=AccessoryEditProposal)
+@receiver(post_undelete, sender=SoftwareEditProposal)
+def update_equipment_contributor_stats_after_delete_or_restore(sender, instance, **kwargs):
+    EquipmentContributorsService.update([instance.edit_proposal_by_id, instance.edit_proposal_reviewed_by_id])
+
+
+@receiver(post_save, sender=EquipmentItemMarketplaceFeedback)
+@receiver(post_softdelete, sender=EquipmentItemMarketplaceFeedback)
+@receiver(post_undelete, sender=EquipmentItemMarketplaceFeedback)
+def update_marketplace_feedback_stats(sender, instance: EquipmentItemMarketplaceFeedback, **kwargs):
+    if instance.recipient_id:
+        MarketplaceFeedbackStatsService.update(instance.recipient_id)
+
+
+@receiver(post_delete, sender=EquipmentItemMarketplaceFeedback)
+def update_marketplace_feedback_stats_after_delete(sender, instance: EquipmentItemMarketplaceFeedback, **kwargs):
+    if instance.recipient_id:
+        MarketplaceFeedbackStatsService.update_on_commit(instance.recipient_id)
+
+
 @receiver(post_delete, sender=EquipmentItemMarketplaceListingLineItemImage)
 def delete_marketplace_image(sender, instance: EquipmentItemMarketplaceListingLineItemImage, **kwargs):
     instance.image_file.delete(save=False)
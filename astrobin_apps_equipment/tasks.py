@@ -5,7 +5,9 @@ from typing import List, Optional
 from annoying.functions import get_object_or_None
 from celery import shared_task
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.utils import timezone
+from geopy.exc import GeocoderServiceError, GeocoderTimedOut
 
 from astrobin.models import GearMigrationStrategy, Image
 from astrobin.services.gear_service import GearService
@@ -22,6 +24,10 @@ from astrobin_apps_equipment.models import (
 from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
 from astrobin_apps_equipment.models.equipment_item_marketplace_offer import EquipmentItemMarketplaceOfferStatus
 from astrobin_apps_equipment.services import EquipmentService
+from astrobin_apps_equipment.services.equipment_autocomplete_service import EquipmentAutocompleteService
+from astrobin_apps_equipment.services.equipment_contributors_service import EquipmentContributorsService
+from astrobin_apps_equipment.services.equipment_item_co_occurrence_service import EquipmentItemCoOccurrenceService
+from astrobin_apps_equipment.services.equipment_stats_service import EquipmentStatsService
 from astrobin_apps_equipment.services.marketplace_service import MarketplaceService
 from astrobin_apps_equipment.services.stock import StockImporterService
 from astrobin_apps_equipment.services.stock.plugins.agena import AgenaStockImporterPlugin
@@ -354,6 +360,18 @@ def auto_approve_marketplace_listings():
         MarketplaceService.approve_listing(listing, admin)
 
 
+# Nominatim's usage policy allows one request per second.
+@shared_task(time_limit=60, rate_limit='1/s')
+def geocode_marketplace_listing(listing_id: int, attempt: int = 0):
+    try:
+        MarketplaceService.geocode_listing(listing_id)
+    except (GeocoderTimedOut, GeocoderServiceError) as e:
+        if attempt < 3:
+            geocode_marketplace_listing.apply_async(args=(listing_id, attempt + 1), countdown=60 * (attempt + 1))
+        else:
+            log.error(f'geocode_marketplace_listing: unable to geocode listing {listing_id}: {str(e)}')
+
+
 @shared_task(time_limit=30)
 def update_equipment_preset_image_count(pk: int):
     try:
@@ -390,3 +408,88 @@ def update_equipment_preset_total_integration(pk: int):
             )
     except EquipmentPreset.DoesNotExist:
         log.warning(f"update_equipment_preset_total_integration_hours: EquipmentPreset with pk={pk} not found")
+
+
+@shared_task(time_limit=300)
+def update_equipment_item_co_occurrences(items: List[List]):
+    EquipmentItemCoOccurrenceService.update([(klass, item_id) for klass, item_id in items])
+
+
+@shared_task(time_limit=60 * 60, acks_late=True)
+def rebuild_equipment_item_co_occurrences():
+    lock_id = EquipmentItemCoOccurrenceService.REBUILD_LOCK_CACHE_KEY
+
+    if not cache.add(lock_id, 'true', 60 * 60):
+        # Another rebuild is running: this one runs when it's done, so that the changes since it started are counted.
+        log.info('rebuild_equipment_item_co_occurrences: another rebuild is running, retrying in 5 minutes')
+        rebuild_equipment_item_co_occurrences.apply_async(countdown=60 * 5)
+        return
+
+    try:
+        EquipmentItemCoOccurrenceService.rebuild()
+    finally:
+        cache.delete(lock_id)
+
+
+@shared_task(time_limit=300)
+def update_equipment_stats(items: List[List]):
+    EquipmentStatsService.update([(klass, item_id) for klass, item_id in items])
+
+
+@shared_task(time_limit=60 * 60, acks_late=True)
+def rebuild_equipment_stats():
+    lock_id = 'rebuild_equipment_stats_lock'
+
+    if not cache.add(lock_id, 'true', 60 * 60):
+        log.debug('rebuild_equipment_stats: already running')
+        return
+
+    try:
+        EquipmentStatsService.rebuild()
+    finally:
+        cache.delete(lock_id)
+
+
+@shared_task(time_limit=60 * 60, acks_late=True)
+def rebuild_equipment_contributors():
+    lock_id = 'rebuild_equipment_contributors_lock'
+
+    if not cache.add(lock_id, 'true', 60 * 60):
+        log.debug('rebuild_equipment_contributors: already running')
+        return
+
+    try:
+        EquipmentContributorsService.rebuild()
+    finally:
+        cache.delete(lock_id)
+
+
+@shared_task(time_limit=300)
+def update_equipment_autocomplete(klass: str, ids: List[int]):
+    lock_id = EquipmentAutocompleteService.LOCK_CACHE_KEY % klass
+
+    if not cache.add(lock_id, 'true', 60 * 5):
+        # Another update or rebuild of the snapshot is running: patching it now would lose one of the two.
+        update_equipment_autocomplete.apply_async(args=(klass, ids), countdown=10)
+        return
+
+    try:
+        EquipmentAutocompleteService.update(klass, ids)
+    finally:
+        cache.delete(lock_id)
+
+
+@shared_task(time_limit=600)
+def rebuild_equipment_autocomplete(klass: Optional[str] = None):
+    for klass in [klass] if klass else EquipmentAutocompleteService.KLASSES:
+        lock_id = EquipmentAutocompleteService.LOCK_CACHE_KEY % klass
+
+        if not cache.add(lock_id, 'true', 60 * 5):
+            rebuild_equipment_autocomplete.apply_async(args=(klass,), countdown=10)
+            continue
+
+        try:
+            EquipmentAutocompleteService.rebuild(klass)
+        finally:
+            cache.delete(lock_id)
+            cache.delete(EquipmentAutocompleteService.REBUILD_SCHEDULED_CACHE_KEY % klass)
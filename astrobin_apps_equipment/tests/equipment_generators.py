@@ -9,7 +9,7 @@ from astrobin_apps_equipment.models import (
     EquipmentItemMarketplaceOffer,
     Sensor, Telescope, Mount, Filter,
     Accessory, Software,
-    EquipmentItemGroup,
+    EquipmentItemGroup, TelescopeEditProposal,
 )
 from astrobin_apps_equipment.models.accessory_base_model import AccessoryType
 from astrobin_apps_equipment.models.camera_base_model import CameraType
@@ -119,6 +119,28 @@ class EquipmentGenerators:
             frozen_as_ambiguous=kwargs.get('frozen_as_ambiguous', None),
         )
 
+    @staticmethod
+    def telescope_edit_proposal(**kwargs):
+        target = kwargs.get('edit_proposal_target')
+
+        if target is None:
+            target = EquipmentGenerators.telescope()
+
+        return TelescopeEditProposal.objects.create(
+            edit_proposal_target=target,
+            edit_proposal_by=kwargs.get('edit_proposal_by', None),
+            edit_proposal_original_properties=kwargs.get('edit_proposal_original_properties', '{}'),
+            edit_proposal_reviewed_by=kwargs.get('edit_proposal_reviewed_by', None),
+            edit_proposal_review_timestamp=kwargs.get('edit_proposal_review_timestamp', None),
+            brand=target.brand,
+            name=kwargs.get('name', target.name),
+            type=target.type,
+            aperture=target.aperture,
+            min_focal_length=target.min_focal_length,
+            max_focal_length=target.max_focal_length,
+            weight=target.weight,
+        )
+
     @staticmethod
     def mount(**kwargs):
         random_name = Generators.random_string()
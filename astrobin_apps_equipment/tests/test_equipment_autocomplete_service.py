@@ -0,0 +1,213 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import patch
+
+from astrobin.tests.generators import Generators
+from astrobin_apps_equipment.models import Camera
+from astrobin_apps_equipment.models.equipment_item import EquipmentItemReviewerDecision
+from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
+from astrobin_apps_equipment.services.equipment_autocomplete_service import (
+    AutocompleteEntry, EquipmentAutocompleteIndex, EquipmentAutocompleteService,
+)
+from astrobin_apps_equipment.tests.equipment_generators import EquipmentGenerators
+
+
+def _entry(pk, name, brand_id=1, brand_name='ZWO', variant_of_id=None, created_by_id=1, approved=True):
+    return AutocompleteEntry(
+        pk, brand_id, brand_name, variant_of_id, created_by_id, approved, name, f'{brand_name or ""} {name}'
+    )
+
+
+class EquipmentAutocompleteIndexTest(TestCase):
+    def setUp(self):
+        self.index = EquipmentAutocompleteIndex([
+            _entry(1, 'ASI1600MM Pro'),
+            _entry(2, 'ASI1600MM Pro Cooled', variant_of_id=1),
+            _entry(3, 'ASI294MC Pro'),
+            _entry(4, 'EOS 6D', brand_id=2, brand_name='Canon'),
+        ])
+
+    def test_search_contains_before_similar(self):
+        result = self.index.search('ASI1600', lambda x: True, 10)
+        self.assertEqual([1, 2], result[:2])
+
+        result = self.index.search('ZWO ASI294MC', lambda x: True, 10)
+        self.assertEqual(3, result[0])
+
+    def test_search_matches_parent_through_variant(self):
+        result = self.index.search('Cooled', lambda x: True, 10)
+        self.assertIn(1, result)
+        self.assertIn(2, result)
+
+    def test_search_respects_visibility_and_limit(self):
+        self.assertNotIn(1, self.index.search('ASI1600', lambda x: x.pk != 1, 10))
+        self.assertEqual(1, len(self.index.search('ASI', lambda x: True, 1)))
+
+    def test_search_brand(self):
+        self.assertEqual([4], self.index.search_brand('canon', lambda x: True))
+        self.assertIsNone(self.index.search_brand('Nikon', lambda x: True))
+
+    def test_remove_and_add(self):
+        self.index.remove(4)
+        self.assertEqual([], self.index.search('EOS 6D', lambda x: True, 10))
+
+        self.index.add(_entry(4, 'EOS 6D Mark II', brand_id=2, brand_name='Canon'))
+        self.assertEqual([4], self.index.search('EOS 6D', lambda x: True, 10))
+
+    def test_serialize(self):
+        index = EquipmentAutocompleteIndex.deserialize(self.index.serialize(), 'version')
+
+        self.assertEqual('version', index.version)
+        self.assertEqual(self.index.entries, index.entries)
+        self.assertEqual(
+            self.index.search('ASI1600', lambda x: True, 10),
+            index.search('ASI1600', lambda x: True, 10)
+        )
+
+
+@patch('astrobin_apps_equipment.tasks.rebuild_equipment_autocomplete.apply_async')
+@patch('astrobin_apps_equipment.tasks.update_equipment_autocomplete.apply_async')
+class EquipmentAutocompleteServiceTest(TestCase):
+    def setUp(self):
+        EquipmentAutocompleteService._indexes = {}
+
+        self.creator = Generators.user()
+        self.other = Generators.user()
+        self.brand = EquipmentGenerators.brand(name='Foo')
+        self.approved = EquipmentGenerators.camera(brand=self.brand, name='Alpha 1')
+        self.unapproved = EquipmentGenerators.camera(brand=self.brand, name='Alpha 2', created_by=self.creator)
+        Camera.objects.filter(pk=self.approved.pk).update(
+            reviewer_decision=EquipmentItemReviewerDecision.APPROVED
+        )
+
+    def _search(self, q, user, allow_unapproved=False, is_equipment_moderator=False):
+        return EquipmentAutocompleteService.search(
+            EquipmentItemKlass.CAMERA, q, user, is_equipment_moderator, allow_unapproved, False, False, None, 10
+        )
+
+    def test_search_without_index(self, update_apply_async, rebuild_apply_async):
+        self.assertIsNone(self._search('Alpha', self.other))
+        rebuild_apply_async.assert_called_with(args=(EquipmentItemKlass.CAMERA,))
+
+    def test_search_visibility(self, *args):
+        EquipmentAutocompleteService.rebuild(EquipmentItemKlass.CAMERA)
+
+        self.assertEqual(([self.approved.pk], False), self._search('Alpha', self.other))
+        self.assertEqual(([self.approved.pk, self.unapproved.pk], False), self._search('Alpha', self.creator))
+        self.assertEqual(
+            ([self.approved.pk, self.unapproved.pk], False),
+            self._search('Alpha', self.other, is_equipment_moderator=True)
+        )
+        self.assertEqual(
+            ([self.approved.pk, self.unapproved.pk], False),
+            self._search('Alpha', self.other, allow_unapproved=True)
+        )
+
+    def test_search_brand(self, *args):
+        EquipmentAutocompleteService.rebuild(EquipmentItemKlass.CAMERA)
+
+        self.assertEqual(([self.approved.pk], True), self._search('foo', self.other))
+
+    def test_enqueue_update_on_change(self, update_apply_async, rebuild_apply_async):
+        update_apply_async.reset_mock()
+
+        self.approved.name = 'Beta'
+        self.approved.save()
+
+        update_apply_async.assert_called_with(args=(EquipmentItemKlass.CAMERA, [self.approved.pk]), countdown=5)
+
+    def _other_process(self, klass=EquipmentItemKlass.CAMERA):
+        # Another process' copy of the index, as loaded from the snapshot.
+        index = EquipmentAutocompleteService._load_snapshot(klass)
+        EquipmentAutocompleteService._indexes = {}
+        return index
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_update_stores_a_patch(self, *args):
+        cache.clear()
+        EquipmentAutocompleteService.rebuild(EquipmentItemKlass.CAMERA)
+        snapshot = cache.get(EquipmentAutocompleteService.SNAPSHOT_CACHE_KEY % EquipmentItemKlass.CAMERA)
+        EquipmentAutocompleteService._indexes = {EquipmentItemKlass.CAMERA: self._other_process()}
+
+        Camera.objects.filter(pk=self.approved.pk).update(name='Beta 1')
+        EquipmentAutocompleteService.update(EquipmentItemKlass.CAMERA, [self.approved.pk])
+
+        self.assertEqual(
+            snapshot, cache.get(EquipmentAutocompleteService.SNAPSHOT_CACHE_KEY % EquipmentItemKlass.CAMERA)
+        )
+        lineage, number = snapshot[0]
+        self.assertEqual(
+            ([tuple(EquipmentAutocompleteService.get_entries(EquipmentItemKlass.CAMERA, [self.approved.pk])[0])], []),
+            cache.get(EquipmentAutocompleteService.PATCH_CACHE_KEY % (EquipmentItemKlass.CAMERA, lineage, number + 1))
+        )
+
+        index = EquipmentAutocompleteService._indexes[EquipmentItemKlass.CAMERA]
+        self.assertEqual(([self.approved.pk], False), self._search('Beta', self.other))
+        self.assertIs(index, EquipmentAutocompleteService._indexes[EquipmentItemKlass.CAMERA])
+        self.assertEqual((lineage, number + 1), index.version)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_update_deletes(self, *args):
+        cache.clear()
+        EquipmentAutocompleteService.rebuild(EquipmentItemKlass.CAMERA)
+        EquipmentAutocompleteService._indexes = {EquipmentItemKlass.CAMERA: self._other_process()}
+
+        Camera.objects.filter(pk=self.unapproved.pk).delete()
+        EquipmentAutocompleteService.update(EquipmentItemKlass.CAMERA, [self.unapproved.pk])
+
+        self.assertEqual(([self.approved.pk], False), self._search('Alpha', self.creator))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    @patch.object(EquipmentAutocompleteService, 'PATCHES_PER_SNAPSHOT', 2)
+    def test_update_rewrites_the_snapshot_every_patches_per_snapshot(self, *args):
+        cache.clear()
+        EquipmentAutocompleteService.rebuild(EquipmentItemKlass.CAMERA)
+        key = EquipmentAutocompleteService.SNAPSHOT_CACHE_KEY % EquipmentItemKlass.CAMERA
+        lineage, number = cache.get(key)[0]
+
+        Camera.objects.filter(pk=self.approved.pk).update(name='Beta 1')
+        EquipmentAutocompleteService.update(EquipmentItemKlass.CAMERA, [self.approved.pk])
+        self.assertEqual((lineage, number), cache.get(key)[0])
+
+        Camera.objects.filter(pk=self.unapproved.pk).update(name='Beta 2')
+        EquipmentAutocompleteService.update(EquipmentItemKlass.CAMERA, [self.unapproved.pk])
+        self.assertEqual((lineage, number + 2), cache.get(key)[0])
+
+        EquipmentAutocompleteService._indexes = {}
+        self.assertEqual(
+            ([self.approved.pk, self.unapproved.pk], False), self._search('Beta', self.other, allow_unapproved=True)
+        )
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_missing_patch(self, update_apply_async, rebuild_apply_async):
+        cache.clear()
+        EquipmentAutocompleteService.rebuild(EquipmentItemKlass.CAMERA)
+        lineage, number = EquipmentAutocompleteService._indexes[EquipmentItemKlass.CAMERA].version
+        EquipmentAutocompleteService._indexes = {EquipmentItemKlass.CAMERA: self._other_process()}
+
+        Camera.objects.filter(pk=self.approved.pk).update(name='Beta 1')
+        EquipmentAutocompleteService.update(EquipmentItemKlass.CAMERA, [self.approved.pk])
+        cache.delete(EquipmentAutocompleteService.PATCH_CACHE_KEY % (EquipmentItemKlass.CAMERA, lineage, number + 1))
+
+        # The snapshot is served as it is until it's rebuilt.
+        self.assertEqual(([self.approved.pk], False), self._search('Alpha', self.other))
+        rebuild_apply_async.assert_called_with(args=(EquipmentItemKlass.CAMERA,))
+        self.assertEqual(
+            (lineage, number + 1), EquipmentAutocompleteService._indexes[EquipmentItemKlass.CAMERA].version
+        )
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_rebuild_starts_a_new_lineage(self, *args):
+        cache.clear()
+        EquipmentAutocompleteService.rebuild(EquipmentItemKlass.CAMERA)
+        old = self._other_process()
+
+        Camera.objects.filter(pk=self.approved.pk).update(name='Beta 1')
+        EquipmentAutocompleteService.rebuild(EquipmentItemKlass.CAMERA)
+        EquipmentAutocompleteService._indexes = {EquipmentItemKlass.CAMERA: old}
+
+        self.assertEqual(([self.approved.pk], False), self._search('Beta', self.other))
+        index = EquipmentAutocompleteService._indexes[EquipmentItemKlass.CAMERA]
+        self.assertIsNot(old, index)
+        self.assertNotEqual(old.version[0], index.version[0])
+        self.assertEqual(0, index.version[1])
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from astrobin.tests.generators import Generators
+from astrobin_apps_equipment.models import EquipmentContributorStats, TelescopeEditProposal
+from astrobin_apps_equipment.services.equipment_contributors_service import EquipmentContributorsService
+from astrobin_apps_equipment.tests.equipment_generators import EquipmentGenerators
+
+
+class EquipmentContributorsServiceTest(TestCase):
+    def setUp(self):
+        self.proposer = Generators.user()
+        self.reviewer = Generators.user()
+
+    def _stats(self, user):
+        stats = EquipmentContributorStats.objects.get(user=user)
+        return stats.contributions, stats.recent_contributions
+
+    def test_updated_on_create_and_review(self):
+        edit_proposal = EquipmentGenerators.telescope_edit_proposal(edit_proposal_by=self.proposer)
+
+        self.assertEqual((1, 1), self._stats(self.proposer))
+        self.assertFalse(EquipmentContributorStats.objects.filter(user=self.reviewer).exists())
+
+        edit_proposal.edit_proposal_reviewed_by = self.reviewer
+        edit_proposal.edit_proposal_review_timestamp = timezone.now()
+        edit_proposal.save()
+
+        self.assertEqual((1, 1), self._stats(self.proposer))
+        self.assertEqual((1, 1), self._stats(self.reviewer))
+
+        # Saving again doesn't count twice.
+        edit_proposal.save()
+
+        self.assertEqual((1, 1), self._stats(self.reviewer))
+
+    def test_updated_on_delete_and_undelete(self):
+        edit_proposal = EquipmentGenerators.telescope_edit_proposal(
+            edit_proposal_by=self.proposer,
+            edit_proposal_reviewed_by=self.reviewer,
+            edit_proposal_review_timestamp=timezone.now(),
+        )
+
+        edit_proposal.delete()
+
+        self.assertEqual((0, 0), self._stats(self.proposer))
+        self.assertEqual((0, 0), self._stats(self.reviewer))
+
+        edit_proposal.undelete()
+
+        self.assertEqual((1, 1), self._stats(self.proposer))
+        self.assertEqual((1, 1), self._stats(self.reviewer))
+
+    def test_rebuild_leaves_old_contributions_out_of_the_recent_window(self):
+        old = EquipmentGenerators.telescope_edit_proposal(edit_proposal_by=self.proposer)
+        EquipmentGenerators.telescope_edit_proposal(edit_proposal_by=self.proposer)
+        TelescopeEditProposal.objects.filter(pk=old.pk).update(
+            edit_proposal_created=timezone.now() - timedelta(days=EquipmentContributorsService.RECENT_DAYS + 1)
+        )
+        EquipmentContributorStats.objects.all().delete()
+
+        EquipmentContributorsService.rebuild()
+
+        self.assertEqual((2, 1), self._stats(self.proposer))
+
+    def test_get_top(self):
+        superuser = Generators.user(is_superuser=True)
+
+        for user, count in ((self.proposer, 1), (self.reviewer, 2), (superuser, 3)):
+            EquipmentContributorStats.objects.create(user=user, contributions=count, recent_contributions=3 - count)
+
+        self.assertEqual([(self.reviewer.pk, 2), (self.proposer.pk, 1)], EquipmentContributorsService.get_top())
+        self.assertEqual(
+            [(self.proposer.pk, 2), (self.reviewer.pk, 1)], EquipmentContributorsService.get_top('last-30-days')
+        )
+        self.assertEqual([(self.reviewer.pk, 2)], EquipmentContributorsService.get_top(limit=1))
+
+    def test_view(self):
+        EquipmentContributorStats.objects.create(user=self.proposer, contributions=2, recent_contributions=0)
+
+        response = self.client.get('/api/v2/equipment/contributors/')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([[self.proposer.pk, 2]], response.json())
+
+        response = self.client.get('/api/v2/equipment/contributors/?period=last-30-days')
+        self.assertEqual([], response.json())
+
+        response = self.client.get('/api/v2/equipment/contributors/?period=yesterday')
+        self.assertEqual(400, response.status_code)
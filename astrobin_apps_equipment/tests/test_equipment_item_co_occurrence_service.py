@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import patch
+
+from astrobin.tests.generators import Generators
+from astrobin_apps_equipment.models import EquipmentItemCoOccurrence
+from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
+from astrobin_apps_equipment.services.equipment_item_co_occurrence_service import EquipmentItemCoOccurrenceService
+from astrobin_apps_equipment.tasks import rebuild_equipment_item_co_occurrences
+from astrobin_apps_equipment.tests.equipment_generators import EquipmentGenerators
+
+
+@patch('astrobin_apps_equipment.tasks.update_equipment_item_co_occurrences.apply_async')
+class EquipmentItemCoOccurrenceServiceTest(TestCase):
+    def setUp(self):
+        self.camera = EquipmentGenerators.camera()
+        self.telescope = EquipmentGenerators.telescope()
+        self.other_telescope = EquipmentGenerators.telescope()
+        self.filter = EquipmentGenerators.filter()
+
+    def _image(self, telescopes, is_wip=False):
+        image = Generators.image(is_wip=is_wip)
+        image.imaging_cameras_2.add(self.camera)
+        image.imaging_telescopes_2.add(*telescopes)
+        image.filters_2.add(self.filter)
+        return image
+
+    def _count(self, item, other) -> int:
+        row = EquipmentItemCoOccurrence.objects.filter(
+            item_klass=item.klass, item_id=item.pk, other_klass=other.klass, other_id=other.pk
+        ).first()
+        return row.count if row else 0
+
+    def test_rebuild(self, apply_async):
+        self._image([self.telescope])
+        self._image([self.telescope, self.other_telescope])
+        self._image([self.telescope], is_wip=True)
+
+        EquipmentItemCoOccurrenceService.rebuild()
+
+        self.assertEqual(2, self._count(self.camera, self.telescope))
+        self.assertEqual(2, self._count(self.telescope, self.camera))
+        self.assertEqual(1, self._count(self.camera, self.other_telescope))
+        self.assertEqual(2, self._count(self.filter, self.camera))
+        self.assertEqual(0, self._count(self.filter, self.telescope))
+
+    def test_update_matches_rebuild(self, apply_async):
+        self._image([self.telescope])
+        image = self._image([self.telescope, self.other_telescope])
+
+        EquipmentItemCoOccurrenceService.rebuild()
+        image.imaging_telescopes_2.remove(self.other_telescope)
+        EquipmentItemCoOccurrenceService.update([(EquipmentItemKlass.TELESCOPE, self.other_telescope.pk)])
+        updated = set(EquipmentItemCoOccurrence.objects.values_list('item_id', 'other_id', 'count'))
+
+        EquipmentItemCoOccurrenceService.rebuild()
+        rebuilt = set(EquipmentItemCoOccurrence.objects.values_list('item_id', 'other_id', 'count'))
+
+        self.assertEqual(rebuilt, updated)
+        self.assertEqual(0, self._count(self.camera, self.other_telescope))
+
+    def test_update_overwrites_rows_written_meanwhile(self, apply_async):
+        self._image([self.telescope])
+        EquipmentItemCoOccurrence.objects.create(
+            item_klass=self.telescope.klass, item_id=self.telescope.pk,
+            other_klass=self.camera.klass, other_id=self.camera.pk, count=5
+        )
+        EquipmentItemCoOccurrence.objects.create(
+            item_klass=self.camera.klass, item_id=self.camera.pk,
+            other_klass=self.telescope.klass, other_id=self.other_telescope.pk, count=5
+        )
+
+        EquipmentItemCoOccurrenceService.update([(EquipmentItemKlass.CAMERA, self.camera.pk)])
+
+        self.assertEqual(1, self._count(self.telescope, self.camera))
+        self.assertEqual(1, self._count(self.camera, self.telescope))
+        self.assertEqual(0, self._count(self.camera, self.other_telescope))
+
+    def test_rebuild_keeps_current_rows(self, apply_async):
+        self._image([self.telescope])
+        EquipmentItemCoOccurrenceService.rebuild()
+        pk = EquipmentItemCoOccurrence.objects.get(
+            item_klass=self.camera.klass, item_id=self.camera.pk, other_klass=self.telescope.klass
+        ).pk
+
+        self._image([self.telescope])
+        EquipmentItemCoOccurrenceService.rebuild()
+
+        row = EquipmentItemCoOccurrence.objects.get(pk=pk)
+        self.assertEqual(2, row.count)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    @patch('astrobin_apps_equipment.tasks.rebuild_equipment_item_co_occurrences.apply_async')
+    @patch.object(EquipmentItemCoOccurrenceService, 'rebuild')
+    def test_rebuild_task_retries_while_another_rebuild_runs(self, rebuild, rebuild_apply_async, apply_async):
+        cache.clear()
+        cache.add(EquipmentItemCoOccurrenceService.REBUILD_LOCK_CACHE_KEY, 'true')
+
+        rebuild_equipment_item_co_occurrences()
+        rebuild.assert_not_called()
+        rebuild_apply_async.assert_called_once_with(countdown=60 * 5)
+
+        cache.delete(EquipmentItemCoOccurrenceService.REBUILD_LOCK_CACHE_KEY)
+        rebuild_equipment_item_co_occurrences()
+        rebuild.assert_called_once_with()
+        self.assertIsNone(cache.get(EquipmentItemCoOccurrenceService.REBUILD_LOCK_CACHE_KEY))
+
+    def test_equipment_change_enqueues_update(self, apply_async):
+        image = Generators.image()
+        image.imaging_telescopes_2.add(self.telescope)
+
+        apply_async.assert_called_with(args=([[EquipmentItemKlass.TELESCOPE, self.telescope.pk]],), countdown=30)
+
+    def test_get_most_often_used_with(self, apply_async):
+        self._image([self.telescope])
+        self._image([self.telescope, self.other_telescope])
+
+        EquipmentItemCoOccurrenceService.rebuild()
+
+        self.assertEqual(
+            {
+                f'{EquipmentItemKlass.FILTER}-{self.filter.pk}': 2,
+                f'{EquipmentItemKlass.TELESCOPE}-{self.telescope.pk}': 2,
+            },
+            EquipmentItemCoOccurrenceService.get_most_often_used_with(EquipmentItemKlass.CAMERA, self.camera.pk)
+        )
+        self.assertEqual(
+            1,
+            len(EquipmentItemCoOccurrenceService.get_most_often_used_with(
+                EquipmentItemKlass.CAMERA, self.camera.pk, limit=1
+            ))
+        )
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from django.test import TestCase
+from mock import patch
+
+from astrobin.models import Image
+from astrobin.tests.generators import Generators
+from astrobin_apps_equipment.models import Camera, EquipmentBrand, Sensor
+from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
+from astrobin_apps_equipment.services.equipment_stats_service import EquipmentStatsService
+from astrobin_apps_equipment.tests.equipment_generators import EquipmentGenerators
+
+
+@patch('astrobin_apps_equipment.tasks.update_equipment_stats.apply_async')
+@patch('astrobin_apps_equipment.tasks.update_equipment_item_co_occurrences.apply_async')
+class EquipmentStatsServiceTest(TestCase):
+    def setUp(self):
+        self.brand = EquipmentGenerators.brand()
+        self.sensor = EquipmentGenerators.sensor()
+        self.camera = EquipmentGenerators.camera(brand=self.brand, sensor=self.sensor)
+        self.variant = EquipmentGenerators.camera(brand=self.brand, sensor=self.sensor, variant_of=self.camera)
+        self.user = Generators.user()
+
+    def _image(self, published, **kwargs):
+        image = Generators.image(**kwargs)
+        # Publication dates are set on creation.
+        Image.all_objects.filter(pk=image.pk).update(published=published)
+        return image
+
+    def _stats(self, obj):
+        obj.refresh_from_db()
+        return obj.image_count, obj.user_count, obj.last_used
+
+    def test_rebuild(self, *args):
+        image = self._image(datetime(2020, 1, 1), user=self.user)
+        image.imaging_cameras_2.add(self.camera)
+        image.guiding_cameras_2.add(self.camera)
+        image = self._image(datetime(2021, 1, 1), user=self.user)
+        image.imaging_cameras_2.add(self.variant)
+        image = self._image(datetime(2022, 1, 1))
+        image.imaging_cameras_2.add(self.variant)
+        image = self._image(datetime(2023, 1, 1), is_wip=True)
+        image.imaging_cameras_2.add(self.camera)
+
+        EquipmentStatsService.rebuild()
+
+        self.assertEqual((3, 2, datetime(2022, 1, 1)), self._stats(self.camera))
+        self.assertEqual((2, 2, datetime(2022, 1, 1)), self._stats(self.variant))
+        self.assertEqual((3, 2, datetime(2022, 1, 1)), self._stats(self.sensor))
+        self.assertEqual((3, 2, datetime(2022, 1, 1)), self._stats(self.brand))
+
+    def test_rebuild_resets_unused(self, *args):
+        Camera.objects.filter(pk=self.camera.pk).update(image_count=5, user_count=3)
+
+        EquipmentStatsService.rebuild()
+
+        self.assertEqual((0, 0, None), self._stats(self.camera))
+
+    def test_update(self, *args):
+        image = self._image(datetime(2020, 1, 1), user=self.user)
+        image.imaging_cameras_2.add(self.variant)
+
+        EquipmentStatsService.update([(EquipmentItemKlass.CAMERA, self.variant.pk)])
+
+        self.assertEqual((1, 1, datetime(2020, 1, 1)), self._stats(self.variant))
+        self.assertEqual((1, 1, datetime(2020, 1, 1)), self._stats(self.camera))
+        self.assertEqual(1, Sensor.objects.get(pk=self.sensor.pk).image_count)
+        self.assertEqual(1, EquipmentBrand.objects.get(pk=self.brand.pk).image_count)
+
+        image.imaging_cameras_2.remove(self.variant)
+        EquipmentStatsService.update([(EquipmentItemKlass.CAMERA, self.variant.pk)])
+
+        self.assertEqual((0, 0, None), self._stats(self.camera))
+        self.assertEqual(0, Sensor.objects.get(pk=self.sensor.pk).image_count)
+
+    def test_equipment_change_enqueues_update(self, update_co_occurrences, update_stats):
+        image = Generators.image()
+        image.guiding_cameras_2.add(self.camera)
+
+        update_stats.assert_called_with(args=([[EquipmentItemKlass.CAMERA, self.camera.pk]],), countdown=30)
@@ -0,0 +1,65 @@
+from django.test import TestCase
+
+from astrobin.tests.generators import Generators
+from astrobin_apps_equipment.models import EquipmentItemMarketplaceFeedbackStats
+from astrobin_apps_equipment.services.marketplace_feedback_stats_service import MarketplaceFeedbackStatsService
+from astrobin_apps_equipment.services.marketplace_service import MarketplaceService
+from astrobin_apps_equipment.tests.equipment_generators import EquipmentGenerators
+from astrobin_apps_equipment.types.marketplace_feedback import MarketplaceFeedback
+from astrobin_apps_equipment.types.marketplace_feedback_target_type import MarketplaceFeedbackTargetType
+
+
+class MarketplaceFeedbackStatsServiceTest(TestCase):
+    def setUp(self):
+        self.recipient = Generators.user()
+
+    def _feedback(self, value, target_type):
+        return EquipmentGenerators.marketplace_feedback(
+            recipient=self.recipient,
+            category_value=value,
+            speed_value=value,
+            packaging_value=value,
+            accuracy_value=value,
+            target_type=target_type,
+        )
+
+    def _stats(self):
+        return EquipmentItemMarketplaceFeedbackStats.objects.get(user=self.recipient)
+
+    def test_no_feedback(self):
+        self.assertEqual(0, MarketplaceService.calculate_received_feedback_score(self.recipient))
+        self.assertEqual(0, MarketplaceService.received_feedback_count(self.recipient))
+
+    def test_updated_on_create_edit_and_delete(self):
+        seller_feedback = self._feedback(MarketplaceFeedback.POSITIVE.value, MarketplaceFeedbackTargetType.SELLER.value)
+        self._feedback(MarketplaceFeedback.NEGATIVE.value, MarketplaceFeedbackTargetType.BUYER.value)
+
+        stats = self._stats()
+        self.assertEqual((1, 1, 1, 1, 1), (
+            stats.seller_count, stats.seller_communication_sum, stats.seller_speed_sum, stats.seller_packaging_sum,
+            stats.seller_accuracy_sum
+        ))
+        self.assertEqual((1, -1, -1), (stats.buyer_count, stats.buyer_communication_sum, stats.buyer_speed_sum))
+        self.assertEqual(50, MarketplaceService.calculate_received_feedback_score(self.recipient))
+        self.assertEqual(2, MarketplaceService.received_feedback_count(self.recipient))
+
+        seller_feedback.speed_value = MarketplaceFeedback.NEUTRAL.value
+        seller_feedback.save()
+        self.assertEqual(0, self._stats().seller_speed_sum)
+
+        seller_feedback.delete()
+        stats = self._stats()
+        self.assertEqual(0, stats.seller_count)
+        self.assertEqual(0, MarketplaceFeedbackStatsService.get_score(stats))
+        self.assertEqual(1, MarketplaceFeedbackStatsService.get_count(stats))
+
+    def test_rebuild(self):
+        self._feedback(MarketplaceFeedback.POSITIVE.value, MarketplaceFeedbackTargetType.SELLER.value)
+        self._feedback(MarketplaceFeedback.NEUTRAL.value, MarketplaceFeedbackTargetType.BUYER.value)
+        expected = MarketplaceFeedbackStatsService.get_score(self._stats())
+
+        EquipmentItemMarketplaceFeedbackStats.objects.all().delete()
+        MarketplaceFeedbackStatsService.rebuild()
+
+        self.assertEqual(expected, MarketplaceFeedbackStatsService.get_score(self._stats()))
+        self.assertEqual(2, MarketplaceFeedbackStatsService.get_count(self._stats()))
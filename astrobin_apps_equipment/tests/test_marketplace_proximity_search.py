@@ -0,0 +1,100 @@
+from django.test import TestCase
+from mock import mock, patch
+
+from astrobin_apps_equipment.services.marketplace_service import MarketplaceService
+from astrobin_apps_equipment.tests.equipment_generators import EquipmentGenerators
+from common.services.gazetteer_service import GazetteerService
+from common.services.geohash_service import GeohashService
+
+
+class MarketplaceProximitySearchTest(TestCase):
+    def _listing(self, latitude, longitude):
+        listing = EquipmentGenerators.marketplace_listing()
+        listing.latitude = latitude
+        listing.longitude = longitude
+        listing.save()
+        return listing
+
+    def test_geohashes_are_filled_in(self):
+        listing = self._listing(57.64911, 10.40744)
+
+        self.assertEqual('u4', listing.geohash_2)
+        self.assertEqual('u4pru', listing.geohash_5)
+
+        listing.latitude = None
+        listing.longitude = None
+        listing.save()
+
+        self.assertIsNone(listing.geohash_2)
+        self.assertEqual([], MarketplaceService.get_listing_geohash_cells(listing))
+
+    def test_get_listing_ids_within_distance(self):
+        zurich = self._listing(47.3769, 8.5417)
+        bern = self._listing(46.9480, 7.4474)
+        auckland = self._listing(-36.8485, 174.7633)
+
+        self.assertEqual([zurich.pk], MarketplaceService.get_listing_ids_within_distance(47.37, 8.54, 10))
+        self.assertEqual(
+            sorted([zurich.pk, bern.pk]),
+            sorted(MarketplaceService.get_listing_ids_within_distance(47.37, 8.54, 100))
+        )
+        self.assertEqual([auckland.pk], MarketplaceService.get_listing_ids_within_distance(-36.8, 174.7, 50))
+
+    def test_get_listing_ids_within_distance_too_large(self):
+        self._listing(47.3769, 8.5417)
+
+        self.assertIsNone(MarketplaceService.get_listing_ids_within_distance(47.37, 8.54, 10000))
+        self.assertIsNone(MarketplaceService.get_listing_ids_within_distance(89.9, 0, 10))
+
+    def test_get_geohash_precision(self):
+        self.assertEqual(5, MarketplaceService.get_geohash_precision(47.37, 8.54, 5))
+        self.assertEqual(2, MarketplaceService.get_geohash_precision(47.37, 8.54, 1000))
+
+        precision = MarketplaceService.get_geohash_precision(47.37, 8.54, 50)
+        self.assertLessEqual(
+            GeohashService.count_covering_cells(47.37, 8.54, 50, precision), MarketplaceService.GEOHASH_MAX_CELLS
+        )
+
+
+class MarketplaceListingGeocodingTest(TestCase):
+    def setUp(self):
+        GazetteerService.load([
+            '\t'.join(['1', 'Zürich', 'Zurich', '', '47.36667', '8.55', 'P', 'PPLA', 'CH'] + [''] * 5 + ['341730'])
+        ])
+
+    @patch('astrobin_apps_equipment.tasks.geocode_marketplace_listing.apply_async')
+    def test_location_from_gazetteer(self, apply_async):
+        listing = EquipmentGenerators.marketplace_listing()
+        listing.country = 'CH'
+        listing.city = 'Zurich'
+        listing.save()
+
+        self.assertEqual((47.36667, 8.55), (listing.latitude, listing.longitude))
+        self.assertEqual('u0qj', listing.geohash_4)
+        apply_async.assert_not_called()
+
+    @patch('astrobin_apps_equipment.tasks.geocode_marketplace_listing.apply_async')
+    def test_location_not_in_gazetteer(self, apply_async):
+        listing = EquipmentGenerators.marketplace_listing()
+        listing.country = 'CH'
+        listing.city = 'Bern'
+        listing.save()
+
+        self.assertIsNone(listing.latitude)
+        apply_async.assert_called_once_with(args=(listing.pk,), countdown=5)
+
+    @patch('astrobin_apps_equipment.services.marketplace_service.Nominatim')
+    def test_geocode_listing(self, Nominatim):
+        Nominatim.return_value.geocode.return_value = mock.Mock(latitude=46.948, longitude=7.4474)
+
+        with patch('astrobin_apps_equipment.tasks.geocode_marketplace_listing.apply_async'):
+            listing = EquipmentGenerators.marketplace_listing()
+            listing.country = 'CH'
+            listing.city = 'Bern'
+            listing.save()
+
+        MarketplaceService.geocode_listing(listing.pk)
+        listing.refresh_from_db()
+
+        self.assertEqual((46.948, 7.4474), (listing.latitude, listing.longitude))
+        self.assertEqual(GeohashService.encode(46.948, 7.4474, 5), listing.geohash_5)
@@ -0,0 +1,119 @@
+from typing import Iterator, List
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from mock import patch
+
+from astrobin_apps_equipment.models import EquipmentItemListing
+from astrobin_apps_equipment.models.equipment_item_group import EquipmentItemKlass
+from astrobin_apps_equipment.services.stock import StockImporterService
+from astrobin_apps_equipment.services.stock.plugins import StockImporterPluginInterface
+from astrobin_apps_equipment.tests.equipment_generators import EquipmentGenerators
+from astrobin_apps_equipment.types import StockStatus
+from astrobin_apps_equipment.types.stock_interface import StockInterface
+
+
+class _Plugin(StockImporterPluginInterface):
+    def __init__(self, retailer_name: str, data: List[StockInterface], error: bool = False):
+        self.retailer_name = retailer_name
+        self.data = data
+        self.error = error
+
+    def iterate_data(self) -> Iterator[StockInterface]:
+        yield from self.data
+        if self.error:
+            raise ValueError('Truncated feed')
+
+
+class StockImporterServiceTest(TestCase):
+    def setUp(self):
+        self.retailer = EquipmentGenerators.equipment_retailer()
+        self.telescope = EquipmentGenerators.telescope()
+        self.camera = EquipmentGenerators.camera()
+
+    def _stock_item(self, item, klass, name, stock_status=StockStatus.IN_STOCK, stock_amount=1):
+        return StockInterface(
+            item.pk, klass, name, 'SKU', 'https://www.example.com/%s' % item.pk, stock_status, stock_amount
+        )
+
+    def _import(self, data, error=False):
+        return StockImporterService(_Plugin(self.retailer.name, data, error)).import_stock()
+
+    def _listing(self, item):
+        return EquipmentItemListing.objects.get(
+            retailer=self.retailer, item_content_type=ContentType.objects.get_for_model(item), item_object_id=item.pk
+        )
+
+    def test_import(self):
+        telescope = self._stock_item(self.telescope, EquipmentItemKlass.TELESCOPE, 'Telescope')
+        camera = self._stock_item(self.camera, EquipmentItemKlass.CAMERA, 'Camera')
+
+        result = self._import([telescope, camera])
+        self.assertEqual((2, 0, 0, 0), (result.inserted, result.updated, result.unchanged, result.removed))
+
+        listing = self._listing(self.telescope)
+        self.assertEqual(str(self.telescope), listing.item_full_name)
+        self.assertEqual(StockStatus.IN_STOCK.value, listing.stock_status)
+        self.assertIn('utm_source=astrobin', listing.url)
+
+        camera.stock_status = StockStatus.OUT_OF_STOCK
+        camera.stock_amount = -1
+        result = self._import([telescope, camera])
+        self.assertEqual((0, 1, 1, 0), (result.inserted, result.updated, result.unchanged, result.removed))
+
+        listing = self._listing(self.camera)
+        self.assertEqual(StockStatus.OUT_OF_STOCK.value, listing.stock_status)
+        self.assertEqual(0, listing.stock_amount)
+
+    def test_removed(self):
+        telescope = self._stock_item(self.telescope, EquipmentItemKlass.TELESCOPE, 'Telescope')
+        camera = self._stock_item(self.camera, EquipmentItemKlass.CAMERA, 'Camera')
+        self._import([telescope, camera])
+
+        result = self._import([telescope])
+        self.assertEqual((0, 0, 1, 1), (result.inserted, result.updated, result.unchanged, result.removed))
+
+        listing = self._listing(self.camera)
+        self.assertEqual(StockStatus.UNKNOWN.value, listing.stock_status)
+        self.assertIsNone(listing.stock_amount)
+
+        result = self._import([telescope])
+        self.assertEqual(0, result.removed)
+
+    def test_incomplete_feed_does_not_remove(self):
+        telescope = self._stock_item(self.telescope, EquipmentItemKlass.TELESCOPE, 'Telescope')
+        camera = self._stock_item(self.camera, EquipmentItemKlass.CAMERA, 'Camera')
+        self._import([telescope, camera])
+
+        result = self._import([telescope], error=True)
+        self.assertFalse(result.complete)
+        self.assertEqual(0, result.removed)
+        self.assertEqual(StockStatus.IN_STOCK.value, self._listing(self.camera).stock_status)
+
+    def test_skipped(self):
+        result = self._import([
+            StockInterface(0, EquipmentItemKlass.TELESCOPE, 'Missing', 'SKU', 'https://a.com/', StockStatus.IN_STOCK, 1),
+            StockInterface(0, EquipmentItemKlass.SENSOR, 'Sensor', 'SKU', 'https://a.com/', StockStatus.IN_STOCK, 1),
+            self._stock_item(self.telescope, EquipmentItemKlass.TELESCOPE, 'Same name'),
+            self._stock_item(self.camera, EquipmentItemKlass.CAMERA, 'Same name'),
+        ])
+
+        self.assertEqual((1, 3), (result.inserted, result.skipped))
+
+    def test_name_taken_by_another_listing(self):
+        EquipmentGenerators.equipment_item_listing(
+            retailer=self.retailer, item_content_object=self.camera, name='Taken'
+        )
+
+        result = self._import([self._stock_item(self.telescope, EquipmentItemKlass.TELESCOPE, 'Taken')])
+
+        self.assertEqual((0, 1), (result.inserted, result.skipped))
+
+    @patch.object(StockImporterService, 'CHUNK_SIZE', 1)
+    def test_chunks(self):
+        result = self._import([
+            self._stock_item(self.telescope, EquipmentItemKlass.TELESCOPE, 'Telescope'),
+            self._stock_item(self.camera, EquipmentItemKlass.CAMERA, 'Camera'),
+        ])
+
+        self.assertEqual(2, result.inserted)
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 
 from astrobin.models import DeepSky_Acquisition
-from astrobin.moon import MoonPhase
+from astrobin.moon_table import get_illuminated
 
 
 class DeepSkyAcquisitionSerializer(serializers.ModelSerializer):
@@ -16,7 +16,7 @@ class DeepSkyAcquisitionSerializer(serializers.ModelSerializer):
     moon_illumination = serializers.SerializerMethodField()
 
     def get_moon_illumination(self, obj: DeepSky_Acquisition):
-        return MoonPhase(obj.date).illuminated if obj.date else None
+        return get_illuminated([obj.date])[0]
 
     class Meta:
         model = DeepSky_Acquisition
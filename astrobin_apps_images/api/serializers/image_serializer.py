@@ -16,7 +16,7 @@ from astrobin.api2.serializers.software_serializer import SoftwareSerializer
 from astrobin.api2.serializers.telescope_serializer import TelescopeSerializer
 from astrobin.enums.mouse_hover_image import MouseHoverImage
 from astrobin.models import DeepSky_Acquisition, Image, SolarSystem_Acquisition
-from astrobin.moon import MoonPhase
+from astrobin.moon_table import get_age, get_illuminated
 from astrobin_apps_equipment.api.serializers.accessory_serializer import (
     AccessorySerializerForImage,
 )
@@ -239,21 +239,19 @@ class ImageSerializer(serializers.ModelSerializer):
         return HitCount.objects.get_for_object(obj).hits
 
     def get_average_moon_age(self, obj) -> Optional[float]:
-        data = []
-        for acquisition in DeepSky_Acquisition.objects.filter(image=obj, date__isnull=False).iterator():
-            data.append(MoonPhase(acquisition.date).age)
+        data = get_age(DeepSky_Acquisition.objects.filter(image=obj, date__isnull=False).values_list('date', flat=True))
 
         return sum(data) / len(data) if data else None
 
     def get_average_moon_illumination(self, obj: Image) -> Optional[float]:
-        data = []
-
-        for acquisition in DeepSky_Acquisition.objects.filter(image=obj, date__isnull=False).iterator():
-            data.append(MoonPhase(acquisition.date).illuminated)
+        data = get_illuminated(
+            DeepSky_Acquisition.objects.filter(image=obj, date__isnull=False).values_list('date', flat=True)
+        )
 
         if len(data) == 0:
-            for acquisition in SolarSystem_Acquisition.objects.filter(image=obj, date__isnull=False).iterator():
-                data.append(MoonPhase(acquisition.date).illuminated)
+            data = get_illuminated(
+                SolarSystem_Acquisition.objects.filter(image=obj, date__isnull=False).values_list('date', flat=True)
+            )
 
         return sum(data) / len(data) if data else None
 
@@ -1,14 +1,14 @@
 from rest_framework import serializers
 
 from astrobin.models import SolarSystem_Acquisition
-from astrobin.moon import MoonPhase
+from astrobin.moon_table import get_illuminated
 
 
 class SolarSystemAcquisitionSerializer(serializers.ModelSerializer):
     moon_illumination = serializers.SerializerMethodField()
 
     def get_moon_illumination(self, obj: SolarSystem_Acquisition):
-        return MoonPhase(obj.date).illuminated if obj.date else None
+        return get_illuminated([obj.date])[0]
 
     class Meta:
         model = SolarSystem_Acquisition
@@ -4,6 +4,7 @@ from django.core.cache import cache
 from djangorestframework_camel_case.render import CamelCaseJSONRenderer
 from drf_haystack.filters import HaystackFilter, HaystackOrderingFilter
 from haystack.query import SearchQuerySet
+from rest_framework.decorators import action
 from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.throttling import ScopedRateThrottle
@@ -19,7 +20,10 @@ from astrobin_apps_premium.services.premium_service import PremiumService
 from common.api_page_size_pagination import PageSizePagination
 from common.encoded_search_viewset import EncodedSearchViewSet
 from common.permissions import ReadOnly
-from common.services.search_service import MatchType, SearchService
+from common.services.facet_count_service import FacetCountService
+from common.services.search_replay_service import SearchReplayService
+from common.services.search_result_cache_service import CachedSearchResults, SearchResultCacheService
+from common.services.search_service import SearchService
 
 log = logging.getLogger(__name__)
 
@@ -99,59 +103,19 @@ class ImageSearchViewSet(EncodedSearchViewSet):
 
         return Response(data)
 
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        params = self.simplify_one_item_lists(request.query_params)
+        params = self.preprocess_query_params(params)
+        facets = params.pop('facets', None)
+
+        if isinstance(facets, str):
+            facets = [x for x in facets.split(',') if x]
+
+        return Response(FacetCountService.get_counts(params, request.user, facets))
+
     def filter_images(self, params: dict, queryset: SearchQuerySet) -> SearchQuerySet:
-        queryset = queryset.models(Image)
-        queryset = SearchService.filter_by_subject(params, queryset)
-        queryset = SearchService.filter_by_telescope(params, queryset)
-        queryset = SearchService.filter_by_sensor(params, queryset)
-        queryset = SearchService.filter_by_camera(params, queryset)
-        queryset = SearchService.filter_by_mount(params, queryset)
-        queryset = SearchService.filter_by_filter(params, queryset)
-        queryset = SearchService.filter_by_accessory(params, queryset)
-        queryset = SearchService.filter_by_software(params, queryset)
-        # Remove next method after the old search page is gone.
-        queryset = SearchService.filter_by_telescope_type(params, queryset)
-        queryset = SearchService.filter_by_telescope_types(params, queryset)
-        # Remove next method after the old search page is gone.
-        queryset = SearchService.filter_by_camera_type(params, queryset)
-        queryset = SearchService.filter_by_camera_types(params, queryset)
-        queryset = SearchService.filter_by_acquisition_months(params, queryset)
-        queryset = SearchService.filter_by_remote_source(params, queryset)
-        queryset = SearchService.filter_by_subject_type(params, queryset)
-        queryset = SearchService.filter_by_color_or_mono(params, queryset)
-        queryset = SearchService.filter_by_modified_camera(params, queryset)
-        queryset = SearchService.filter_by_animated(params, queryset)
-        queryset = SearchService.filter_by_video(params, queryset)
-        queryset = SearchService.filter_by_award(params, queryset)
-        queryset = SearchService.filter_by_country(params, queryset)
-        queryset = SearchService.filter_by_data_source(params, queryset)
-        queryset = SearchService.filter_by_minimum_data(params, queryset)
-        queryset = SearchService.filter_by_constellation(params, queryset)
-        queryset = SearchService.filter_by_bortle_scale(params, queryset)
-        queryset = SearchService.filter_by_license(params, queryset)
-        queryset = SearchService.filter_by_camera_pixel_size(params, queryset)
-        queryset = SearchService.filter_by_field_radius(params, queryset)
-        queryset = SearchService.filter_by_pixel_scale(params, queryset)
-        queryset = SearchService.filter_by_telescope_diameter(params, queryset)
-        queryset = SearchService.filter_by_telescope_weight(params, queryset)
-        queryset = SearchService.filter_by_mount_weight(params, queryset)
-        queryset = SearchService.filter_by_mount_max_payload(params, queryset)
-        queryset = SearchService.filter_by_telescope_focal_length(params, queryset)
-        queryset = SearchService.filter_by_integration_time(params, queryset)
-        queryset = SearchService.filter_by_filter_types(params, queryset)
-        queryset = SearchService.filter_by_size(params, queryset)
-        queryset = SearchService.filter_by_acquisition_type(params, queryset)
-        queryset = SearchService.filter_by_date_published(params, queryset)
-        queryset = SearchService.filter_by_date_acquired(params, queryset)
-        queryset = SearchService.filter_by_moon_phase(params, queryset)
-        queryset = SearchService.filter_by_coords(params, queryset)
-        queryset = SearchService.filter_by_image_size(params, queryset)
-        queryset = SearchService.filter_by_groups(params, self.request.user, queryset)
-        queryset = SearchService.filter_by_personal_filters(params, self.request.user, queryset)
-        queryset = SearchService.filter_by_equipment_ids(params, queryset)
-        queryset = SearchService.filter_by_user_id(params, queryset)
-        queryset = SearchService.filter_by_username(params, queryset)
-        queryset = SearchService.filter_by_similar_images(params, queryset)
+        queryset = SearchService.filter_images(params, self.request.user, queryset)
 
         ordering = params.get('ordering', '-published')
 
@@ -177,16 +141,12 @@ class ImageSearchViewSet(EncodedSearchViewSet):
 
         self.request = self.update_request_params(self.request, params)
 
-        text = params.get('text', dict(value=''))
-        if isinstance(text, str):
-            text = dict(value=text)
-            if ' ' in text:
-                text['matchType'] = MatchType.ALL.value
-
-        if text.get('value'):
-            log.debug(f"Searching for: {text.get('value')}")
-            queryset = EncodedSearchViewSet.build_search_query(queryset, text)
+        SearchReplayService.record(params)
 
-        queryset = self.filter_images(params, queryset)
+        if SearchResultCacheService.is_enabled():
+            # The filter chain only runs if the ids of the requested page are not cached.
+            return CachedSearchResults(
+                Image, params, self.request.user, lambda: self.filter_images(params, queryset)
+            )
 
-        return queryset
+        return self.filter_images(params, queryset)
@@ -44,7 +44,7 @@ from astrobin.models import (
     Collection, DeepSky_Acquisition, Image, ImageRevision, SOLAR_SYSTEM_SUBJECT_CHOICES,
     SolarSystem_Acquisition,
 )
-from astrobin.moon import MoonPhase
+from astrobin.moon_table import get_age, get_illuminated
 from astrobin.services.gear_service import GearService
 from astrobin.services.utils_service import UtilsService
 from astrobin.stories import ACTSTREAM_VERB_UPLOADED_IMAGE, add_story
@@ -61,6 +61,7 @@ from astrobin_apps_platesolving.solver import Solver
 from astrobin_apps_premium.services.premium_service import PremiumService
 from astrobin_apps_premium.templatetags.astrobin_apps_premium_tags import is_free
 from astrobin_apps_users.services import UserService
+from common.request_cache import request_memoize
 from common.services import AppRedirectionService, DateTimeService, SearchIndexUpdateService
 from common.services.constellations_service import ConstellationException, ConstellationsService
 from nested_comments.models import NestedComment
@@ -85,6 +86,7 @@ class ImageService:
 
         return self.image.revisions.get(image=self.image, label=label)
 
+    @request_memoize(lambda self: self.image.pk)
     def get_final_revision_label(self):
         # type: () -> str
         # Avoid hitting the db by potentially exiting early
@@ -599,6 +601,7 @@ class ImageService:
                 updated=now
             )
 
+        ImageService.get_final_revision_label.forget(self)
         UserService(self.image.user).clear_gallery_image_list_cache()
 
     def delete_stories(self):
@@ -673,15 +676,10 @@ class ImageService:
             'mean_fwhm': [],
             'temperature': [],
         }
-        moon_age_list = []
-        moon_illuminated_list = []
 
         for a in deep_sky_acquisitions.iterator():
             if a.date is not None and a.date not in data['dates']:
                 data['dates'].append(a.date)
-                m = MoonPhase(a.date)
-                moon_age_list.append(m.age)
-                moon_illuminated_list.append(m.illuminated * 100.0)
 
             if a.number and a.duration:
                 key = ""
@@ -747,6 +745,9 @@ class ImageService:
             if a.temperature:
                 data['temperature'].append(a.temperature)
 
+        moon_age_list = get_age(data['dates'])
+        moon_illuminated_list = [x * 100.0 for x in get_illuminated(data['dates'])]
+
         return moon_age_list, moon_illuminated_list, data
 
     def get_deep_sky_acquisition_html(self):
@@ -1,6 +1,29 @@
+from collections import OrderedDict
+
 from django.conf import settings
 from rest_framework import pagination
+from rest_framework.response import Response
+
 
+class QueuePagination(pagination.CursorPagination):
+    """
+    Keyset pagination over a queue's own ordering (the staff member's sort order, then the pk): a page is fetched with
+    an indexed range query from the position of the cursor, however deep it is in the queue.
+    """
 
-class QueuePagination(pagination.PageNumberPagination):
     page_size = settings.IOTD_QUEUES_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(queryset.query.order_by)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from typing import List
+
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from rest_framework import viewsets
+from rest_framework.renderers import BrowsableAPIRenderer
+
+from astrobin.models import Image
+from astrobin_apps_iotd.api.queue_pagination import QueuePagination
+
+
+class BaseQueueViewSet(viewsets.ModelViewSet):
+    renderer_classes = [BrowsableAPIRenderer, CamelCaseJSONRenderer]
+    pagination_class = QueuePagination
+    http_method_names = ['get', 'head']
+
+    # `get_queryset` returns the queue entries; a page of entries is turned into the images to serialize.
+    def get_queue_images(self, entries) -> List[Image]:
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(self.get_queue_images(page), many=True)
+        return self.get_paginated_response(serializer.data)
@@ -1,31 +1,28 @@
 # -*- coding: utf-8 -*-
 from django.http import JsonResponse
-from djangorestframework_camel_case.render import CamelCaseJSONRenderer
-from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.renderers import BrowsableAPIRenderer
 
-from astrobin_apps_iotd.api.queue_pagination import QueuePagination
 from astrobin_apps_iotd.api.serializers.judgement_queue_serializer import JudgementQueueSerializer
+from astrobin_apps_iotd.api.views.base_queue_view_set import BaseQueueViewSet
 from astrobin_apps_iotd.services import IotdService
 from common.constants import GroupName
 from common.permissions import ReadOnly, is_group_member
 
 
-class JudgementQueueViewSet(viewsets.ModelViewSet):
+class JudgementQueueViewSet(BaseQueueViewSet):
     serializer_class = JudgementQueueSerializer
-    renderer_classes = [BrowsableAPIRenderer, CamelCaseJSONRenderer]
-    pagination_class = QueuePagination
     permission_classes = [IsAuthenticated, ReadOnly, is_group_member(GroupName.IOTD_JUDGES)]
-    http_method_names = ['get', 'head']
 
     def get_queryset(self):
-        return IotdService().get_judgement_queue(
+        return IotdService().get_judgement_queue_entries(
             self.request.user,
             self.request.GET.get('sort', None),
         )
 
+    def get_queue_images(self, entries):
+        return IotdService().get_judgement_queue_images(entries)
+
     @action(methods=['GET'], detail=False, url_path='cannot-select-now-reason')
     def cannot_select_now_reason(self, request):
         return JsonResponse({'reason': IotdService().judge_cannot_select_now_reason(request.user)})
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.24 on 2026-10-19 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astrobin_apps_iotd', '0024_add_created_to_top_pick_and_nomination_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='iotdstats',
+            name='computation_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
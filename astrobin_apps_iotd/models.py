@@ -374,6 +374,9 @@ class IotdStats(models.Model):
     other_tpns = models.PositiveIntegerField()
     unknown_tpns = models.PositiveIntegerField()
 
+    # Seconds it took to compute the stats.
+    computation_time = models.FloatField(null=True, blank=True)
+
     class Meta:
         ordering = ('-created',)
 
@@ -0,0 +1,203 @@
+import hashlib
+import logging
+import time
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpRequest, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from astrobin_apps_iotd.feeds.iotd import IotdAtomFeed, IotdFeed
+from astrobin_apps_iotd.feeds.top_picks import TopPickAtomFeed, TopPickFeed
+from astrobin_apps_iotd.feeds.top_picks_instagram_story import TopPickInstagramStoryAtomFeed, TopPickInstagramStoryFeed
+from common.services import DateTimeService
+
+log = logging.getLogger(__name__)
+
+
+class IotdFeedService:
+    """
+    The IOTD and TP feeds are rendered once, when the selection changes, and served from the cache with an ETag and a
+    Last-Modified header, so that polling feed readers neither hit the database nor regenerate thumbnail URLs, and
+    conditional requests get a 304.
+
+    A rendered feed doesn't expire: it's replaced when it's regenerated, by `regenerate_iotd_feeds`, which also runs at
+    midnight when the IOTD of the new day goes live. A feed that was rendered on a previous day is still served while
+    its regeneration is scheduled, and a feed that's not in the cache at all is rendered by one request at a time.
+    """
+
+    # Url name: feed class.
+    IOTD_FEEDS = {
+        'iotd_rss_iotd': IotdFeed,
+        'iotd_atom_iotd': IotdAtomFeed,
+    }
+
+    TOP_PICK_FEEDS = {
+        'iotd_rss_top_picks': TopPickFeed,
+        'iotd_atom_top_picks': TopPickAtomFeed,
+        'iotd_rss_top_picks_instagram_story': TopPickInstagramStoryFeed,
+        'iotd_atom_top_picks_instagram_story': TopPickInstagramStoryAtomFeed,
+    }
+
+    FEEDS = {**IOTD_FEEDS, **TOP_PICK_FEEDS}
+
+    CACHE_KEY = 'astrobin_apps_iotd.feed.%s'
+    REGENERATION_SCHEDULED_CACHE_KEY = 'astrobin_apps_iotd.feed_regeneration_scheduled.%s'
+    RENDER_LOCK_CACHE_KEY = 'astrobin_apps_iotd.feed_render_lock.%s'
+    FEATURED_IMAGES_CACHE_KEY = 'astrobin_apps_iotd.feed_featured_images'
+
+    # Seconds to wait for a feed that another request is rendering.
+    RENDER_WAIT = 10
+
+    @staticmethod
+    def _get_request(name: str) -> HttpRequest:
+        # A request for the feed on BASE_URL, so that the feed's own links are the same as when it's requested.
+        url = urlparse(settings.BASE_URL)
+        secure = url.scheme == 'https'
+
+        return WSGIRequest({
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': reverse(name),
+            'SERVER_NAME': url.hostname,
+            'SERVER_PORT': str(url.port or (443 if secure else 80)),
+            'wsgi.url_scheme': url.scheme,
+            'wsgi.input': BytesIO(),
+        })
+
+    @staticmethod
+    def render(name: str) -> Dict:
+        """
+        Renders a feed into the cache, and returns it as a dict with `content`, `content_type`, `etag`,
+        `last_modified` (a timestamp) and `day` (the day it was rendered on).
+        """
+        key = IotdFeedService.CACHE_KEY % name
+        response = IotdFeedService.FEEDS[name]()(IotdFeedService._get_request(name))
+        etag = quote_etag(hashlib.md5(response.content).hexdigest())
+
+        # The feed is only modified if its content changed since it was last rendered.
+        previous: Optional[Dict] = cache.get(key)
+        if previous and previous['etag'] == etag:
+            last_modified = previous['last_modified']
+        else:
+            last_modified = int(time.time())
+
+        rendered = dict(
+            content=response.content,
+            content_type=response['Content-Type'],
+            etag=etag,
+            last_modified=last_modified,
+            day=DateTimeService.today(),
+        )
+        cache.set(key, rendered, None)
+
+        return rendered
+
+    @staticmethod
+    def regenerate(names: Iterable[str]):
+        IotdFeedService.update_featured_image_ids()
+
+        for name in names:
+            try:
+                IotdFeedService.render(name)
+            except Exception as e:
+                # The feed stays in the cache as it was.
+                log.exception(f"Unable to render the {name} feed: {str(e)}")
+
+    @staticmethod
+    def schedule_regeneration(names: Iterable[str]):
+        from astrobin_apps_iotd.tasks import regenerate_iotd_feeds
+
+        # Selections come in bursts (e.g. when the top pick archive is updated): the feeds are regenerated once per
+        # burst.
+        names = sorted(names)
+        if cache.add(IotdFeedService.REGENERATION_SCHEDULED_CACHE_KEY % ','.join(names), True, 30):
+            regenerate_iotd_feeds.apply_async(args=(names,), countdown=30)
+
+    @staticmethod
+    def update_featured_image_ids() -> Dict[str, List[int]]:
+        """
+        Caches the ids of the images that the feeds list: the 10 latest IOTDs and top picks. Deleted images are counted
+        in, since the feeds listed them before they were deleted.
+        """
+        from astrobin_apps_iotd.models import Iotd, TopPickArchive
+
+        featured = dict(
+            iotds=list(Iotd.objects.filter(date__lte=DateTimeService.today()).values_list('image_id', flat=True)[:10]),
+            top_picks=list(TopPickArchive.objects.values_list('image_id', flat=True)[:10]),
+        )
+        cache.set(IotdFeedService.FEATURED_IMAGES_CACHE_KEY, featured, None)
+
+        return featured
+
+    @staticmethod
+    def get_feeds_featuring(image_id: int) -> List[str]:
+        """
+        The names of the feeds that list an image, i.e. the feeds to regenerate when it changes, from the ids cached
+        when the feeds were last regenerated.
+        """
+        featured: Optional[Dict[str, List[int]]] = cache.get(IotdFeedService.FEATURED_IMAGES_CACHE_KEY)
+        if featured is None:
+            featured = IotdFeedService.update_featured_image_ids()
+
+        names = []
+
+        if image_id in featured['iotds']:
+            names += IotdFeedService.IOTD_FEEDS.keys()
+
+        if image_id in featured['top_picks']:
+            names += IotdFeedService.TOP_PICK_FEEDS.keys()
+
+        return names
+
+    @staticmethod
+    def _get_rendered(name: str) -> Optional[Dict]:
+        key = IotdFeedService.CACHE_KEY % name
+        lock_key = IotdFeedService.RENDER_LOCK_CACHE_KEY % name
+
+        rendered: Optional[Dict] = cache.get(key)
+        if rendered is not None:
+            if rendered['day'] != DateTimeService.today():
+                # Served as it is until the regeneration replaces it.
+                IotdFeedService.schedule_regeneration(IotdFeedService.FEEDS.keys())
+            return rendered
+
+        if cache.add(lock_key, True, 60):
+            try:
+                return IotdFeedService.render(name)
+            finally:
+                cache.delete(lock_key)
+
+        # Another request is rendering the feed.
+        deadline = time.time() + IotdFeedService.RENDER_WAIT
+        while time.time() < deadline:
+            time.sleep(.5)
+            rendered = cache.get(key)
+            if rendered is not None:
+                return rendered
+
+        return None
+
+    @staticmethod
+    def serve(request: HttpRequest, name: str) -> HttpResponse:
+        rendered = IotdFeedService._get_rendered(name)
+        if rendered is None:
+            response = HttpResponse(status=503)
+            response['Retry-After'] = IotdFeedService.RENDER_WAIT
+            return response
+
+        response = get_conditional_response(
+            request, etag=rendered['etag'], last_modified=rendered['last_modified']
+        )
+        if response is None:
+            response = HttpResponse(rendered['content'], content_type=rendered['content_type'])
+
+        response['ETag'] = rendered['etag']
+        response['Last-Modified'] = http_date(rendered['last_modified'])
+
+        return response
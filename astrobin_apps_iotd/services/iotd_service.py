@@ -1,28 +1,27 @@
 import logging
-from collections import defaultdict
 from datetime import date, datetime, timedelta
-from decimal import Decimal
-from typing import List, Union
+from typing import Dict, Iterable, List, Set, Tuple, Union
 
 from django.conf import settings
 from django.contrib.auth.models import Group, User
-from django.db.models import Count, OuterRef, Prefetch, Q, QuerySet, Subquery
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, QuerySet, Subquery
 from django.utils import timezone
 from django.utils.translation import gettext
 
 from astrobin.enums import SubjectType
-from astrobin.enums.data_source import DataSource
 from astrobin.enums.moderator_decision import ModeratorDecision
-from astrobin.models import Image
+from astrobin.models import Image, ImageRevision
 from astrobin_apps_images.services import ImageService
 from astrobin_apps_iotd.models import (
     Iotd, IotdDismissedImage, IotdJudgementQueueEntry, IotdQueueSortOrder, IotdReviewQueueEntry,
-    IotdStaffMemberScore, IotdStaffMemberSettings, IotdStats,
+    IotdStaffMemberSettings,
     IotdSubmission,
-    IotdSubmissionQueueEntry, IotdSubmitterSeenImage, IotdVote,
+    IotdSubmissionQueueEntry, IotdVote,
     TopPickArchive,
     TopPickNominationsArchive,
 )
+from astrobin_apps_iotd.services.iotd_stats_service import IotdStatsService
 from astrobin_apps_iotd.types.may_not_submit_to_iotd_tp_reason import MayNotSubmitToIotdTpReason
 from astrobin_apps_notifications.utils import build_notification_url, push_notification
 from astrobin_apps_premium.services.premium_service import PremiumService
@@ -33,8 +32,21 @@ from common.services import DateTimeService
 
 log = logging.getLogger(__name__)
 
+# (user id, image id)
+QueueKey = Tuple[int, int]
+
 
 class IotdService:
+    QUEUE_BATCH_SIZE = 1000
+
+    # The image relations that the queue serializers read.
+    QUEUE_IMAGE_PREFETCH = (
+        'image__imaging_telescopes',
+        'image__imaging_cameras',
+        'image__imaging_telescopes_2',
+        'image__imaging_cameras_2',
+    )
+
     def is_in_iotd_queue(self, image: Image) -> bool:
         if image.submitted_for_iotd_tp_consideration is None or image.disqualified_from_iotd_tp is not None:
             return False
@@ -100,9 +112,9 @@ class IotdService:
     def get_top_pick_nominations(self) -> QuerySet:
         return TopPickNominationsArchive.objects.all().select_related('image')
 
-    def get_submission_queue(self, submitter: User, queue_sort_order: str = None) -> List[IotdSubmissionQueueEntry]:
+    def _get_queue_order_by(self, member: User, queue_sort_order: str, field: str) -> List[str]:
         member_settings: IotdStaffMemberSettings
-        member_settings, created = IotdStaffMemberSettings.objects.get_or_create(user=submitter)
+        member_settings, created = IotdStaffMemberSettings.objects.get_or_create(user=member)
         queue_sort_order_before = member_settings.queue_sort_order
 
         if queue_sort_order in ('newest', 'oldest'):
@@ -113,114 +125,102 @@ class IotdService:
         if member_settings.queue_sort_order != queue_sort_order_before:
             member_settings.save()
 
-        order_by = [
-            '-published'
-            if member_settings.queue_sort_order == IotdQueueSortOrder.NEWEST_FIRST
-            else 'published'
-        ]
+        # The pk breaks ties, so that the order is stable and the queue can be paginated by keyset.
+        if member_settings.queue_sort_order == IotdQueueSortOrder.NEWEST_FIRST:
+            return [f'-{field}', '-pk']
+        return [field, 'pk']
 
-        images: List[IotdSubmissionQueueEntry] = []
+    def get_submission_queue_entries(self, submitter: User, queue_sort_order: str = None) -> QuerySet:
         now = DateTimeService.now()
         start = now - timedelta(settings.IOTD_SUBMISSION_WINDOW_DAYS)
         end = now - timedelta(hours=12)
 
-        for entry in IotdSubmissionQueueEntry.objects.select_related(
-                'image'
+        return IotdSubmissionQueueEntry.objects.select_related(
+            'image'
         ).prefetch_related(
-            'image__imaging_telescopes_2', 'image__imaging_cameras_2'
+            *IotdService.QUEUE_IMAGE_PREFETCH
         ).filter(
             submitter=submitter,
             published__gte=start,
             published__lt=end,
         ).order_by(
-            *order_by
-        ).iterator():
-            image = entry.image
-            final_revision = ImageService(image).get_final_revision()
-            image.w = final_revision.w
-            image.h = final_revision.h
-            images.append(image)
-
-        return images
+            *self._get_queue_order_by(submitter, queue_sort_order, 'published')
+        )
 
-    def get_review_queue(self, reviewer: User, queue_sort_order: str = None) -> List[IotdReviewQueueEntry]:
-        member_settings: IotdStaffMemberSettings
-        member_settings, created = IotdStaffMemberSettings.objects.get_or_create(user=reviewer)
-        queue_sort_order_before = member_settings.queue_sort_order
+    def get_submission_queue_images(self, entries: Iterable[IotdSubmissionQueueEntry]) -> List[Image]:
+        images: List[Image] = [entry.image for entry in entries]
 
-        if queue_sort_order in ('newest', 'oldest'):
-            member_settings.queue_sort_order = IotdQueueSortOrder.NEWEST_FIRST \
-                if queue_sort_order == 'newest' \
-                else IotdQueueSortOrder.OLDEST_FIRST
+        # The size of the final revisions, with one query for the images whose final revision is not the original.
+        sizes: Dict[int, Tuple[int, int]] = {}
+        revised = [image.pk for image in images if not image.is_final]
+        if revised:
+            for image_id, w, h in ImageRevision.objects.filter(
+                    image__in=revised, is_final=True
+            ).values_list('image', 'w', 'h'):
+                sizes[image_id] = (w, h)
 
-        if member_settings.queue_sort_order != queue_sort_order_before:
-            member_settings.save()
+        for image in images:
+            image.w, image.h = sizes.get(image.pk, (image.w, image.h))
 
-        order_by = [
-            '-last_submission_timestamp'
-            if member_settings.queue_sort_order == IotdQueueSortOrder.NEWEST_FIRST
-            else 'last_submission_timestamp'
-        ]
+        return images
 
-        images: List[IotdReviewQueueEntry] = []
+    def get_submission_queue(self, submitter: User, queue_sort_order: str = None) -> List[Image]:
+        return self.get_submission_queue_images(self.get_submission_queue_entries(submitter, queue_sort_order))
 
-        for entry in IotdReviewQueueEntry.objects.select_related(
-                'image'
+    def get_review_queue_entries(self, reviewer: User, queue_sort_order: str = None) -> QuerySet:
+        return IotdReviewQueueEntry.objects.select_related(
+            'image'
         ).prefetch_related(
-            'image__imaging_telescopes_2', 'image__imaging_cameras_2'
+            *IotdService.QUEUE_IMAGE_PREFETCH
         ).filter(
             reviewer=reviewer,
             last_submission_timestamp__gte=DateTimeService.now() - timedelta(
                 settings.IOTD_REVIEW_WINDOW_DAYS
             )
         ).order_by(
-            *order_by
-        ).iterator():
+            *self._get_queue_order_by(reviewer, queue_sort_order, 'last_submission_timestamp')
+        )
+
+    def get_review_queue_images(self, entries: Iterable[IotdReviewQueueEntry]) -> List[Image]:
+        images: List[Image] = []
+
+        for entry in entries:
             image = entry.image
             image.last_submission_timestamp = entry.last_submission_timestamp
             images.append(image)
 
         return images
 
-    def get_judgement_queue(self, judge: User, queue_sort_order: str = None) -> List[IotdJudgementQueueEntry]:
-        member_settings: IotdStaffMemberSettings
-        member_settings, created = IotdStaffMemberSettings.objects.get_or_create(user=judge)
-        queue_sort_order_before = member_settings.queue_sort_order
-
-        if queue_sort_order in ('newest', 'oldest'):
-            member_settings.queue_sort_order = IotdQueueSortOrder.NEWEST_FIRST \
-                if queue_sort_order == 'newest' \
-                else IotdQueueSortOrder.OLDEST_FIRST
-
-        if member_settings.queue_sort_order != queue_sort_order_before:
-            member_settings.save()
-
-        order_by = [
-            '-last_vote_timestamp'
-            if member_settings.queue_sort_order == IotdQueueSortOrder.NEWEST_FIRST
-            else 'last_vote_timestamp'
-        ]
-
-        images: List[IotdJudgementQueueEntry] = []
+    def get_review_queue(self, reviewer: User, queue_sort_order: str = None) -> List[Image]:
+        return self.get_review_queue_images(self.get_review_queue_entries(reviewer, queue_sort_order))
 
-        for entry in IotdJudgementQueueEntry.objects.select_related(
-                'image'
+    def get_judgement_queue_entries(self, judge: User, queue_sort_order: str = None) -> QuerySet:
+        return IotdJudgementQueueEntry.objects.select_related(
+            'image'
         ).prefetch_related(
-            'image__imaging_telescopes_2', 'image__imaging_cameras_2'
+            *IotdService.QUEUE_IMAGE_PREFETCH
         ).filter(
             judge=judge,
             last_vote_timestamp__gte=DateTimeService.now() - timedelta(
                 settings.IOTD_JUDGEMENT_WINDOW_DAYS
             )
         ).order_by(
-            *order_by
-        ).iterator():
+            *self._get_queue_order_by(judge, queue_sort_order, 'last_vote_timestamp')
+        )
+
+    def get_judgement_queue_images(self, entries: Iterable[IotdJudgementQueueEntry]) -> List[Image]:
+        images: List[Image] = []
+
+        for entry in entries:
             image = entry.image
             image.last_vote_timestamp = entry.last_vote_timestamp
             images.append(image)
 
         return images
 
+    def get_judgement_queue(self, judge: User, queue_sort_order: str = None) -> List[Image]:
+        return self.get_judgement_queue_images(self.get_judgement_queue_entries(judge, queue_sort_order))
+
     def judge_cannot_select_now_reason(self, judge):
         # type: (User) -> Union[str, None]
 
@@ -350,137 +350,202 @@ class IotdService:
             TopPickArchive.objects.get_or_create(image=item)
             ImageService(item).clear_badges_cache()
 
+    def _get_dismissed_images(self) -> QuerySet:
+        # The images that reached the maximum number of dismissals, as a subquery.
+        return IotdDismissedImage.objects.order_by().values('image').annotate(
+            num_dismissals=Count('pk')
+        ).filter(
+            num_dismissals__gte=settings.IOTD_MAX_DISMISSALS
+        ).values('image')
+
+    def _get_queue_candidates(self, candidates: QuerySet, timestamp_field: str) -> Dict[int, Tuple[int, datetime]]:
+        return dict(
+            (pk, (user_id, timestamp))
+            for pk, user_id, timestamp in candidates.values_list('pk', 'user', timestamp_field).iterator()
+        )
+
+    def _get_queue_exclusions(self, candidates: QuerySet, *querysets: QuerySet) -> Set[QueueKey]:
+        # The (user, image) pairs of the candidates that may not be in a staff member's queue: the images they
+        # collaborated on or dismissed, plus those of the given querysets.
+        excluded = set()
+
+        for queryset in (
+                Image.collaborators.through.objects.filter(image__in=candidates).values_list('user', 'image'),
+                IotdDismissedImage.objects.filter(image__in=candidates).values_list('user', 'image'),
+        ) + querysets:
+            excluded.update(queryset)
+
+        return excluded
+
+    def _update_queue_entries(
+            self,
+            Entry,
+            user_field: str,
+            timestamp_field: str,
+            group_name: str,
+            candidates: Dict[int, Tuple[int, datetime]],
+            pairs: Iterable[QueueKey],
+            excluded: Set[QueueKey],
+    ):
+        """
+        Brings the queue entries of a staff group in line with the (user, image) pairs they should have, by deleting
+        and creating only the entries that differ. `candidates` are the (owner, timestamp) of the images that can be in
+        a queue, by image id.
+        """
+        desired: Dict[QueueKey, datetime] = {}
+        for user_id, image_id in pairs:
+            if image_id not in candidates or (user_id, image_id) in excluded:
+                continue
+
+            owner_id, timestamp = candidates[image_id]
+            if user_id != owner_id:
+                desired[(user_id, image_id)] = timestamp
+
+        existing: Dict[QueueKey, Tuple[int, datetime]] = dict(
+            ((user_id, image_id), (pk, timestamp))
+            for pk, user_id, image_id, timestamp in Entry.objects.filter(
+                **{f'{user_field}__groups__name': group_name}
+            ).values_list('pk', user_field, 'image', timestamp_field).iterator()
+        )
+
+        to_delete = [pk for key, (pk, timestamp) in existing.items() if key not in desired]
+        to_create = [
+            Entry(**{f'{user_field}_id': user_id, 'image_id': image_id, timestamp_field: timestamp})
+            for (user_id, image_id), timestamp in desired.items() if (user_id, image_id) not in existing
+        ]
+        # Entries that stay keep their row; only a changed timestamp, which the queue is sorted by, is written.
+        to_update = [
+            Entry(pk=existing[key][0], **{timestamp_field: timestamp})
+            for key, timestamp in desired.items() if key in existing and existing[key][1] != timestamp
+        ]
+
+        with transaction.atomic():
+            for i in range(0, len(to_delete), IotdService.QUEUE_BATCH_SIZE):
+                Entry.objects.filter(pk__in=to_delete[i:i + IotdService.QUEUE_BATCH_SIZE]).delete()
+            Entry.objects.bulk_create(to_create, batch_size=IotdService.QUEUE_BATCH_SIZE)
+            Entry.objects.bulk_update(to_update, [timestamp_field], batch_size=IotdService.QUEUE_BATCH_SIZE)
+
+        changed_keys = set(existing.keys()).symmetric_difference(desired.keys())
+        changed_image_ids = set(image_id for user_id, image_id in changed_keys)
+
+        for image in Image.all_objects.filter(pk__in=list(changed_image_ids)).only('pk').iterator():
+            ImageService(image).clear_badges_cache()
+
+        log.debug(
+            f'{Entry.__name__}: {len(to_create)} created, {len(to_update)} updated, {len(to_delete)} deleted, '
+            f'{len(set(user_id for user_id, image_id in changed_keys))} queues changed.'
+        )
+
     def update_submission_queues(self):
-        def _compute_queue(submitter: User):
-            days = settings.IOTD_SUBMISSION_WINDOW_DAYS
-            cutoff = datetime.now() - timedelta(days)
-
-            return Image.objects \
-                .annotate(
-                num_dismissals=Count('iotddismissedimage', distinct=True),
-            ) \
-                .filter(
-                Q(
-                    Q(disqualified_from_iotd_tp__isnull=True) &
-                    Q(moderator_decision=ModeratorDecision.APPROVED) &
-                    Q(submitted_for_iotd_tp_consideration__gte=cutoff) &
-                    Q(designated_iotd_submitters=submitter) &
-                    Q(num_dismissals__lt=settings.IOTD_MAX_DISMISSALS) &
-                    Q(
-                        Q(iotd__isnull=True) |
-                        Q(iotd__date__gt=datetime.now().date())
-                    )
-                ) &
-                ~Q(
-                    Q(user__userprofile__exclude_from_competitions=True) |
-                    Q(user=submitter) |
-                    Q(collaborators=submitter) |
-                    Q(subject_type__in=(SubjectType.GEAR, SubjectType.OTHER)) |
-                    Q(
-                        Q(iotdsubmission__submitter=submitter) &
-                        Q(iotdsubmission__date__lt=date.today())
-                    ) |
-                    Q(iotddismissedimage__user=submitter)
-                )
-            )
+        cutoff = datetime.now() - timedelta(settings.IOTD_SUBMISSION_WINDOW_DAYS)
+        submitters = User.objects.filter(groups__name=GroupName.IOTD_SUBMITTERS)
 
-        for submitter in User.objects.filter(groups__name=GroupName.IOTD_SUBMITTERS):
-            IotdSubmissionQueueEntry.objects.filter(submitter=submitter).delete()
-            for image in _compute_queue(submitter).iterator():
-                IotdSubmissionQueueEntry.objects.create(
-                    submitter=submitter,
-                    image=image,
-                    published=image.submitted_for_iotd_tp_consideration
-                )
-                ImageService(image).clear_badges_cache()
-                log.debug(
-                    f'Image {image.get_id()} "{image.title}" assigned to submitter {submitter.pk} "{submitter.username}".'
-                )
+        candidates = Image.objects_plain.filter(
+            Q(disqualified_from_iotd_tp__isnull=True) &
+            Q(moderator_decision=ModeratorDecision.APPROVED) &
+            Q(submitted_for_iotd_tp_consideration__gte=cutoff) &
+            Q(
+                Q(iotd__isnull=True) |
+                Q(iotd__date__gt=datetime.now().date())
+            )
+        ).exclude(
+            Q(user__userprofile__exclude_from_competitions=True) |
+            Q(subject_type__in=(SubjectType.GEAR, SubjectType.OTHER)) |
+            Q(pk__in=self._get_dismissed_images())
+        )
+        candidate_ids = candidates.values('pk')
+
+        self._update_queue_entries(
+            IotdSubmissionQueueEntry,
+            'submitter',
+            'published',
+            GroupName.IOTD_SUBMITTERS,
+            self._get_queue_candidates(candidates, 'submitted_for_iotd_tp_consideration'),
+            Image.designated_iotd_submitters.through.objects.filter(
+                image__in=candidate_ids, user__in=submitters
+            ).values_list('user', 'image'),
+            self._get_queue_exclusions(
+                candidate_ids,
+                IotdSubmission.objects.filter(
+                    image__in=candidate_ids, date__lt=date.today()
+                ).values_list('submitter', 'image'),
+            ),
+        )
 
     def update_review_queues(self):
-        def _compute_queue(reviewer: User):
-            days = settings.IOTD_REVIEW_WINDOW_DAYS
-            cutoff = datetime.now() - timedelta(days)
-
-            return Image.objects.annotate(
-                num_submissions=Count('iotdsubmission', distinct=True),
-                num_dismissals=Count('iotddismissedimage', distinct=True),
-                last_submission_timestamp=Subquery(IotdSubmission.last_for_image(OuterRef('pk')).values('date'))
-            ).filter(
-                Q(deleted__isnull=True) &
-                Q(disqualified_from_iotd_tp__isnull=True) &
-                Q(last_submission_timestamp__gte=cutoff) &
-                Q(designated_iotd_reviewers=reviewer) &
-                Q(num_submissions__gte=settings.IOTD_SUBMISSION_MIN_PROMOTIONS) &
-                Q(num_dismissals__lt=settings.IOTD_MAX_DISMISSALS) &
-                Q(
-                    Q(iotd__isnull=True) |
-                    Q(iotd__date__gt=datetime.now().date())
-                )
-            ).exclude(
-                Q(iotdsubmission__submitter=reviewer) |
-                Q(user=reviewer) |
-                Q(collaborators=reviewer) |
-                Q(iotddismissedimage__user=reviewer) |
-                Q(
-                    Q(iotdvote__reviewer=reviewer) &
-                    Q(iotdvote__date__lt=DateTimeService.today())
-                )
-            )
+        cutoff = datetime.now() - timedelta(settings.IOTD_REVIEW_WINDOW_DAYS)
+        reviewers = User.objects.filter(groups__name=GroupName.IOTD_REVIEWERS)
 
-        for reviewer in User.objects.filter(groups__name=GroupName.IOTD_REVIEWERS):
-            IotdReviewQueueEntry.objects.filter(reviewer=reviewer).delete()
-            for image in _compute_queue(reviewer).iterator():
-                last_submission = IotdSubmission.last_for_image(image.pk).first()
-                IotdReviewQueueEntry.objects.create(
-                    reviewer=reviewer,
-                    image=image,
-                    last_submission_timestamp=last_submission.date
-                )
-                ImageService(image).clear_badges_cache()
-                log.debug(
-                    f'Image {image.get_id()} "{image.title}" assigned to reviewer {reviewer.pk} "{reviewer.username}".'
-                )
+        # The last submission timestamp is that of the IOTD_SUBMISSION_MIN_PROMOTIONS-th submission, so images with
+        # fewer submissions don't have one.
+        candidates = Image.objects_plain.annotate(
+            last_submission_timestamp=Subquery(IotdSubmission.last_for_image(OuterRef('pk')).values('date'))
+        ).filter(
+            Q(deleted__isnull=True) &
+            Q(disqualified_from_iotd_tp__isnull=True) &
+            Q(last_submission_timestamp__gte=cutoff) &
+            Q(
+                Q(iotd__isnull=True) |
+                Q(iotd__date__gt=datetime.now().date())
+            )
+        ).exclude(
+            pk__in=self._get_dismissed_images()
+        )
+        candidate_ids = candidates.values('pk')
+
+        self._update_queue_entries(
+            IotdReviewQueueEntry,
+            'reviewer',
+            'last_submission_timestamp',
+            GroupName.IOTD_REVIEWERS,
+            self._get_queue_candidates(candidates, 'last_submission_timestamp'),
+            Image.designated_iotd_reviewers.through.objects.filter(
+                image__in=candidate_ids, user__in=reviewers
+            ).values_list('user', 'image'),
+            self._get_queue_exclusions(
+                candidate_ids,
+                IotdSubmission.objects.filter(image__in=candidate_ids).values_list('submitter', 'image'),
+                IotdVote.objects.filter(
+                    image__in=candidate_ids, date__lt=DateTimeService.today()
+                ).values_list('reviewer', 'image'),
+            ),
+        )
 
     def update_judgement_queues(self):
-        def _compute_queue(judge: User):
-            days = settings.IOTD_JUDGEMENT_WINDOW_DAYS
-            cutoff = datetime.now() - timedelta(days)
-
-            return Image.objects.annotate(
-                num_votes=Count('iotdvote', distinct=True),
-                num_dismissals=Count('iotddismissedimage', distinct=True),
-                last_vote_timestamp=Subquery(IotdVote.last_for_image(OuterRef('pk')).values('date'))
-            ).filter(
-                Q(deleted__isnull=True) &
-                Q(disqualified_from_iotd_tp__isnull=True) &
-                Q(last_vote_timestamp__gte=cutoff) &
-                Q(num_votes__gte=settings.IOTD_REVIEW_MIN_PROMOTIONS) &
-                Q(num_dismissals__lt=settings.IOTD_MAX_DISMISSALS) &
-                Q(
-                    Q(iotd__isnull=True) |
-                    Q(iotd__date__gt=datetime.now().date())
-                )
-            ).exclude(
-                Q(iotdvote__reviewer=judge) |
-                Q(iotddismissedimage__user=judge) |
-                Q(user=judge) |
-                Q(collaborators=judge)
-            )
+        cutoff = datetime.now() - timedelta(settings.IOTD_JUDGEMENT_WINDOW_DAYS)
+        judge_ids = list(User.objects.filter(groups__name=GroupName.IOTD_JUDGES).values_list('pk', flat=True))
 
-        for judge in User.objects.filter(groups__name=GroupName.IOTD_JUDGES):
-            IotdJudgementQueueEntry.objects.filter(judge=judge).delete()
-            for image in _compute_queue(judge).iterator():
-                last_vote = IotdVote.last_for_image(image.pk).first()
-                IotdJudgementQueueEntry.objects.create(
-                    judge=judge,
-                    image=image,
-                    last_vote_timestamp=last_vote.date
-                )
-                ImageService(image).clear_badges_cache()
-                log.debug(
-                    f'Image {image.get_id()} "{image.title}" assigned to judge {judge.pk} "{judge.username}".'
-                )
+        # The last vote timestamp is that of the IOTD_REVIEW_MIN_PROMOTIONS-th vote, so images with fewer votes don't
+        # have one.
+        candidates = Image.objects_plain.annotate(
+            last_vote_timestamp=Subquery(IotdVote.last_for_image(OuterRef('pk')).values('date'))
+        ).filter(
+            Q(deleted__isnull=True) &
+            Q(disqualified_from_iotd_tp__isnull=True) &
+            Q(last_vote_timestamp__gte=cutoff) &
+            Q(
+                Q(iotd__isnull=True) |
+                Q(iotd__date__gt=datetime.now().date())
+            )
+        ).exclude(
+            pk__in=self._get_dismissed_images()
+        )
+        candidate_ids = candidates.values('pk')
+        judge_candidates = self._get_queue_candidates(candidates, 'last_vote_timestamp')
+
+        self._update_queue_entries(
+            IotdJudgementQueueEntry,
+            'judge',
+            'last_vote_timestamp',
+            GroupName.IOTD_JUDGES,
+            judge_candidates,
+            # Every judge can judge every image.
+            ((judge_id, image_id) for judge_id in judge_ids for image_id in judge_candidates),
+            self._get_queue_exclusions(
+                candidate_ids,
+                IotdVote.objects.filter(image__in=candidate_ids).values_list('reviewer', 'image'),
+            ),
+        )
 
     def clear_stale_queue_entries(self):
         IotdSubmissionQueueEntry.objects.exclude(submitter__groups__name=GroupName.IOTD_SUBMITTERS).delete()
@@ -655,321 +720,7 @@ class IotdService:
 
     @staticmethod
     def update_stats(days=365):
-        cutoff = date.today() - timedelta(days=days)
-
-        total_submitted_images_queryset = Image.objects \
-            .filter(
-            published__gt=cutoff, submitted_for_iotd_tp_consideration__isnull=False, subject_type__in=[
-                SubjectType.DEEP_SKY,
-                SubjectType.SOLAR_SYSTEM,
-                SubjectType.WIDE_FIELD,
-                SubjectType.STAR_TRAILS,
-                SubjectType.NORTHERN_LIGHTS,
-                SubjectType.NOCTILUCENT_CLOUDS,
-                SubjectType.LANDSCAPE,
-                SubjectType.ARTIFICIAL_SATELLITE,
-            ]
-        )
-
-        IotdStats.objects.create(
-            # Period of time covered by the stats.
-            days=days,
-
-            # Distinct winners.
-            distinct_iotd_winners=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .values_list('image__user', flat=True) \
-                .distinct() \
-                .count(),
-            distinct_tp_winners=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .values_list('image__user', flat=True) \
-                .distinct() \
-                .count(),
-            distinct_tpn_winners=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .values_list('image__user', flat=True) \
-                .distinct() \
-                .count(),
-
-            # Total awarded images.
-            total_iotds=days,
-            total_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .count(),
-            total_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .count(),
-
-            # Total submitted images.
-            total_submitted_images=total_submitted_images_queryset
-                .count(),
-
-            # Breakdown by subject type.
-            total_deep_sky_images=total_submitted_images_queryset \
-                .filter(subject_type=SubjectType.DEEP_SKY) \
-                .count(),
-            total_solar_system_images=total_submitted_images_queryset \
-                .filter(subject_type=SubjectType.SOLAR_SYSTEM) \
-                .count(),
-            total_wide_field_images=total_submitted_images_queryset \
-                .filter(subject_type=SubjectType.WIDE_FIELD) \
-                .count(),
-            total_star_trails_images=total_submitted_images_queryset \
-                .filter(subject_type=SubjectType.STAR_TRAILS) \
-                .count(),
-            total_northern_lights_images=total_submitted_images_queryset \
-                .filter(subject_type=SubjectType.NORTHERN_LIGHTS) \
-                .count(),
-            total_noctilucent_clouds_images=total_submitted_images_queryset \
-                .filter(subject_type=SubjectType.NOCTILUCENT_CLOUDS) \
-                .count(),
-            total_landscape_images=total_submitted_images_queryset \
-                .filter(subject_type=SubjectType.LANDSCAPE) \
-                .count(),
-            total_artificial_satellite_images=total_submitted_images_queryset \
-                .filter(subject_type=SubjectType.ARTIFICIAL_SATELLITE) \
-                .count(),
-
-            deep_sky_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.DEEP_SKY) \
-                .count(),
-            solar_system_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.SOLAR_SYSTEM) \
-                .count(),
-            wide_field_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.WIDE_FIELD) \
-                .count(),
-            star_trails_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.STAR_TRAILS) \
-                .count(),
-            northern_lights_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.NORTHERN_LIGHTS) \
-                .count(),
-            noctilucent_clouds_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.NOCTILUCENT_CLOUDS) \
-                .count(),
-            landscape_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.LANDSCAPE) \
-                .count(),
-            artificial_satellite_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.ARTIFICIAL_SATELLITE) \
-                .count(),
-
-            deep_sky_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.DEEP_SKY) \
-                .count(),
-            solar_system_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.SOLAR_SYSTEM) \
-                .count(),
-            wide_field_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.WIDE_FIELD) \
-                .count(),
-            star_trails_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.STAR_TRAILS) \
-                .count(),
-            northern_lights_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.NORTHERN_LIGHTS) \
-                .count(),
-            noctilucent_clouds_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.NOCTILUCENT_CLOUDS) \
-                .count(),
-            landscape_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.LANDSCAPE) \
-                .count(),
-            artificial_satellite_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.ARTIFICIAL_SATELLITE) \
-                .count(),
-
-            deep_sky_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.DEEP_SKY) \
-                .count(),
-            solar_system_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.SOLAR_SYSTEM) \
-                .count(),
-            wide_field_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.WIDE_FIELD) \
-                .count(),
-            star_trails_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.STAR_TRAILS) \
-                .count(),
-            northern_lights_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.NORTHERN_LIGHTS) \
-                .count(),
-            noctilucent_clouds_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.NOCTILUCENT_CLOUDS) \
-                .count(),
-            landscape_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.LANDSCAPE) \
-                .count(),
-            artificial_satellite_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__subject_type=SubjectType.ARTIFICIAL_SATELLITE) \
-                .count(),
-
-            # Breakdown by data source.
-            total_backyard_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.BACKYARD) \
-                .count(),
-            total_traveller_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.TRAVELLER) \
-                .count(),
-            total_own_remote_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.OWN_REMOTE) \
-                .count(),
-            total_amateur_hosting_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.AMATEUR_HOSTING) \
-                .count(),
-            total_public_amateur_data_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.PUBLIC_AMATEUR_DATA) \
-                .count(),
-            total_pro_data_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.PRO_DATA) \
-                .count(),
-            total_mix_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.MIX) \
-                .count(),
-            total_other_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.OTHER) \
-                .count(),
-            total_unknown_images=total_submitted_images_queryset \
-                .filter(data_source=DataSource.UNKNOWN) \
-                .count(),
-
-            backyard_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.BACKYARD) \
-                .count(),
-            traveller_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.TRAVELLER) \
-                .count(),
-            own_remote_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.OWN_REMOTE) \
-                .count(),
-            amateur_hosting_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.AMATEUR_HOSTING) \
-                .count(),
-            public_amateur_data_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.PUBLIC_AMATEUR_DATA) \
-                .count(),
-            pro_data_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.PRO_DATA) \
-                .count(),
-            mix_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.MIX) \
-                .count(),
-            other_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.OTHER) \
-                .count(),
-            unknown_iotds=Iotd.objects \
-                .filter(date__gt=cutoff) \
-                .filter(image__data_source=DataSource.UNKNOWN) \
-                .count(),
-
-            backyard_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.BACKYARD) \
-                .count(),
-            traveller_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.TRAVELLER) \
-                .count(),
-            own_remote_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.OWN_REMOTE) \
-                .count(),
-            amateur_hosting_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.AMATEUR_HOSTING) \
-                .count(),
-            public_amateur_data_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.PUBLIC_AMATEUR_DATA) \
-                .count(),
-            pro_data_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.PRO_DATA) \
-                .count(),
-            mix_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.MIX) \
-                .count(),
-            other_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.OTHER) \
-                .count(),
-            unknown_tps=TopPickArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.UNKNOWN) \
-                .count(),
-
-            backyard_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.BACKYARD) \
-                .count(),
-            traveller_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.TRAVELLER) \
-                .count(),
-            own_remote_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.OWN_REMOTE) \
-                .count(),
-            amateur_hosting_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.AMATEUR_HOSTING) \
-                .count(),
-            public_amateur_data_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.PUBLIC_AMATEUR_DATA) \
-                .count(),
-            pro_data_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.PRO_DATA) \
-                .count(),
-            mix_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.MIX) \
-                .count(),
-            other_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.OTHER) \
-                .count(),
-            unknown_tpns=TopPickNominationsArchive.objects \
-                .filter(image__published__gt=cutoff) \
-                .filter(image__data_source=DataSource.UNKNOWN) \
-                .count(),
-        )
+        return IotdStatsService.update_stats(days)
 
     @staticmethod
     def user_has_submissions(user, days):
@@ -1066,413 +817,7 @@ class IotdService:
 
     @staticmethod
     def calculate_iotd_staff_members_stats(period_start: datetime, period_end: datetime):
-        # Promoted an image that made it to IOTD
-        guessed_iotd_reward = Decimal('4')
-        # Promoted an image that made it to TP
-        guessed_tp_reward = Decimal('2')
-        # Promoted an image that made it to TPN
-        guessed_tpn_reward = Decimal('1')
-        # Dismissed an image that made it to IOTD
-        canned_iotd_penalty = Decimal('40')
-        # Dismissed an image that made it to TP
-        canned_tp_penalty = Decimal('20')
-        # Dismissed an image that made it to TPN
-        canned_tpn_penalty = Decimal('10')
-        # Dismissed an image that was dismissed by (settings.IOTD_MAX_DISMISSALS - 1) other users
-        correct_dismissal_reward = Decimal('1')
-        # Neglected to dismiss an image that was dismissed by settings.IOTD_MAX_DISMISSALS users
-        missed_dismissal_penalty = Decimal('2')
-        # Promoted an image that didn't get any awards
-        wasted_promotion_penalty = Decimal('0.5')
-        # Neglected to promote an image that made it to IOTD
-        missed_iotd_submission_penalty = Decimal('2')
-        # Neglected to promote an image that made it to TP
-        missed_tp_submission_penalty = Decimal('1')
-        # Neglected to promote an image that made it to TPN
-        missed_tpn_submission_penalty = Decimal('.5')
-
-        submitters_scores = {}
-        reviewers_scores = {}
-        dismissal_scores = {}
-        is_iotd_cache = {}
-        is_top_pick_cache = {}
-        is_top_pick_nomination_cache = {}
-
-        def is_iotd(image):
-            if image.id in is_iotd_cache:
-                return is_iotd_cache[image.id]
-            result = hasattr(image, 'iotd')
-            is_iotd_cache[image.id] = result
-            return result
-
-        def is_top_pick(image):
-            if image.id in is_top_pick_cache:
-                return is_top_pick_cache[image.id]
-            result = hasattr(image, 'toppickarchive')
-            is_top_pick_cache[image.id] = result
-            return result
-
-        def is_top_pick_nomination(image):
-            if image.id in is_top_pick_nomination_cache:
-                return is_top_pick_nomination_cache[image.id]
-            result = hasattr(image, 'toppicknominationsarchive')
-            is_top_pick_nomination_cache[image.id] = result
-            return result
-
-        def get_submissions():
-            return IotdSubmission.objects.filter(
-                date__gte=period_start, date__lte=period_end
-            ).select_related('image', 'submitter')
-
-        def get_submissions_by_user(submissions):
-            return {
-                submission.submitter.username: set(
-                    IotdSubmission.objects.filter(
-                        submitter=submission.submitter, date__gte=period_start, date__lte=period_end
-                    ).select_related('image').values_list('image_id', flat=True)
-                )
-                for submission in submissions
-            }
-
-        def get_dismissals_by_user(dismissals):
-            dismissed_images = dismissals.values_list('user__username', 'image_id').order_by('user__username')
-            dismissed_images_dict = defaultdict(list)
-            for username, image_id in dismissed_images:
-                dismissed_images_dict[username].append(image_id)
-            return dict(dismissed_images_dict)
-
-        def get_votes():
-            return IotdVote.objects.filter(
-                date__gte=period_start, date__lte=period_end
-            ).select_related('image', 'reviewer')
-
-        def get_dismissals():
-            return IotdDismissedImage.objects.filter(
-                created__gte=period_start, created__lte=period_end
-            ).select_related('image', 'user')
-
-        def prepare_dismissals_counts(dismissals):
-            counts = {}
-            for dismissal in dismissals:
-                image_id = dismissal.image_id
-                counts[image_id] = counts.get(image_id, 0) + 1
-            return counts
-
-        def get_seen_images_by_user():
-            prefetch = Prefetch(
-                'iotdsubmitterseenimage_set',
-                queryset=IotdSubmitterSeenImage.objects.filter(created__gte=period_start, created__lte=period_end),
-                to_attr='seen_images'
-            )
-
-            # Get all users who have seen images, prefetching the filtered seen images
-            users = User.objects.prefetch_related(prefetch).all()
-
-            # Build the dictionary with a single database query
-            return {
-                user.username: {seen_image.image_id for seen_image in user.seen_images}
-                for user in users
-            }
-
-        def prepare_submitter_scores(submissions, dismissals):
-            for submission in submissions:
-                try:
-                    if not submission.submitter:
-                        continue
-
-                    submitter_username = submission.submitter.username
-                    score = submitters_scores.get(submitter_username, 0)
-
-                    if is_iotd(submission.image):
-                        score += guessed_iotd_reward
-                        submitter_promotion_counts[submitter_username]['iotds'] += 1
-                    elif is_top_pick(submission.image):
-                        score += guessed_tp_reward
-                        submitter_promotion_counts[submitter_username]['top_picks'] += 1
-                    elif is_top_pick_nomination(submission.image):
-                        score += guessed_tpn_reward
-                        submitter_promotion_counts[submitter_username]['top_pick_nominations'] += 1
-                    else:
-                        score -= wasted_promotion_penalty
-                        submitter_promotion_counts[submitter_username]['wasted_promotions'] += 1
-
-                    submitters_scores[submitter_username] = score
-
-                    # Increment promotion counts
-                    submitter_promotion_counts[submitter_username]['promotions'] += 1
-                except KeyError:
-                    continue
-
-            # Update scoring for missed submissions and dismissals
-            for submitter_username, seen_image_ids in seen_images_by_user.items():
-                try:
-                    submitted_image_ids = submissions_by_user.get(submitter_username, set())
-                    dismissed_image_ids = dismissals_by_user.get(submitter_username, set())
-
-                    for image_id in seen_image_ids:
-                        try:
-                            image = Image.objects_including_wip.get(pk=image_id)
-                        except Image.DoesNotExist:
-                            # In case the image was deleted.
-                            continue
-                        if image_id not in submitted_image_ids:
-                            # Submitter saw an image that was promoted but did not submit it
-                            score = 0
-                            if is_iotd(image):
-                                score = submitters_scores.get(submitter_username, 0) - missed_iotd_submission_penalty
-                                submitter_promotion_counts[submitter_username]['missed_iotd_promotions'] += 1
-                            elif is_top_pick(image):
-                                score = submitters_scores.get(submitter_username, 0) - missed_tp_submission_penalty
-                                submitter_promotion_counts[submitter_username]['missed_tp_promotions'] += 1
-                            elif is_top_pick_nomination(image):
-                                score = submitters_scores.get(submitter_username, 0) - missed_tpn_submission_penalty
-                                submitter_promotion_counts[submitter_username]['missed_tpn_promotions'] += 1
-                            submitters_scores[submitter_username] = score
-
-                        if image_id not in dismissed_image_ids:
-                            # Submitter saw an image that was dismissed by others but did not submit it
-                            dismissed = image_dismissal_counts[image_id] >= settings.IOTD_MAX_DISMISSALS
-                            if dismissed:
-                                score = submitters_scores.get(submitter_username, 0) - missed_dismissal_penalty
-                                submitters_scores[submitter_username] = score
-                                dismissal_counts[submitter_username]['missed_dismissals'] += 1
-                except KeyError:
-                    continue
-
-        def prepare_reviewer_scores(votes):
-            for vote in votes:
-                try:
-                    if not vote.reviewer:
-                        continue
-
-                    reviewer_username = vote.reviewer.username
-                    score = reviewers_scores.get(reviewer_username, 0)
-
-                    if is_iotd(vote.image):
-                        score += guessed_iotd_reward
-                    elif is_top_pick(vote.image):
-                        score += guessed_tp_reward
-
-                    reviewers_scores[reviewer_username] = score
-
-                    # Increment promotion counts
-                    reviewer_promotion_counts[reviewer_username]['promotions'] += 1
-                    if is_iotd(vote.image):
-                        reviewer_promotion_counts[reviewer_username]['iotds'] += 1
-                    elif is_top_pick(vote.image):
-                        reviewer_promotion_counts[reviewer_username]['top_picks'] += 1
-                    else:
-                        score -= wasted_promotion_penalty
-                        reviewer_promotion_counts[reviewer_username]['wasted_promotions'] += 1
-                except KeyError:
-                    continue
-
-        def remove_inactive_reviewers(reviewers_scores, reviewer_promotion_counts):
-            return {
-                username: score
-                for username, score in reviewers_scores.items()
-                if reviewer_promotion_counts[username]['promotions'] > 0
-            }
-
-        def prepare_dismissal_scores(dismissals):
-            for dismissal in dismissals:
-                if not dismissal.user:
-                    continue
-
-                user_username = dismissal.user.username
-                image_id = dismissal.image_id
-
-                # Fetch current scores
-                dismissal_score = dismissal_scores.get(user_username, 0)
-
-                # Check if the dismissal was correct (at least settings.IOTD_MAX_DISMISSALS other dismissals)
-                correct_dismissal = image_dismissal_counts[image_id] >= settings.IOTD_MAX_DISMISSALS
-
-                if correct_dismissal:
-                    dismissal_scores[user_username] = dismissal_score + correct_dismissal_reward
-                    # Update correct dismissal counts
-                    dismissal_counts[user_username]['correct_dismissals'] += 1
-                else:
-                    if is_iotd(dismissal.image):
-                        dismissal_scores[user_username] = dismissal_score - canned_iotd_penalty
-                        dismissal_counts[user_username]['iotds'] += 1
-                    elif is_top_pick(dismissal.image):
-                        dismissal_scores[user_username] = dismissal_score - canned_tp_penalty
-                        dismissal_counts[user_username]['top_picks'] += 1
-                    elif is_top_pick_nomination(dismissal.image):
-                        dismissal_scores[user_username] = dismissal_score - canned_tpn_penalty
-                        dismissal_counts[user_username]['top_pick_nominations'] += 1
-
-                dismissal_counts[user_username]['dismissals'] += 1
-
-        def prepare_active_days(submissions, votes, dismissals):
-            for username in all_usernames:
-                days_with_submissions = list(
-                    submissions.filter(submitter__username=username).values_list('date__date', flat=True).distinct()
-                )
-                days_with_votes = list(
-                    votes.filter(reviewer__username=username).values_list('date__date', flat=True).distinct()
-                )
-                days_with_dismissals = list(
-                    dismissals.filter(user__username=username).values_list('created__date', flat=True).distinct()
-                )
-                submitter_promotion_counts[username]['active_days'] = len(
-                    set(days_with_submissions + days_with_votes + days_with_dismissals)
-                )
-
-        def combined_score(submitter_score, reviewer_score, dismissal_score):
-            return submitter_score + reviewer_score + dismissal_score
-
-        def combine_counts(submitter_counts, reviewer_counts):
-            combined = {}
-
-            for key in set(submitter_counts) | set(reviewer_counts):
-                combined[key] = submitter_counts.get(key, 0) + reviewer_counts.get(key, 0)
-            return combined
-
-        def prepare_combined_data():
-            combined_data = {}
-
-            for user in set(submitters_scores) | set(reviewers_scores) | set(dismissal_scores):
-                combined_data[user] = {
-                    'score': combined_score(
-                        submitters_scores.get(user, Decimal('0')),
-                        reviewers_scores.get(user, Decimal('0')),
-                        dismissal_scores.get(user, Decimal('0'))
-                    ),
-                    'promotions': combine_counts(
-                        submitter_promotion_counts.get(user, {}),
-                        reviewer_promotion_counts.get(user, {})
-                    ),
-                    'dismissals': dismissal_counts.get(user, {}),
-                }
-
-            return combined_data
-
-        submissions = get_submissions()
-        dismissals = get_dismissals()
-        submissions_by_user = get_submissions_by_user(submissions)
-        dismissals_by_user = get_dismissals_by_user(dismissals)
-        votes = get_votes()
-        image_dismissal_counts = prepare_dismissals_counts(dismissals)
-        seen_images_by_user = get_seen_images_by_user()
-
-        all_usernames = set()
-        all_usernames.update(submission.submitter.username for submission in submissions if submission.submitter)
-        all_usernames.update(vote.reviewer.username for vote in votes if vote.reviewer)
-        all_usernames.update(dismissal.user.username for dismissal in dismissals if dismissal.user)
-
-        submitter_promotion_counts = {
-            username: {
-                'promotions': 0,
-                'wasted_promotions': 0,
-                'missed_iotd_promotions': 0,
-                'missed_tp_promotions': 0,
-                'missed_tpn_promotions': 0,
-                'top_pick_nominations': 0,
-                'top_picks': 0,
-                'iotds': 0,
-                'active_days': 0
-            } for username in all_usernames
-        }
-
-        reviewer_promotion_counts = {
-            username: {
-                'promotions': 0,
-                'wasted_promotions': 0,
-                'missed_iotd_promotions': 0,
-                'missed_tp_promotions': 0,
-                'missed_tpn_promotions': 0,
-                'top_pick_nominations': 0,
-                'top_picks': 0,
-                'iotds': 0,
-                'active_days': 0
-            } for username in all_usernames
-        }
-
-        dismissal_counts = {
-            username: {
-                'dismissals': 0,
-                'correct_dismissals': 0,
-                'missed_dismissals': 0,
-                'top_pick_nominations': 0,
-                'top_picks': 0,
-                'iotds': 0
-            } for username in all_usernames
-        }
-
-        prepare_submitter_scores(submissions, dismissals)
-        prepare_reviewer_scores(votes)
-        prepare_dismissal_scores(dismissals)
-        prepare_active_days(submissions, votes, dismissals)
-        reviewers_scores = remove_inactive_reviewers(reviewers_scores, reviewer_promotion_counts)
-
-        combined_data = prepare_combined_data()
-
-        # Print the merged data
-        log.debug(
-            "User,Score,Active days,Promotions/Dismissals accuracy ratio,"
-            "Promotions,Wasted Promotions,Missed IOTD Promotions,Missed TP Promotion,Missed TPN Promotions,"
-            "TPNs,TPs,IOTDs,"
-            "Dismissals,Correct Dismissals,Missed Dismissals,"
-            "TPNs,TPs,IOTDs"
-        )
-        for username, data in sorted(combined_data.items(), key=lambda item: item[1]['score'], reverse=True):
-            try:
-                promotions_dismissals_accuracy_ratio = (
-                                                               data['promotions'].get('top_pick_nominations', 0) +
-                                                               data['promotions'].get('top_picks', 0) +
-                                                               data['promotions'].get('iotds', 0)
-                                                       ) / (
-                                                               data['dismissals'].get('top_pick_nominations', 0) +
-                                                               data['dismissals'].get('top_picks', 0) +
-                                                               data['dismissals'].get('iotds', 0)
-                                                       )
-            except ZeroDivisionError:
-                promotions_dismissals_accuracy_ratio = 0
-
-            log.debug(
-                f"{username},"
-                f"{data['score']},"
-                f"{data['promotions'].get('active_days', 0)},"
-                f"{promotions_dismissals_accuracy_ratio:.2f},"
-                f"{data['promotions'].get('promotions', 0)},"
-                f"{data['promotions'].get('wasted_promotions', 0)},"
-                f"{data['promotions'].get('missed_iotd_promotions', 0)},"
-                f"{data['promotions'].get('missed_tp_promotions', 0)},"
-                f"{data['promotions'].get('missed_tpn_promotions', 0)},"
-                f"{data['promotions'].get('top_pick_nominations', 0)},"
-                f"{data['promotions'].get('top_picks', 0)},"
-                f"{data['promotions'].get('iotds', 0)},"
-                f"{data['dismissals'].get('dismissals', 0)},"
-                f"{data['dismissals'].get('correct_dismissals', 0)},"
-                f"{data['dismissals'].get('missed_dismissals', 0)},"
-                f"{data['dismissals'].get('top_pick_nominations', 0)},"
-                f"{data['dismissals'].get('top_picks', 0)},"
-                f"{data['dismissals'].get('iotds', 0)}"
-            )
-            IotdStaffMemberScore.objects.create(
-                user=User.objects.get(username=username),
-                period_start=period_start,
-                period_end=period_end,
-                score=data['score'],
-                active_days=data['promotions'].get('active_days', 0),
-                promotions_dismissals_accuracy_ratio=promotions_dismissals_accuracy_ratio,
-                promotions=data['promotions'].get('promotions', 0),
-                wasted_promotions=data['promotions'].get('wasted_promotions', 0),
-                missed_iotd_promotions=data['promotions'].get('missed_iotd_promotions', 0),
-                missed_tp_promotions=data['promotions'].get('missed_tp_promotions', 0),
-                missed_tpn_promotions=data['promotions'].get('missed_tpn_promotions', 0),
-                promotions_to_tpn=data['promotions'].get('top_pick_nominations', 0),
-                promotions_to_tp=data['promotions'].get('top_picks', 0),
-                promotions_to_iotd=data['promotions'].get('iotds', 0),
-                dismissals=data['dismissals'].get('dismissals', 0),
-                correct_dismissals=data['dismissals'].get('correct_dismissals', 0),
-                missed_dismissals=data['dismissals'].get('missed_dismissals', 0),
-                dismissals_to_tpn=data['dismissals'].get('top_pick_nominations', 0),
-                dismissals_to_tp=data['dismissals'].get('top_picks', 0),
-                dismissals_to_iotd=data['dismissals'].get('iotds', 0),
-            )
+        return IotdStatsService.calculate_staff_member_scores(period_start, period_end)
 
     @staticmethod
     def may_auto_submit_to_iotd_tp_process(user: User) -> bool:
@@ -0,0 +1,310 @@
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Set, Union
+
+from django.conf import settings
+from django.db.models import Count
+
+from astrobin.enums import SubjectType
+from astrobin.enums.data_source import DataSource
+from astrobin.models import Image
+from astrobin_apps_iotd.models import (
+    Iotd, IotdDismissedImage, IotdStaffMemberScore, IotdStats, IotdSubmission, IotdSubmitterSeenImage, IotdVote,
+    TopPickArchive, TopPickNominationsArchive,
+)
+from common.utils import get_segregated_reader_database
+
+log = logging.getLogger(__name__)
+
+IOTD = 'iotd'
+TP = 'tp'
+TPN = 'tpn'
+
+StaffMemberScore = Dict[str, Union[int, float, Decimal]]
+
+
+class IotdStatsService:
+    """
+    Computes the IOTD/TP stats (IotdStats) and the staff member scores (IotdStaffMemberScore) of a period. The events
+    of the period (awards, submissions, votes, dismissals, seen images) are loaded once from the reader database, as
+    tuples, and all the figures are tallied from them in one pass.
+    """
+
+    SUBJECT_TYPES = (
+        SubjectType.DEEP_SKY,
+        SubjectType.SOLAR_SYSTEM,
+        SubjectType.WIDE_FIELD,
+        SubjectType.STAR_TRAILS,
+        SubjectType.NORTHERN_LIGHTS,
+        SubjectType.NOCTILUCENT_CLOUDS,
+        SubjectType.LANDSCAPE,
+        SubjectType.ARTIFICIAL_SATELLITE,
+    )
+
+    DATA_SOURCES = (
+        DataSource.BACKYARD,
+        DataSource.TRAVELLER,
+        DataSource.OWN_REMOTE,
+        DataSource.AMATEUR_HOSTING,
+        DataSource.PUBLIC_AMATEUR_DATA,
+        DataSource.PRO_DATA,
+        DataSource.MIX,
+        DataSource.OTHER,
+        DataSource.UNKNOWN,
+    )
+
+    # Promoted an image that made it to IOTD, TP or TPN.
+    PROMOTION_REWARDS = {IOTD: Decimal('4'), TP: Decimal('2'), TPN: Decimal('1')}
+    # Dismissed an image that made it to IOTD, TP or TPN.
+    DISMISSAL_PENALTIES = {IOTD: Decimal('40'), TP: Decimal('20'), TPN: Decimal('10')}
+    # Neglected to promote a seen image that made it to IOTD, TP or TPN.
+    MISSED_PROMOTION_PENALTIES = {IOTD: Decimal('2'), TP: Decimal('1'), TPN: Decimal('.5')}
+    # Dismissed an image that was dismissed by (settings.IOTD_MAX_DISMISSALS - 1) other users.
+    CORRECT_DISMISSAL_REWARD = Decimal('1')
+    # Neglected to dismiss a seen image that was dismissed by settings.IOTD_MAX_DISMISSALS users.
+    MISSED_DISMISSAL_PENALTY = Decimal('2')
+    # Promoted an image that didn't get any awards.
+    WASTED_PROMOTION_PENALTY = Decimal('0.5')
+
+    BATCH_SIZE = 5000
+
+    @staticmethod
+    def _batches(ids: Iterable[int]) -> Iterable[List[int]]:
+        ids = sorted(ids)
+        for i in range(0, len(ids), IotdStatsService.BATCH_SIZE):
+            yield ids[i:i + IotdStatsService.BATCH_SIZE]
+
+    @staticmethod
+    def compute_stats(days: int) -> Dict[str, int]:
+        """
+        The IotdStats fields of the last days.
+        """
+        database = get_segregated_reader_database()
+        cutoff = date.today() - timedelta(days=days)
+
+        stats = dict(days=days, total_iotds=days)
+
+        # (winner, subject type, data source) of the awarded images, by award.
+        awarded = {
+            'iotds': Iotd.objects.using(database).filter(date__gt=cutoff),
+            'tps': TopPickArchive.objects.using(database).filter(image__published__gt=cutoff),
+            'tpns': TopPickNominationsArchive.objects.using(database).filter(image__published__gt=cutoff),
+        }
+
+        for suffix, queryset in awarded.items():
+            rows = list(queryset.order_by().values_list('image__user', 'image__subject_type', 'image__data_source'))
+            subject_type_counts = Counter(row[1] for row in rows)
+            data_source_counts = Counter(row[2] for row in rows)
+
+            stats[f'distinct_{suffix[:-1]}_winners'] = len(set(row[0] for row in rows))
+            if suffix != 'iotds':
+                stats[f'total_{suffix}'] = len(rows)
+            for subject_type in IotdStatsService.SUBJECT_TYPES:
+                stats[f'{subject_type.lower()}_{suffix}'] = subject_type_counts[subject_type]
+            for data_source in IotdStatsService.DATA_SOURCES:
+                stats[f'{data_source.lower()}_{suffix}'] = data_source_counts[data_source]
+
+        # (subject type, data source, count) of the images submitted for consideration.
+        rows = list(
+            Image.objects_plain.using(database).filter(
+                published__gt=cutoff,
+                submitted_for_iotd_tp_consideration__isnull=False,
+                subject_type__in=IotdStatsService.SUBJECT_TYPES,
+            ).order_by().values('subject_type', 'data_source').annotate(
+                count=Count('pk')
+            ).values_list('subject_type', 'data_source', 'count')
+        )
+        subject_type_counts = Counter()
+        data_source_counts = Counter()
+        for subject_type, data_source, count in rows:
+            subject_type_counts[subject_type] += count
+            data_source_counts[data_source] += count
+
+        stats['total_submitted_images'] = sum(subject_type_counts.values())
+        for subject_type in IotdStatsService.SUBJECT_TYPES:
+            stats[f'total_{subject_type.lower()}_images'] = subject_type_counts[subject_type]
+        for data_source in IotdStatsService.DATA_SOURCES:
+            stats[f'total_{data_source.lower()}_images'] = data_source_counts[data_source]
+
+        return stats
+
+    @staticmethod
+    def update_stats(days: int = 365) -> IotdStats:
+        start = time.perf_counter()
+        stats = IotdStatsService.compute_stats(days)
+
+        return IotdStats.objects.create(computation_time=time.perf_counter() - start, **stats)
+
+    @staticmethod
+    def _get_awards(database: str, image_ids: Set[int]) -> Dict[int, str]:
+        # The highest award of each image, if any.
+        awards = {}
+
+        for award, Model in ((TPN, TopPickNominationsArchive), (TP, TopPickArchive), (IOTD, Iotd)):
+            for batch in IotdStatsService._batches(image_ids):
+                for image_id in Model.objects.using(database).filter(image__in=batch).values_list('image', flat=True):
+                    awards[image_id] = award
+
+        return awards
+
+    @staticmethod
+    def _get_existing_images(database: str, image_ids: Set[int]) -> Set[int]:
+        existing = set()
+
+        for batch in IotdStatsService._batches(image_ids):
+            existing.update(
+                Image.objects_including_wip.using(database).filter(pk__in=batch).values_list('pk', flat=True)
+            )
+
+        return existing
+
+    @staticmethod
+    def compute_staff_member_scores(period_start: datetime, period_end: datetime) -> Dict[int, StaffMemberScore]:
+        """
+        The IotdStaffMemberScore fields of the users that submitted, voted or dismissed in a period, by user id.
+        """
+        database = get_segregated_reader_database()
+
+        # (user, image, timestamp) of the events of the period.
+        submissions = list(
+            IotdSubmission.objects.using(database).filter(
+                date__gte=period_start, date__lte=period_end, submitter__isnull=False
+            ).order_by().values_list('submitter', 'image', 'date')
+        )
+        votes = list(
+            IotdVote.objects.using(database).filter(
+                date__gte=period_start, date__lte=period_end, reviewer__isnull=False
+            ).order_by().values_list('reviewer', 'image', 'date')
+        )
+        dismissals = list(
+            IotdDismissedImage.objects.using(database).filter(
+                created__gte=period_start, created__lte=period_end, user__isnull=False
+            ).order_by().values_list('user', 'image', 'created')
+        )
+        seen = list(
+            IotdSubmitterSeenImage.objects.using(database).filter(
+                created__gte=period_start, created__lte=period_end
+            ).order_by().values_list('user', 'image')
+        )
+
+        awards = IotdStatsService._get_awards(
+            database, set(row[1] for rows in (submissions, votes, dismissals, seen) for row in rows)
+        )
+        image_dismissal_counts = Counter(image_id for user_id, image_id, timestamp in dismissals)
+
+        scores: Dict[int, StaffMemberScore] = {}
+        active_days = defaultdict(set)
+        submitted = defaultdict(set)
+        dismissed = defaultdict(set)
+
+        for user_id, image_id, timestamp in submissions + votes + dismissals:
+            scores.setdefault(user_id, dict(
+                score=Decimal('0'),
+                promotions=0,
+                wasted_promotions=0,
+                missed_iotd_promotions=0,
+                missed_tp_promotions=0,
+                missed_tpn_promotions=0,
+                promotions_to_tpn=0,
+                promotions_to_tp=0,
+                promotions_to_iotd=0,
+                dismissals=0,
+                correct_dismissals=0,
+                missed_dismissals=0,
+                dismissals_to_tpn=0,
+                dismissals_to_tp=0,
+                dismissals_to_iotd=0,
+            ))
+            active_days[user_id].add(timestamp.date())
+
+        for user_id, image_id, timestamp in submissions:
+            score = scores[user_id]
+            award = awards.get(image_id)
+            submitted[user_id].add(image_id)
+
+            score['promotions'] += 1
+            if award:
+                score['score'] += IotdStatsService.PROMOTION_REWARDS[award]
+                score[f'promotions_to_{award}'] += 1
+            else:
+                score['score'] -= IotdStatsService.WASTED_PROMOTION_PENALTY
+                score['wasted_promotions'] += 1
+
+        for user_id, image_id, timestamp in votes:
+            score = scores[user_id]
+            award = awards.get(image_id)
+
+            score['promotions'] += 1
+            if award in (IOTD, TP):
+                score['score'] += IotdStatsService.PROMOTION_REWARDS[award]
+                score[f'promotions_to_{award}'] += 1
+            else:
+                # A reviewer's promotion is wasted if the image didn't make it to TP, and it's not penalized.
+                score['wasted_promotions'] += 1
+
+        for user_id, image_id, timestamp in dismissals:
+            score = scores[user_id]
+            award = awards.get(image_id)
+            dismissed[user_id].add(image_id)
+
+            score['dismissals'] += 1
+            if image_dismissal_counts[image_id] >= settings.IOTD_MAX_DISMISSALS:
+                score['score'] += IotdStatsService.CORRECT_DISMISSAL_REWARD
+                score['correct_dismissals'] += 1
+            elif award:
+                score['score'] -= IotdStatsService.DISMISSAL_PENALTIES[award]
+                score[f'dismissals_to_{award}'] += 1
+
+        existing_images = IotdStatsService._get_existing_images(database, set(image_id for user_id, image_id in seen))
+
+        for user_id, image_id in seen:
+            if user_id not in scores or image_id not in existing_images:
+                continue
+
+            score = scores[user_id]
+            award = awards.get(image_id)
+
+            if award and image_id not in submitted[user_id]:
+                score['score'] -= IotdStatsService.MISSED_PROMOTION_PENALTIES[award]
+                score[f'missed_{award}_promotions'] += 1
+
+            if image_id not in dismissed[user_id] and \
+                    image_dismissal_counts[image_id] >= settings.IOTD_MAX_DISMISSALS:
+                score['score'] -= IotdStatsService.MISSED_DISMISSAL_PENALTY
+                score['missed_dismissals'] += 1
+
+        for user_id, score in scores.items():
+            score['active_days'] = len(active_days[user_id])
+
+            awarded_promotions = score['promotions_to_tpn'] + score['promotions_to_tp'] + score['promotions_to_iotd']
+            awarded_dismissals = score['dismissals_to_tpn'] + score['dismissals_to_tp'] + score['dismissals_to_iotd']
+            score['promotions_dismissals_accuracy_ratio'] = \
+                awarded_promotions / awarded_dismissals if awarded_dismissals else 0
+
+        return scores
+
+    @staticmethod
+    def calculate_staff_member_scores(period_start: datetime, period_end: datetime) -> List[IotdStaffMemberScore]:
+        start = time.perf_counter()
+        scores = IotdStatsService.compute_staff_member_scores(period_start, period_end)
+
+        created = IotdStaffMemberScore.objects.bulk_create([
+            IotdStaffMemberScore(user_id=user_id, period_start=period_start, period_end=period_end, **score)
+            for user_id, score in sorted(scores.items(), key=lambda item: item[1]['score'], reverse=True)
+        ])
+
+        for obj in created:
+            log.debug(
+                f"IOTD staff member score of user {obj.user_id}: {obj.score} "
+                f"({obj.promotions} promotions, {obj.dismissals} dismissals, {obj.active_days} active days)"
+            )
+
+        log.info(
+            f"Computed the IOTD staff member scores of {len(created)} users for {period_start} - {period_end} in "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+
+        return created
@@ -1,13 +1,15 @@
 from datetime import timedelta
 
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from safedelete.signals import post_softdelete
 
 from astrobin.models import Image
 from astrobin_apps_images.services import ImageService
-from astrobin_apps_iotd.models import Iotd, IotdSubmission, IotdVote
+from astrobin_apps_iotd.models import Iotd, IotdSubmission, IotdVote, TopPickArchive
 from astrobin_apps_iotd.services import IotdService
+from astrobin_apps_iotd.services.iotd_feed_service import IotdFeedService
 from common.services import DateTimeService
 
 
@@ -17,6 +19,45 @@ def iotd_post_save(sender, instance: Iotd, created: bool, **kwargs):
         Image.objects.filter(pk=instance.image.pk).update(updated=DateTimeService.now())
         ImageService(instance.image).clear_badges_cache()
 
+    IotdFeedService.schedule_regeneration(IotdFeedService.IOTD_FEEDS.keys())
+
+
+@receiver(post_delete, sender=Iotd)
+def iotd_post_delete(sender, instance: Iotd, **kwargs):
+    IotdFeedService.schedule_regeneration(IotdFeedService.IOTD_FEEDS.keys())
+
+
+@receiver(post_save, sender=TopPickArchive)
+def top_pick_archive_post_save(sender, instance: TopPickArchive, created: bool, **kwargs):
+    if created:
+        IotdFeedService.schedule_regeneration(IotdFeedService.TOP_PICK_FEEDS.keys())
+
+
+@receiver(post_delete, sender=TopPickArchive)
+def top_pick_archive_post_delete(sender, instance: TopPickArchive, **kwargs):
+    IotdFeedService.schedule_regeneration(IotdFeedService.TOP_PICK_FEEDS.keys())
+
+
+@receiver(post_save, sender=Image)
+def image_post_save(sender, instance: Image, created: bool, **kwargs):
+    # A new image can't be featured yet; a featured one can change its title, description or file.
+    if not created:
+        schedule_image_feeds_regeneration(instance)
+
+
+@receiver(post_softdelete, sender=Image)
+def image_post_softdelete(sender, instance: Image, **kwargs):
+    schedule_image_feeds_regeneration(instance)
+
+
+def schedule_image_feeds_regeneration(image: Image):
+    names = IotdFeedService.get_feeds_featuring(image.pk)
+
+    # The IOTD and TP feeds are debounced separately, like when the selections change.
+    for feeds in (IotdFeedService.IOTD_FEEDS, IotdFeedService.TOP_PICK_FEEDS):
+        if any(name in feeds for name in names):
+            IotdFeedService.schedule_regeneration(feeds.keys())
+
 
 @receiver(post_save, sender=IotdVote)
 def iotd_vote_post_save(sender, instance: IotdVote, created: bool, **kwargs):
@@ -1,5 +1,6 @@
 import logging
 from datetime import datetime, timedelta
+from typing import List, Optional
 
 from celery import shared_task
 from django.conf import settings
@@ -13,6 +14,7 @@ from astrobin_apps_iotd.models import (
     IotdSubmitterSeenImage, IotdVote,
 )
 from astrobin_apps_iotd.services import IotdService
+from astrobin_apps_iotd.services.iotd_feed_service import IotdFeedService
 from astrobin_apps_notifications.utils import push_notification
 from common.constants import GroupName
 from common.services import DateTimeService
@@ -31,6 +33,12 @@ def update_top_pick_archive():
     IotdService().update_top_pick_archive()
 
 
+@shared_task(time_limit=600)
+def regenerate_iotd_feeds(names: Optional[List[str]] = None):
+    # Without names, all the feeds: this runs as a periodic task at midnight, when the IOTD of the new day goes live.
+    IotdFeedService.regenerate(names or IotdFeedService.FEEDS.keys())
+
+
 @shared_task(time_limit=900)
 def send_iotd_staff_insufficiently_active_reminders_and_remove_after_max_reminders():
     min_promotions_per_period = getattr(settings, 'IOTD_MIN_PROMOTIONS_PER_PERIOD', '7/7')
@@ -0,0 +1,751 @@
+"""
+IotdService.update_stats and IotdService.calculate_iotd_staff_members_stats as they were before IotdStatsService, kept
+verbatim so that the tests can check that the new service computes the same figures.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Prefetch
+
+from astrobin.enums import SubjectType
+from astrobin.enums.data_source import DataSource
+from astrobin.models import Image
+from astrobin_apps_iotd.models import (
+    Iotd, IotdDismissedImage, IotdStaffMemberScore, IotdStats, IotdSubmission, IotdSubmitterSeenImage, IotdVote,
+    TopPickArchive, TopPickNominationsArchive,
+)
+
+log = logging.getLogger(__name__)
+
+
+def update_stats(days=365):
+    cutoff = date.today() - timedelta(days=days)
+
+    total_submitted_images_queryset = Image.objects \
+        .filter(
+        published__gt=cutoff, submitted_for_iotd_tp_consideration__isnull=False, subject_type__in=[
+            SubjectType.DEEP_SKY,
+            SubjectType.SOLAR_SYSTEM,
+            SubjectType.WIDE_FIELD,
+            SubjectType.STAR_TRAILS,
+            SubjectType.NORTHERN_LIGHTS,
+            SubjectType.NOCTILUCENT_CLOUDS,
+            SubjectType.LANDSCAPE,
+            SubjectType.ARTIFICIAL_SATELLITE,
+        ]
+    )
+
+    IotdStats.objects.create(
+        # Period of time covered by the stats.
+        days=days,
+
+        # Distinct winners.
+        distinct_iotd_winners=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .values_list('image__user', flat=True) \
+            .distinct() \
+            .count(),
+        distinct_tp_winners=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .values_list('image__user', flat=True) \
+            .distinct() \
+            .count(),
+        distinct_tpn_winners=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .values_list('image__user', flat=True) \
+            .distinct() \
+            .count(),
+
+        # Total awarded images.
+        total_iotds=days,
+        total_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .count(),
+        total_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .count(),
+
+        # Total submitted images.
+        total_submitted_images=total_submitted_images_queryset
+            .count(),
+
+        # Breakdown by subject type.
+        total_deep_sky_images=total_submitted_images_queryset \
+            .filter(subject_type=SubjectType.DEEP_SKY) \
+            .count(),
+        total_solar_system_images=total_submitted_images_queryset \
+            .filter(subject_type=SubjectType.SOLAR_SYSTEM) \
+            .count(),
+        total_wide_field_images=total_submitted_images_queryset \
+            .filter(subject_type=SubjectType.WIDE_FIELD) \
+            .count(),
+        total_star_trails_images=total_submitted_images_queryset \
+            .filter(subject_type=SubjectType.STAR_TRAILS) \
+            .count(),
+        total_northern_lights_images=total_submitted_images_queryset \
+            .filter(subject_type=SubjectType.NORTHERN_LIGHTS) \
+            .count(),
+        total_noctilucent_clouds_images=total_submitted_images_queryset \
+            .filter(subject_type=SubjectType.NOCTILUCENT_CLOUDS) \
+            .count(),
+        total_landscape_images=total_submitted_images_queryset \
+            .filter(subject_type=SubjectType.LANDSCAPE) \
+            .count(),
+        total_artificial_satellite_images=total_submitted_images_queryset \
+            .filter(subject_type=SubjectType.ARTIFICIAL_SATELLITE) \
+            .count(),
+
+        deep_sky_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.DEEP_SKY) \
+            .count(),
+        solar_system_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.SOLAR_SYSTEM) \
+            .count(),
+        wide_field_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.WIDE_FIELD) \
+            .count(),
+        star_trails_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.STAR_TRAILS) \
+            .count(),
+        northern_lights_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.NORTHERN_LIGHTS) \
+            .count(),
+        noctilucent_clouds_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.NOCTILUCENT_CLOUDS) \
+            .count(),
+        landscape_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.LANDSCAPE) \
+            .count(),
+        artificial_satellite_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.ARTIFICIAL_SATELLITE) \
+            .count(),
+
+        deep_sky_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.DEEP_SKY) \
+            .count(),
+        solar_system_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.SOLAR_SYSTEM) \
+            .count(),
+        wide_field_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.WIDE_FIELD) \
+            .count(),
+        star_trails_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.STAR_TRAILS) \
+            .count(),
+        northern_lights_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.NORTHERN_LIGHTS) \
+            .count(),
+        noctilucent_clouds_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.NOCTILUCENT_CLOUDS) \
+            .count(),
+        landscape_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.LANDSCAPE) \
+            .count(),
+        artificial_satellite_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.ARTIFICIAL_SATELLITE) \
+            .count(),
+
+        deep_sky_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.DEEP_SKY) \
+            .count(),
+        solar_system_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.SOLAR_SYSTEM) \
+            .count(),
+        wide_field_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.WIDE_FIELD) \
+            .count(),
+        star_trails_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.STAR_TRAILS) \
+            .count(),
+        northern_lights_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.NORTHERN_LIGHTS) \
+            .count(),
+        noctilucent_clouds_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.NOCTILUCENT_CLOUDS) \
+            .count(),
+        landscape_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.LANDSCAPE) \
+            .count(),
+        artificial_satellite_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__subject_type=SubjectType.ARTIFICIAL_SATELLITE) \
+            .count(),
+
+        # Breakdown by data source.
+        total_backyard_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.BACKYARD) \
+            .count(),
+        total_traveller_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.TRAVELLER) \
+            .count(),
+        total_own_remote_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.OWN_REMOTE) \
+            .count(),
+        total_amateur_hosting_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.AMATEUR_HOSTING) \
+            .count(),
+        total_public_amateur_data_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.PUBLIC_AMATEUR_DATA) \
+            .count(),
+        total_pro_data_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.PRO_DATA) \
+            .count(),
+        total_mix_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.MIX) \
+            .count(),
+        total_other_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.OTHER) \
+            .count(),
+        total_unknown_images=total_submitted_images_queryset \
+            .filter(data_source=DataSource.UNKNOWN) \
+            .count(),
+
+        backyard_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.BACKYARD) \
+            .count(),
+        traveller_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.TRAVELLER) \
+            .count(),
+        own_remote_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.OWN_REMOTE) \
+            .count(),
+        amateur_hosting_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.AMATEUR_HOSTING) \
+            .count(),
+        public_amateur_data_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.PUBLIC_AMATEUR_DATA) \
+            .count(),
+        pro_data_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.PRO_DATA) \
+            .count(),
+        mix_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.MIX) \
+            .count(),
+        other_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.OTHER) \
+            .count(),
+        unknown_iotds=Iotd.objects \
+            .filter(date__gt=cutoff) \
+            .filter(image__data_source=DataSource.UNKNOWN) \
+            .count(),
+
+        backyard_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.BACKYARD) \
+            .count(),
+        traveller_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.TRAVELLER) \
+            .count(),
+        own_remote_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.OWN_REMOTE) \
+            .count(),
+        amateur_hosting_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.AMATEUR_HOSTING) \
+            .count(),
+        public_amateur_data_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.PUBLIC_AMATEUR_DATA) \
+            .count(),
+        pro_data_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.PRO_DATA) \
+            .count(),
+        mix_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.MIX) \
+            .count(),
+        other_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.OTHER) \
+            .count(),
+        unknown_tps=TopPickArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.UNKNOWN) \
+            .count(),
+
+        backyard_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.BACKYARD) \
+            .count(),
+        traveller_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.TRAVELLER) \
+            .count(),
+        own_remote_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.OWN_REMOTE) \
+            .count(),
+        amateur_hosting_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.AMATEUR_HOSTING) \
+            .count(),
+        public_amateur_data_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.PUBLIC_AMATEUR_DATA) \
+            .count(),
+        pro_data_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.PRO_DATA) \
+            .count(),
+        mix_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.MIX) \
+            .count(),
+        other_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.OTHER) \
+            .count(),
+        unknown_tpns=TopPickNominationsArchive.objects \
+            .filter(image__published__gt=cutoff) \
+            .filter(image__data_source=DataSource.UNKNOWN) \
+            .count(),
+    )
+
+
+def calculate_iotd_staff_members_stats(period_start: datetime, period_end: datetime):
+    # Promoted an image that made it to IOTD
+    guessed_iotd_reward = Decimal('4')
+    # Promoted an image that made it to TP
+    guessed_tp_reward = Decimal('2')
+    # Promoted an image that made it to TPN
+    guessed_tpn_reward = Decimal('1')
+    # Dismissed an image that made it to IOTD
+    canned_iotd_penalty = Decimal('40')
+    # Dismissed an image that made it to TP
+    canned_tp_penalty = Decimal('20')
+    # Dismissed an image that made it to TPN
+    canned_tpn_penalty = Decimal('10')
+    # Dismissed an image that was dismissed by (settings.IOTD_MAX_DISMISSALS - 1) other users
+    correct_dismissal_reward = Decimal('1')
+    # Neglected to dismiss an image that was dismissed by settings.IOTD_MAX_DISMISSALS users
+    missed_dismissal_penalty = Decimal('2')
+    # Promoted an image that didn't get any awards
+    wasted_promotion_penalty = Decimal('0.5')
+    # Neglected to promote an image that made it to IOTD
+    missed_iotd_submission_penalty = Decimal('2')
+    # Neglected to promote an image that made it to TP
+    missed_tp_submission_penalty = Decimal('1')
+    # Neglected to promote an image that made it to TPN
+    missed_tpn_submission_penalty = Decimal('.5')
+
+    submitters_scores = {}
+    reviewers_scores = {}
+    dismissal_scores = {}
+    is_iotd_cache = {}
+    is_top_pick_cache = {}
+    is_top_pick_nomination_cache = {}
+
+    def is_iotd(image):
+        if image.id in is_iotd_cache:
+            return is_iotd_cache[image.id]
+        result = hasattr(image, 'iotd')
+        is_iotd_cache[image.id] = result
+        return result
+
+    def is_top_pick(image):
+        if image.id in is_top_pick_cache:
+            return is_top_pick_cache[image.id]
+        result = hasattr(image, 'toppickarchive')
+        is_top_pick_cache[image.id] = result
+        return result
+
+    def is_top_pick_nomination(image):
+        if image.id in is_top_pick_nomination_cache:
+            return is_top_pick_nomination_cache[image.id]
+        result = hasattr(image, 'toppicknominationsarchive')
+        is_top_pick_nomination_cache[image.id] = result
+        return result
+
+    def get_submissions():
+        return IotdSubmission.objects.filter(
+            date__gte=period_start, date__lte=period_end
+        ).select_related('image', 'submitter')
+
+    def get_submissions_by_user(submissions):
+        return {
+            submission.submitter.username: set(
+                IotdSubmission.objects.filter(
+                    submitter=submission.submitter, date__gte=period_start, date__lte=period_end
+                ).select_related('image').values_list('image_id', flat=True)
+            )
+            for submission in submissions
+        }
+
+    def get_dismissals_by_user(dismissals):
+        dismissed_images = dismissals.values_list('user__username', 'image_id').order_by('user__username')
+        dismissed_images_dict = defaultdict(list)
+        for username, image_id in dismissed_images:
+            dismissed_images_dict[username].append(image_id)
+        return dict(dismissed_images_dict)
+
+    def get_votes():
+        return IotdVote.objects.filter(
+            date__gte=period_start, date__lte=period_end
+        ).select_related('image', 'reviewer')
+
+    def get_dismissals():
+        return IotdDismissedImage.objects.filter(
+            created__gte=period_start, created__lte=period_end
+        ).select_related('image', 'user')
+
+    def prepare_dismissals_counts(dismissals):
+        counts = {}
+        for dismissal in dismissals:
+            image_id = dismissal.image_id
+            counts[image_id] = counts.get(image_id, 0) + 1
+        return counts
+
+    def get_seen_images_by_user():
+        prefetch = Prefetch(
+            'iotdsubmitterseenimage_set',
+            queryset=IotdSubmitterSeenImage.objects.filter(created__gte=period_start, created__lte=period_end),
+            to_attr='seen_images'
+        )
+
+        # Get all users who have seen images, prefetching the filtered seen images
+        users = User.objects.prefetch_related(prefetch).all()
+
+        # Build the dictionary with a single database query
+        return {
+            user.username: {seen_image.image_id for seen_image in user.seen_images}
+            for user in users
+        }
+
+    def prepare_submitter_scores(submissions, dismissals):
+        for submission in submissions:
+            try:
+                if not submission.submitter:
+                    continue
+
+                submitter_username = submission.submitter.username
+                score = submitters_scores.get(submitter_username, 0)
+
+                if is_iotd(submission.image):
+                    score += guessed_iotd_reward
+                    submitter_promotion_counts[submitter_username]['iotds'] += 1
+                elif is_top_pick(submission.image):
+                    score += guessed_tp_reward
+                    submitter_promotion_counts[submitter_username]['top_picks'] += 1
+                elif is_top_pick_nomination(submission.image):
+                    score += guessed_tpn_reward
+                    submitter_promotion_counts[submitter_username]['top_pick_nominations'] += 1
+                else:
+                    score -= wasted_promotion_penalty
+                    submitter_promotion_counts[submitter_username]['wasted_promotions'] += 1
+
+                submitters_scores[submitter_username] = score
+
+                # Increment promotion counts
+                submitter_promotion_counts[submitter_username]['promotions'] += 1
+            except KeyError:
+                continue
+
+        # Update scoring for missed submissions and dismissals
+        for submitter_username, seen_image_ids in seen_images_by_user.items():
+            try:
+                submitted_image_ids = submissions_by_user.get(submitter_username, set())
+                dismissed_image_ids = dismissals_by_user.get(submitter_username, set())
+
+                for image_id in seen_image_ids:
+                    try:
+                        image = Image.objects_including_wip.get(pk=image_id)
+                    except Image.DoesNotExist:
+                        # In case the image was deleted.
+                        continue
+                    if image_id not in submitted_image_ids:
+                        # Submitter saw an image that was promoted but did not submit it
+                        score = 0
+                        if is_iotd(image):
+                            score = submitters_scores.get(submitter_username, 0) - missed_iotd_submission_penalty
+                            submitter_promotion_counts[submitter_username]['missed_iotd_promotions'] += 1
+                        elif is_top_pick(image):
+                            score = submitters_scores.get(submitter_username, 0) - missed_tp_submission_penalty
+                            submitter_promotion_counts[submitter_username]['missed_tp_promotions'] += 1
+                        elif is_top_pick_nomination(image):
+                            score = submitters_scores.get(submitter_username, 0) - missed_tpn_submission_penalty
+                            submitter_promotion_counts[submitter_username]['missed_tpn_promotions'] += 1
+                        submitters_scores[submitter_username] = score
+
+                    if image_id not in dismissed_image_ids:
+                        # Submitter saw an image that was dismissed by others but did not submit it
+                        dismissed = image_dismissal_counts[image_id] >= settings.IOTD_MAX_DISMISSALS
+                        if dismissed:
+                            score = submitters_scores.get(submitter_username, 0) - missed_dismissal_penalty
+                            submitters_scores[submitter_username] = score
+                            dismissal_counts[submitter_username]['missed_dismissals'] += 1
+            except KeyError:
+                continue
+
+    def prepare_reviewer_scores(votes):
+        for vote in votes:
+            try:
+                if not vote.reviewer:
+                    continue
+
+                reviewer_username = vote.reviewer.username
+                score = reviewers_scores.get(reviewer_username, 0)
+
+                if is_iotd(vote.image):
+                    score += guessed_iotd_reward
+                elif is_top_pick(vote.image):
+                    score += guessed_tp_reward
+
+                reviewers_scores[reviewer_username] = score
+
+                # Increment promotion counts
+                reviewer_promotion_counts[reviewer_username]['promotions'] += 1
+                if is_iotd(vote.image):
+                    reviewer_promotion_counts[reviewer_username]['iotds'] += 1
+                elif is_top_pick(vote.image):
+                    reviewer_promotion_counts[reviewer_username]['top_picks'] += 1
+                else:
+                    score -= wasted_promotion_penalty
+                    reviewer_promotion_counts[reviewer_username]['wasted_promotions'] += 1
+            except KeyError:
+                continue
+
+    def remove_inactive_reviewers(reviewers_scores, reviewer_promotion_counts):
+        return {
+            username: score
+            for username, score in reviewers_scores.items()
+            if reviewer_promotion_counts[username]['promotions'] > 0
+        }
+
+    def prepare_dismissal_scores(dismissals):
+        for dismissal in dismissals:
+            if not dismissal.user:
+                continue
+
+            user_username = dismissal.user.username
+            image_id = dismissal.image_id
+
+            # Fetch current scores
+            dismissal_score = dismissal_scores.get(user_username, 0)
+
+            # Check if the dismissal was correct (at least settings.IOTD_MAX_DISMISSALS other dismissals)
+            correct_dismissal = image_dismissal_counts[image_id] >= settings.IOTD_MAX_DISMISSALS
+
+            if correct_dismissal:
+                dismissal_scores[user_username] = dismissal_score + correct_dismissal_reward
+                # Update correct dismissal counts
+                dismissal_counts[user_username]['correct_dismissals'] += 1
+            else:
+                if is_iotd(dismissal.image):
+                    dismissal_scores[user_username] = dismissal_score - canned_iotd_penalty
+                    dismissal_counts[user_username]['iotds'] += 1
+                elif is_top_pick(dismissal.image):
+                    dismissal_scores[user_username] = dismissal_score - canned_tp_penalty
+                    dismissal_counts[user_username]['top_picks'] += 1
+                elif is_top_pick_nomination(dismissal.image):
+                    dismissal_scores[user_username] = dismissal_score - canned_tpn_penalty
+                    dismissal_counts[user_username]['top_pick_nominations'] += 1
+
+            dismissal_counts[user_username]['dismissals'] += 1
+
+    def prepare_active_days(submissions, votes, dismissals):
+        for username in all_usernames:
+            days_with_submissions = list(
+                submissions.filter(submitter__username=username).values_list('date__date', flat=True).distinct()
+            )
+            days_with_votes = list(
+                votes.filter(reviewer__username=username).values_list('date__date', flat=True).distinct()
+            )
+            days_with_dismissals = list(
+                dismissals.filter(user__username=username).values_list('created__date', flat=True).distinct()
+            )
+            submitter_promotion_counts[username]['active_days'] = len(
+                set(days_with_submissions + days_with_votes + days_with_dismissals)
+            )
+
+    def combined_score(submitter_score, reviewer_score, dismissal_score):
+        return submitter_score + reviewer_score + dismissal_score
+
+    def combine_counts(submitter_counts, reviewer_counts):
+        combined = {}
+
+        for key in set(submitter_counts) | set(reviewer_counts):
+            combined[key] = submitter_counts.get(key, 0) + reviewer_counts.get(key, 0)
+        return combined
+
+    def prepare_combined_data():
+        combined_data = {}
+
+        for user in set(submitters_scores) | set(reviewers_scores) | set(dismissal_scores):
+            combined_data[user] = {
+                'score': combined_score(
+                    submitters_scores.get(user, Decimal('0')),
+                    reviewers_scores.get(user, Decimal('0')),
+                    dismissal_scores.get(user, Decimal('0'))
+                ),
+                'promotions': combine_counts(
+                    submitter_promotion_counts.get(user, {}),
+                    reviewer_promotion_counts.get(user, {})
+                ),
+                'dismissals': dismissal_counts.get(user, {}),
+            }
+
+        return combined_data
+
+    submissions = get_submissions()
+    dismissals = get_dismissals()
+    submissions_by_user = get_submissions_by_user(submissions)
+    dismissals_by_user = get_dismissals_by_user(dismissals)
+    votes = get_votes()
+    image_dismissal_counts = prepare_dismissals_counts(dismissals)
+    seen_images_by_user = get_seen_images_by_user()
+
+    all_usernames = set()
+    all_usernames.update(submission.submitter.username for submission in submissions if submission.submitter)
+    all_usernames.update(vote.reviewer.username for vote in votes if vote.reviewer)
+    all_usernames.update(dismissal.user.username for dismissal in dismissals if dismissal.user)
+
+    submitter_promotion_counts = {
+        username: {
+            'promotions': 0,
+            'wasted_promotions': 0,
+            'missed_iotd_promotions': 0,
+            'missed_tp_promotions': 0,
+            'missed_tpn_promotions': 0,
+            'top_pick_nominations': 0,
+            'top_picks': 0,
+            'iotds': 0,
+            'active_days': 0
+        } for username in all_usernames
+    }
+
+    reviewer_promotion_counts = {
+        username: {
+            'promotions': 0,
+            'wasted_promotions': 0,
+            'missed_iotd_promotions': 0,
+            'missed_tp_promotions': 0,
+            'missed_tpn_promotions': 0,
+            'top_pick_nominations': 0,
+            'top_picks': 0,
+            'iotds': 0,
+            'active_days': 0
+        } for username in all_usernames
+    }
+
+    dismissal_counts = {
+        username: {
+            'dismissals': 0,
+            'correct_dismissals': 0,
+            'missed_dismissals': 0,
+            'top_pick_nominations': 0,
+            'top_picks': 0,
+            'iotds': 0
+        } for username in all_usernames
+    }
+
+    prepare_submitter_scores(submissions, dismissals)
+    prepare_reviewer_scores(votes)
+    prepare_dismissal_scores(dismissals)
+    prepare_active_days(submissions, votes, dismissals)
+    reviewers_scores = remove_inactive_reviewers(reviewers_scores, reviewer_promotion_counts)
+
+    combined_data = prepare_combined_data()
+
+    # Print the merged data
+    log.debug(
+        "User,Score,Active days,Promotions/Dismissals accuracy ratio,"
+        "Promotions,Wasted Promotions,Missed IOTD Promotions,Missed TP Promotion,Missed TPN Promotions,"
+        "TPNs,TPs,IOTDs,"
+        "Dismissals,Correct Dismissals,Missed Dismissals,"
+        "TPNs,TPs,IOTDs"
+    )
+    for username, data in sorted(combined_data.items(), key=lambda item: item[1]['score'], reverse=True):
+        try:
+            promotions_dismissals_accuracy_ratio = (
+                                                           data['promotions'].get('top_pick_nominations', 0) +
+                                                           data['promotions'].get('top_picks', 0) +
+                                                           data['promotions'].get('iotds', 0)
+                                                   ) / (
+                                                           data['dismissals'].get('top_pick_nominations', 0) +
+                                                           data['dismissals'].get('top_picks', 0) +
+                                                           data['dismissals'].get('iotds', 0)
+                                                   )
+        except ZeroDivisionError:
+            promotions_dismissals_accuracy_ratio = 0
+
+        log.debug(
+            f"{username},"
+            f"{data['score']},"
+            f"{data['promotions'].get('active_days', 0)},"
+            f"{promotions_dismissals_accuracy_ratio:.2f},"
+            f"{data['promotions'].get('promotions', 0)},"
+            f"{data['promotions'].get('wasted_promotions', 0)},"
+            f"{data['promotions'].get('missed_iotd_promotions', 0)},"
+            f"{data['promotions'].get('missed_tp_promotions', 0)},"
+            f"{data['promotions'].get('missed_tpn_promotions', 0)},"
+            f"{data['promotions'].get('top_pick_nominations', 0)},"
+            f"{data['promotions'].get('top_picks', 0)},"
+            f"{data['promotions'].get('iotds', 0)},"
+            f"{data['dismissals'].get('dismissals', 0)},"
+            f"{data['dismissals'].get('correct_dismissals', 0)},"
+            f"{data['dismissals'].get('missed_dismissals', 0)},"
+            f"{data['dismissals'].get('top_pick_nominations', 0)},"
+            f"{data['dismissals'].get('top_picks', 0)},"
+            f"{data['dismissals'].get('iotds', 0)}"
+        )
+        IotdStaffMemberScore.objects.create(
+            user=User.objects.get(username=username),
+            period_start=period_start,
+            period_end=period_end,
+            score=data['score'],
+            active_days=data['promotions'].get('active_days', 0),
+            promotions_dismissals_accuracy_ratio=promotions_dismissals_accuracy_ratio,
+            promotions=data['promotions'].get('promotions', 0),
+            wasted_promotions=data['promotions'].get('wasted_promotions', 0),
+            missed_iotd_promotions=data['promotions'].get('missed_iotd_promotions', 0),
+            missed_tp_promotions=data['promotions'].get('missed_tp_promotions', 0),
+            missed_tpn_promotions=data['promotions'].get('missed_tpn_promotions', 0),
+            promotions_to_tpn=data['promotions'].get('top_pick_nominations', 0),
+            promotions_to_tp=data['promotions'].get('top_picks', 0),
+            promotions_to_iotd=data['promotions'].get('iotds', 0),
+            dismissals=data['dismissals'].get('dismissals', 0),
+            correct_dismissals=data['dismissals'].get('correct_dismissals', 0),
+            missed_dismissals=data['dismissals'].get('missed_dismissals', 0),
+            dismissals_to_tpn=data['dismissals'].get('top_pick_nominations', 0),
+            dismissals_to_tp=data['dismissals'].get('top_picks', 0),
+            dismissals_to_iotd=data['dismissals'].get('iotds', 0),
+        )
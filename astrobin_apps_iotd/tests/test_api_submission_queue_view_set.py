@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from mock import patch
+from rest_framework.test import APIClient
+
+from astrobin.tests.generators import Generators
+from astrobin_apps_iotd.api.queue_pagination import QueuePagination
+from astrobin_apps_iotd.models import IotdSubmissionQueueEntry
+from common.constants import GroupName
+from common.services import DateTimeService
+
+
+class TestApiSubmissionQueueViewSet(TestCase):
+    def _get_all_pages(self, client, url):
+        counts = []
+        pks = []
+
+        while url:
+            response = client.get(url, format='json')
+            self.assertEqual(200, response.status_code)
+            counts.append(response.data['count'])
+            pks += [x['pk'] for x in response.data['results']]
+            url = response.data['next']
+
+        return counts, pks
+
+    @patch.object(QueuePagination, 'page_size', 2)
+    def test_list_paginates_by_cursor(self):
+        submitter = Generators.user(groups=[GroupName.IOTD_SUBMITTERS])
+        images = [Generators.image() for _ in range(5)]
+        now = DateTimeService.now()
+        published = [
+            now - timedelta(hours=13),
+            now - timedelta(hours=20),
+            # Two entries with the same timestamp, across a page boundary.
+            now - timedelta(hours=30),
+            now - timedelta(hours=30),
+            now - timedelta(hours=40),
+        ]
+
+        entries = [
+            IotdSubmissionQueueEntry.objects.create(submitter=submitter, image=image, published=timestamp)
+            for image, timestamp in zip(images, published)
+        ]
+        # Not in this submitter's queue.
+        IotdSubmissionQueueEntry.objects.create(submitter=Generators.user(), image=images[0], published=published[0])
+
+        client = APIClient()
+        client.force_authenticate(user=submitter)
+        url = reverse('astrobin_apps_iotd:submission-queue-list')
+
+        newest_first = [
+            entry.image.pk for entry in sorted(entries, key=lambda x: (x.published, x.pk), reverse=True)
+        ]
+
+        counts, pks = self._get_all_pages(client, url)
+        self.assertEqual([5, 5, 5], counts)
+        self.assertEqual(newest_first, pks)
+
+        counts, pks = self._get_all_pages(client, url + '?sort=oldest')
+        self.assertEqual(list(reversed(newest_first)), pks)
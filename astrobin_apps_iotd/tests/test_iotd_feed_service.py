@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mock import ANY, patch
+
+from astrobin.tests.generators import Generators
+from astrobin_apps_iotd.models import TopPickArchive
+from astrobin_apps_iotd.tests.iotd_generators import IotdGenerators
+from astrobin_apps_iotd.services.iotd_feed_service import IotdFeedService
+from astrobin_apps_iotd.tasks import regenerate_iotd_feeds
+from common.services import DateTimeService
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+})
+class IotdFeedServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_serve_renders_once(self):
+        url = reverse('iotd_rss_iotd')
+
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        self.assertIn('rss', response['Content-Type'])
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+
+        with patch.object(IotdFeedService, 'render') as render:
+            cached_response = self.client.get(url)
+            render.assert_not_called()
+
+        self.assertEqual(200, cached_response.status_code)
+        self.assertEqual(response.content, cached_response.content)
+        self.assertEqual(response['ETag'], cached_response['ETag'])
+
+    def test_serve_conditional_requests(self):
+        url = reverse('iotd_atom_top_picks')
+        response = self.client.get(url)
+
+        with patch.object(IotdFeedService, 'render') as render:
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(304, not_modified.status_code)
+            self.assertEqual(b'', not_modified.content)
+
+            not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(304, not_modified.status_code)
+
+            modified = self.client.get(url, HTTP_IF_NONE_MATCH='"foo"')
+            self.assertEqual(200, modified.status_code)
+
+            render.assert_not_called()
+
+    @patch('astrobin.models.Image.thumbnail', return_value='https://cdn.astrobin.com/thumbnail.jpg')
+    def test_render_keeps_last_modified_if_unchanged(self, thumbnail):
+        TopPickArchive.objects.bulk_create([TopPickArchive(image=Generators.image(published=datetime.now()))])
+        first = IotdFeedService.render('iotd_rss_top_picks')
+
+        with patch('astrobin_apps_iotd.services.iotd_feed_service.time.time') as time:
+            time.return_value = first['last_modified'] + 60
+            second = IotdFeedService.render('iotd_rss_top_picks')
+
+        self.assertEqual(first['etag'], second['etag'])
+        self.assertEqual(first['last_modified'], second['last_modified'])
+
+    @patch('astrobin_apps_iotd.tasks.regenerate_iotd_feeds.apply_async')
+    def test_top_pick_schedules_regeneration_once(self, apply_async):
+        TopPickArchive.objects.create(image=Generators.image())
+        TopPickArchive.objects.create(image=Generators.image())
+
+        apply_async.assert_called_once_with(args=(sorted(IotdFeedService.TOP_PICK_FEEDS.keys()),), countdown=30)
+
+    @patch('astrobin_apps_iotd.tasks.regenerate_iotd_feeds.apply_async')
+    def test_featured_image_change_schedules_regeneration(self, apply_async):
+        iotd = IotdGenerators.iotd()
+        image = Generators.image()
+        cache.clear()
+        apply_async.reset_mock()
+
+        image.title = 'Foo'
+        image.save()
+        apply_async.assert_not_called()
+
+        iotd.image.title = 'Foo'
+        iotd.image.save()
+        apply_async.assert_called_once_with(args=(sorted(IotdFeedService.IOTD_FEEDS.keys()),), countdown=30)
+
+        TopPickArchive.objects.create(image=image)
+        cache.clear()
+        apply_async.reset_mock()
+
+        image.delete()
+        apply_async.assert_called_once_with(args=(sorted(IotdFeedService.TOP_PICK_FEEDS.keys()),), countdown=30)
+
+    def test_render_does_not_expire(self):
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            IotdFeedService.render('iotd_rss_iotd')
+
+        cache_set.assert_called_once_with(IotdFeedService.CACHE_KEY % 'iotd_rss_iotd', ANY, None)
+
+    @patch('astrobin_apps_iotd.tasks.regenerate_iotd_feeds.apply_async')
+    def test_serve_rendering_of_a_previous_day(self, apply_async):
+        url = reverse('iotd_rss_iotd')
+        rendered = IotdFeedService.render('iotd_rss_iotd')
+        rendered['day'] = DateTimeService.today() - timedelta(days=1)
+        cache.set(IotdFeedService.CACHE_KEY % 'iotd_rss_iotd', rendered, None)
+
+        with patch.object(IotdFeedService, 'render') as render:
+            response = self.client.get(url)
+            self.client.get(url)
+            render.assert_not_called()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(rendered['content'], response.content)
+        apply_async.assert_called_once_with(args=(sorted(IotdFeedService.FEEDS.keys()),), countdown=30)
+
+    @patch.object(IotdFeedService, 'RENDER_WAIT', 0)
+    def test_serve_while_another_request_renders(self):
+        cache.add(IotdFeedService.RENDER_LOCK_CACHE_KEY % 'iotd_rss_iotd', True, 60)
+
+        with patch.object(IotdFeedService, 'render') as render:
+            response = self.client.get(reverse('iotd_rss_iotd'))
+            render.assert_not_called()
+
+        self.assertEqual(503, response.status_code)
+
+    @patch.object(IotdFeedService, 'regenerate')
+    def test_regenerate_all_feeds(self, regenerate):
+        regenerate_iotd_feeds()
+
+        regenerate.assert_called_once_with(IotdFeedService.FEEDS.keys())
+
+    @patch('astrobin_apps_iotd.tasks.regenerate_iotd_feeds.apply_async')
+    def test_get_feeds_featuring_uses_the_cached_ids(self, apply_async):
+        iotd = IotdGenerators.iotd()
+        top_pick = TopPickArchive.objects.create(image=Generators.image())
+        image = Generators.image()
+        IotdFeedService.update_featured_image_ids()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(IotdFeedService.IOTD_FEEDS), IotdFeedService.get_feeds_featuring(iotd.image_id))
+            self.assertEqual(
+                list(IotdFeedService.TOP_PICK_FEEDS), IotdFeedService.get_feeds_featuring(top_pick.image_id)
+            )
+            self.assertEqual([], IotdFeedService.get_feeds_featuring(image.pk))
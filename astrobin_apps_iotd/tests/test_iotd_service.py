@@ -14,7 +14,7 @@ from astrobin.tests.generators import Generators
 from astrobin_apps_equipment.tests.equipment_generators import EquipmentGenerators
 from astrobin_apps_iotd.models import (
     Iotd, IotdDismissedImage, IotdJudgementQueueEntry, IotdQueueSortOrder, IotdReviewQueueEntry,
-    IotdStaffMemberSettings, IotdSubmission,
+    IotdStaffMemberSettings, IotdSubmission, IotdSubmissionQueueEntry,
     IotdVote,
 )
 from astrobin_apps_iotd.services import IotdService
@@ -901,6 +901,35 @@ class IotdServiceTest(TestCase):
                 .exists()
         )
 
+    def test_update_submission_queues_only_writes_changes(self):
+        user = Generators.user()
+        Generators.premium_subscription(user, SubscriptionName.ULTIMATE_2020)
+        image1 = Generators.image(user=user, submitted_for_iotd_tp_consideration=datetime.now())
+        image2 = Generators.image(user=user, submitted_for_iotd_tp_consideration=datetime.now())
+
+        submitter = Generators.user(groups=[GroupName.IOTD_SUBMITTERS])
+        image1.designated_iotd_submitters.add(submitter)
+        image2.designated_iotd_submitters.add(submitter)
+
+        update_submission_queues()
+
+        entry1 = IotdSubmissionQueueEntry.objects.get(submitter=submitter, image=image1)
+
+        IotdDismissedImage.objects.create(user=submitter, image=image2)
+
+        with patch('astrobin_apps_iotd.services.iotd_service.ImageService.clear_badges_cache') as clear_badges_cache:
+            update_submission_queues()
+            self.assertEqual(1, clear_badges_cache.call_count)
+
+        # The entry that stays is the same row, and the dismissed image is gone.
+        self.assertEqual(
+            [entry1.pk], list(IotdSubmissionQueueEntry.objects.filter(submitter=submitter).values_list('pk', flat=True))
+        )
+
+        with patch('astrobin_apps_iotd.services.iotd_service.ImageService.clear_badges_cache') as clear_badges_cache:
+            update_submission_queues()
+            clear_badges_cache.assert_not_called()
+
     @override_settings(IOTD_SUBMISSION_MIN_PROMOTIONS=2)
     def test_get_review_queue_own_image(self):
         submitter = Generators.user(groups=[GroupName.IOTD_SUBMITTERS])
@@ -0,0 +1,209 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from astrobin.enums import SubjectType
+from astrobin.enums.data_source import DataSource
+from astrobin.models import Image
+from astrobin.tests.generators import Generators
+from astrobin_apps_iotd.models import (
+    Iotd, IotdDismissedImage, IotdStaffMemberScore, IotdStats, IotdSubmission, IotdSubmitterSeenImage, IotdVote,
+    TopPickArchive, TopPickNominationsArchive,
+)
+from astrobin_apps_iotd.services.iotd_stats_service import IotdStatsService
+from astrobin_apps_iotd.tests import legacy_iotd_stats
+
+
+class IotdStatsServiceTest(TestCase):
+    def _image(self, subject_type, data_source, published, user=None):
+        image = Generators.image(user=user) if user else Generators.image()
+        Image.objects_including_wip.filter(pk=image.pk).update(
+            subject_type=subject_type,
+            data_source=data_source,
+            published=published,
+            submitted_for_iotd_tp_consideration=published,
+        )
+        return image
+
+    def _stats(self, stats: IotdStats) -> dict:
+        return {
+            field.name: getattr(stats, field.name)
+            for field in IotdStats._meta.fields if field.name not in ('id', 'created', 'computation_time')
+        }
+
+    def _scores(self) -> dict:
+        excluded = ('id', 'created', 'user', 'period_start', 'period_end')
+        return {
+            score['user']: {key: value for key, value in score.items() if key not in excluded}
+            for score in IotdStaffMemberScore.objects.values()
+        }
+
+    def _legacy_and_new_scores(self, period_start: datetime, period_end: datetime):
+        legacy_iotd_stats.calculate_iotd_staff_members_stats(period_start, period_end)
+        legacy = self._scores()
+        IotdStaffMemberScore.objects.all().delete()
+
+        IotdStatsService.calculate_staff_member_scores(period_start, period_end)
+
+        return legacy, self._scores()
+
+    def test_compute_stats_matches_legacy(self):
+        now = datetime.now()
+        user = Generators.user()
+        judge = Generators.user()
+
+        recent = [
+            self._image(SubjectType.DEEP_SKY, DataSource.BACKYARD, now - timedelta(days=1), user=user),
+            self._image(SubjectType.DEEP_SKY, DataSource.OWN_REMOTE, now - timedelta(days=2)),
+            self._image(SubjectType.SOLAR_SYSTEM, DataSource.BACKYARD, now - timedelta(days=3), user=user),
+            self._image(SubjectType.WIDE_FIELD, DataSource.PRO_DATA, now - timedelta(days=4)),
+            self._image(SubjectType.LANDSCAPE, DataSource.TRAVELLER, now - timedelta(days=5)),
+            self._image(SubjectType.ARTIFICIAL_SATELLITE, DataSource.UNKNOWN, now - timedelta(days=6)),
+            self._image(SubjectType.GEAR, DataSource.BACKYARD, now - timedelta(days=7)),
+            self._image(SubjectType.STAR_TRAILS, DataSource.MIX, now - timedelta(days=40)),
+        ]
+        old = [
+            self._image(SubjectType.DEEP_SKY, DataSource.BACKYARD, now - timedelta(days=400)),
+            self._image(SubjectType.NORTHERN_LIGHTS, DataSource.MIX, now - timedelta(days=500)),
+        ]
+        wip = self._image(SubjectType.DEEP_SKY, DataSource.BACKYARD, now - timedelta(days=1))
+        uploading = self._image(SubjectType.DEEP_SKY, DataSource.BACKYARD, now - timedelta(days=1))
+        deleted = self._image(SubjectType.DEEP_SKY, DataSource.BACKYARD, now - timedelta(days=1))
+        Image.all_objects.filter(pk=wip.pk).update(is_wip=True)
+        Image.all_objects.filter(pk=uploading.pk).update(uploader_in_progress=True)
+        Image.all_objects.filter(pk=deleted.pk).update(deleted=now)
+
+        Iotd.objects.bulk_create([
+            Iotd(judge=judge, image=recent[0], date=date.today() - timedelta(days=1)),
+            Iotd(judge=judge, image=recent[1], date=date.today() - timedelta(days=2)),
+            Iotd(judge=judge, image=recent[7], date=date.today() - timedelta(days=40)),
+            Iotd(judge=judge, image=old[0], date=date.today() - timedelta(days=400)),
+        ])
+        TopPickArchive.objects.bulk_create(
+            [TopPickArchive(image=x) for x in (recent[0], recent[2], recent[3], recent[7], old[1], deleted)]
+        )
+        TopPickNominationsArchive.objects.bulk_create(
+            [TopPickNominationsArchive(image=x) for x in recent + old + [wip]]
+        )
+
+        for days in (30, 365, 1000):
+            self.assertEqual(
+                self._stats(legacy_iotd_stats.update_stats(days)),
+                self._stats(IotdStatsService.update_stats(days)),
+            )
+
+    def test_update_stats(self):
+        stats = IotdStatsService.update_stats(30)
+
+        self.assertEqual(1, IotdStats.objects.count())
+        self.assertEqual(30, stats.days)
+        self.assertIsNotNone(stats.computation_time)
+
+    @override_settings(IOTD_MAX_DISMISSALS=2)
+    def test_calculate_staff_member_scores_matches_legacy(self):
+        # Every seen image has a dismissal in the period, and every seen image that its submitter didn't promote has
+        # an award: the legacy implementation gets those two cases wrong, and they have their own tests below.
+        now = datetime.now()
+        judge = Generators.user()
+        s1, s2, s3, r1, r2, d1 = [Generators.user() for _ in range(6)]
+        a, b, c, d, e, f, g, h = [Generators.image() for _ in range(8)]
+        Image.all_objects.filter(pk=h.pk).update(deleted=now)
+        Image.all_objects.filter(pk=g.pk).update(is_wip=True)
+
+        Iotd.objects.bulk_create([Iotd(judge=judge, image=a, date=date.today())])
+        TopPickArchive.objects.bulk_create([TopPickArchive(image=x) for x in (a, b, f, g)])
+        TopPickNominationsArchive.objects.bulk_create([TopPickNominationsArchive(image=x) for x in (a, b, c, g)])
+
+        IotdSubmission.objects.bulk_create(
+            [IotdSubmission(submitter=s1, image=x) for x in (a, b, d, e)] +
+            [IotdSubmission(submitter=s2, image=x) for x in (c, f, g)] +
+            [IotdSubmission(submitter=s3, image=x) for x in (a, e)]
+        )
+        IotdSubmission.objects.filter(submitter=s1, image=a).update(date=now - timedelta(days=3))
+        IotdSubmission.objects.filter(submitter=s3, image=e).update(date=now - timedelta(days=30))
+        IotdVote.objects.bulk_create(
+            [IotdVote(reviewer=r1, image=x) for x in (a, c, f)] + [IotdVote(reviewer=r2, image=x) for x in (b, d)]
+        )
+        IotdVote.objects.filter(reviewer=r2, image=d).update(date=now - timedelta(days=2))
+        IotdDismissedImage.objects.bulk_create([
+            IotdDismissedImage(user=s1, image=b),
+            IotdDismissedImage(user=s2, image=e),
+            IotdDismissedImage(user=r1, image=e),
+            IotdDismissedImage(user=r1, image=d),
+            IotdDismissedImage(user=s3, image=d),
+            IotdDismissedImage(user=d1, image=a),
+            IotdDismissedImage(user=d1, image=f),
+            IotdDismissedImage(user=d1, image=g),
+            IotdDismissedImage(user=d1, image=h),
+        ])
+        IotdSubmitterSeenImage.objects.bulk_create([
+            IotdSubmitterSeenImage(user=s1, image=x) for x in (b, c, d, e, h)
+        ] + [
+            IotdSubmitterSeenImage(user=s2, image=x) for x in (a, b, g)
+        ] + [
+            IotdSubmitterSeenImage(user=s3, image=x) for x in (a, b, f)
+        ])
+        # Seen before the period, so it's not a missed promotion.
+        IotdSubmitterSeenImage.objects.filter(user=s1, image=c).update(created=now - timedelta(days=20))
+
+        legacy, new = self._legacy_and_new_scores(now - timedelta(days=10), now + timedelta(hours=1))
+
+        self.assertEqual({s1.pk, s2.pk, s3.pk, r1.pk, r2.pk, d1.pk}, set(new))
+        self.assertEqual(legacy, new)
+        self.assertEqual(2, new[s1.pk]['missed_dismissals'])
+        self.assertEqual(1, new[s2.pk]['missed_iotd_promotions'])
+        self.assertEqual(2, new[s3.pk]['missed_tp_promotions'])
+
+    @override_settings(IOTD_MAX_DISMISSALS=2)
+    def test_calculate_staff_member_scores_unawarded_seen_image_does_not_reset_the_score(self):
+        # The legacy implementation reset the submitter's score to 0 when they saw an image that they didn't promote
+        # and that didn't get any awards, and it gave a score to the submitters that only saw images.
+        now = datetime.now()
+        judge = Generators.user()
+        submitter, spectator, dismisser = [Generators.user() for _ in range(3)]
+        awarded, unawarded = [Generators.image() for _ in range(2)]
+
+        Iotd.objects.bulk_create([Iotd(judge=judge, image=awarded, date=date.today())])
+        IotdSubmission.objects.bulk_create([IotdSubmission(submitter=submitter, image=awarded)])
+        IotdDismissedImage.objects.bulk_create(
+            [IotdDismissedImage(user=dismisser, image=x) for x in (awarded, unawarded)]
+        )
+        IotdSubmitterSeenImage.objects.bulk_create(
+            [IotdSubmitterSeenImage(user=x, image=unawarded) for x in (submitter, spectator)]
+        )
+
+        legacy, new = self._legacy_and_new_scores(now - timedelta(days=10), now + timedelta(hours=1))
+
+        self.assertEqual(Decimal('0'), legacy[submitter.pk]['score'])
+        self.assertEqual(Decimal('0'), legacy[spectator.pk]['score'])
+        self.assertEqual(Decimal('4'), new[submitter.pk]['score'])
+        self.assertNotIn(spectator.pk, new)
+        self.assertEqual(legacy[dismisser.pk], new[dismisser.pk])
+
+    @override_settings(IOTD_MAX_DISMISSALS=2)
+    def test_calculate_staff_member_scores_seen_image_without_dismissals(self):
+        # The legacy implementation raised a KeyError on a seen image that nobody dismissed in the period, and that
+        # ended the processing of the submitter's seen images.
+        now = datetime.now()
+        judge = Generators.user()
+        submitter = Generators.user()
+        promoted, iotd, tpn = [Generators.image() for _ in range(3)]
+
+        Iotd.objects.bulk_create([Iotd(judge=judge, image=iotd, date=date.today())])
+        TopPickNominationsArchive.objects.bulk_create([TopPickNominationsArchive(image=x) for x in (promoted, tpn)])
+        IotdSubmission.objects.bulk_create([IotdSubmission(submitter=submitter, image=promoted)])
+        IotdSubmitterSeenImage.objects.bulk_create(
+            [IotdSubmitterSeenImage(user=submitter, image=x) for x in (iotd, tpn)]
+        )
+
+        legacy, new = self._legacy_and_new_scores(now - timedelta(days=10), now + timedelta(hours=1))
+
+        # Only the first seen image was processed, whichever it was.
+        self.assertEqual(
+            1, legacy[submitter.pk]['missed_iotd_promotions'] + legacy[submitter.pk]['missed_tpn_promotions']
+        )
+        # +1 (TPN) -2 (missed IOTD) -0.5 (missed TPN)
+        self.assertEqual(Decimal('-1.5'), new[submitter.pk]['score'])
+        self.assertEqual(1, new[submitter.pk]['missed_iotd_promotions'])
+        self.assertEqual(1, new[submitter.pk]['missed_tpn_promotions'])
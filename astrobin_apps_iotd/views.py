@@ -18,6 +18,7 @@ from astrobin_apps_iotd.models import (
     IotdVote,
 )
 from astrobin_apps_iotd.services import IotdService
+from astrobin_apps_iotd.services.iotd_feed_service import IotdFeedService
 from common.services.caching_service import CachingService
 
 log = logging.getLogger(__name__)
@@ -80,3 +81,11 @@ class ImageStats(JsonRequestResponseMixin, base.View):
         }
 
         return self.render_json_response(data)
+
+
+class IotdFeedView(base.View):
+    # The url name of the feed, see IotdFeedService.FEEDS.
+    feed_name = None
+
+    def get(self, request, *args, **kwargs):
+        return IotdFeedService.serve(request, self.feed_name)
@@ -1,9 +1,12 @@
 import logging
 from datetime import datetime, timedelta
+from typing import List, Set, Tuple
 
 import persistent_messages
 from django.conf import settings
-from django.core.mail import send_mail
+from django.contrib.auth.models import User
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.db.models import Count
 from django.template import TemplateDoesNotExist
 from django.template.loader import get_template, render_to_string
 from django.utils.safestring import mark_safe
@@ -21,45 +24,65 @@ log = logging.getLogger(__name__)
 class PersistentMessagesBackend(BaseBackend):
     spam_sensitivity = 1
 
-    def deliver(self, recipient, sender, notice_type, extra_context):
+    def render(self, notice_type, extra_context):
         context = self.default_context()
         context.update(extra_context)
 
+        template = 'notice.html'
+        return self.get_formatted_messages([template], notice_type.label, context)[template]
+
+    @staticmethod
+    def build_message(recipient, sender, message):
+        # type: (User, User, str) -> Message
+        return Message(user=recipient, from_user=sender, level=persistent_messages.INFO, message=message)
+
+    def deliver(self, recipient, sender, notice_type, extra_context):
         if UserService(recipient).shadow_bans(sender):
             log.debug("On-site notice %s not sent because of shadow ban: %s -> %s" % (notice_type, recipient, sender))
             return
 
-        template = 'notice.html'
-        message = self.get_formatted_messages([template], notice_type.label, context)[template]
-        level = persistent_messages.INFO
-        persistent_message = Message(user=recipient, from_user=sender, level=level, message=message)
-        persistent_message.save()
+        self.build_message(recipient, sender, self.render(notice_type, extra_context)).save()
 
 
 class EmailBackend(BaseEmailBackend):
-    def can_send(self, user, notice_type):
+    @staticmethod
+    def get_unreachable_addresses(addresses):
+        # type: (List[str]) -> Set[str]
         hard_bounces = Bounce.objects.filter(
             hard=True,
             bounce_type="Permanent",
-            address=user.email)
+            address__in=addresses).values_list('address', flat=True)
         soft_bounces = Bounce.objects.filter(
             hard=False,
             bounce_type="Transient",
-            address=user.email,
-            created_at__gte=datetime.now() - timedelta(days=7))
+            address__in=addresses,
+            created_at__gte=datetime.now() - timedelta(days=7)
+        ).values('address').annotate(count=Count('pk')).filter(count__gt=2).order_by().values_list('address', flat=True)
         complaints = Complaint.objects.filter(
-            address=user.email)
+            address__in=addresses).values_list('address', flat=True)
+
+        return set(hard_bounces) | set(soft_bounces) | set(complaints)
+
+    @staticmethod
+    def is_reachable(user):
+        # type: (User) -> bool
         deleted = user.userprofile.deleted is not None
         ignored = 'ASTROBIN_IGNORE' in user.email
         last_seen = user.userprofile.last_seen or user.last_login
         inactive = last_seen is None or last_seen < datetime.now() - timedelta(days=180)
 
-        if deleted or hard_bounces.exists() or soft_bounces.count() > 2 or complaints or ignored or inactive:
+        return not (deleted or ignored or inactive)
+
+    def can_send(self, user, notice_type):
+        if not self.is_reachable(user) or user.email in self.get_unreachable_addresses([user.email]):
             return False
 
         return super(EmailBackend, self).can_send(user, notice_type)
 
-    def deliver(self, recipient, sender, notice_type, extra_context):
+    def render(self, recipient, sender, notice_type, extra_context):
+        """
+        Renders the parts of the email that are the same for every recipient of the notice, when `recipient` is None.
+        """
         context = self.default_context()
         context.update({
             "recipient": recipient,
@@ -68,10 +91,6 @@ class EmailBackend(BaseEmailBackend):
         })
         context.update(extra_context)
 
-        if UserService(recipient).shadow_bans(sender):
-            log.debug("Email notice %s not sent because of shadow ban: %s -> %s" % (notice_type, recipient, sender))
-            return
-
         messages = self.get_formatted_messages((
             "short.txt",
             "full.txt",
@@ -82,23 +101,56 @@ class EmailBackend(BaseEmailBackend):
             "message": messages["short.txt"],
         })).splitlines())
 
-        body = render_to_string("notification/email_body.txt", dict(context, **{
-            "message": messages["full.txt"]
-        }))
-
         try:
             get_template("notification/%s/full.html" % notice_type.label)
             message = messages["full.html"]
         except TemplateDoesNotExist:
             message = messages["full.txt"]
 
+        return dict(context=context, subject=subject, text_message=messages["full.txt"], html_message=message)
+
+    @staticmethod
+    def render_body(recipient, rendered):
+        # type: (User, dict) -> Tuple[str, str]
+        context = dict(rendered["context"], recipient=recipient)
+
+        body = render_to_string("notification/email_body.txt", dict(context, **{
+            "message": rendered["text_message"]
+        }))
+
         html_body = render_to_string("notification/email_body.html", dict(context, **{
-            "message": mark_safe(str(message))
+            "message": mark_safe(str(rendered["html_message"]))
         }))
 
+        return body, html_body
+
+    @staticmethod
+    def get_address(recipient):
+        # type: (User) -> str
+        return settings.EMAIL_DEV_RECIPIENT if settings.SEND_EMAILS == 'dev' else recipient.email
+
+    @staticmethod
+    def build_email(recipient, rendered):
+        # type: (User, dict) -> EmailMultiAlternatives
+        body, html_body = EmailBackend.render_body(recipient, rendered)
+
+        email = EmailMultiAlternatives(
+            rendered["subject"], body, settings.DEFAULT_FROM_EMAIL, [EmailBackend.get_address(recipient)])
+        email.attach_alternative(html_body, "text/html")
+
+        return email
+
+    def deliver(self, recipient, sender, notice_type, extra_context):
+        if UserService(recipient).shadow_bans(sender):
+            log.debug("Email notice %s not sent because of shadow ban: %s -> %s" % (notice_type, recipient, sender))
+            return
+
+        rendered = self.render(recipient, sender, notice_type, extra_context)
+        body, html_body = self.render_body(recipient, rendered)
+
         send_mail(
-            subject,
+            rendered["subject"],
             body,
             settings.DEFAULT_FROM_EMAIL,
-            [settings.EMAIL_DEV_RECIPIENT if settings.SEND_EMAILS == 'dev' else recipient.email],
+            [self.get_address(recipient)],
             html_message=html_body)
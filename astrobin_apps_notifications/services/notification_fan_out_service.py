@@ -0,0 +1,137 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import get_connection
+from django.utils import translation
+from notification.models import NOTICE_MEDIA_DEFAULTS, NOTIFICATION_BACKENDS, NoticeSetting, NoticeType
+from persistent_messages.models import Message
+
+from astrobin.models import UserProfile
+from astrobin_apps_notifications.backends import EmailBackend, PersistentMessagesBackend
+from astrobin_apps_notifications.utils import add_notification_urls, clear_notifications_template_caches
+from common.services import DateTimeService
+
+log = logging.getLogger(__name__)
+
+
+class NotificationFanOutService:
+    """
+    Sends a notice with the same content to many recipients, e.g. a new image to the followers of its author and
+    equipment. `notification.send` does everything recipient by recipient; here, the recipients are loaded in chunks,
+    and for each chunk the preferences, shadow bans and email bounces are fetched at once, the on-site messages are
+    bulk created, the emails are handed to the email backend together, and the notifications caches are cleared
+    together. The messages are rendered once per language: only the email body, that greets the recipient, is
+    rendered for each of them.
+    """
+
+    @staticmethod
+    def _get_preferences(users: List[User], notice_type: NoticeType) -> Dict[Tuple[int, int], bool]:
+        # (User id, medium id): send. Like `NoticeSetting.for_user`, saves the default for the missing settings.
+        preferences = {
+            (user_id, int(medium)): send
+            for user_id, medium, send in NoticeSetting.objects.filter(
+                user__in=users, notice_type=notice_type
+            ).values_list('user_id', 'medium', 'send')
+        }
+
+        missing = []
+        for user in users:
+            for medium_id, medium_label in NOTIFICATION_BACKENDS.keys():
+                if (user.pk, medium_id) not in preferences:
+                    send = NOTICE_MEDIA_DEFAULTS[medium_id] <= notice_type.default
+                    preferences[(user.pk, medium_id)] = send
+                    missing.append(NoticeSetting(user=user, notice_type=notice_type, medium=medium_id, send=send))
+
+        NoticeSetting.objects.bulk_create(missing, ignore_conflicts=True)
+
+        return preferences
+
+    @staticmethod
+    def _get_shadow_banning_user_ids(users: List[User], sender: Optional[User]) -> Set[int]:
+        if sender is None or not hasattr(sender, 'userprofile'):
+            return set()
+
+        return set(
+            UserProfile.objects.filter(
+                user__in=users, shadow_bans=sender.userprofile
+            ).values_list('user_id', flat=True)
+        )
+
+    @staticmethod
+    def _get_language(user: User) -> str:
+        # Like `notification.send`, falls back to the current language if the user doesn't have one.
+        profile: Optional[UserProfile] = getattr(user, 'userprofile', None)
+        return profile.language if profile and profile.language else translation.get_language()
+
+    @staticmethod
+    def _send_chunk(users: List[User], sender: Optional[User], notice_type: NoticeType, data: dict, rendered: Dict):
+        preferences = NotificationFanOutService._get_preferences(users, notice_type)
+        shadow_banning_user_ids = NotificationFanOutService._get_shadow_banning_user_ids(users, sender)
+        unreachable_addresses = EmailBackend.get_unreachable_addresses([x.email for x in users if x.email])
+
+        messages: List[Message] = []
+        emails = []
+
+        for user in users:
+            if user.pk in shadow_banning_user_ids:
+                log.debug("Notice %s not sent because of shadow ban: %s -> %s" % (notice_type, user, sender))
+                continue
+
+            language = NotificationFanOutService._get_language(user)
+
+            with translation.override(language):
+                for (medium_id, medium_label), backend in NOTIFICATION_BACKENDS.items():
+                    if not preferences[(user.pk, medium_id)]:
+                        continue
+
+                    key = (language, medium_id)
+
+                    if isinstance(backend, PersistentMessagesBackend):
+                        if key not in rendered:
+                            rendered[key] = backend.render(notice_type, data)
+                        messages.append(backend.build_message(user, sender, rendered[key]))
+                    elif isinstance(backend, EmailBackend):
+                        if not user.email or user.email in unreachable_addresses or not backend.is_reachable(user):
+                            continue
+                        if key not in rendered:
+                            rendered[key] = backend.render(None, sender, notice_type, data)
+                        emails.append(backend.build_email(user, rendered[key]))
+                    elif backend.can_send(user, notice_type):
+                        backend.deliver(user, sender, notice_type, data)
+
+        if messages:
+            Message.objects.bulk_create(messages)
+            # `bulk_create` doesn't send `post_save`, whose receiver updates this for a single message.
+            UserProfile.objects.filter(user__in=[x.user for x in messages]).update(
+                last_notification_update=DateTimeService.now()
+            )
+
+        clear_notifications_template_caches([x.username for x in users])
+
+        if emails:
+            get_connection().send_messages(emails)
+
+        log.debug(
+            "Notice %s sent to %d users: %d on-site messages, %d emails" % (
+                notice_type, len(users), len(messages), len(emails))
+        )
+
+    @staticmethod
+    def send(recipient_pks: Iterable[int], sender: Optional[User], label: str, data: dict):
+        recipient_pks = sorted(set(recipient_pks) - {sender.pk if sender else None})
+
+        if len(recipient_pks) == 0:
+            return
+
+        notice_type = NoticeType.objects.get(label=label)
+        add_notification_urls(data)
+
+        # (Language, medium id): the rendered message, reused across chunks.
+        rendered = {}
+        chunk_size = settings.NOTIFICATION_FAN_OUT_CHUNK_SIZE
+
+        for i in range(0, len(recipient_pks), chunk_size):
+            users = list(User.objects.filter(pk__in=recipient_pks[i:i + chunk_size]).select_related('userprofile'))
+            NotificationFanOutService._send_chunk(users, sender, notice_type, data, rendered)
@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from celery import shared_task
@@ -6,11 +7,13 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.core.management import call_command
+from django.db.models import Q
 from django.utils import formats
 from django_bouncy.models import Bounce, Complaint, Delivery
 
 from astrobin.models import Image, ImageRevision
 from astrobin_apps_equipment.services import EquipmentService
+from astrobin_apps_notifications.services.notification_fan_out_service import NotificationFanOutService
 from astrobin_apps_notifications.utils import build_notification_url, push_notification
 from common.services import DateTimeService
 from toggleproperties.models import ToggleProperty
@@ -84,133 +87,108 @@ def push_notification_for_new_image(image_pk: int):
         logger.error('push_notification_for_new_image called for image that is wip: %d' % image_pk)
         return
 
-    def get_image_followers():
-        user_pks = [image.user.pk] + list(image.collaborators.all().values_list('pk', flat=True))
-
-        return list(set([x.user for x in ToggleProperty.objects.filter(
-            property_type="follow",
-            content_type=ContentType.objects.get_for_model(User),
-            object_id__in=user_pks
-        ).order_by('object_id')]))
-
-    def get_equipment_dictionary():
+    def get_equipment_items():
         """
-        Returns a dictionary of equipment items and their followers, like this:
+        Returns the equipment items of the image by content type and pk, in the order of the usage classes, like this:
         {
-            'telescope-1': {
-                'item': <Telescope: 1>,
-                'followers': [<User: 1>, <User: 2>]
-            },
-            'camera-1': {
-                'item': <Camera: 1>,
-                'followers': [<User: 1>, <User: 3>]
-            },
+            (<ContentType: telescope>.pk, 1): <Telescope: 1>,
+            (<ContentType: camera>.pk, 1): <Camera: 1>,
         }
         """
         val = {}
 
         for equipment_item_class in EquipmentService.usage_classes():
             for equipment_item in getattr(image, equipment_item_class).all().iterator():
-                key = f'{equipment_item.klass}-{equipment_item.pk}'  # unique key
-
-                # Initialize the nested dictionary if it doesn't exist
-                if key not in val:
-                    val[key] = {"item": equipment_item, "followers": []}
-
-                # Create the list of ToggleProperty objects
-                equipment_item_followers = list(
-                    set(
-                        x.user for x in ToggleProperty.objects.filter(
-                            property_type="follow",
-                            content_type=ContentType.objects.get_for_model(equipment_item),
-                            object_id=equipment_item.pk
-                        ).order_by('object_id')
-                    )
-                )
-
-                val[key]["followers"].extend(equipment_item_followers)
-                val[key]["followers"] = list(set(val[key]["followers"]))
+                # An item can be used in more than one way, e.g. as imaging and guiding telescope.
+                key = (ContentType.objects.get_for_model(equipment_item).pk, equipment_item.pk)
+                val.setdefault(key, equipment_item)
 
         return val
 
-    def get_user_equipment_dictionary():
+    def get_followed_objects():
         """
-        Returns a dictionary of users and their equipment items, like this:
+        Returns the followers of the authors of the image and of its equipment items, and what they follow, with a
+        single query, like this:
         {
-            1: {
-                'user': <User: 1>,
-                'items': [<Telescope: 1>, <Camera: 1>]
-            },
-            2: {
-                'user': <User: 2>,
-                'items': [<Telescope: 1>]
-            },
-            3: {
-                'user': <User: 3>,
-                'items': [<Camera: 1>]
-            },
+            1: {(<ContentType: user>.pk, 1), (<ContentType: telescope>.pk, 1)},
+            2: {(<ContentType: telescope>.pk, 1)},
+            3: {(<ContentType: camera>.pk, 1)},
         }
         """
-        val = {}
+        user_pks = [image.user.pk] + list(image.collaborators.all().values_list('pk', flat=True))
+        followed = Q(content_type=user_content_type, object_id__in=user_pks)
+
+        equipment_item_pks = defaultdict(list)
+        for content_type_pk, equipment_item_pk in equipment_items.keys():
+            equipment_item_pks[content_type_pk].append(equipment_item_pk)
+        for content_type_pk, pks in equipment_item_pks.items():
+            followed |= Q(content_type_id=content_type_pk, object_id__in=pks)
 
-        for key in equipment_dictionary.keys():
-            equipment_item = equipment_dictionary[key]['item']
-            followers = equipment_dictionary[key]['followers']
-            if len(followers) > 0:
-                for x in followers:
-                    if x.pk not in val:
-                        val[x.pk] = {'user': x, 'items': []}
-                    val[x.pk]['items'].append(equipment_item)
+        val = defaultdict(set)
+
+        for user_pk, content_type_pk, object_id in ToggleProperty.objects.filter(
+                followed,
+                property_type="follow",
+                user__isnull=False
+        ).order_by('user_id').values_list('user_id', 'content_type_id', 'object_id'):
+            val[user_pk].add((content_type_pk, object_id))
 
         return val
 
-    user_followers = get_image_followers()
-    equipment_dictionary = get_equipment_dictionary()
-    user_equipment_dictionary = get_user_equipment_dictionary()
+    user_content_type = ContentType.objects.get_for_model(User)
+    equipment_items = get_equipment_items()
+    followed_objects = get_followed_objects()
     thumb = image.thumbnail_raw('gallery', None, sync=True)
-    new_image_sent_to = []
-
-    if len(user_followers) > 0:
-        for follower in user_followers:
-            new_image_sent_to.append(follower)
-            push_notification(
-                [follower],
-                image.user,
-                'new_image',
-                {
-                    'preheader': image.title,
-                    'image': image,
-                    'image_thumbnail': thumb.url if thumb else None,
-                    'followed_equipment_items': user_equipment_dictionary[follower.pk]['items']
-                    if follower.pk in user_equipment_dictionary else [],
-                }
-            )
-    else:
+
+    # Followers of the authors get `new_image`, the others `new-image-from-followed-equipment`. Followers who get the
+    # same notice for the same equipment items get the same message, so they are notified together.
+    new_image_recipients = defaultdict(list)
+    new_image_from_followed_equipment_recipients = defaultdict(list)
+
+    for user_pk, followed in followed_objects.items():
+        followed_equipment_item_keys = tuple(x for x in equipment_items.keys() if x in followed)
+        if any(content_type_pk == user_content_type.pk for content_type_pk, object_id in followed):
+            new_image_recipients[followed_equipment_item_keys].append(user_pk)
+        else:
+            new_image_from_followed_equipment_recipients[followed_equipment_item_keys].append(user_pk)
+
+    if len(new_image_recipients) == 0:
         logger.info(
             'push_notification_for_new_image called for image %d whose author %d has no followers' % (
                 image.pk, image.user.pk)
         )
 
-    for key in user_equipment_dictionary.keys():
-        follower = user_equipment_dictionary[key]['user']
-        equipment_items = user_equipment_dictionary[key]['items']
-        if follower not in new_image_sent_to:
-            push_notification(
-                [follower],
-                image.user,
-                'new-image-from-followed-equipment',
-                {
-                    'preheader': image.title,
-                    'image': image,
-                    'image_thumbnail': thumb.url if thumb else None,
-                    'items': equipment_items
-                }
-            )
-    else:
+    for followed_equipment_item_keys, recipient_pks in new_image_recipients.items():
+        NotificationFanOutService.send(
+            recipient_pks,
+            image.user,
+            'new_image',
+            {
+                'preheader': image.title,
+                'image': image,
+                'image_thumbnail': thumb.url if thumb else None,
+                'followed_equipment_items': [equipment_items[x] for x in followed_equipment_item_keys],
+            }
+        )
+
+    if len(new_image_from_followed_equipment_recipients) == 0:
         logger.info(
             'push_notification_for_new_image called for image %d whose equipment items have no followers' % image.pk
         )
 
+    for followed_equipment_item_keys, recipient_pks in new_image_from_followed_equipment_recipients.items():
+        NotificationFanOutService.send(
+            recipient_pks,
+            image.user,
+            'new-image-from-followed-equipment',
+            {
+                'preheader': image.title,
+                'image': image,
+                'image_thumbnail': thumb.url if thumb else None,
+                'items': [equipment_items[x] for x in followed_equipment_item_keys],
+            }
+        )
+
 
 @shared_task(time_limit=1800)
 def push_notification_for_new_image_revision(revision_pk):
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from mock import patch
+from notification.models import NoticeSetting, NoticeType
+from persistent_messages.models import Message
+
+from astrobin.models import UserProfile
+from astrobin.tests.generators import Generators
+from astrobin_apps_notifications.backends import PersistentMessagesBackend
+from astrobin_apps_notifications.services.notification_fan_out_service import NotificationFanOutService
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', NOTIFICATION_FAN_OUT_CHUNK_SIZE=2)
+class NotificationFanOutServiceTest(TestCase):
+    def _user(self, language, last_seen=None):
+        user = Generators.user()
+        UserProfile.objects.filter(user=user).update(language=language, last_seen=last_seen)
+        return user
+
+    def test_send(self):
+        sender = Generators.user()
+        notice_type = NoticeType.objects.get(label='test_notification')
+
+        english = self._user('en', last_seen=datetime.now())
+        another_english = self._user('en')
+        italian = self._user('it')
+        shadow_banning = self._user('en', last_seen=datetime.now())
+        shadow_banning.userprofile.shadow_bans.add(sender.userprofile)
+        on_site_disabled = self._user('en')
+        NoticeSetting.objects.create(user=on_site_disabled, notice_type=notice_type, medium='0', send=False)
+
+        recipients = [english, another_english, italian, shadow_banning, on_site_disabled]
+
+        with patch.object(
+                PersistentMessagesBackend, 'render', autospec=True, side_effect=PersistentMessagesBackend.render
+        ) as render:
+            NotificationFanOutService.send([x.pk for x in recipients] + [sender.pk], sender, 'test_notification', {})
+
+        # Once per language, across chunks.
+        self.assertEqual(2, render.call_count)
+
+        self.assertEqual(
+            [english.pk, another_english.pk, italian.pk],
+            list(Message.objects.order_by('user').values_list('user', flat=True))
+        )
+        self.assertEqual(1, Message.objects.filter(user=english, from_user=sender).count())
+
+        # Only `english` is active and wants emails.
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual([english.email], mail.outbox[0].to)
+
+        # The default settings are saved, like `NoticeSetting.for_user` does.
+        self.assertEqual(2, NoticeSetting.objects.filter(user=english, notice_type=notice_type).count())
+        self.assertFalse(NoticeSetting.objects.get(user=on_site_disabled, notice_type=notice_type, medium='0').send)
+        self.assertFalse(NoticeSetting.objects.filter(user=sender).exists())
@@ -8,8 +8,8 @@ from astrobin_apps_images.services import ImageService
 
 class TasksTest(TestCase):
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @mock.patch('astrobin_apps_notifications.tasks.push_notification')
-    def test_new_image_notification(self, push_notification):
+    @mock.patch('astrobin_apps_notifications.tasks.NotificationFanOutService.send')
+    def test_new_image_notification(self, send):
         user = Generators.user()
         follower = Generators.user()
 
@@ -17,15 +17,16 @@ class TasksTest(TestCase):
 
         image = Generators.image(user=user)
 
-        push_notification.assert_called_with([follower], user, 'new_image', {
+        send.assert_called_with([follower.pk], user, 'new_image', {
+            'preheader': image.title,
             'image': image,
             'image_thumbnail': mock.ANY,
             'followed_equipment_items': [],
         })
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @mock.patch('astrobin_apps_notifications.tasks.push_notification')
-    def test_new_image_from_equipment_item_notification(self, push_notification):
+    @mock.patch('astrobin_apps_notifications.tasks.NotificationFanOutService.send')
+    def test_new_image_from_equipment_item_notification(self, send):
         user = Generators.user()
         user_follower = Generators.user()
         telescope_follower = Generators.user()
@@ -40,13 +41,15 @@ class TasksTest(TestCase):
         ImageService(image).promote_to_public_area(skip_notifications=False, skip_activity_stream=False)
         image.save()
 
-        push_notification.assert_has_calls([
-            mock.call([user_follower], user, 'new_image', {
+        send.assert_has_calls([
+            mock.call([user_follower.pk], user, 'new_image', {
+                'preheader': image.title,
                 'image': image,
                 'image_thumbnail': mock.ANY,
                 'followed_equipment_items': [],
             }),
-            mock.call([telescope_follower], user, 'new-image-from-followed-equipment', {
+            mock.call([telescope_follower.pk], user, 'new-image-from-followed-equipment', {
+                'preheader': image.title,
                 'image': image,
                 'image_thumbnail': mock.ANY,
                 'items': [telescope],
@@ -54,8 +57,8 @@ class TasksTest(TestCase):
         ], any_order=True)
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @mock.patch('astrobin_apps_notifications.tasks.push_notification')
-    def test_new_image_from_equipment_item_notification_avoids_duplicate_if_new_image_is_sent(self, push_notification):
+    @mock.patch('astrobin_apps_notifications.tasks.NotificationFanOutService.send')
+    def test_new_image_from_equipment_item_notification_avoids_duplicate_if_new_image_is_sent(self, send):
         user = Generators.user()
         follower = Generators.user()
         telescope = EquipmentGenerators.telescope()
@@ -69,10 +72,11 @@ class TasksTest(TestCase):
         ImageService(image).promote_to_public_area(skip_notifications=False, skip_activity_stream=False)
         image.save()
 
-        self.assertEquals(push_notification.call_count, 1)
-        push_notification.assert_has_calls(
+        self.assertEquals(send.call_count, 1)
+        send.assert_has_calls(
             [
-                mock.call([follower], user, 'new_image', {
+                mock.call([follower.pk], user, 'new_image', {
+                    'preheader': image.title,
                     'image': image,
                     'image_thumbnail': mock.ANY,
                     'followed_equipment_items': [telescope],
@@ -81,8 +85,8 @@ class TasksTest(TestCase):
         )
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @mock.patch('astrobin_apps_notifications.tasks.push_notification')
-    def test_new_image_from_equipment_item_notification_avoids_duplicate_if_new_image_is_sent_for_collaborator(self, push_notification):
+    @mock.patch('astrobin_apps_notifications.tasks.NotificationFanOutService.send')
+    def test_new_image_from_equipment_item_notification_avoids_duplicate_if_new_image_is_sent_for_collaborator(self, send):
         user = Generators.user()
         collaborator = Generators.user()
         follower = Generators.user()
@@ -98,10 +102,11 @@ class TasksTest(TestCase):
         ImageService(image).promote_to_public_area(skip_notifications=False, skip_activity_stream=False)
         image.save()
 
-        self.assertEquals(push_notification.call_count, 1)
-        push_notification.assert_has_calls(
+        self.assertEquals(send.call_count, 1)
+        send.assert_has_calls(
             [
-                mock.call([follower], user, 'new_image', {
+                mock.call([follower.pk], user, 'new_image', {
+                    'preheader': image.title,
                     'image': image,
                     'image_thumbnail': mock.ANY,
                     'followed_equipment_items': [telescope],
@@ -110,8 +115,8 @@ class TasksTest(TestCase):
         )
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @mock.patch('astrobin_apps_notifications.tasks.push_notification')
-    def test_new_image_from_equipment_item_notification_avoid_duplicate_for_different_usage_types(self, push_notification):
+    @mock.patch('astrobin_apps_notifications.tasks.NotificationFanOutService.send')
+    def test_new_image_from_equipment_item_notification_avoid_duplicate_for_different_usage_types(self, send):
         user = Generators.user()
         user_follower = Generators.user()
         telescope_follower = Generators.user()
@@ -127,15 +132,17 @@ class TasksTest(TestCase):
         ImageService(image).promote_to_public_area(skip_notifications=False, skip_activity_stream=False)
         image.save()
 
-        self.assertEquals(push_notification.call_count, 2)
-        push_notification.assert_has_calls(
+        self.assertEquals(send.call_count, 2)
+        send.assert_has_calls(
             [
-                mock.call([user_follower], user, 'new_image', {
+                mock.call([user_follower.pk], user, 'new_image', {
+                    'preheader': image.title,
                     'image': image,
                     'image_thumbnail': mock.ANY,
                     'followed_equipment_items': [],
                 }),
-                mock.call([telescope_follower], user, 'new-image-from-followed-equipment', {
+                mock.call([telescope_follower.pk], user, 'new-image-from-followed-equipment', {
+                    'preheader': image.title,
                     'image': image,
                     'image_thumbnail': mock.ANY,
                     'items': [telescope],
@@ -144,9 +151,9 @@ class TasksTest(TestCase):
         )
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @mock.patch('astrobin_apps_notifications.tasks.push_notification')
+    @mock.patch('astrobin_apps_notifications.tasks.NotificationFanOutService.send')
     def test_new_image_from_equipment_item_notification_avoid_duplicate_for_different_classes(
-            self, push_notification
+            self, send
     ):
         user = Generators.user()
         user_follower = Generators.user()
@@ -165,15 +172,17 @@ class TasksTest(TestCase):
         ImageService(image).promote_to_public_area(skip_notifications=False, skip_activity_stream=False)
         image.save()
 
-        self.assertEquals(push_notification.call_count, 2)
-        push_notification.assert_has_calls(
+        self.assertEquals(send.call_count, 2)
+        send.assert_has_calls(
             [
-                mock.call([user_follower], user, 'new_image', {
+                mock.call([user_follower.pk], user, 'new_image', {
+                    'preheader': image.title,
                     'image': image,
                     'image_thumbnail': mock.ANY,
                     'followed_equipment_items': [],
                 }),
-                mock.call([equipment_follower], user, 'new-image-from-followed-equipment', {
+                mock.call([equipment_follower.pk], user, 'new-image-from-followed-equipment', {
+                    'preheader': image.title,
                     'image': image,
                     'image_thumbnail': mock.ANY,
                     'items': [telescope, camera],
@@ -183,8 +192,8 @@ class TasksTest(TestCase):
 
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @mock.patch('astrobin_apps_notifications.tasks.push_notification')
-    def test_new_image_notification_collaborators(self, push_notification):
+    @mock.patch('astrobin_apps_notifications.tasks.NotificationFanOutService.send')
+    def test_new_image_notification_collaborators(self, send):
         user = Generators.user()
         collaborator = Generators.user()
 
@@ -199,28 +208,19 @@ class TasksTest(TestCase):
         ImageService(image).promote_to_public_area(skip_notifications=False, skip_activity_stream=False)
         image.save()
 
-        push_notification.assert_has_calls(
-            [
-                mock.call(
-                    [user_follower], user, 'new_image', {
-                        'image': image,
-                        'image_thumbnail': mock.ANY,
-                        'followed_equipment_items': [],
-                    }
-                ),
-                mock.call(
-                    [collaborator_follower], user, 'new_image', {
-                        'image': image,
-                        'image_thumbnail': mock.ANY,
-                        'followed_equipment_items': [],
-                    }
-                )
-            ]
+        # Both followers get the same message, so they are notified together.
+        send.assert_called_once_with(
+            [user_follower.pk, collaborator_follower.pk], user, 'new_image', {
+                'preheader': image.title,
+                'image': image,
+                'image_thumbnail': mock.ANY,
+                'followed_equipment_items': [],
+            }
         )
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @mock.patch('astrobin_apps_notifications.tasks.push_notification')
-    def test_new_image_notification_collaborators_no_duplicates(self, push_notification):
+    @mock.patch('astrobin_apps_notifications.tasks.NotificationFanOutService.send')
+    def test_new_image_notification_collaborators_no_duplicates(self, send):
         user = Generators.user()
         collaborator1 = Generators.user()
         collaborator2 = Generators.user()
@@ -236,7 +236,7 @@ class TasksTest(TestCase):
         ImageService(image).promote_to_public_area(skip_notifications=False, skip_activity_stream=False)
         image.save()
 
-        push_notification.assert_called_with([follower], user, 'new_image', mock.ANY)
+        send.assert_called_with([follower.pk], user, 'new_image', mock.ANY)
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
     @mock.patch('astrobin_apps_notifications.tasks.push_notification')
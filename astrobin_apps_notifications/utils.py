@@ -13,21 +13,28 @@ def clear_notifications_template_cache(username):
     cache.delete(key)
 
 
-def push_notification(recipients, from_user, notice_type, data):
-    if len(recipients) == 0:
-        return
+def clear_notifications_template_caches(usernames):
+    cache.delete_many([make_template_fragment_key('notifications_table', [x]) for x in usernames])
 
-    if len(recipients) == 1 and recipients[0] == from_user:
-        return
 
+def add_notification_urls(data):
     data.update({
         'notices_url': settings.BASE_URL + '/',
         'base_url': settings.BASE_URL,
         'app_url': settings.APP_URL,
     })
+
+
+def push_notification(recipients, from_user, notice_type, data):
+    if len(recipients) == 0:
+        return
+
+    if len(recipients) == 1 and recipients[0] == from_user:
+        return
+
+    add_notification_urls(data)
     notification.send(recipients, notice_type, data, sender=from_user)
-    for recipient in recipients:
-        clear_notifications_template_cache(recipient.username)
+    clear_notifications_template_caches([x.username for x in recipients])
 
 
 def get_notification_url_params_for_email(from_user=None, additional_query_args=None):
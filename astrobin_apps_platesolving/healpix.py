@@ -0,0 +1,218 @@
+"""HEALPix pixelization of the sphere (NESTED scheme), in NumPy.
+
+Only what's needed to describe the sky footprint of a plate-solved image as a set of integer pixel ids: point to pixel,
+pixel centers, and the pixels overlapping a disc or a convex spherical polygon. The footprints are inclusive: every
+pixel that may intersect the region is returned, plus possibly a few neighbours, so that set intersections never miss
+an overlap.
+
+See Górski et al. 2005, "HEALPix: A Framework for High-Resolution Discretization and Fast Analysis of Data Distributed
+on the Sphere", ApJ 622, 759.
+"""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# The resolutions at which footprints are stored: ~1.8 and ~0.23 degrees per pixel.
+COARSE_NSIDE = 32
+FINE_NSIDE = 256
+
+# Stands for the pixels of a footprint that was too large to be stored at a resolution.
+OMITTED = -1
+
+_JRLL = np.array([2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4])
+_JPLL = np.array([1, 3, 5, 7, 0, 2, 4, 6, 1, 3, 5, 7])
+
+# Upper bound of the angular distance, in radians, between the center of a pixel and any point of the pixel, times
+# nside. The largest distance is about 0.84 / nside at nside 1 and grows towards ~1.07 / nside, near the poles, at high
+# resolutions; the margin keeps the bound safe at every resolution.
+_MAX_PIXRAD_TIMES_NSIDE = 1.2
+
+
+def npix(nside: int) -> int:
+    return 12 * nside * nside
+
+
+def max_pixrad(nside: int) -> float:
+    return _MAX_PIXRAD_TIMES_NSIDE / nside
+
+
+def _spread_bits(v):
+    v = np.asarray(v, dtype=np.int64)
+    v = (v | (v << 16)) & 0x0000FFFF0000FFFF
+    v = (v | (v << 8)) & 0x00FF00FF00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v << 2)) & 0x3333333333333333
+    v = (v | (v << 1)) & 0x5555555555555555
+    return v
+
+
+def _compact_bits(v):
+    v = np.asarray(v, dtype=np.int64) & 0x5555555555555555
+    v = (v | (v >> 1)) & 0x3333333333333333
+    v = (v | (v >> 2)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v >> 4)) & 0x00FF00FF00FF00FF
+    v = (v | (v >> 8)) & 0x0000FFFF0000FFFF
+    v = (v | (v >> 16)) & 0x00000000FFFFFFFF
+    return v
+
+
+def radec_to_vec(ra, dec) -> np.ndarray:
+    """Unit vectors (..., 3) for RA and declination in degrees."""
+    ra = np.radians(np.asarray(ra, dtype=np.float64))
+    dec = np.radians(np.asarray(dec, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+def ang2pix(nside: int, ra, dec) -> np.ndarray:
+    """Ids of the pixels containing the given RA and declinations, in degrees."""
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+
+    z = np.sin(np.radians(dec))
+    za = np.abs(z)
+    tt = np.mod(np.radians(ra), 2 * math.pi) / (math.pi / 2)
+    tt = np.where(tt >= 4, 0.0, tt)
+
+    # Equatorial region.
+    temp1 = nside * (0.5 + tt)
+    temp2 = nside * z * 0.75
+    jp = (temp1 - temp2).astype(np.int64)
+    jm = (temp1 + temp2).astype(np.int64)
+    ifp = jp // nside
+    ifm = jm // nside
+    face_eq = np.where(ifp == ifm, ifp | 4, np.where(ifp < ifm, ifp, ifm + 8))
+    ix_eq = jm & (nside - 1)
+    iy_eq = nside - (jp & (nside - 1)) - 1
+
+    # Polar caps.
+    ntt = np.minimum(3, tt.astype(np.int64))
+    tp = tt - ntt
+    tmp = nside * np.sqrt(3 * (1 - za))
+    jp_polar = np.minimum(nside - 1, (tp * tmp).astype(np.int64))
+    jm_polar = np.minimum(nside - 1, ((1 - tp) * tmp).astype(np.int64))
+    north = z >= 0
+    face_polar = np.where(north, ntt, ntt + 8)
+    ix_polar = np.where(north, nside - jm_polar - 1, jp_polar)
+    iy_polar = np.where(north, nside - jp_polar - 1, jm_polar)
+
+    equatorial = za <= 2.0 / 3.0
+    face = np.where(equatorial, face_eq, face_polar)
+    ix = np.where(equatorial, ix_eq, ix_polar)
+    iy = np.where(equatorial, iy_eq, iy_polar)
+
+    return face * nside * nside + (_spread_bits(ix) | (_spread_bits(iy) << 1))
+
+
+def pix2vec(nside: int, pix) -> np.ndarray:
+    """Unit vectors (..., 3) of the centers of the given pixels."""
+    pix = np.asarray(pix, dtype=np.int64)
+    npface = nside * nside
+
+    face = pix // npface
+    ipf = pix & (npface - 1)
+    ix = _compact_bits(ipf)
+    iy = _compact_bits(ipf >> 1)
+
+    jr = _JRLL[face] * nside - ix - iy - 1
+
+    nr = np.where(jr < nside, jr, np.where(jr > 3 * nside, 4 * nside - jr, nside))
+    z = np.where(
+        jr < nside,
+        1 - nr * nr / (3.0 * npface),
+        np.where(jr > 3 * nside, nr * nr / (3.0 * npface) - 1, (2 * nside - jr) * 2.0 / (3 * nside))
+    )
+    kshift = np.where((jr >= nside) & (jr <= 3 * nside), (jr - nside) & 1, 0)
+
+    jp = (_JPLL[face] * nr + ix - iy + 1 + kshift) // 2
+    jp = np.where(jp > 4 * nside, jp - 4 * nside, jp)
+    jp = np.where(jp < 1, jp + 4 * nside, jp)
+
+    phi = (jp - (kshift + 1) * 0.5) * (math.pi / 2 / nr)
+    sin_theta = np.sqrt(np.maximum(0.0, (1 - z) * (1 + z)))
+
+    return np.stack([sin_theta * np.cos(phi), sin_theta * np.sin(phi), z], axis=-1)
+
+
+def _refine(nside: int, keep) -> np.ndarray:
+    """
+    Walks down the NESTED hierarchy from nside 1, keeping at each level the pixels for which `keep(vectors, margin)`
+    is true, where `margin` is the radius of the pixels of that level.
+    """
+    pixels = np.arange(12, dtype=np.int64)
+    level_nside = 1
+
+    while True:
+        pixels = pixels[keep(pix2vec(level_nside, pixels), max_pixrad(level_nside))]
+
+        if level_nside == nside or len(pixels) == 0:
+            return pixels
+
+        level_nside *= 2
+        pixels = (pixels[:, None] * 4 + np.arange(4)).ravel()
+
+
+def query_disc(nside: int, ra: float, dec: float, radius: float) -> np.ndarray:
+    """Sorted ids of the pixels overlapping the disc of the given center and radius, in degrees."""
+    if nside < 1 or nside & (nside - 1):
+        raise ValueError('nside must be a power of 2')
+
+    center = radec_to_vec(ra, dec)
+    radius = math.radians(max(0.0, radius))
+
+    def keep(vectors, margin):
+        return np.arccos(np.clip(vectors @ center, -1.0, 1.0)) <= radius + margin
+
+    pixels = _refine(nside, keep)
+
+    # A tiny disc is always in the pixel that contains its center, even if the bound above missed it.
+    return np.union1d(pixels, ang2pix(nside, [ra], [dec]))
+
+
+def query_polygon(nside: int, vertices: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """
+    Sorted ids of the pixels overlapping the convex spherical polygon with the given (RA, declination) vertices, in
+    degrees, in either winding order.
+    """
+    if nside < 1 or nside & (nside - 1):
+        raise ValueError('nside must be a power of 2')
+
+    vectors = radec_to_vec([x[0] for x in vertices], [x[1] for x in vertices])
+    normals = np.cross(vectors, np.roll(vectors, -1, axis=0))
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+
+    centroid = vectors.sum(axis=0)
+    centroid /= np.linalg.norm(centroid)
+    if np.sum(normals @ centroid) < 0:
+        normals = -normals
+
+    def keep(pixel_vectors, margin):
+        # Inside every edge's half-space, or closer than `margin` to it.
+        return np.all(pixel_vectors @ normals.T >= -math.sin(min(margin, math.pi / 2)), axis=1)
+
+    pixels = _refine(nside, keep)
+    centroid_ra = math.degrees(math.atan2(centroid[1], centroid[0])) % 360
+    centroid_dec = math.degrees(math.asin(centroid[2]))
+
+    return np.union1d(pixels, ang2pix(nside, [centroid_ra], [centroid_dec]))
+
+
+def footprint(
+        nside: int,
+        ra: float,
+        dec: float,
+        radius: float,
+        corners: Optional[Sequence[Tuple[float, float]]] = None
+) -> List[int]:
+    """
+    Pixels of the footprint of a plate-solved field: the polygon of its corners when they are known (which accounts
+    for the orientation of the field), or else the disc of its radius around its center.
+    """
+    if corners and len(corners) >= 3:
+        pixels = query_polygon(nside, corners)
+    else:
+        pixels = query_disc(nside, ra, dec, radius)
+
+    return [int(x) for x in pixels]
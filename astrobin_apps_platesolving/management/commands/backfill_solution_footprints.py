@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from astrobin_apps_platesolving.models import Solution
+from astrobin_apps_platesolving.services import SolutionService
+
+
+class Command(BaseCommand):
+    help = "Computes the HEALPix footprints of the solved solutions that don't have one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        count = 0
+
+        while True:
+            # `update_footprint` updates instead of saving: saving would touch the targets and queue a reindex for each
+            # of them.
+            solutions = list(
+                Solution.objects.filter(
+                    pk__gt=last_pk,
+                    footprint_healpix_32__isnull=True,
+                    ra__isnull=False,
+                    dec__isnull=False,
+                    radius__isnull=False,
+                ).order_by('pk')[:batch_size]
+            )
+
+            if not solutions:
+                break
+
+            for solution in solutions:
+                SolutionService(solution).update_footprint()
+
+            last_pk = solutions[-1].pk
+            count += len(solutions)
+            self.stdout.write(f"{count} solutions...")
+
+        self.stdout.write(f"Computed the footprints of {count} solutions.")
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.24 on 2026-10-19 10:12
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astrobin_apps_platesolving', '0028_platesolvingsettings_astrometry_net_publicly_visible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solution',
+            name='footprint_healpix_256',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, editable=False, null=True, size=None),
+        ),
+        migrations.AddField(
+            model_name='solution',
+            name='footprint_healpix_32',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, editable=False, null=True, size=None),
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX solution_footprint_32_idx ON astrobin_apps_platesolving_solution '
+            'USING gin (footprint_healpix_32);',
+            'DROP INDEX solution_footprint_32_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX solution_footprint_256_idx ON astrobin_apps_platesolving_solution '
+            'USING gin (footprint_healpix_256);',
+            'DROP INDEX solution_footprint_256_idx;',
+        ),
+    ]
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.contrib.contenttypes import fields
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
@@ -272,12 +274,71 @@ class Solution(models.Model):
         blank=True,
     )
 
+    # HEALPix (NESTED) pixels overlapping the solved field, see `astrobin_apps_platesolving.healpix`.
+    footprint_healpix_32 = ArrayField(
+        models.IntegerField(),
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    # Not set for fields larger than PLATESOLVING_FOOTPRINT_MAX_PIXELS at this resolution.
+    footprint_healpix_256 = ArrayField(
+        models.IntegerField(),
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    # The fields the footprint is computed from, see `SolutionService.get_footprints`.
+    FOOTPRINT_SOURCE_FIELDS = (
+        'ra',
+        'dec',
+        'radius',
+        'advanced_ra',
+        'advanced_dec',
+        'advanced_ra_top_left',
+        'advanced_dec_top_left',
+        'advanced_ra_top_right',
+        'advanced_dec_top_right',
+        'advanced_ra_bottom_right',
+        'advanced_dec_bottom_right',
+        'advanced_ra_bottom_left',
+        'advanced_dec_bottom_left',
+    )
+
     def __str__(self):
         return "solution_%d" % self.id
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Solution, cls).from_db(db, field_names, values)
+        instance._loaded_footprint_source = instance._get_footprint_source()
+        return instance
+
+    def _get_footprint_source(self):
+        # Deferred fields are not loaded: they count as changed.
+        return tuple(self.__dict__.get(x, models.DEFERRED) for x in self.FOOTPRINT_SOURCE_FIELDS)
+
     def save(self, *args, **kwargs):
+        footprint_source = self._get_footprint_source()
+        # New solutions have no footprint to update until they have coordinates.
+        footprint_source_changed = footprint_source != getattr(
+            self, '_loaded_footprint_source', (None,) * len(self.FOOTPRINT_SOURCE_FIELDS)
+        )
+
         super(Solution, self).save(*args, **kwargs)
 
+        self._loaded_footprint_source = footprint_source
+
+        if settings.PLATESOLVING_FOOTPRINTS_ENABLED and footprint_source_changed:
+            from astrobin_apps_platesolving.tasks import update_solution_footprint
+
+            # Pixelizing a large field takes a while, so the footprint is computed by a task, once the coordinates it
+            # reads are committed.
+            pk = self.pk
+            transaction.on_commit(lambda: update_solution_footprint.apply_async(args=(pk,)))
+
         # Save target to trigger index update if applicable.
         if self.content_object and hasattr(self.content_object, 'updated') and self.status in (
                 Solver.SUCCESS,
@@ -361,3 +422,4 @@ class Solution(models.Model):
         app_label = 'astrobin_apps_platesolving'
         verbose_name = "Solution"
         unique_together = ('content_type', 'object_id',)
+        # The footprints have GIN indexes, created by migration 0029 since they're specific to PostgreSQL.
@@ -1,22 +1,25 @@
 import logging
+import math
 import os
 import re
 import time
 import urllib
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import simplejson
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.files import File
 from django.core.files.temp import NamedTemporaryFile
 from django.db import IntegrityError
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
 from django.urls import reverse
 from django.utils import timezone
 
 from astrobin.models import DeepSky_Acquisition, Image, ImageRevision, Location
 from astrobin.services.utils_service import UtilsService
 from astrobin.utils import degrees_minutes_seconds_to_decimal_degrees
+from astrobin_apps_platesolving import healpix
 from astrobin_apps_platesolving.annotate import Annotator
 from astrobin_apps_platesolving.backends.astrometry_net.errors import RequestError
 from astrobin_apps_platesolving.models import (PlateSolvingAdvancedSettings, PlateSolvingSettings, Solution)
@@ -416,3 +419,105 @@ class SolutionService:
         ]
 
         return base_search_url + "?" + "&".join(url_params)
+
+    def get_footprints(self) -> Dict[int, Optional[List[int]]]:
+        """
+        HEALPix pixels of the solved field by nside. The corners of the advanced solution account for the orientation
+        and aspect ratio of the field; without them the footprint is the disc of the basic solution's radius.
+        """
+        footprints = {healpix.COARSE_NSIDE: None, healpix.FINE_NSIDE: None}
+
+        if self.solution.ra is None or self.solution.dec is None or self.solution.radius is None:
+            return footprints
+
+        ra = float(self.solution.advanced_ra or self.solution.ra)
+        dec = float(self.solution.advanced_dec or self.solution.dec)
+        radius = float(self.solution.radius)
+
+        corners = [
+            (getattr(self.solution, f'advanced_ra_{x}'), getattr(self.solution, f'advanced_dec_{x}'))
+            for x in ('top_left', 'top_right', 'bottom_right', 'bottom_left')
+        ]
+        if all(x[0] is not None and x[1] is not None for x in corners):
+            corners = [(float(x[0]), float(x[1])) for x in corners]
+        else:
+            corners = None
+
+        footprints[healpix.COARSE_NSIDE] = healpix.footprint(healpix.COARSE_NSIDE, ra, dec, radius, corners)
+
+        # The area of the disc tells whether the fine footprint is worth computing at all.
+        estimated_pixels = healpix.npix(healpix.FINE_NSIDE) * (1 - math.cos(math.radians(min(radius, 180)))) / 2
+        if estimated_pixels <= settings.PLATESOLVING_FOOTPRINT_MAX_PIXELS:
+            fine = healpix.footprint(healpix.FINE_NSIDE, ra, dec, radius, corners)
+            if len(fine) <= settings.PLATESOLVING_FOOTPRINT_MAX_PIXELS:
+                footprints[healpix.FINE_NSIDE] = fine
+
+        return footprints
+
+    def update_footprint(self) -> None:
+        try:
+            footprints = self.get_footprints()
+        except (TypeError, ValueError) as e:
+            log.warning(f"Unable to compute the footprint of solution {self.solution.pk}: {e}")
+            footprints = {healpix.COARSE_NSIDE: None, healpix.FINE_NSIDE: None}
+
+        self.solution.footprint_healpix_32 = footprints[healpix.COARSE_NSIDE]
+        self.solution.footprint_healpix_256 = footprints[healpix.FINE_NSIDE]
+
+        # Updating instead of saving: saving would touch the target and check the coordinates again.
+        Solution.objects.filter(pk=self.solution.pk).update(
+            footprint_healpix_32=self.solution.footprint_healpix_32,
+            footprint_healpix_256=self.solution.footprint_healpix_256,
+        )
+
+    @staticmethod
+    def get_cone_pixels(
+            ra: float, dec: float, radius: float, max_pixels: int
+    ) -> Tuple[Optional[List[int]], Optional[List[int]]]:
+        """
+        Coarse and fine HEALPix pixels of a cone, in degrees. Either is None if it has more than `max_pixels` pixels.
+        """
+        coarse = [int(x) for x in healpix.query_disc(healpix.COARSE_NSIDE, ra, dec, radius)]
+        if len(coarse) > max_pixels:
+            return None, None
+
+        estimated_fine_pixels = len(coarse) * (healpix.FINE_NSIDE // healpix.COARSE_NSIDE) ** 2 / 4
+        if estimated_fine_pixels > max_pixels:
+            return coarse, None
+
+        fine = [int(x) for x in healpix.query_disc(healpix.FINE_NSIDE, ra, dec, radius)]
+        return coarse, fine if len(fine) <= max_pixels else None
+
+    @staticmethod
+    def _filter_by_footprint(queryset: QuerySet, lookup: str, coarse: List[int], fine: Optional[List[int]]) -> QuerySet:
+        queryset = queryset.filter(**{f'footprint_healpix_{healpix.COARSE_NSIDE}__{lookup}': coarse})
+
+        if fine is not None:
+            # Fields without a fine footprint are too large to have one, and only match at the coarse resolution.
+            queryset = queryset.filter(
+                Q(**{f'footprint_healpix_{healpix.FINE_NSIDE}__{lookup}': fine}) |
+                Q(**{f'footprint_healpix_{healpix.FINE_NSIDE}__isnull': True})
+            )
+
+        return queryset
+
+    @staticmethod
+    def get_solutions_in_cone(ra: float, dec: float, radius: float) -> QuerySet:
+        """
+        Solutions whose footprint overlaps the cone, in degrees. Footprints are inclusive, so this may also return
+        fields up to about a pixel away from the cone.
+        """
+        coarse, fine = SolutionService.get_cone_pixels(ra, dec, radius, settings.PLATESOLVING_FOOTPRINT_MAX_PIXELS)
+
+        if coarse is None:
+            return Solution.objects.filter(footprint_healpix_32__isnull=False)
+
+        return SolutionService._filter_by_footprint(Solution.objects.all(), 'overlap', coarse, fine)
+
+    @staticmethod
+    def get_solutions_covering(ra: float, dec: float) -> QuerySet:
+        """Solutions whose footprint contains the point, in degrees (e.g. the coordinates of an object)."""
+        coarse = [int(healpix.ang2pix(healpix.COARSE_NSIDE, ra, dec))]
+        fine = [int(healpix.ang2pix(healpix.FINE_NSIDE, ra, dec))]
+
+        return SolutionService._filter_by_footprint(Solution.objects.all(), 'contains', coarse, fine)
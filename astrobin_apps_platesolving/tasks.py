@@ -16,6 +16,7 @@ from astrobin_apps_platesolving.services import SolutionService
 from astrobin_apps_platesolving.solver import Solver, SolverBase
 from astrobin_apps_platesolving.utils import get_target
 from astrobin_apps_premium.services.premium_service import PremiumService
+from common.services import SearchIndexUpdateService
 
 logger = logging.getLogger(__name__)
 
@@ -149,3 +150,21 @@ def start_advanced_solver(solution_id: int):
     image_id, revision_label = get_target_image_id_and_label(solution.content_object)
     SolutionService(solution).start_advanced_solver()
     logger.debug(f'start_advanced_solver: {solution_id} for {image_id}/{revision_label}')
+
+
+@shared_task(time_limit=300)
+def update_solution_footprint(solution_id: int):
+    solution = get_object_or_None(Solution, pk=solution_id)
+
+    if solution is None:
+        logger.warning(f"update_solution_footprint: solution {solution_id} not found")
+        return
+
+    SolutionService(solution).update_footprint()
+
+    # The footprints are indexed with the image.
+    target = get_target(solution.object_id, solution.content_type_id)
+    if isinstance(target, ImageRevision):
+        target = target.image
+    if isinstance(target, Image):
+        SearchIndexUpdateService.update_index(target)
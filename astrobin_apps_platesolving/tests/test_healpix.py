@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+from django.test import TestCase
+
+from astrobin_apps_platesolving import healpix
+
+
+class HealpixTest(TestCase):
+    def _random_points(self, count=50000, seed=0):
+        rng = np.random.default_rng(seed)
+        ra = rng.uniform(0, 360, count)
+        dec = np.degrees(np.arcsin(rng.uniform(-1, 1, count)))
+        return ra, dec
+
+    def test_pixel_centers_round_trip(self):
+        for nside in (1, 2, 8, healpix.COARSE_NSIDE):
+            pixels = np.arange(healpix.npix(nside))
+            vectors = healpix.pix2vec(nside, pixels)
+            ra = np.degrees(np.arctan2(vectors[:, 1], vectors[:, 0])) % 360
+            dec = np.degrees(np.arcsin(np.clip(vectors[:, 2], -1, 1)))
+
+            self.assertTrue(np.array_equal(healpix.ang2pix(nside, ra, dec), pixels))
+
+    def test_max_pixrad(self):
+        ra, dec = self._random_points()
+        points = healpix.radec_to_vec(ra, dec)
+
+        for nside in (1, 4, healpix.COARSE_NSIDE, healpix.FINE_NSIDE):
+            centers = healpix.pix2vec(nside, healpix.ang2pix(nside, ra, dec))
+            distances = np.arccos(np.clip(np.sum(points * centers, axis=1), -1, 1))
+            self.assertLessEqual(distances.max(), healpix.max_pixrad(nside))
+
+    def test_query_disc_contains_every_point_of_the_disc(self):
+        ra, dec = self._random_points()
+        points = healpix.radec_to_vec(ra, dec)
+
+        # Includes a pole and RA=0.
+        for center_ra, center_dec, radius in ((0.1, 10, 3), (359.5, -45, 1), (120, 89.5, 2), (200, -90, 5)):
+            center = healpix.radec_to_vec(center_ra, center_dec)
+            inside = np.arccos(np.clip(points @ center, -1, 1)) <= math.radians(radius)
+
+            for nside in (healpix.COARSE_NSIDE, healpix.FINE_NSIDE):
+                expected = set(healpix.ang2pix(nside, ra[inside], dec[inside]).tolist())
+                self.assertTrue(expected <= set(healpix.query_disc(nside, center_ra, center_dec, radius).tolist()))
+
+    def test_query_disc_of_a_point(self):
+        pixels = healpix.query_disc(healpix.FINE_NSIDE, 83.8, -5.4, 0)
+
+        self.assertIn(healpix.ang2pix(healpix.FINE_NSIDE, 83.8, -5.4), pixels)
+        self.assertLessEqual(len(pixels), 9)
+
+    def test_query_polygon_across_ra_zero(self):
+        ra, dec = self._random_points(200000)
+        corners = [(359, -1), (1, -1), (1, 1), (359, 1)]
+        pixels = set(healpix.query_polygon(healpix.FINE_NSIDE, corners).tolist())
+
+        inside = ((ra > 359.05) | (ra < 0.95)) & (np.abs(dec) < 0.95)
+        self.assertTrue(set(healpix.ang2pix(healpix.FINE_NSIDE, ra[inside], dec[inside]).tolist()) <= pixels)
+
+        outside = (ra > 5) & (ra < 355)
+        self.assertFalse(set(healpix.ang2pix(healpix.FINE_NSIDE, ra[outside], dec[outside]).tolist()) & pixels)
+
+        self.assertEqual(pixels, set(healpix.query_polygon(healpix.FINE_NSIDE, corners[::-1]).tolist()))
+
+    def test_footprint(self):
+        corners = [(9.5, 40.8), (10.5, 40.8), (10.5, 41.2), (9.5, 41.2)]
+        disc = healpix.footprint(healpix.FINE_NSIDE, 10, 41, 3)
+        polygon = healpix.footprint(healpix.FINE_NSIDE, 10, 41, 3, corners)
+
+        self.assertTrue(all(isinstance(x, int) for x in disc))
+        self.assertTrue(set(polygon) < set(disc))
+        self.assertEqual(polygon, [int(x) for x in healpix.query_polygon(healpix.FINE_NSIDE, corners)])
+
+    def test_nside_must_be_a_power_of_two(self):
+        with self.assertRaises(ValueError):
+            healpix.query_disc(3, 0, 0, 1)
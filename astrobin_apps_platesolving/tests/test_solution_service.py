@@ -1,9 +1,18 @@
+from unittest import skipUnless
+
+from django.conf import settings
 from django.core.files import File
-from django.test import TestCase
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from mock import patch
 
 from astrobin.tests.generators import Generators
+from astrobin_apps_platesolving import healpix
+from astrobin_apps_platesolving.models import Solution
 from astrobin_apps_platesolving.services import SolutionService
+from astrobin_apps_platesolving.tasks import update_solution_footprint
 from astrobin_apps_platesolving.tests.platesolving_generators import PlateSolvingGenerators
 
 
@@ -306,3 +315,196 @@ class SolutionServiceTest(TestCase):
         result = self.service.get_search_query_around(4)
         self.assertEqual(result, expected_url)
 
+    def test_update_footprint_without_coordinates(self):
+        self.service.update_footprint()
+        self.solution.refresh_from_db()
+
+        self.assertIsNone(self.solution.footprint_healpix_32)
+        self.assertIsNone(self.solution.footprint_healpix_256)
+
+    @patch('astrobin_apps_platesolving.services.solution_service.Solution.objects')
+    def test_update_footprint_writes_the_footprints(self, objects):
+        self.solution.ra = 83.8
+        self.solution.dec = -5.4
+        self.solution.radius = 1
+        footprints = self.service.get_footprints()
+
+        self.service.update_footprint()
+
+        objects.filter.assert_called_once_with(pk=self.solution.pk)
+        objects.filter.return_value.update.assert_called_once_with(
+            footprint_healpix_32=footprints[healpix.COARSE_NSIDE],
+            footprint_healpix_256=footprints[healpix.FINE_NSIDE],
+        )
+        self.assertEqual(footprints[healpix.COARSE_NSIDE], self.solution.footprint_healpix_32)
+        self.assertEqual(footprints[healpix.FINE_NSIDE], self.solution.footprint_healpix_256)
+        self.assertIn(healpix.ang2pix(healpix.COARSE_NSIDE, 83.8, -5.4), self.solution.footprint_healpix_32)
+        self.assertIn(healpix.ang2pix(healpix.FINE_NSIDE, 83.8, -5.4), self.solution.footprint_healpix_256)
+
+    @patch('astrobin_apps_platesolving.services.solution_service.Solution.objects')
+    def test_update_footprint_of_invalid_coordinates(self, objects):
+        self.solution.ra = 83.8
+        self.solution.dec = -5.4
+        self.solution.radius = 1
+
+        with patch.object(SolutionService, 'get_footprints', side_effect=ValueError):
+            self.service.update_footprint()
+
+        objects.filter.return_value.update.assert_called_once_with(
+            footprint_healpix_32=None,
+            footprint_healpix_256=None,
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', "The footprints are PostgreSQL arrays")
+    def test_footprint_is_saved(self):
+        self.solution.ra = 83.8
+        self.solution.dec = -5.4
+        self.solution.radius = 1
+        self.solution.save()
+        self.service.update_footprint()
+        self.solution.refresh_from_db()
+
+        self.assertIn(healpix.ang2pix(healpix.COARSE_NSIDE, 83.8, -5.4), self.solution.footprint_healpix_32)
+        self.assertIn(healpix.ang2pix(healpix.FINE_NSIDE, 83.8, -5.4), self.solution.footprint_healpix_256)
+
+    @override_settings(PLATESOLVING_FOOTPRINTS_ENABLED=True)
+    @patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+    @patch('astrobin_apps_platesolving.tasks.update_solution_footprint.apply_async')
+    def test_footprint_is_only_updated_when_the_coordinates_change(self, apply_async, on_commit):
+        solution = Solution.objects.get(pk=self.solution.pk)
+
+        solution.pixscale = 1.5
+        solution.save()
+        apply_async.assert_not_called()
+
+        for field in Solution.FOOTPRINT_SOURCE_FIELDS:
+            apply_async.reset_mock()
+
+            setattr(solution, field, 10)
+            solution.save()
+            apply_async.assert_called_once_with(args=(solution.pk,))
+
+            apply_async.reset_mock()
+            solution.save()
+            apply_async.assert_not_called()
+
+    @override_settings(PLATESOLVING_FOOTPRINTS_ENABLED=True)
+    @patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+    @patch('astrobin_apps_platesolving.tasks.update_solution_footprint.apply_async')
+    def test_footprint_is_updated_for_new_solutions_with_coordinates(self, apply_async, on_commit):
+        image = Generators.image()
+
+        solution = Solution.objects.create(
+            object_id=image.pk,
+            content_type=self.solution.content_type,
+        )
+        apply_async.assert_not_called()
+
+        solution = Solution.objects.create(
+            object_id=image.pk,
+            content_type=self.solution.content_type,
+            ra=83.8,
+            dec=-5.4,
+            radius=1,
+        )
+        apply_async.assert_called_once_with(args=(solution.pk,))
+
+    @override_settings(PLATESOLVING_FOOTPRINTS_ENABLED=False)
+    @patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+    @patch('astrobin_apps_platesolving.tasks.update_solution_footprint.apply_async')
+    def test_footprint_is_not_updated_when_disabled(self, apply_async, on_commit):
+        solution = Solution.objects.get(pk=self.solution.pk)
+        solution.ra = 83.8
+        solution.save()
+
+        apply_async.assert_not_called()
+
+    @patch('astrobin_apps_platesolving.tasks.SearchIndexUpdateService.update_index')
+    @patch.object(SolutionService, 'update_footprint')
+    def test_update_solution_footprint_task(self, update_footprint, update_index):
+        update_solution_footprint(self.solution.pk)
+
+        update_footprint.assert_called_once_with()
+        update_index.assert_called_once_with(self.image)
+
+        update_footprint.reset_mock()
+        update_solution_footprint(-1)
+        update_footprint.assert_not_called()
+
+    @override_settings(PLATESOLVING_FOOTPRINT_MAX_PIXELS=10)
+    def test_footprint_too_large_for_fine_resolution(self):
+        self.solution.ra = 83.8
+        self.solution.dec = -5.4
+        self.solution.radius = 1
+        footprints = self.service.get_footprints()
+
+        self.assertIsNotNone(footprints[healpix.COARSE_NSIDE])
+        self.assertIsNone(footprints[healpix.FINE_NSIDE])
+
+    def test_footprint_uses_advanced_corners(self):
+        self.solution.ra = 83.8
+        self.solution.dec = -5.4
+        self.solution.radius = 1
+        self.solution.advanced_ra_top_left = 83.0
+        self.solution.advanced_dec_top_left = -5.2
+        self.solution.advanced_ra_top_right = 84.6
+        self.solution.advanced_dec_top_right = -5.2
+        self.solution.advanced_ra_bottom_right = 84.6
+        self.solution.advanced_dec_bottom_right = -5.6
+        self.solution.advanced_ra_bottom_left = 83.0
+        self.solution.advanced_dec_bottom_left = -5.6
+        footprints = self.service.get_footprints()
+
+        self.assertLess(
+            len(footprints[healpix.FINE_NSIDE]),
+            len(healpix.query_disc(healpix.FINE_NSIDE, 83.8, -5.4, 1))
+        )
+
+    @patch('astrobin_apps_platesolving.services.solution_service.Solution.objects')
+    def test_get_solutions_in_cone_query(self, objects):
+        coarse, fine = SolutionService.get_cone_pixels(84.5, -5.4, 0.5, settings.PLATESOLVING_FOOTPRINT_MAX_PIXELS)
+        queryset = objects.all.return_value
+
+        result = SolutionService.get_solutions_in_cone(84.5, -5.4, 0.5)
+
+        queryset.filter.assert_called_once_with(footprint_healpix_32__overlap=coarse)
+        queryset.filter.return_value.filter.assert_called_once_with(
+            Q(footprint_healpix_256__overlap=fine) | Q(footprint_healpix_256__isnull=True)
+        )
+        self.assertEqual(queryset.filter.return_value.filter.return_value, result)
+
+    @override_settings(PLATESOLVING_FOOTPRINT_MAX_PIXELS=10)
+    @patch('astrobin_apps_platesolving.services.solution_service.Solution.objects')
+    def test_get_solutions_in_large_cone_query(self, objects):
+        result = SolutionService.get_solutions_in_cone(84.5, -5.4, 30)
+
+        objects.filter.assert_called_once_with(footprint_healpix_32__isnull=False)
+        objects.all.assert_not_called()
+        self.assertEqual(objects.filter.return_value, result)
+
+    @patch('astrobin_apps_platesolving.services.solution_service.Solution.objects')
+    def test_get_solutions_covering_query(self, objects):
+        queryset = objects.all.return_value
+
+        SolutionService.get_solutions_covering(83.9, -5.3)
+
+        queryset.filter.assert_called_once_with(
+            footprint_healpix_32__contains=[healpix.ang2pix(healpix.COARSE_NSIDE, 83.9, -5.3)]
+        )
+        queryset.filter.return_value.filter.assert_called_once_with(
+            Q(footprint_healpix_256__contains=[healpix.ang2pix(healpix.FINE_NSIDE, 83.9, -5.3)]) |
+            Q(footprint_healpix_256__isnull=True)
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', "Array lookups are specific to PostgreSQL")
+    def test_get_solutions_in_cone_and_covering(self):
+        self.solution.ra = 83.8
+        self.solution.dec = -5.4
+        self.solution.radius = 0.5
+        self.solution.save()
+        self.service.update_footprint()
+
+        self.assertIn(self.solution, SolutionService.get_solutions_in_cone(84.5, -5.4, 0.5))
+        self.assertNotIn(self.solution, SolutionService.get_solutions_in_cone(90, -5.4, 0.5))
+        self.assertIn(self.solution, SolutionService.get_solutions_covering(83.9, -5.3))
+        self.assertNotIn(self.solution, SolutionService.get_solutions_covering(83.8, 5.4))
@@ -13,6 +13,7 @@ from subscription.models import UserSubscription
 
 from astrobin.enums.full_size_display_limitation import FullSizeDisplayLimitation
 from astrobin.models import Image, UserProfile
+from common.request_cache import request_memoize
 from common.services import DateTimeService
 
 
@@ -100,18 +101,19 @@ class PremiumService:
         ):
             cache.delete(f'{key}_{pk}')
 
+        PremiumService.get_valid_usersubscription.forget(self)
+
         UserProfile.objects.filter(user=self.user).update(updated=timezone.now())
 
+    @request_memoize(lambda self: self.user.pk if self.user is not None else None)
     def get_valid_usersubscription(self):
         if self.user is None or self.user.pk is None or not self.user.is_authenticated:
             return None
 
         cache_key = "astrobin_valid_usersubscription_%d" % self.user.pk
 
-        # Try local cache first, because this function is called by many templates.
-        from common.services.caching_service import CachingService
-
-        value = CachingService.get(cache_key)
+        # This function is called by many templates: the request memoization above avoids repeated cache lookups.
+        value = cache.get(cache_key)
         if value is not None:
             return value
 
@@ -131,7 +133,7 @@ class PremiumService:
             sortedByWeight = sorted(us, key=functools.cmp_to_key(_compareSubscriptionWeights))
             result = sortedByWeight[0]
 
-        CachingService.set(cache_key, result, timeout=60)
+        cache.set(cache_key, result, timeout=60)
 
         return result
 
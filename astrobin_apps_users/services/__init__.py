@@ -1,2 +1,3 @@
 from .mailing_list_service import MailingListService
 from .user_service import UserService
+from .user_stats_service import UserStatsService
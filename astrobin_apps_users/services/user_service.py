@@ -20,6 +20,7 @@ from safedelete.queryset import SafeDeleteQueryset
 from subscription.models import Subscription
 
 from astrobin.enums import SubjectType
+from common.request_cache import request_memoize
 from common.services.constellations_service import ConstellationsService
 from common.utils import astrobin_index, get_segregated_reader_database
 from nested_comments.models import NestedComment
@@ -663,17 +664,21 @@ class UserService:
             for revision in image.revisions.all():
                 start_basic_solver.delay(revision.pk, ContentType.objects.get_for_model(revision).pk)
 
+    @request_memoize(lambda self: self.user.pk if self.user else None)
+    def _get_all_group_names(self) -> List[str]:
+        cache_key = f'all_groups_{self.user.pk}'
+        all_groups = cache.get(cache_key)
+        if all_groups is None:
+            all_groups = list(self.user.groups.values_list('name', flat=True))
+            cache.set(cache_key, all_groups, 300)
+
+        return all_groups
+
     def is_in_group(self, group_name: Union[str, List[str]]) -> bool:
         if not self.user or not self.user.is_authenticated:
             return False
 
-        from common.services.caching_service import CachingService
-
-        cache_key = f'all_groups_{self.user.pk}'
-        all_groups = CachingService.get(cache_key)
-        if all_groups is None:
-            all_groups = list(self.user.groups.values_list('name', flat=True))
-            CachingService.set(cache_key, all_groups, 300)
+        all_groups = self._get_all_group_names()
 
         if type(group_name) is list:
             return any([x in all_groups for x in group_name])
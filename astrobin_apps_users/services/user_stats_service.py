@@ -0,0 +1,160 @@
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Sum
+
+from common.utils import get_segregated_reader_database
+
+log = logging.getLogger(__name__)
+
+
+class UserStatsService:
+    """
+    Computes the per-user aggregates of the search index (likes, views, integration, moon phase...) over all the
+    user's public images with a handful of grouped queries on the reader database, instead of iterating images one by
+    one.
+    """
+
+    user: User = None
+    database: str = None
+
+    def __init__(self, user: User, database: Optional[str] = None):
+        self.user = user
+        self.database = database or get_segregated_reader_database()
+
+    def _get_public_image_ids(self) -> List[int]:
+        from astrobin_apps_users.services import UserService
+
+        return list(
+            UserService(self.user).get_public_images(use_union=False).using(
+                self.database
+            ).order_by().values_list('pk', flat=True)
+        )
+
+    def _get_acquisition_stats(self, image_ids: List[int]) -> Dict[str, float]:
+        from astrobin.models import DeepSky_Acquisition
+        from astrobin.moon_table import get_illuminated
+
+        integration_by_image = defaultdict(float)
+        illumination_by_image = defaultdict(list)
+        dated_acquisitions = []
+
+        acquisitions = DeepSky_Acquisition.objects.using(self.database).filter(
+            image_id__in=image_ids
+        ).values_list('image_id', 'duration', 'number', 'date')
+
+        for image_id, duration, number, date in acquisitions.iterator():
+            if duration and number:
+                integration_by_image[image_id] += float(duration * number)
+
+            if date is not None:
+                dated_acquisitions.append((image_id, date))
+
+        illuminations = get_illuminated([date for image_id, date in dated_acquisitions])
+        for (image_id, date), illuminated in zip(dated_acquisitions, illuminations):
+            illumination_by_image[image_id].append(illuminated * 100.0)
+
+        integration = sum(integration_by_image.values())
+        images_with_integration = len([x for x in integration_by_image.values() if x])
+
+        # Images without dated acquisitions count as 0, like in the image index.
+        moon_phases = [
+            sum(illumination_by_image[image_id]) / len(illumination_by_image[image_id])
+            if illumination_by_image[image_id] else 0
+            for image_id in image_ids
+        ]
+
+        return dict(
+            integration=integration / 3600.0,
+            avg_integration=(integration / 3600.0) / images_with_integration if images_with_integration else 0,
+            moon_phase=sum(moon_phases) / len(moon_phases) if moon_phases else 0,
+        )
+
+    def _get_toggle_property_counts(self, image_ids: List[int]) -> Dict[str, int]:
+        from astrobin.models import Image
+        from toggleproperties.models import ToggleProperty
+
+        counts = dict(like=0, bookmark=0)
+
+        if not image_ids:
+            return counts
+
+        rows = ToggleProperty.objects.using(self.database).filter(
+            content_type=ContentType.objects.get_for_model(Image),
+            property_type__in=counts.keys(),
+            object_id__in=image_ids,
+        ).values('property_type').annotate(count=Count('id')).order_by()
+
+        for row in rows:
+            counts[row['property_type']] = row['count']
+
+        return counts
+
+    def _get_views(self, image_ids: List[int]) -> int:
+        from hitcount.models import HitCount
+
+        if not image_ids:
+            return 0
+
+        return HitCount.objects.using(self.database).filter(
+            content_type__model='image',
+            object_pk__in=image_ids,
+        ).aggregate(total=Sum('hits'))['total'] or 0
+
+    def _get_comments(self, image_ids: List[int]) -> int:
+        from astrobin.models import Image
+        from nested_comments.models import NestedComment
+
+        if not image_ids:
+            return 0
+
+        return NestedComment.objects.using(self.database).filter(
+            content_type=ContentType.objects.get_for_model(Image),
+            object_id__in=image_ids,
+            deleted=False,
+        ).count()
+
+    def _get_likes_received_on(self, model, authored) -> int:
+        from toggleproperties.models import ToggleProperty
+
+        return ToggleProperty.objects.using(self.database).filter(
+            content_type=ContentType.objects.get_for_model(model),
+            property_type='like',
+            object_id__in=authored.values('pk'),
+        ).count()
+
+    def get_comment_likes_received(self) -> int:
+        from nested_comments.models import NestedComment
+
+        return self._get_likes_received_on(
+            NestedComment,
+            NestedComment.objects.using(self.database).filter(author=self.user)
+        )
+
+    def get_forum_post_likes_received(self) -> int:
+        from pybb.models import Post
+
+        return self._get_likes_received_on(
+            Post,
+            Post.objects.using(self.database).filter(user=self.user)
+        )
+
+    def get_search_index_stats(self) -> Dict[str, float]:
+        image_ids = self._get_public_image_ids()
+        toggle_property_counts = self._get_toggle_property_counts(image_ids)
+
+        stats = dict(
+            images=len(image_ids),
+            likes=toggle_property_counts['like'],
+            bookmarks=toggle_property_counts['bookmark'],
+            views=self._get_views(image_ids),
+            comments=self._get_comments(image_ids),
+            comment_likes_received=self.get_comment_likes_received(),
+            forum_post_likes_received=self.get_forum_post_likes_received(),
+        )
+        stats.update(self._get_acquisition_stats(image_ids))
+
+        return stats
@@ -0,0 +1,61 @@
+from datetime import date
+
+from django.test import TestCase
+
+from astrobin.moon import MoonPhase
+from astrobin.tests.generators import Generators
+from astrobin_apps_users.services import UserStatsService
+from nested_comments.tests.nested_comments_generators import NestedCommentsGenerators
+
+
+class TestUserStatsService(TestCase):
+    def test_no_images(self):
+        stats = UserStatsService(Generators.user()).get_search_index_stats()
+
+        self.assertEqual(0, stats['images'])
+        self.assertEqual(0, stats['likes'])
+        self.assertEqual(0, stats['integration'])
+        self.assertEqual(0, stats['avg_integration'])
+        self.assertEqual(0, stats['moon_phase'])
+        self.assertEqual(0, stats['views'])
+        self.assertEqual(0, stats['comments'])
+
+    def test_aggregates(self):
+        user = Generators.user()
+        image1 = Generators.image(user=user)
+        image2 = Generators.image(user=user)
+        collaboration = Generators.image()
+        collaboration.collaborators.add(user)
+        Generators.image(user=user, is_wip=True)
+
+        Generators.deep_sky_acquisition(image1, number=10, duration=360, date=date(2020, 1, 1))
+        Generators.deep_sky_acquisition(image1, number=10, duration=360, date=date(2020, 1, 10))
+        Generators.deep_sky_acquisition(image2, number=1, duration=3600)
+
+        Generators.like(image1)
+        Generators.like(image1)
+        Generators.like(collaboration)
+
+        NestedCommentsGenerators.comment(target=image2)
+        comment = NestedCommentsGenerators.comment(author=user)
+        Generators.like(comment)
+
+        post = Generators.forum_post(user=user)
+        Generators.like(post)
+        Generators.like(post)
+
+        stats = UserStatsService(user).get_search_index_stats()
+
+        self.assertEqual(3, stats['images'])
+        self.assertEqual(3, stats['likes'])
+        self.assertEqual(3, stats['integration'])
+        self.assertEqual(1.5, stats['avg_integration'])
+        self.assertEqual(1, stats['comments'])
+        self.assertEqual(1, stats['comment_likes_received'])
+        self.assertEqual(2, stats['forum_post_likes_received'])
+
+        image1_moon_phase = (
+            MoonPhase(date(2020, 1, 1)).illuminated * 100.0 +
+            MoonPhase(date(2020, 1, 10)).illuminated * 100.0
+        ) / 2
+        self.assertAlmostEqual(image1_moon_phase / 3, stats['moon_phase'])
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.24 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_abusereport_content_owner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GazetteerCity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(editable=False, max_length=2)),
+                ('normalized_name', models.CharField(editable=False, max_length=200)),
+                ('name', models.CharField(editable=False, max_length=200)),
+                ('latitude', models.FloatField(editable=False)),
+                ('longitude', models.FloatField(editable=False)),
+                ('population', models.BigIntegerField(default=0, editable=False)),
+            ],
+            options={
+                'unique_together': {('country', 'normalized_name')},
+            },
+        ),
+    ]
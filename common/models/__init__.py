@@ -1 +1,2 @@
 from common.models.abuse_report import *
+from common.models.gazetteer_city import *
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class GazetteerCity(models.Model):
+    # A city of the gazetteer loaded by GazetteerService.load, under one of its names (normalized by
+    # GazetteerService.normalize). When several cities of a country share a name, only the most populous one is kept.
+
+    country = models.CharField(max_length=2, editable=False)
+    normalized_name = models.CharField(max_length=200, editable=False)
+    name = models.CharField(max_length=200, editable=False)
+    latitude = models.FloatField(editable=False)
+    longitude = models.FloatField(editable=False)
+    population = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        app_label = 'common'
+        unique_together = ('country', 'normalized_name')
@@ -0,0 +1,114 @@
+import functools
+import threading
+from collections import Counter
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Optional
+
+# The request cache is scoped to a request (see ThreadLocalsMiddleware) or to a Celery task (see astrobin.celery).
+# Being a ContextVar rather than a threading.local, it follows async views and is never shared between two requests
+# served by the same thread. Outside of a scope nothing is cached, so management commands and tests that call
+# services directly always see fresh values.
+_request_cache: ContextVar[Optional[Dict[str, Any]]] = ContextVar('astrobin_request_cache', default=None)
+
+_MISSING = object()
+
+_stats_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def start_request_cache(initial: Optional[Dict[str, Any]] = None) -> Token:
+    return _request_cache.set(dict(initial or {}))
+
+
+def end_request_cache(token: Optional[Token] = None):
+    if token is not None:
+        try:
+            _request_cache.reset(token)
+            return
+        except ValueError:
+            # The token was created in a different context (e.g. Celery signals dispatched across contexts).
+            pass
+
+    _request_cache.set(None)
+
+
+def is_request_cache_active() -> bool:
+    return _request_cache.get() is not None
+
+
+def get_request_cache() -> Dict[str, Any]:
+    request_cache = _request_cache.get()
+    if request_cache is None:
+        # Not in a request or task: hand out a throwaway dict so that writes are discarded.
+        return {}
+    return request_cache
+
+
+def get_request_memoize_stats() -> Dict[str, Dict[str, int]]:
+    with _stats_lock:
+        return {
+            name: dict(hits=_hits[name], misses=_misses[name])
+            for name in set(_hits) | set(_misses)
+        }
+
+
+def reset_request_memoize_stats():
+    with _stats_lock:
+        _hits.clear()
+        _misses.clear()
+
+
+def request_memoize(key_fn: Callable[..., Any]):
+    """
+    Memoizes the decorated function for the duration of the current request or Celery task. `key_fn` receives the
+    same arguments as the decorated function and returns a hashable key, or None to bypass the cache for that call.
+    The decorated function gets a `forget(*args, **kwargs)` attribute to drop a memoized value, e.g. after a write, and
+    a `forget_key(key)` attribute to do the same when only the key is at hand.
+    """
+
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        def make_key(*args, **kwargs):
+            key = key_fn(*args, **kwargs)
+            if key is None:
+                return None
+            return name, key
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            request_cache = _request_cache.get()
+            if request_cache is None:
+                return func(*args, **kwargs)
+
+            key = make_key(*args, **kwargs)
+            if key is None:
+                return func(*args, **kwargs)
+
+            value = request_cache.get(key, _MISSING)
+            if value is not _MISSING:
+                with _stats_lock:
+                    _hits[name] += 1
+                return value
+
+            with _stats_lock:
+                _misses[name] += 1
+
+            value = func(*args, **kwargs)
+            request_cache[key] = value
+            return value
+
+        def forget_key(key):
+            request_cache = _request_cache.get()
+            if request_cache is not None and key is not None:
+                request_cache.pop((name, key), None)
+
+        def forget(*args, **kwargs):
+            forget_key(key_fn(*args, **kwargs))
+
+        wrapper.forget = forget
+        wrapper.forget_key = forget_key
+        return wrapper
+
+    return decorator
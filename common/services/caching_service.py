@@ -1,6 +1,5 @@
 from datetime import datetime
 
-from django.conf import settings
 from django.core.cache import caches
 from persistent_messages.models import Message
 from rest_framework.authtoken.models import Token
@@ -8,6 +7,7 @@ from rest_framework.authtoken.models import Token
 from astrobin.models import UserProfile, Image
 from astrobin_apps_images.services import ImageService
 from astrobin_apps_iotd.models import TopPickNominationsArchive, Iotd, TopPickArchive
+from common.request_cache import get_request_cache
 from common.services import DateTimeService
 
 JSON_CACHE = 'json'
@@ -16,37 +16,21 @@ DEFAULT_CACHE = 'default'
 class CachingService:
     @staticmethod
     def is_in_request_cache(key: str) -> bool:
-        if settings.TESTING:
-            return False
-
-        from astrobin.middleware.thread_locals_middleware import get_request_cache
         request_cache = get_request_cache()
         return key in request_cache
 
     @staticmethod
     def get_from_request_cache(key: str) -> any:
-        if settings.TESTING:
-            return None
-
-        from astrobin.middleware.thread_locals_middleware import get_request_cache
         request_cache = get_request_cache()
         return request_cache.get(key, None)
 
     @staticmethod
     def set_in_request_cache(key: str, value: any):
-        if settings.TESTING:
-            return
-
-        from astrobin.middleware.thread_locals_middleware import get_request_cache
         request_cache = get_request_cache()
         request_cache[key] = value
 
     @staticmethod
     def delete_from_request_cache(key: str):
-        if settings.TESTING:
-            return
-
-        from astrobin.middleware.thread_locals_middleware import get_request_cache
         request_cache = get_request_cache()
         if key in request_cache:
             del request_cache[key]
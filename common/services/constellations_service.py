@@ -1,4 +1,10 @@
+import bisect
 import math
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
 
 # http://djm.cc/constellation.js
 
@@ -490,18 +496,52 @@ class ConstellationsService(object):
         ['Vul', 'Vulpecula', 'Vulpeculae']
     ]
 
-    # ra1, dec1: RA, dec coordinates, in radians, for EPOCH1, where the epoch is in years AD.
-    # Output: [RA, dec], in radians, precessed to EPOCH2, where the epoch is in years AD.
-    #
+    __by_abbreviation = dict((x[0], x) for x in constellation_table)
+
+    # Spatial index over `__table`, built on first use: the distinct RA boundaries of the table split the sky in RA
+    # bands, and each band keeps the rows covering it as (negated lower declination, abbreviation), sorted so that a
+    # lookup is a bisection on the RA boundaries followed by a bisection on the declinations of the band.
+    __index = None
+    __index_lock = threading.Lock()
+
+    @staticmethod
+    def __build_index():
+        table = ConstellationsService.__table
+        boundaries = sorted(set([row[0] for row in table] + [row[1] for row in table]))
+        bands = []
+
+        for lower, upper in zip(boundaries, boundaries[1:]):
+            neg_decs = []
+            names = []
+
+            for ra1, ra2, dec, name in table:
+                # The linear scan returns the first row, in table order, whose lower declination is <= dec: a row can
+                # only ever be that first match if its declination is lower than the ones of all the rows before it.
+                if ra1 <= lower and upper <= ra2 and (not neg_decs or -dec > neg_decs[-1]):
+                    neg_decs.append(-dec)
+                    names.append(name)
+
+            bands.append((neg_decs, names, np.array(neg_decs)))
+
+        return dict(boundaries=boundaries, boundaries_array=np.array(boundaries), bands=bands)
+
+    @staticmethod
+    def __get_index():
+        if ConstellationsService.__index is None:
+            with ConstellationsService.__index_lock:
+                if ConstellationsService.__index is None:
+                    ConstellationsService.__index = ConstellationsService.__build_index()
+
+        return ConstellationsService.__index
+
     # Original comment:
     # Herget precession, see p. 9 of Publ. Cincinnati Obs., No. 24.
     @staticmethod
-    def __precess(ra1, dec1, epoch1, epoch2):
+    @lru_cache(maxsize=None)
+    def __get_precession_matrix(epoch1, epoch2):
         cdr = math.pi / 180.0
         csr = cdr / 3600.0
 
-        a = math.cos(dec1)
-        x1 = [a * math.cos(ra1), a * math.sin(ra1), math.sin(dec1)]
         t = 0.001 * (epoch2 - epoch1)
         st = 0.001 * (epoch1 - 1900.0)
 
@@ -517,21 +557,20 @@ class ConstellationsService(object):
         cos_b = math.cos(b)
         cos_c = math.cos(c)
 
-        r = [
-            [0.0, 0.0, 0.0],
-            [0.0, 0.0, 0.0],
-            [0.0, 0.0, 0.0]
-        ]
-        r[0][0] = cos_a * cos_b * cos_c - sin_a * sin_b
-        r[0][1] = -cos_a * sin_b - sin_a * cos_b * cos_c
-        r[0][2] = -cos_b * sin_c
-        r[1][0] = sin_a * cos_b + cos_a * sin_b * cos_c
-        r[1][1] = cos_a * cos_b - sin_a * sin_b * cos_c
-        r[1][2] = -sin_b * sin_c
-        r[2][0] = cos_a * sin_c
-        r[2][1] = -sin_a * sin_c
-        r[2][2] = cos_c
+        return (
+            (cos_a * cos_b * cos_c - sin_a * sin_b, -cos_a * sin_b - sin_a * cos_b * cos_c, -cos_b * sin_c),
+            (sin_a * cos_b + cos_a * sin_b * cos_c, cos_a * cos_b - sin_a * sin_b * cos_c, -sin_b * sin_c),
+            (cos_a * sin_c, -sin_a * sin_c, cos_c),
+        )
+
+    # ra1, dec1: RA, dec coordinates, in radians, for EPOCH1, where the epoch is in years AD.
+    # Output: [RA, dec], in radians, precessed to EPOCH2, where the epoch is in years AD.
+    @staticmethod
+    def __precess(ra1, dec1, epoch1, epoch2):
+        r = ConstellationsService.__get_precession_matrix(epoch1, epoch2)
 
+        a = math.cos(dec1)
+        x1 = [a * math.cos(ra1), a * math.sin(ra1), math.sin(dec1)]
         x2 = [0.0, 0.0, 0.0]
 
         for i in range(0, 3):
@@ -546,8 +585,39 @@ class ConstellationsService(object):
 
         return [ra2, dec2]
 
+    # Same as `__precess`, on numpy arrays.
+    @staticmethod
+    def __precess_many(ra1, dec1, epoch1, epoch2):
+        r = ConstellationsService.__get_precession_matrix(epoch1, epoch2)
+
+        a = np.cos(dec1)
+        x1 = [a * np.cos(ra1), a * np.sin(ra1), np.sin(dec1)]
+        x2 = [r[i][0] * x1[0] + r[i][1] * x1[1] + r[i][2] * x1[2] for i in range(0, 3)]
+
+        ra2 = np.arctan2(x2[1], x2[0])
+        ra2 = np.where(ra2 < 0.0, ra2 + 2.0 * math.pi, ra2)
+
+        dec2 = np.arcsin(np.clip(x2[2], -1.0, 1.0))
+
+        return [ra2, dec2]
+
+    # Input: coordinates (RA in hours, declination in degrees), in the 1875 equinox
+    # Output: constellation abbreviation (3 letters), or None on error
+    @staticmethod
+    def __lookup(ra, dec):
+        index = ConstellationsService.__get_index()
+        band = bisect.bisect_right(index['boundaries'], ra) - 1
+
+        if band < 0 or band >= len(index['bands']):
+            return None
+
+        neg_decs, names, _ = index['bands'][band]
+        i = bisect.bisect_left(neg_decs, -dec)
+
+        return names[i] if i < len(names) else None
+
     # Input: coordinates (RA in hours, declination in degrees, epoch in years AD)
-    # Output: constellation abbreviation (3 letters), or '' on error
+    # Output: constellation abbreviation (3 letters), or None on error
     @staticmethod
     def __get_name(ra, dec, epoch):
         conv_h = math.pi / 12.0
@@ -561,14 +631,37 @@ class ConstellationsService(object):
         ra = new_coordinates[0] / conv_h
         dec = new_coordinates[1] / conv_d
 
-        for i in range(0, len(ConstellationsService.__table)):
-            if dec < ConstellationsService.__table[i][2] or \
-                    ra < ConstellationsService.__table[i][0] or \
-                    ra >= ConstellationsService.__table[i][1]:
+        return ConstellationsService.__lookup(ra, dec)
+
+    # Input: arrays of coordinates (RA in hours, declination in degrees) and the epoch in years AD
+    # Output: list of constellation abbreviations, with None on error
+    @staticmethod
+    def __get_names(ras, decs, epoch):
+        conv_h = math.pi / 12.0
+        conv_d = math.pi / 180.0
+
+        new_coordinates = ConstellationsService.__precess_many(ras * conv_h, decs * conv_d, epoch, 1875.0)
+
+        ras = new_coordinates[0] / conv_h
+        decs = new_coordinates[1] / conv_d
+
+        index = ConstellationsService.__get_index()
+        bands = np.searchsorted(index['boundaries_array'], ras, side='right') - 1
+        names = [None] * len(ras)
+
+        for band in np.unique(bands):
+            if band < 0 or band >= len(index['bands']):
                 continue
-            return ConstellationsService.__table[i][3]
 
-        return None  # Error!
+            _, band_names, neg_decs = index['bands'][band]
+            positions = np.nonzero(bands == band)[0]
+            matches = np.searchsorted(neg_decs, -decs[positions], side='left')
+
+            for position, match in zip(positions, matches):
+                if match < len(band_names):
+                    names[position] = band_names[match]
+
+        return names
 
     # Input: coordinate string of the form "RA Dec",
     # where RA is HH, HH MM, or HH MM SS;
@@ -634,11 +727,23 @@ class ConstellationsService(object):
 
         return [ra_h + ra_m / 60.0 + ra_s / 3600.0, dec_d + dec_m / 60.0 + dec_s / 3600.0]
 
+    @staticmethod
+    def __get_constellation_info(name):
+        if name not in ConstellationsService.__by_abbreviation:
+            raise ConstellationException('No constellation found')
+
+        constellation = ConstellationsService.__by_abbreviation[name]
+
+        return {
+            'name': constellation[1],
+            'genitive': constellation[2],
+            'abbreviation': name
+        }
+
     # Input: coordinate string as above, assumed to be a position in equinox 2000.0 coordinates
     # Output: Informative message about its location
     @staticmethod
     def get_constellation(coordinates):
-        i = 0
         coordinate_list = ConstellationsService.__parse_coordinates(coordinates)
 
         if len(coordinate_list) == 0:
@@ -648,15 +753,23 @@ class ConstellationsService(object):
         dec = coordinate_list[1]
         name = ConstellationsService.__get_name(ra, dec, 2000.0)
 
-        for i in range(0, len(ConstellationsService.constellation_table)):
-            if name == ConstellationsService.constellation_table[i][0]:
-                break
-
-        if i == len(ConstellationsService.constellation_table):
-            raise ConstellationException('No constellation found')
+        return ConstellationsService.__get_constellation_info(name)
 
-        return {
-            'name': ConstellationsService.constellation_table[i][1],
-            'genitive': ConstellationsService.constellation_table[i][2],
-            'abbreviation': name
-        }
+    # Input: sequences of RA in hours and declinations in degrees, assumed to be positions in equinox `epoch`
+    # coordinates
+    # Output: list with the same information as `get_constellation` for each position, or None where no constellation
+    # is found
+    @staticmethod
+    def get_constellations(
+            ras: Sequence[float], decs: Sequence[float], epoch: float = 2000.0
+    ) -> List[Optional[Dict[str, str]]]:
+        ras = np.asarray(ras, dtype=np.float64)
+        decs = np.asarray(decs, dtype=np.float64)
+
+        if ras.shape != decs.shape:
+            raise ConstellationException('RA and declination sequences have different lengths')
+
+        return [
+            ConstellationsService.__get_constellation_info(name) if name is not None else None
+            for name in ConstellationsService.__get_names(ras, decs, epoch)
+        ]
@@ -0,0 +1,127 @@
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from haystack.query import SearchQuerySet
+
+from common.services import DateTimeService
+from common.services.search_result_cache_service import SearchResultCacheService
+
+log = logging.getLogger(__name__)
+
+
+class FacetCountService:
+    """
+    Counts of images for each value of the search filters, for a given filter state. The counts of the unfiltered
+    state and of the states in SEARCH_FACET_PRECOMPUTED_STATES are refreshed in the background by
+    `refresh_search_facet_counts`; the counts of other states are computed on demand, only for the requested facets,
+    and cached for a short time.
+
+    Each value counted on demand is a search of its own, so a live request counts at most SEARCH_FACET_LIVE_MAX_COUNTS
+    values. The requested facets that don't fit, like `country`, are returned as `unavailable`.
+    """
+
+    CACHE_KEY_PREFIX = 'search_facet_counts'
+
+    @staticmethod
+    def get_facet_values() -> Dict[str, List[str]]:
+        from astrobin.enums import SolarSystemSubject, SubjectType
+        from astrobin.enums.license import License
+        from astrobin.fields import COUNTRIES
+        from astrobin.models import Image
+        from astrobin_apps_equipment.models.camera_base_model import CameraType
+        from astrobin_apps_equipment.models.telescope_base_model import TelescopeType
+
+        def constants(klass) -> List[str]:
+            return [value for key, value in vars(klass).items() if key.isupper() and isinstance(value, str)]
+
+        return {
+            'subject_type': constants(SubjectType) + constants(SolarSystemSubject),
+            'telescope_types': constants(TelescopeType),
+            'camera_types': constants(CameraType),
+            'country': [x[0] for x in COUNTRIES],
+            'acquisition_type': [x[0] for x in Image.ACQUISITION_TYPE_CHOICES],
+            'data_source': list(Image.DATA_SOURCE_TYPES),
+            'license': constants(License),
+        }
+
+    @staticmethod
+    def get_precomputed_states() -> List[Dict[str, Any]]:
+        return [{}] + list(settings.SEARCH_FACET_PRECOMPUTED_STATES)
+
+    @staticmethod
+    def _get_key(canonical_params: str) -> str:
+        digest = hashlib.sha1(canonical_params.encode('utf-8')).hexdigest()
+        return f'{FacetCountService.CACHE_KEY_PREFIX}_{digest}'
+
+    @staticmethod
+    def compute(params: Dict[str, Any], user: User, facets: Optional[List[str]] = None) -> Dict[str, Any]:
+        from common.services.search_service import SearchService
+
+        facet_values = FacetCountService.get_facet_values()
+        counts = {}
+
+        for facet in facets or facet_values.keys():
+            counts[facet] = {}
+            for value in facet_values.get(facet, []):
+                # The facet's own filter is replaced, so that each count is what the user would get by choosing
+                # that value.
+                queryset = SearchService.filter_images(dict(params, **{facet: value}), user, SearchQuerySet())
+                counts[facet][value] = queryset.count()
+
+        return dict(facets=counts, updated=DateTimeService.now().isoformat())
+
+    @staticmethod
+    def refresh_precomputed():
+        for state in FacetCountService.get_precomputed_states():
+            canonical_params = SearchResultCacheService.canonicalize(state, None)
+
+            try:
+                data = FacetCountService.compute(state, AnonymousUser())
+            except Exception as e:
+                log.exception(f"Unable to compute facet counts for {canonical_params}: {e}")
+                continue
+
+            cache.set(FacetCountService._get_key(canonical_params), data, settings.SEARCH_FACET_COUNTS_TIMEOUT)
+            log.info(f"Refreshed facet counts for {canonical_params}")
+
+    @staticmethod
+    def get_counts(params: Dict[str, Any], user: User, facets: Optional[List[str]] = None) -> Dict[str, Any]:
+        canonical_params = SearchResultCacheService.canonicalize(params, user)
+        precomputed_states = [
+            SearchResultCacheService.canonicalize(x, None) for x in FacetCountService.get_precomputed_states()
+        ]
+        facet_values = FacetCountService.get_facet_values()
+        facets = [x for x in dict.fromkeys(facets or []) if x in facet_values]
+
+        if canonical_params in precomputed_states:
+            data = cache.get(FacetCountService._get_key(canonical_params))
+            if data is not None:
+                if facets:
+                    data = dict(data, facets=dict((x, data['facets'].get(x, {})) for x in facets))
+                return dict(data, precomputed=True, unavailable=[])
+
+        # Live counts are only computed for the requested facets: computing every facet is a background job.
+        live_facets = []
+        remaining_counts = settings.SEARCH_FACET_LIVE_MAX_COUNTS
+        for facet in facets:
+            if len(facet_values[facet]) <= remaining_counts:
+                live_facets.append(facet)
+                remaining_counts -= len(facet_values[facet])
+
+        unavailable = [x for x in facets if x not in live_facets]
+
+        if not live_facets:
+            return dict(facets={}, updated=None, precomputed=False, unavailable=unavailable)
+
+        key = FacetCountService._get_key(f'{canonical_params}_{",".join(sorted(live_facets))}')
+        data = cache.get(key)
+
+        if data is None:
+            data = FacetCountService.compute(params, user, live_facets)
+            cache.set(key, data, settings.SEARCH_FACET_LIVE_COUNTS_TIMEOUT)
+
+        return dict(data, precomputed=False, unavailable=unavailable)
@@ -0,0 +1,120 @@
+import csv
+import logging
+import re
+import sys
+import unicodedata
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+
+log = logging.getLogger(__name__)
+
+# (name, latitude, longitude, population)
+GazetteerEntry = Tuple[str, float, float, int]
+
+
+class GazetteerService:
+    """
+    A local gazetteer of cities, loaded from a GeoNames dump (https://download.geonames.org/export/dump/, e.g.
+    cities15000.txt) into GazetteerCity, so that places can be geocoded with an indexed lookup on (country, normalized
+    name) instead of a call to a geocoding service.
+    """
+
+    # Columns of the GeoNames "geoname" table.
+    NAME_COLUMN = 1
+    ASCII_NAME_COLUMN = 2
+    ALTERNATE_NAMES_COLUMN = 3
+    LATITUDE_COLUMN = 4
+    LONGITUDE_COLUMN = 5
+    COUNTRY_COLUMN = 8
+    POPULATION_COLUMN = 14
+
+    BATCH_SIZE = 5000
+
+    @staticmethod
+    def normalize(name: Optional[str]) -> str:
+        # Case and accents are ignored, and punctuation counts as a space: "Zürich", "zurich" and "St. Gallen" /
+        # "st gallen" match.
+        name = unicodedata.normalize('NFKD', name or '')
+        name = ''.join(x for x in name if not unicodedata.combining(x)).casefold()
+        return ' '.join(re.findall(r'[^\W_]+', name))
+
+    @staticmethod
+    def parse(lines: Iterable[str], alternate_names: bool = True) -> Dict[Tuple[str, str], GazetteerEntry]:
+        """
+        The cities of a GeoNames dump, by (country, normalized name). Each city is listed under its name, its ASCII
+        name and, optionally, its alternate names; the most populous city wins a name.
+        """
+        csv.field_size_limit(sys.maxsize)
+        entries: Dict[Tuple[str, str], GazetteerEntry] = {}
+
+        for row in csv.reader(lines, delimiter='\t', quoting=csv.QUOTE_NONE):
+            try:
+                country = row[GazetteerService.COUNTRY_COLUMN].upper()
+                name = row[GazetteerService.NAME_COLUMN]
+                latitude = float(row[GazetteerService.LATITUDE_COLUMN])
+                longitude = float(row[GazetteerService.LONGITUDE_COLUMN])
+                population = int(row[GazetteerService.POPULATION_COLUMN] or 0)
+            except (IndexError, ValueError):
+                log.warning(f"Skipping malformed gazetteer row: {row[:3]}")
+                continue
+
+            names = {name, row[GazetteerService.ASCII_NAME_COLUMN]}
+            if alternate_names:
+                names.update(row[GazetteerService.ALTERNATE_NAMES_COLUMN].split(','))
+
+            for alternate_name in names:
+                key = (country, GazetteerService.normalize(alternate_name)[:200])
+                if not key[0] or not key[1]:
+                    continue
+
+                existing = entries.get(key)
+                if existing is None or existing[3] < population:
+                    entries[key] = (name[:200], latitude, longitude, population)
+
+        return entries
+
+    @staticmethod
+    def load(lines: Iterable[str], alternate_names: bool = True) -> int:
+        """
+        Replaces the gazetteer with the cities of a GeoNames dump, and returns the number of names loaded.
+        """
+        from common.models import GazetteerCity
+
+        entries = GazetteerService.parse(lines, alternate_names)
+
+        with transaction.atomic():
+            GazetteerCity.objects.all().delete()
+            GazetteerCity.objects.bulk_create(
+                (
+                    GazetteerCity(
+                        country=country,
+                        normalized_name=normalized_name,
+                        name=name,
+                        latitude=latitude,
+                        longitude=longitude,
+                        population=population,
+                    )
+                    for (country, normalized_name), (name, latitude, longitude, population) in entries.items()
+                ),
+                batch_size=GazetteerService.BATCH_SIZE
+            )
+
+        log.info(f"Loaded {len(entries)} gazetteer names")
+        return len(entries)
+
+    @staticmethod
+    def get_location(country: Optional[str], city: Optional[str]) -> Optional[Tuple[float, float]]:
+        """
+        The (latitude, longitude) of a city of a country (ISO 3166-1 alpha-2 code), or None if it's not in the
+        gazetteer.
+        """
+        from common.models import GazetteerCity
+
+        normalized_name = GazetteerService.normalize(city)
+        if not country or not normalized_name:
+            return None
+
+        return GazetteerCity.objects.filter(
+            country=country.upper(), normalized_name=normalized_name[:200]
+        ).values_list('latitude', 'longitude').first()
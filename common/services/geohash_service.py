@@ -0,0 +1,127 @@
+import math
+from typing import Optional, Set, Tuple
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# The radius used by PostgreSQL's `earth_distance`, in kilometers.
+EARTH_RADIUS = 6378.168
+
+
+class GeohashService:
+    """
+    Geohash cells: a cell of precision p splits longitudes into 2^ceil(5p/2) bands and latitudes into 2^floor(5p/2),
+    so that the cells of an area can be enumerated without encoding every point in it.
+    """
+
+    @staticmethod
+    def get_bits(precision: int) -> Tuple[int, int]:
+        # (latitude bits, longitude bits); bits alternate starting with the longitude.
+        bits = 5 * precision
+        return bits // 2, bits - bits // 2
+
+    @staticmethod
+    def get_cell_size(precision: int) -> Tuple[float, float]:
+        """
+        The (height, width) of the cells of a precision, in degrees.
+        """
+        lat_bits, lon_bits = GeohashService.get_bits(precision)
+        return 180 / 2 ** lat_bits, 360 / 2 ** lon_bits
+
+    @staticmethod
+    def _encode_indexes(lat_index: int, lon_index: int, precision: int) -> str:
+        lat_bits, lon_bits = GeohashService.get_bits(precision)
+        value = 0
+
+        for i in range(5 * precision):
+            if i % 2 == 0:
+                lon_bits -= 1
+                value = (value << 1) | ((lon_index >> lon_bits) & 1)
+            else:
+                lat_bits -= 1
+                value = (value << 1) | ((lat_index >> lat_bits) & 1)
+
+        return ''.join(BASE32[(value >> (5 * (precision - 1 - i))) & 31] for i in range(precision))
+
+    @staticmethod
+    def _get_indexes(lat: float, lon: float, precision: int) -> Tuple[int, int]:
+        lat_bits, lon_bits = GeohashService.get_bits(precision)
+        height, width = GeohashService.get_cell_size(precision)
+
+        return (
+            min(int((lat + 90) / height), 2 ** lat_bits - 1),
+            min(int(((lon + 180) % 360) / width), 2 ** lon_bits - 1),
+        )
+
+    @staticmethod
+    def encode(lat: float, lon: float, precision: int) -> str:
+        return GeohashService._encode_indexes(*GeohashService._get_indexes(lat, lon, precision), precision)
+
+    @staticmethod
+    def get_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+        """
+        The great-circle distance between two points, in kilometers.
+        """
+        lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+        a = (
+            math.sin((lat2 - lat1) / 2) ** 2 +
+            math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS * math.asin(min(1, math.sqrt(a)))
+
+    @staticmethod
+    def _get_covering_indexes(lat: float, lon: float, radius: float, precision: int) -> Optional[Tuple[range, range]]:
+        # The latitude and longitude indexes of the cells that overlap the bounding box of the circle. Longitude indexes
+        # can go past the antimeridian, and are to be taken modulo the number of bands.
+        angle = radius / EARTH_RADIUS
+        lat_delta = math.degrees(angle)
+        if lat + lat_delta >= 90 or lat - lat_delta <= -90:
+            return None
+
+        lat_bits, lon_bits = GeohashService.get_bits(precision)
+        height, width = GeohashService.get_cell_size(precision)
+
+        lat_indexes = range(
+            int((lat - lat_delta + 90) // height), min(int((lat + lat_delta + 90) // height), 2 ** lat_bits - 1) + 1
+        )
+
+        ratio = math.sin(angle) / math.cos(math.radians(lat))
+        if ratio >= 1:
+            return lat_indexes, range(2 ** lon_bits)
+
+        lon_delta = math.degrees(math.asin(ratio))
+        lon_indexes = range(int((lon - lon_delta + 180) // width), int((lon + lon_delta + 180) // width) + 1)
+        if len(lon_indexes) > 2 ** lon_bits:
+            lon_indexes = range(2 ** lon_bits)
+
+        return lat_indexes, lon_indexes
+
+    @staticmethod
+    def count_covering_cells(lat: float, lon: float, radius: float, precision: int) -> Optional[int]:
+        """
+        The number of cells `get_covering_cells` returns, without encoding them.
+        """
+        indexes = GeohashService._get_covering_indexes(lat, lon, radius, precision)
+        if indexes is None:
+            return None
+
+        lat_indexes, lon_indexes = indexes
+        return len(lat_indexes) * len(lon_indexes)
+
+    @staticmethod
+    def get_covering_cells(lat: float, lon: float, radius: float, precision: int) -> Optional[Set[str]]:
+        """
+        The cells of a precision that cover the circle of a radius (in kilometers) around a point, from the cells that
+        overlap its bounding box. None if the circle includes a pole.
+        """
+        indexes = GeohashService._get_covering_indexes(lat, lon, radius, precision)
+        if indexes is None:
+            return None
+
+        lat_indexes, lon_indexes = indexes
+        lon_bands = 2 ** GeohashService.get_bits(precision)[1]
+
+        return set(
+            GeohashService._encode_indexes(lat_index, lon_index % lon_bands, precision)
+            for lat_index in lat_indexes
+            for lon_index in lon_indexes
+        )
@@ -1,12 +1,61 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
 
+log = logging.getLogger(__name__)
+
+# Pending updates are members "<content_type_pk>:<object_pk>" of a Redis sorted set, scored by the time at which they
+# become due. Adding an object that is already pending is a no-op, so a burst of updates for the same object (e.g.
+# many likes on the same user's images) coalesces into a single document update.
+QUEUE_KEY = 'astrobin_search_index_update_queue'
+
+# Members claimed by `process_queue`, scored by the time at which their lease expires. They're only removed once they're
+# indexed: the members of a drainer that crashed or was killed are moved back to the queue when their lease expires.
+PROCESSING_KEY = 'astrobin_search_index_update_processing'
+
+# Atomically moves up to ARGV[2] members whose score is <= ARGV[1] to the processing set, with a lease expiring at
+# ARGV[3], and returns them with their due time.
+CLAIM_DUE_SCRIPT = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #items, 2 do
+    redis.call('ZREM', KEYS[1], items[i])
+    redis.call('ZADD', KEYS[2], ARGV[3], items[i])
+end
+return items
+"""
+
+# Atomically moves the members whose lease expired before ARGV[1] back to the queue, due at ARGV[1], and returns
+# their number. Members that are pending again keep their due time.
+REQUEUE_EXPIRED_SCRIPT = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for i = 1, #items do
+    redis.call('ZREM', KEYS[2], items[i])
+    redis.call('ZADD', KEYS[1], 'NX', ARGV[1], items[i])
+end
+return #items
+"""
+
 
 class SearchIndexUpdateService:
     @staticmethod
-    def update_index(instance, max_frequency=10):
-        from astrobin.tasks import update_index
+    def _get_redis():
+        if not settings.SEARCH_INDEX_UPDATE_QUEUE_ENABLED:
+            return None
 
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection('default')
+        except NotImplementedError:
+            # The cache is not backed by Redis (e.g. locmem in development).
+            return None
+
+    @staticmethod
+    def update_index(instance, max_frequency=10):
         content_type = ContentType.objects.get_for_model(instance)
 
         cache_key = f'astrobin_common_search_index_update_service_{content_type.pk}_{instance.pk}'
@@ -14,8 +63,138 @@ class SearchIndexUpdateService:
         if cache.get(cache_key):
             return
 
-        # Delay by a few seconds so that the instance will have time to process all the m2m stages.
-        update_index.apply_async(args=(content_type.pk, instance.pk), countdown=30)
+        redis = SearchIndexUpdateService._get_redis()
+
+        if redis is None:
+            from astrobin.tasks import update_index
+
+            # Delay by a few seconds so that the instance will have time to process all the m2m stages.
+            update_index.apply_async(args=(content_type.pk, instance.pk), countdown=30)
+        else:
+            SearchIndexUpdateService.enqueue(redis, content_type.pk, instance.pk)
 
         # Don't update an item more frequently than once in `max_frequency` seconds.
         cache.set(cache_key, '1', max_frequency)
+
+    @staticmethod
+    def enqueue(redis, content_type_pk: int, object_pk: int):
+        # Delay by a few seconds so that the instance will have time to process all the m2m stages.
+        delay = settings.SEARCH_INDEX_UPDATE_QUEUE_DELAY
+
+        queue_size = redis.zcard(QUEUE_KEY)
+        if queue_size >= settings.SEARCH_INDEX_UPDATE_QUEUE_HIGH_WATER_MARK:
+            # Back-pressure: spread new work over time instead of letting the backlog grow in a single burst.
+            log.warning(f"Search index update queue has {queue_size} pending updates, backing off")
+            delay += settings.SEARCH_INDEX_UPDATE_QUEUE_BACKOFF
+
+        # `nx` keeps the original due time of objects that are already pending.
+        redis.zadd(QUEUE_KEY, {f'{content_type_pk}:{object_pk}': time.time() + delay}, nx=True)
+
+    @staticmethod
+    def claim_due(redis, limit: int) -> List[Tuple[int, int, float]]:
+        now = time.time()
+        items = redis.eval(
+            CLAIM_DUE_SCRIPT, 2, QUEUE_KEY, PROCESSING_KEY, now, limit, now + settings.SEARCH_INDEX_UPDATE_QUEUE_LEASE
+        )
+        result = []
+
+        for i in range(0, len(items), 2):
+            member = items[i].decode() if isinstance(items[i], bytes) else items[i]
+            content_type_pk, object_pk = member.split(':')
+            result.append((int(content_type_pk), int(object_pk), float(items[i + 1])))
+
+        return result
+
+    @staticmethod
+    def release(redis, content_type_pk: int, object_pks: List[int]):
+        redis.zrem(PROCESSING_KEY, *[f'{content_type_pk}:{object_pk}' for object_pk in object_pks])
+
+    @staticmethod
+    def requeue_expired(redis) -> int:
+        return redis.eval(REQUEUE_EXPIRED_SCRIPT, 2, QUEUE_KEY, PROCESSING_KEY, time.time())
+
+    @staticmethod
+    def get_queue_stats() -> Dict[str, float]:
+        redis = SearchIndexUpdateService._get_redis()
+
+        if redis is None:
+            return dict(size=0, due=0, processing=0, lag=0)
+
+        now = time.time()
+        oldest = redis.zrange(QUEUE_KEY, 0, 0, withscores=True)
+
+        return dict(
+            size=redis.zcard(QUEUE_KEY),
+            due=redis.zcount(QUEUE_KEY, '-inf', now),
+            processing=redis.zcard(PROCESSING_KEY),
+            lag=max(0.0, now - oldest[0][1]) if oldest else 0,
+        )
+
+    @staticmethod
+    def update_objects(model_class, object_pks: List[int]) -> int:
+        from haystack import connections
+
+        index = connections['default'].get_unified_index().get_index(model_class)
+
+        if hasattr(index, 'update_batch'):
+            return index.update_batch(object_pks)
+
+        backend = index.get_backend()
+        instances = [x for x in index.index_queryset().filter(pk__in=object_pks) if index.should_update(x)]
+        updated = set([x.pk for x in instances])
+
+        if instances:
+            backend.update(index, instances)
+
+        for pk in set(object_pks) - updated:
+            backend.remove(f'{model_class._meta.app_label}.{model_class._meta.model_name}.{pk}')
+
+        return len(instances)
+
+    @staticmethod
+    def process_queue() -> Dict[str, float]:
+        redis = SearchIndexUpdateService._get_redis()
+
+        if redis is None:
+            return dict(processed=0)
+
+        batch_size = settings.SEARCH_INDEX_UPDATE_QUEUE_BATCH_SIZE
+        deadline = time.time() + settings.SEARCH_INDEX_UPDATE_QUEUE_MAX_RUN_TIME
+        processed = 0
+        max_lag = 0
+
+        expired = SearchIndexUpdateService.requeue_expired(redis)
+        if expired:
+            log.warning(f"Search index update queue: {expired} updates of an interrupted run were queued again")
+
+        while time.time() < deadline:
+            items = SearchIndexUpdateService.claim_due(redis, batch_size)
+
+            if not items:
+                break
+
+            now = time.time()
+            max_lag = max([max_lag] + [now - due for _, _, due in items])
+
+            pks_by_content_type = defaultdict(list)
+            for content_type_pk, object_pk, due in items:
+                pks_by_content_type[content_type_pk].append(object_pk)
+
+            for content_type_pk, object_pks in pks_by_content_type.items():
+                model_class = ContentType.objects.get_for_id(content_type_pk).model_class()
+                try:
+                    SearchIndexUpdateService.update_objects(model_class, object_pks)
+                except Exception as e:
+                    log.exception(f"Error updating search index for {model_class.__name__} {object_pks}: {e}")
+                    for object_pk in object_pks:
+                        SearchIndexUpdateService.enqueue(redis, content_type_pk, object_pk)
+
+                SearchIndexUpdateService.release(redis, content_type_pk, object_pks)
+
+            processed += len(items)
+
+        stats = SearchIndexUpdateService.get_queue_stats()
+        stats.update(processed=processed, max_lag=max_lag)
+        log.info(f"Search index update queue: {stats}")
+
+        return stats
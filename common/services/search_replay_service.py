@@ -0,0 +1,332 @@
+import json
+import logging
+import math
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+
+from common.services.search_result_cache_service import SearchResultCacheService
+
+log = logging.getLogger(__name__)
+
+
+class SearchReplayService:
+    """
+    Records anonymized parameter sets of the image search, and replays them through SearchService against the
+    configured search backend, measuring the time spent in each filter, the size of the generated query and the number
+    of results. References to users, images and equipment items are recorded as placeholders, and resolved at replay
+    time against the local corpus (see `SearchReplayService.get_corpus`).
+
+    Replaying patches the SearchService filters to time them, so it's meant for offline use only
+    (`manage.py replay_searches`).
+    """
+
+    RECORDING_KEY = 'astrobin_search_replay_recording'
+
+    TEXT_PARAMS = ('text', 'q')
+    USER_PARAMS = ('user_id', 'username', 'users')
+    IMAGE_PARAMS = ('similar_to_image_id',)
+    EQUIPMENT_PARAMS = {
+        'telescope': 'telescope',
+        'sensor': 'sensor',
+        'camera': 'camera',
+        'mount': 'mount',
+        'filter': 'filter',
+        'accessory': 'accessory',
+        'software': 'software',
+        'all_telescope_ids': 'telescope',
+        'imaging_telescope_ids': 'telescope',
+        'guiding_telescope_ids': 'telescope',
+        'all_camera_ids': 'camera',
+        'imaging_camera_ids': 'camera',
+        'guiding_camera_ids': 'camera',
+        'all_sensor_ids': 'sensor',
+        'imaging_sensor_ids': 'sensor',
+        'guiding_sensor_ids': 'sensor',
+        'mount_ids': 'mount',
+        'filter_ids': 'filter',
+        'accessory_ids': 'accessory',
+        'software_ids': 'software',
+    }
+    # Parameters that reference private data that a replay can't reproduce.
+    DROPPED_PARAMS = ('groups', 'topic')
+
+    # SearchService filters whose name doesn't follow `filter_by_<param>`.
+    FILTERS_BY_PARAM = dict(
+        [(x, 'filter_by_equipment_ids') for x in EQUIPMENT_PARAMS if x.endswith('_ids')] + [
+            ('similar_to_image_id', 'filter_by_similar_images'),
+            ('users', 'filter_by_user_id'),
+            ('subjects', 'filter_by_subject'),
+            ('q', 'filter_by_subject'),
+            ('coord_ra_min', 'filter_by_coords'),
+            ('coord_ra_max', 'filter_by_coords'),
+            ('coord_dec_min', 'filter_by_coords'),
+            ('coord_dec_max', 'filter_by_coords'),
+        ]
+    )
+
+    @staticmethod
+    def _get_redis():
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection('default')
+        except NotImplementedError:
+            # The cache is not backed by Redis (e.g. locmem in development).
+            return None
+
+    @staticmethod
+    def _count(value) -> int:
+        if isinstance(value, dict):
+            return SearchReplayService._count(value.get('value'))
+        if isinstance(value, list):
+            return len(value)
+        if isinstance(value, str):
+            return len([x for x in value.split(',') if x])
+        return 1
+
+    @staticmethod
+    def anonymize(params: Dict[str, Any]) -> Dict[str, Any]:
+        anonymized = {}
+
+        for key, value in params.items():
+            if (
+                    key in SearchResultCacheService.IGNORED_PARAMS or
+                    key in SearchReplayService.DROPPED_PARAMS or
+                    SearchResultCacheService._is_empty(value)
+            ):
+                continue
+
+            if key in SearchReplayService.TEXT_PARAMS:
+                # Only the shape of the text is kept: the number of words drives the complexity of the query.
+                text = value.get('value', '') if isinstance(value, dict) else str(value)
+                placeholder = f'$text:{len(text.split())}'
+                value = dict(value, value=placeholder) if isinstance(value, dict) else placeholder
+            elif key in SearchReplayService.USER_PARAMS:
+                count = SearchReplayService._count(value)
+                value = dict(value, value=['$user'] * count) if isinstance(value, dict) else '$user'
+            elif key in SearchReplayService.IMAGE_PARAMS:
+                value = '$image'
+            elif key in SearchReplayService.EQUIPMENT_PARAMS:
+                placeholder = f'${SearchReplayService.EQUIPMENT_PARAMS[key]}'
+                count = SearchReplayService._count(value)
+                if isinstance(value, dict):
+                    value = dict(value, value=[placeholder] * count)
+                elif key.endswith('_ids'):
+                    value = ','.join([placeholder] * count)
+                else:
+                    # A name, matched as text by the legacy search.
+                    value = f'{placeholder}:name'
+
+            anonymized[key] = value
+
+        return anonymized
+
+    @staticmethod
+    def record(params: Dict[str, Any]) -> None:
+        if not settings.SEARCH_REPLAY_RECORDING_ENABLED:
+            return
+
+        if random.random() >= settings.SEARCH_REPLAY_RECORDING_SAMPLE_RATE:
+            return
+
+        redis = SearchReplayService._get_redis()
+        if redis is None:
+            return
+
+        try:
+            redis.lpush(SearchReplayService.RECORDING_KEY, json.dumps(SearchReplayService.anonymize(params), default=str))
+            redis.ltrim(SearchReplayService.RECORDING_KEY, 0, settings.SEARCH_REPLAY_RECORDING_MAX_SIZE - 1)
+        except Exception as e:
+            log.warning(f"Unable to record search parameters: {e}")
+
+    @staticmethod
+    def get_recording() -> List[Dict[str, Any]]:
+        redis = SearchReplayService._get_redis()
+        if redis is None:
+            return []
+
+        return [json.loads(x) for x in redis.lrange(SearchReplayService.RECORDING_KEY, 0, -1)]
+
+    @staticmethod
+    def get_corpus(limit: int = 1000) -> Dict[str, List]:
+        from astrobin.models import Image
+        from astrobin_apps_equipment.models import Accessory, Camera, Filter, Mount, Sensor, Software, Telescope
+
+        images = list(Image.objects.order_by('-pk').values_list('pk', 'title', 'user_id', 'user__username')[:limit])
+
+        corpus = dict(
+            image=[x[0] for x in images],
+            user=sorted(set((x[2], x[3]) for x in images)),
+            words=[word for x in images for word in (x[1] or '').split() if word.isalnum()],
+        )
+
+        for key, model in (
+                ('telescope', Telescope),
+                ('camera', Camera),
+                ('sensor', Sensor),
+                ('mount', Mount),
+                ('filter', Filter),
+                ('accessory', Accessory),
+                ('software', Software),
+        ):
+            corpus[key] = list(model.objects.order_by('-pk').values_list('pk', 'name')[:limit])
+
+        return corpus
+
+    @staticmethod
+    def resolve(params: Dict[str, Any], corpus: Dict[str, List], rng: random.Random) -> Optional[Dict[str, Any]]:
+        """
+        Replaces the placeholders of a recorded parameter set with random items of the corpus. Returns None if the
+        corpus doesn't have what's needed.
+        """
+
+        def pick(kind: str):
+            if not corpus.get(kind):
+                raise LookupError(kind)
+            return rng.choice(corpus[kind])
+
+        def resolve_value(key: str, value):
+            if isinstance(value, dict):
+                return dict(value, value=resolve_value(key, value.get('value')))
+
+            if isinstance(value, list):
+                return [resolve_value(key, x) for x in value]
+
+            if not isinstance(value, str) or '$' not in value:
+                return value
+
+            if value.startswith('$text:'):
+                return ' '.join(pick('words') for _ in range(int(value.split(':')[1])))
+
+            if ',' in value:
+                return ','.join(str(resolve_value(key, x)) for x in value.split(','))
+
+            if value == '$user':
+                user_id, username = pick('user')
+                return username if key == 'username' else user_id if key == 'user_id' else dict(id=user_id)
+
+            if value == '$image':
+                return pick('image')
+
+            item_id, name = pick(value[1:].split(':')[0])
+            if value.endswith(':name'):
+                return name
+            return item_id if key.endswith('_ids') else dict(id=item_id, name=name)
+
+        try:
+            return dict((key, resolve_value(key, value)) for key, value in params.items())
+        except LookupError as e:
+            log.debug(f"Skipping parameters {params}: no {e} in the corpus")
+            return None
+
+    @staticmethod
+    def _count_clauses(node) -> int:
+        children = getattr(node, 'children', None)
+        if children is None:
+            return 1
+        return sum(SearchReplayService._count_clauses(x) for x in children)
+
+    @staticmethod
+    @contextmanager
+    def _instrument_filters(timings: Dict[str, float]):
+        from common.services.search_service import SearchService
+
+        originals = dict(
+            (name, getattr(SearchService, name)) for name in vars(SearchService) if name.startswith('filter_by_')
+        )
+
+        def wrap(name, function):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    timings[name] += time.perf_counter() - start
+
+            return staticmethod(wrapper)
+
+        for name, function in originals.items():
+            setattr(SearchService, name, wrap(name, function))
+
+        try:
+            yield
+        finally:
+            for name, function in originals.items():
+                setattr(SearchService, name, staticmethod(function))
+
+    @staticmethod
+    def replay_one(params: Dict[str, Any], user=None) -> Dict[str, Any]:
+        from haystack.query import SearchQuerySet
+
+        from common.services.search_service import SearchService
+
+        filter_timings = defaultdict(float)
+
+        start = time.perf_counter()
+        with SearchReplayService._instrument_filters(filter_timings):
+            queryset = SearchService.filter_images(params, user or AnonymousUser(), SearchQuerySet())
+        ordering = params.get('ordering', '-published')
+        if ordering != 'relevance':
+            queryset = queryset.order_by(ordering)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        count = queryset.count()
+        list(queryset[:settings.HAYSTACK_SEARCH_RESULTS_PER_PAGE])
+        execution_time = time.perf_counter() - start
+
+        return dict(
+            filter_timings=dict(filter_timings),
+            build_time=build_time,
+            execution_time=execution_time,
+            clauses=SearchReplayService._count_clauses(queryset.query.query_filter),
+            query_length=len(queryset.query.build_query()),
+            count=count,
+        )
+
+    @staticmethod
+    def _percentile(values: List[float], percentile: float) -> float:
+        # Nearest-rank.
+        values = sorted(values)
+        return values[max(0, math.ceil(percentile / 100.0 * len(values)) - 1)]
+
+    @staticmethod
+    def summarize(results: List[Dict[str, Any]], param_sets: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregates replay results by parameter: the latencies, clauses and counts of a parameter are those of the
+        searches that used it; `filter_p50`/`filter_p95` are the times spent in the SearchService filter that handles
+        it. The `*` row covers every search.
+        """
+        groups = defaultdict(list)
+        for params, result in zip(param_sets, results):
+            groups['*'].append(result)
+            for key in params:
+                groups[key].append(result)
+
+        summary = {}
+        for key, group in sorted(groups.items()):
+            latencies = [x['build_time'] + x['execution_time'] for x in group]
+            row = dict(
+                searches=len(group),
+                p50=SearchReplayService._percentile(latencies, 50),
+                p95=SearchReplayService._percentile(latencies, 95),
+                p99=SearchReplayService._percentile(latencies, 99),
+                clauses=sum(x['clauses'] for x in group) / len(group),
+                query_length=sum(x['query_length'] for x in group) / len(group),
+                count=sum(x['count'] for x in group) / len(group),
+            )
+
+            filter_name = SearchReplayService.FILTERS_BY_PARAM.get(key, f'filter_by_{key}')
+            if filter_name in group[0]['filter_timings']:
+                filter_latencies = [x['filter_timings'][filter_name] for x in group]
+                row['filter_p50'] = SearchReplayService._percentile(filter_latencies, 50)
+                row['filter_p95'] = SearchReplayService._percentile(filter_latencies, 95)
+
+            summary[key] = row
+
+        return summary
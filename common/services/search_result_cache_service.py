@@ -0,0 +1,176 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class SearchResultCacheService:
+    """
+    Caches the ordered ids of search results, in windows of SEARCH_RESULT_CACHE_WINDOW results, keyed by a canonical
+    form of the search parameters. A cache hit skips building and running the filter chain: only the documents of the
+    requested page are fetched from the index, by id.
+    """
+
+    GENERATION_KEY = 'search_result_cache_generation'
+    INVALIDATION_LOCK_KEY = 'search_result_cache_invalidation_lock'
+
+    # Parameters that don't change the result set, or that are handled by the windowing.
+    IGNORED_PARAMS = ('params', 'page', 'page_size', 'format')
+
+    # Parameters whose results depend on the requesting user: when present, the user is part of the key.
+    USER_DEPENDENT_PARAMS = ('groups', 'personal_filters')
+
+    DEFAULTS = {
+        'ordering': '-published',
+    }
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return settings.SEARCH_RESULT_CACHE_ENABLED
+
+    @staticmethod
+    def _is_empty(value: Any) -> bool:
+        if value is None or value == '' or value == [] or value == {}:
+            return True
+
+        if isinstance(value, dict) and 'value' in value:
+            return SearchResultCacheService._is_empty(value.get('value'))
+
+        return False
+
+    @staticmethod
+    def canonicalize(params: Dict[str, Any], user) -> str:
+        canonical = {}
+
+        for key, value in params.items():
+            if key in SearchResultCacheService.IGNORED_PARAMS or SearchResultCacheService._is_empty(value):
+                continue
+
+            if SearchResultCacheService.DEFAULTS.get(key) == value:
+                continue
+
+            canonical[key] = value
+
+        if any(x in canonical for x in SearchResultCacheService.USER_DEPENDENT_PARAMS):
+            canonical['__user__'] = user.pk if user and user.is_authenticated else None
+
+        return json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=str)
+
+    @staticmethod
+    def get_generation() -> int:
+        generation = cache.get(SearchResultCacheService.GENERATION_KEY)
+
+        if generation is None:
+            generation = 1
+            cache.add(SearchResultCacheService.GENERATION_KEY, generation, None)
+
+        return generation
+
+    @staticmethod
+    def invalidate():
+        # Index writes come in bursts: bumping the generation at most once per interval is enough, since entries
+        # expire after SEARCH_RESULT_CACHE_TIMEOUT anyway.
+        if not cache.add(
+                SearchResultCacheService.INVALIDATION_LOCK_KEY, '1',
+                settings.SEARCH_RESULT_CACHE_INVALIDATION_INTERVAL
+        ):
+            return
+
+        try:
+            cache.incr(SearchResultCacheService.GENERATION_KEY)
+        except ValueError:
+            cache.set(SearchResultCacheService.GENERATION_KEY, 2, None)
+
+    @staticmethod
+    def get_key(model_name: str, canonical_params: str, generation: int, window: int) -> str:
+        digest = hashlib.sha1(canonical_params.encode('utf-8')).hexdigest()
+        return f'search_result_cache_{model_name}_{generation}_{digest}_{window}'
+
+    @staticmethod
+    def get_window(
+            model_name: str, canonical_params: str, generation: int, window: int, get_queryset: Callable
+    ) -> Dict[str, Any]:
+        key = SearchResultCacheService.get_key(model_name, canonical_params, generation, window)
+        entry = cache.get(key)
+
+        if entry is None:
+            size = settings.SEARCH_RESULT_CACHE_WINDOW
+            queryset = get_queryset()
+            entry = dict(
+                count=queryset.count(),
+                ids=[int(x.pk) for x in queryset[window * size:(window + 1) * size]],
+            )
+            cache.set(key, entry, settings.SEARCH_RESULT_CACHE_TIMEOUT)
+
+        return entry
+
+
+class CachedSearchResults:
+    """
+    A lazy, sliceable stand-in for a SearchQuerySet that a paginator can use: the count and the ids come from
+    SearchResultCacheService, and the filter chain (`get_queryset`) only runs on a cache miss.
+    """
+
+    def __init__(self, model, params: Dict[str, Any], user, get_queryset: Callable):
+        self.model = model
+        self.canonical_params = SearchResultCacheService.canonicalize(params, user)
+        self.generation = SearchResultCacheService.get_generation()
+        self._get_queryset = get_queryset
+        self._queryset = None
+
+    def _queryset_factory(self):
+        if self._queryset is None:
+            self._queryset = self._get_queryset()
+
+        return self._queryset
+
+    def _get_window(self, window: int) -> Dict[str, Any]:
+        return SearchResultCacheService.get_window(
+            self.model._meta.model_name, self.canonical_params, self.generation, window, self._queryset_factory
+        )
+
+    def count(self) -> int:
+        return self._get_window(0)['count']
+
+    def __len__(self):
+        return self.count()
+
+    def _get_ids(self, start: int, stop: int) -> List[int]:
+        size = settings.SEARCH_RESULT_CACHE_WINDOW
+        ids = []
+
+        for window in range(start // size, (stop - 1) // size + 1):
+            window_ids = self._get_window(window)['ids']
+            ids += window_ids[max(0, start - window * size):stop - window * size]
+
+        return ids
+
+    def _hydrate(self, ids: List[int]) -> List:
+        from haystack.query import SearchQuerySet
+
+        if not ids:
+            return []
+
+        results = SearchQuerySet().models(self.model).filter(django_id__in=ids)[:len(ids)]
+        results_by_id = dict((int(x.pk), x) for x in results)
+
+        # Documents removed from the index since the ids were cached are skipped.
+        return [results_by_id[x] for x in ids if x in results_by_id]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.count())
+            if step != 1:
+                raise ValueError('CachedSearchResults does not support slice steps')
+            return self._hydrate(self._get_ids(start, stop)) if stop > start else []
+
+        result = self[item:item + 1]
+        if not result:
+            raise IndexError(item)
+
+        return result[0]
+
+    def __iter__(self):
+        return iter(self[:])
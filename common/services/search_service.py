@@ -1,9 +1,12 @@
+import logging
+import math
 import re
 from datetime import datetime, time
 from enum import Enum
 from functools import reduce
-from typing import Any, Callable, Optional, Type, Union
+from typing import Any, Callable, List, Optional, Type, Union
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.postgres.search import TrigramDistance
 from django.db.models import Q
@@ -24,8 +27,12 @@ from astrobin_apps_equipment.models.sensor_base_model import ColorOrMono
 from astrobin_apps_equipment.types.marketplace_listing_type import MarketplaceListingType
 from astrobin_apps_groups.models import Group
 from astrobin_apps_images.services import ImageService
+from astrobin_apps_platesolving import healpix
+from astrobin_apps_platesolving.services import SolutionService
 from common.services import DateTimeService
 
+log = logging.getLogger(__name__)
+
 
 class MatchType(Enum):
     ALL = 'ALL'
@@ -807,6 +814,52 @@ class SearchService:
 
         return results
 
+    @staticmethod
+    def _filter_by_footprint(
+            coarse: List[int], fine: Optional[List[int]], results: SearchQuerySet
+    ) -> SearchQuerySet:
+        results = results.filter(footprint_healpix_32__in=coarse)
+
+        if fine:
+            # Images too large for a fine footprint are only matched at the coarse resolution.
+            results = results.filter(footprint_healpix_256__in=fine + [healpix.OMITTED])
+
+        return results
+
+    @staticmethod
+    def _filter_by_bounding_box(ra: float, dec: float, radius: float, results: SearchQuerySet) -> SearchQuerySet:
+        results = results.filter(coord_dec_min__lte=dec + radius, coord_dec_max__gte=dec - radius)
+
+        # The RA range is only meaningful away from the poles and from RA=0.
+        cos_dec = math.cos(math.radians(min(89.0, abs(dec) + radius)))
+        ra_delta = radius / cos_dec
+        if abs(dec) + radius < 89.0 and ra - ra_delta >= 0 and ra + ra_delta <= 360:
+            results = results.filter(coord_ra_min__lte=ra + ra_delta, coord_ra_max__gte=ra - ra_delta)
+
+        return results
+
+    @staticmethod
+    def filter_by_cone(data, results: SearchQuerySet) -> SearchQuerySet:
+        # Images whose field overlaps a cone: `cone` is a dict with `ra`, `dec` and `radius`, in degrees.
+        cone = data.get("cone")
+
+        if not cone:
+            return results
+
+        try:
+            ra = float(cone.get("ra")) % 360
+            dec = max(-90.0, min(90.0, float(cone.get("dec"))))
+            radius = max(0.0, float(cone.get("radius") or 0))
+        except (TypeError, ValueError, AttributeError):
+            return results
+
+        if settings.SEARCH_HEALPIX_FOOTPRINTS_ENABLED:
+            coarse, fine = SolutionService.get_cone_pixels(ra, dec, radius, settings.SEARCH_HEALPIX_MAX_QUERY_PIXELS)
+            if coarse is not None:
+                return SearchService._filter_by_footprint(coarse, fine, results)
+
+        return SearchService._filter_by_bounding_box(ra, dec, radius, results)
+
     @staticmethod
     def filter_by_image_size(data, results: SearchQuerySet) -> SearchQuerySet:
         try:
@@ -996,21 +1049,37 @@ class SearchService:
                     target_ra = float(image.solution.advanced_ra or image.solution.ra)
                     target_dec = float(image.solution.advanced_dec or image.solution.dec)
                     delta = float(image.solution.radius)
-
-                    search_ra_min = target_ra - delta
-                    search_ra_max = target_ra + delta
-                    search_dec_min = target_dec - delta
-                    search_dec_max = target_dec + delta
                     field_radius_min = delta / 4
                     field_radius_max = min(180.0, delta * 4)
 
-                    results = results.filter(
-                        coord_ra_min__lte=search_ra_max,
-                        coord_ra_max__gte=search_ra_min,
-                        coord_dec_min__lte=search_dec_max,
-                        coord_dec_max__gte=search_dec_min,
-                        field_radius__range=(field_radius_min, field_radius_max)
-                    )
+                    coarse, fine = None, None
+                    if settings.SEARCH_HEALPIX_FOOTPRINTS_ENABLED:
+                        coarse = image.solution.footprint_healpix_32
+                        fine = image.solution.footprint_healpix_256
+                        if coarse is None:
+                            footprints = SolutionService(image.solution).get_footprints()
+                            coarse = footprints[healpix.COARSE_NSIDE]
+                            fine = footprints[healpix.FINE_NSIDE]
+
+                    max_pixels = settings.SEARCH_HEALPIX_MAX_QUERY_PIXELS
+                    if coarse and len(coarse) <= max_pixels:
+                        results = SearchService._filter_by_footprint(
+                            coarse, fine if fine and len(fine) <= max_pixels else None, results
+                        )
+                    else:
+                        search_ra_min = target_ra - delta
+                        search_ra_max = target_ra + delta
+                        search_dec_min = target_dec - delta
+                        search_dec_max = target_dec + delta
+
+                        results = results.filter(
+                            coord_ra_min__lte=search_ra_max,
+                            coord_ra_max__gte=search_ra_min,
+                            coord_dec_min__lte=search_dec_max,
+                            coord_dec_max__gte=search_dec_min,
+                        )
+
+                    results = results.filter(field_radius__range=(field_radius_min, field_radius_max))
                 else:
                     # No solution, let's see if there's a catalog name in the title.
                     title = image.title.lower()
@@ -1042,6 +1111,76 @@ class SearchService:
 
         return results
 
+    @staticmethod
+    def filter_images(params: dict, user: User, queryset: SearchQuerySet) -> SearchQuerySet:
+        from common.encoded_search_viewset import EncodedSearchViewSet
+
+        text = params.get('text', dict(value=''))
+        if isinstance(text, str):
+            text = dict(value=text)
+            if ' ' in text:
+                text['matchType'] = MatchType.ALL.value
+
+        if text.get('value'):
+            log.debug(f"Searching for: {text.get('value')}")
+            queryset = EncodedSearchViewSet.build_search_query(queryset, text)
+
+        queryset = queryset.models(Image)
+        queryset = SearchService.filter_by_subject(params, queryset)
+        queryset = SearchService.filter_by_telescope(params, queryset)
+        queryset = SearchService.filter_by_sensor(params, queryset)
+        queryset = SearchService.filter_by_camera(params, queryset)
+        queryset = SearchService.filter_by_mount(params, queryset)
+        queryset = SearchService.filter_by_filter(params, queryset)
+        queryset = SearchService.filter_by_accessory(params, queryset)
+        queryset = SearchService.filter_by_software(params, queryset)
+        # Remove next method after the old search page is gone.
+        queryset = SearchService.filter_by_telescope_type(params, queryset)
+        queryset = SearchService.filter_by_telescope_types(params, queryset)
+        # Remove next method after the old search page is gone.
+        queryset = SearchService.filter_by_camera_type(params, queryset)
+        queryset = SearchService.filter_by_camera_types(params, queryset)
+        queryset = SearchService.filter_by_acquisition_months(params, queryset)
+        queryset = SearchService.filter_by_remote_source(params, queryset)
+        queryset = SearchService.filter_by_subject_type(params, queryset)
+        queryset = SearchService.filter_by_color_or_mono(params, queryset)
+        queryset = SearchService.filter_by_modified_camera(params, queryset)
+        queryset = SearchService.filter_by_animated(params, queryset)
+        queryset = SearchService.filter_by_video(params, queryset)
+        queryset = SearchService.filter_by_award(params, queryset)
+        queryset = SearchService.filter_by_country(params, queryset)
+        queryset = SearchService.filter_by_data_source(params, queryset)
+        queryset = SearchService.filter_by_minimum_data(params, queryset)
+        queryset = SearchService.filter_by_constellation(params, queryset)
+        queryset = SearchService.filter_by_bortle_scale(params, queryset)
+        queryset = SearchService.filter_by_license(params, queryset)
+        queryset = SearchService.filter_by_camera_pixel_size(params, queryset)
+        queryset = SearchService.filter_by_field_radius(params, queryset)
+        queryset = SearchService.filter_by_pixel_scale(params, queryset)
+        queryset = SearchService.filter_by_telescope_diameter(params, queryset)
+        queryset = SearchService.filter_by_telescope_weight(params, queryset)
+        queryset = SearchService.filter_by_mount_weight(params, queryset)
+        queryset = SearchService.filter_by_mount_max_payload(params, queryset)
+        queryset = SearchService.filter_by_telescope_focal_length(params, queryset)
+        queryset = SearchService.filter_by_integration_time(params, queryset)
+        queryset = SearchService.filter_by_filter_types(params, queryset)
+        queryset = SearchService.filter_by_size(params, queryset)
+        queryset = SearchService.filter_by_acquisition_type(params, queryset)
+        queryset = SearchService.filter_by_date_published(params, queryset)
+        queryset = SearchService.filter_by_date_acquired(params, queryset)
+        queryset = SearchService.filter_by_moon_phase(params, queryset)
+        queryset = SearchService.filter_by_coords(params, queryset)
+        queryset = SearchService.filter_by_cone(params, queryset)
+        queryset = SearchService.filter_by_image_size(params, queryset)
+        queryset = SearchService.filter_by_groups(params, user, queryset)
+        queryset = SearchService.filter_by_personal_filters(params, user, queryset)
+        queryset = SearchService.filter_by_equipment_ids(params, queryset)
+        queryset = SearchService.filter_by_user_id(params, queryset)
+        queryset = SearchService.filter_by_username(params, queryset)
+        queryset = SearchService.filter_by_similar_images(params, queryset)
+
+        return queryset
+
     @staticmethod
     def get_equipment_brand_listings(q: str, country: str):
         return EquipmentBrandListing.objects.annotate(
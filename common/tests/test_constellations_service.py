@@ -0,0 +1,70 @@
+from django.test import TestCase
+
+from common.services.constellations_service import ConstellationException, ConstellationsService
+
+
+def _linear_lookup(ra, dec):
+    # The original linear scan of the boundary table, used as reference for the spatial index.
+    for ra1, ra2, lower_dec, name in ConstellationsService._ConstellationsService__table:
+        if dec < lower_dec or ra < ra1 or ra >= ra2:
+            continue
+        return name
+
+    return None
+
+
+class ConstellationsServiceTest(TestCase):
+    def test_get_constellation(self):
+        self.assertEqual(
+            {'name': 'Orion', 'genitive': 'Orionis', 'abbreviation': 'Ori'},
+            ConstellationsService.get_constellation('5 35 17 -5 23 28')
+        )
+        self.assertEqual('And', ConstellationsService.get_constellation('0 42 44 +41 16 9')['abbreviation'])
+        self.assertEqual('UMi', ConstellationsService.get_constellation('2 31 49 +89 15 51')['abbreviation'])
+        self.assertEqual('Oct', ConstellationsService.get_constellation('21 8 46 -88 57 23')['abbreviation'])
+
+    def test_get_constellation_invalid(self):
+        with self.assertRaises(ConstellationException):
+            ConstellationsService.get_constellation('foo')
+
+        with self.assertRaises(ConstellationException):
+            ConstellationsService.get_constellation('25 +10')
+
+    def test_index_matches_linear_scan(self):
+        lookup = ConstellationsService._ConstellationsService__lookup
+        table = ConstellationsService._ConstellationsService__table
+
+        # Every corner of every boundary, and just around it, plus a regular grid.
+        ras = set([x / 10.0 for x in range(0, 240)])
+        decs = set([x / 2.0 for x in range(-180, 181)])
+        for ra1, ra2, dec, name in table:
+            for delta in (-1e-6, 0, 1e-6):
+                ras.update([ra1 + delta, ra2 + delta])
+                decs.add(dec + delta)
+
+        ras = sorted([x for x in ras if 0 <= x < 24])
+        decs = sorted([x for x in decs if -90 <= x <= 90])
+
+        for ra in ras:
+            for dec in decs:
+                self.assertEqual(_linear_lookup(ra, dec), lookup(ra, dec), (ra, dec))
+
+    def test_get_constellations_matches_get_constellation(self):
+        ras = []
+        decs = []
+        for ra in range(0, 24 * 4):
+            for dec in range(-89, 90, 2):
+                ras.append(ra / 4.0)
+                decs.append(float(dec))
+
+        get_name = ConstellationsService._ConstellationsService__get_name
+
+        for ra, dec, constellation in zip(ras, decs, ConstellationsService.get_constellations(ras, decs)):
+            self.assertEqual(get_name(ra, dec, 2000.0), constellation['abbreviation'], (ra, dec))
+
+    def test_get_constellations_empty(self):
+        self.assertEqual([], ConstellationsService.get_constellations([], []))
+
+    def test_get_constellations_length_mismatch(self):
+        with self.assertRaises(ConstellationException):
+            ConstellationsService.get_constellations([1, 2], [3])
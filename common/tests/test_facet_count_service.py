@@ -0,0 +1,82 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import MagicMock, patch
+
+from common.services.facet_count_service import FacetCountService
+
+
+def _fake_filter_images(params, user, queryset):
+    return MagicMock(count=MagicMock(return_value=len(params)))
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    },
+    SEARCH_FACET_PRECOMPUTED_STATES=[{'subject_type': 'DEEP_SKY'}],
+)
+@patch('common.services.search_service.SearchService.filter_images', side_effect=_fake_filter_images)
+class FacetCountServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_facet_values(self, filter_images):
+        values = FacetCountService.get_facet_values()
+
+        self.assertIn('DEEP_SKY', values['subject_type'])
+        self.assertIn('MOON', values['subject_type'])
+        self.assertIn('REFRACTOR_APOCHROMATIC', values['telescope_types'])
+        self.assertIn('IT', values['country'])
+
+    def test_compute(self, filter_images):
+        data = FacetCountService.compute({'country': 'IT'}, AnonymousUser(), ['acquisition_type'])
+
+        self.assertEqual(['acquisition_type'], list(data['facets'].keys()))
+        self.assertEqual(2, data['facets']['acquisition_type']['LUCKY'])
+        self.assertIsNotNone(data['updated'])
+
+    def test_precomputed(self, filter_images):
+        FacetCountService.refresh_precomputed()
+        filter_images.reset_mock()
+
+        data = FacetCountService.get_counts({'ordering': '-published'}, AnonymousUser(), ['camera_types'])
+        self.assertTrue(data['precomputed'])
+        self.assertEqual(['camera_types'], list(data['facets'].keys()))
+
+        data = FacetCountService.get_counts({'subject_type': 'DEEP_SKY'}, AnonymousUser())
+        self.assertTrue(data['precomputed'])
+        self.assertIn('country', data['facets'])
+
+        filter_images.assert_not_called()
+
+    def test_live(self, filter_images):
+        data = FacetCountService.get_counts({'country': 'IT'}, AnonymousUser(), ['camera_types', 'foo'])
+        self.assertFalse(data['precomputed'])
+        self.assertEqual(['camera_types'], list(data['facets'].keys()))
+
+        filter_images.reset_mock()
+        FacetCountService.get_counts({'country': 'IT'}, AnonymousUser(), ['camera_types'])
+        filter_images.assert_not_called()
+
+    @override_settings(SEARCH_FACET_LIVE_MAX_COUNTS=30)
+    def test_live_counts_are_limited(self, filter_images):
+        values = FacetCountService.get_facet_values()
+
+        data = FacetCountService.get_counts(
+            {'subject_type': 'DEEP_SKY', 'data_source': 'BACKYARD'},
+            AnonymousUser(),
+            ['country', 'camera_types', 'subject_type', 'license'],
+        )
+
+        self.assertEqual(['camera_types', 'license'], sorted(data['facets'].keys()))
+        self.assertEqual(['country', 'subject_type'], data['unavailable'])
+        self.assertEqual(len(values['camera_types']) + len(values['license']), filter_images.call_count)
+
+    def test_live_requires_facets(self, filter_images):
+        data = FacetCountService.get_counts({'country': 'IT'}, AnonymousUser())
+
+        self.assertEqual({}, data['facets'])
+        filter_images.assert_not_called()
@@ -0,0 +1,65 @@
+from django.test import TestCase
+
+from common.models import GazetteerCity
+from common.services.gazetteer_service import GazetteerService
+
+
+def _row(name, ascii_name, alternate_names, latitude, longitude, country, population):
+    columns = [''] * 19
+    columns[0] = '1'
+    columns[1] = name
+    columns[2] = ascii_name
+    columns[3] = alternate_names
+    columns[4] = str(latitude)
+    columns[5] = str(longitude)
+    columns[8] = country
+    columns[14] = str(population)
+    return '\t'.join(columns) + '\n'
+
+
+DUMP = [
+    _row('Zürich', 'Zurich', 'Turicum,Zurigo', 47.36667, 8.55, 'CH', 341730),
+    _row('St. Gallen', 'St. Gallen', 'Sankt Gallen', 47.42391, 9.37477, 'CH', 70572),
+    _row('Paris', 'Paris', 'Lutetia', 48.85341, 2.3488, 'FR', 2138551),
+    _row('Paris', 'Paris', '', 33.66094, -95.55551, 'US', 24782),
+    _row('Springfield', 'Springfield', '', 39.80172, -89.64371, 'US', 116250),
+    _row('Springfield', 'Springfield', '', 37.21533, -93.29824, 'US', 166810),
+    'malformed\n',
+]
+
+
+class GazetteerServiceTest(TestCase):
+    def test_normalize(self):
+        self.assertEqual('zurich', GazetteerService.normalize('Zürich'))
+        self.assertEqual('st gallen', GazetteerService.normalize(' St.  Gallen '))
+        self.assertEqual('東京', GazetteerService.normalize('東京'))
+        self.assertEqual('', GazetteerService.normalize(None))
+
+    def test_load_and_get_location(self):
+        self.assertEqual(len(GazetteerService.parse(DUMP)), GazetteerService.load(DUMP))
+
+        self.assertEqual((47.36667, 8.55), GazetteerService.get_location('CH', 'zurich'))
+        self.assertEqual((47.36667, 8.55), GazetteerService.get_location('ch', 'Zurigo'))
+        self.assertEqual((47.42391, 9.37477), GazetteerService.get_location('CH', 'St Gallen'))
+        self.assertEqual((48.85341, 2.3488), GazetteerService.get_location('FR', 'Paris'))
+        self.assertEqual((33.66094, -95.55551), GazetteerService.get_location('US', 'Paris'))
+        self.assertIsNone(GazetteerService.get_location('DE', 'Paris'))
+        self.assertIsNone(GazetteerService.get_location('CH', ''))
+
+    def test_most_populous_city_wins(self):
+        GazetteerService.load(DUMP)
+
+        self.assertEqual((37.21533, -93.29824), GazetteerService.get_location('US', 'Springfield'))
+
+    def test_load_without_alternate_names(self):
+        GazetteerService.load(DUMP, alternate_names=False)
+
+        self.assertIsNone(GazetteerService.get_location('CH', 'Zurigo'))
+        self.assertEqual((47.36667, 8.55), GazetteerService.get_location('CH', 'Zurich'))
+
+    def test_load_replaces_gazetteer(self):
+        GazetteerService.load(DUMP)
+        GazetteerService.load(DUMP[:1])
+
+        self.assertEqual(3, GazetteerCity.objects.count())
+        self.assertIsNone(GazetteerService.get_location('FR', 'Paris'))
@@ -0,0 +1,51 @@
+import math
+import random
+
+from django.test import TestCase
+
+from common.services.geohash_service import EARTH_RADIUS, GeohashService
+
+
+def _destination(lat, lon, bearing, distance):
+    lat, lon, angle = math.radians(lat), math.radians(lon), distance / EARTH_RADIUS
+    lat2 = math.asin(math.sin(lat) * math.cos(angle) + math.cos(lat) * math.sin(angle) * math.cos(bearing))
+    lon2 = lon + math.atan2(
+        math.sin(bearing) * math.sin(angle) * math.cos(lat), math.cos(angle) - math.sin(lat) * math.sin(lat2)
+    )
+    return math.degrees(lat2), (math.degrees(lon2) + 180) % 360 - 180
+
+
+class GeohashServiceTest(TestCase):
+    def test_encode(self):
+        self.assertEqual('u4pruydqqvj', GeohashService.encode(57.64911, 10.40744, 11))
+        self.assertEqual('6gkzwgjz', GeohashService.encode(-25.382708, -49.265506, 8))
+        self.assertEqual('u4pru', GeohashService.encode(57.64911, 10.40744, 5))
+
+    def test_get_distance(self):
+        self.assertEqual(0, GeohashService.get_distance(10, 20, 10, 20))
+        self.assertAlmostEqual(
+            math.pi * EARTH_RADIUS / 2, GeohashService.get_distance(0, 0, 0, 90), places=3
+        )
+
+    def test_get_covering_cells(self):
+        random.seed(0)
+
+        for _ in range(200):
+            lat, lon = random.uniform(-70, 70), random.uniform(-180, 180)
+            radius, precision = random.choice((5, 50, 500)), random.choice((2, 3, 4))
+            cells = GeohashService.get_covering_cells(lat, lon, radius, precision)
+
+            self.assertEqual(len(cells), GeohashService.count_covering_cells(lat, lon, radius, precision))
+            for _ in range(10):
+                point = _destination(lat, lon, random.uniform(0, 2 * math.pi), random.uniform(0, radius))
+                self.assertIn(GeohashService.encode(*point, precision), cells)
+
+    def test_get_covering_cells_across_antimeridian(self):
+        cells = GeohashService.get_covering_cells(0, 179.99, 50, 3)
+
+        self.assertIn(GeohashService.encode(0, 179.99, 3), cells)
+        self.assertIn(GeohashService.encode(0, -179.99, 3), cells)
+
+    def test_get_covering_cells_including_pole(self):
+        self.assertIsNone(GeohashService.get_covering_cells(89.9, 0, 50, 3))
+        self.assertIsNone(GeohashService.count_covering_cells(-89.9, 0, 50, 3))
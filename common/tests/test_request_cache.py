@@ -0,0 +1,69 @@
+from django.test import TestCase
+from mock import Mock
+
+from common.request_cache import (
+    end_request_cache, get_request_cache, get_request_memoize_stats, request_memoize,
+    reset_request_memoize_stats, start_request_cache,
+)
+
+
+class RequestCacheTest(TestCase):
+    def setUp(self):
+        reset_request_memoize_stats()
+        self.compute = Mock(side_effect=lambda x: x * 2)
+
+        @request_memoize(lambda x: x)
+        def double(x):
+            return self.compute(x)
+
+        self.double = double
+
+    def test_nothing_is_cached_outside_of_a_request(self):
+        self.assertEqual(4, self.double(2))
+        self.assertEqual(4, self.double(2))
+        self.assertEqual(2, self.compute.call_count)
+
+        get_request_cache()['foo'] = 'bar'
+        self.assertNotIn('foo', get_request_cache())
+
+    def test_memoized_within_a_request(self):
+        token = start_request_cache()
+        try:
+            self.assertEqual(4, self.double(2))
+            self.assertEqual(4, self.double(2))
+            self.assertEqual(6, self.double(3))
+        finally:
+            end_request_cache(token)
+
+        self.assertEqual(2, self.compute.call_count)
+
+        stats = list(get_request_memoize_stats().values())[0]
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+
+    def test_cleared_between_requests(self):
+        for _ in range(2):
+            token = start_request_cache()
+            self.double(2)
+            end_request_cache(token)
+
+        self.assertEqual(2, self.compute.call_count)
+
+    def test_forget(self):
+        token = start_request_cache()
+        try:
+            self.double(2)
+            self.double.forget(2)
+            self.double(2)
+        finally:
+            end_request_cache(token)
+
+        self.assertEqual(2, self.compute.call_count)
+
+    def test_nested_scopes_restore_the_outer_cache(self):
+        outer = start_request_cache({'user': 'foo'})
+        inner = start_request_cache()
+        self.assertNotIn('user', get_request_cache())
+        end_request_cache(inner)
+        self.assertEqual('foo', get_request_cache()['user'])
+        end_request_cache(outer)
@@ -0,0 +1,133 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import MagicMock, call, patch
+
+from astrobin.tests.generators import Generators
+from common.services import SearchIndexUpdateService
+from common.services.search_index_update_service import PROCESSING_KEY, QUEUE_KEY
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+})
+class SearchIndexUpdateServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('astrobin.tasks.update_index.apply_async')
+    def test_update_index_without_queue_schedules_task(self, apply_async):
+        user = Generators.user()
+        # Creating the user schedules its own updates.
+        cache.clear()
+        apply_async.reset_mock()
+
+        SearchIndexUpdateService.update_index(user)
+        SearchIndexUpdateService.update_index(user)
+
+        self.assertEqual(
+            1,
+            apply_async.call_args_list.count(
+                call(args=(ContentType.objects.get_for_model(user).pk, user.pk), countdown=30)
+            )
+        )
+
+    @patch('astrobin.tasks.update_index.apply_async')
+    @patch('common.services.search_index_update_service.SearchIndexUpdateService._get_redis')
+    def test_update_index_with_queue_enqueues(self, get_redis, apply_async):
+        redis = MagicMock()
+        redis.zcard.return_value = 0
+        get_redis.return_value = redis
+        user = Generators.user()
+
+        SearchIndexUpdateService.update_index(user)
+
+        apply_async.assert_not_called()
+        member = f'{ContentType.objects.get_for_model(user).pk}:{user.pk}'
+        args, kwargs = redis.zadd.call_args
+        self.assertEqual(QUEUE_KEY, args[0])
+        self.assertIn(member, args[1])
+        self.assertTrue(kwargs['nx'])
+
+    @override_settings(SEARCH_INDEX_UPDATE_QUEUE_HIGH_WATER_MARK=10, SEARCH_INDEX_UPDATE_QUEUE_BACKOFF=1000)
+    @patch('common.services.search_index_update_service.time.time', return_value=0)
+    def test_enqueue_backs_off_when_queue_is_full(self, time):
+        redis = MagicMock()
+        redis.zcard.return_value = 10
+
+        SearchIndexUpdateService.enqueue(redis, 1, 2)
+
+        args, kwargs = redis.zadd.call_args
+        self.assertEqual(1030, args[1]['1:2'])
+
+    @override_settings(SEARCH_INDEX_UPDATE_QUEUE_LEASE=120)
+    @patch('common.services.search_index_update_service.time.time', return_value=1000)
+    def test_claim_due_parses_members(self, time):
+        redis = MagicMock()
+        redis.eval.return_value = [b'1:2', b'100.0', b'3:4', b'101.5']
+
+        self.assertEqual([(1, 2, 100.0), (3, 4, 101.5)], SearchIndexUpdateService.claim_due(redis, 10))
+
+        args = redis.eval.call_args[0]
+        self.assertEqual((2, QUEUE_KEY, PROCESSING_KEY, 1000, 10, 1120), args[1:])
+
+    def _queue(self, get_redis, claimed, expired=0):
+        redis = MagicMock()
+        redis.eval.side_effect = [expired, claimed, []]
+        redis.zrange.return_value = []
+        redis.zcard.return_value = 0
+        redis.zcount.return_value = 0
+        get_redis.return_value = redis
+        return redis
+
+    @patch('common.services.search_index_update_service.SearchIndexUpdateService.update_objects')
+    @patch('common.services.search_index_update_service.SearchIndexUpdateService._get_redis')
+    def test_process_queue_groups_by_content_type(self, get_redis, update_objects):
+        user_content_type = ContentType.objects.get_for_model(Generators.user())
+        redis = self._queue(
+            get_redis, [f'{user_content_type.pk}:1'.encode(), b'0', f'{user_content_type.pk}:2'.encode(), b'0']
+        )
+
+        stats = SearchIndexUpdateService.process_queue()
+
+        update_objects.assert_called_once_with(user_content_type.model_class(), [1, 2])
+        redis.zrem.assert_called_once_with(PROCESSING_KEY, f'{user_content_type.pk}:1', f'{user_content_type.pk}:2')
+        self.assertEqual(2, stats['processed'])
+
+    @patch('common.services.search_index_update_service.SearchIndexUpdateService.update_objects')
+    @patch('common.services.search_index_update_service.SearchIndexUpdateService._get_redis')
+    def test_process_queue_requeues_expired_leases_first(self, get_redis, update_objects):
+        redis = self._queue(get_redis, [], expired=3)
+
+        SearchIndexUpdateService.process_queue()
+
+        args = redis.eval.call_args_list[0][0]
+        self.assertEqual((2, QUEUE_KEY, PROCESSING_KEY), args[1:4])
+        self.assertIn("ZADD', KEYS[1], 'NX'", args[0])
+        update_objects.assert_not_called()
+
+    @patch('common.services.search_index_update_service.SearchIndexUpdateService.enqueue')
+    @patch.object(SearchIndexUpdateService, 'update_objects', side_effect=ValueError)
+    @patch('common.services.search_index_update_service.SearchIndexUpdateService._get_redis')
+    def test_process_queue_requeues_failed_updates(self, get_redis, update_objects, enqueue):
+        user_content_type = ContentType.objects.get_for_model(Generators.user())
+        redis = self._queue(get_redis, [f'{user_content_type.pk}:1'.encode(), b'0'])
+
+        SearchIndexUpdateService.process_queue()
+
+        enqueue.assert_called_once_with(redis, user_content_type.pk, 1)
+        redis.zrem.assert_called_once_with(PROCESSING_KEY, f'{user_content_type.pk}:1')
+
+    @patch.object(SearchIndexUpdateService, 'update_objects', side_effect=SystemExit)
+    @patch('common.services.search_index_update_service.SearchIndexUpdateService._get_redis')
+    def test_process_queue_keeps_the_lease_of_interrupted_updates(self, get_redis, update_objects):
+        user_content_type = ContentType.objects.get_for_model(Generators.user())
+        redis = self._queue(get_redis, [f'{user_content_type.pk}:1'.encode(), b'0'])
+
+        with self.assertRaises(SystemExit):
+            SearchIndexUpdateService.process_queue()
+
+        # The update stays claimed, and is queued again by the next run once its lease expires.
+        redis.zrem.assert_not_called()
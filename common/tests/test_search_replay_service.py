@@ -0,0 +1,139 @@
+import json
+import random
+
+from django.test import TestCase, override_settings
+from mock import MagicMock, patch
+
+from common.services.search_replay_service import SearchReplayService
+from common.services.search_service import SearchService
+
+
+class SearchReplayServiceTest(TestCase):
+    def test_anonymize(self):
+        anonymized = SearchReplayService.anonymize({
+            'text': {'value': 'my secret m31', 'matchType': 'ALL'},
+            'username': 'astrobin_dev',
+            'users': {'value': [{'id': 1}, {'id': 2}], 'matchType': 'ANY'},
+            'similar_to_image_id': '123',
+            'telescope': {'value': [{'id': 5, 'name': 'Foo'}], 'matchType': 'ALL'},
+            'camera': 'Bar',
+            'mount_ids': '1,2,3',
+            'groups': [1, 2],
+            'subject_type': 'DEEP_SKY',
+            'page': 2,
+            'country': '',
+        })
+
+        self.assertEqual(
+            {
+                'text': {'value': '$text:3', 'matchType': 'ALL'},
+                'username': '$user',
+                'users': {'value': ['$user', '$user'], 'matchType': 'ANY'},
+                'similar_to_image_id': '$image',
+                'telescope': {'value': ['$telescope'], 'matchType': 'ALL'},
+                'camera': '$camera:name',
+                'mount_ids': '$mount,$mount,$mount',
+                'subject_type': 'DEEP_SKY',
+            },
+            anonymized
+        )
+
+    def test_resolve(self):
+        corpus = dict(
+            image=[10],
+            user=[(20, 'user20')],
+            words=['m31'],
+            telescope=[(30, 'Telescope 30')],
+            camera=[(40, 'Camera 40')],
+            mount=[(50, 'Mount 50')],
+        )
+        resolved = SearchReplayService.resolve(
+            {
+                'text': {'value': '$text:2', 'matchType': 'ALL'},
+                'username': '$user',
+                'user_id': '$user',
+                'users': {'value': ['$user']},
+                'similar_to_image_id': '$image',
+                'telescope': {'value': ['$telescope'], 'matchType': 'ALL'},
+                'camera': '$camera:name',
+                'mount_ids': '$mount,$mount',
+                'subject_type': 'DEEP_SKY',
+            },
+            corpus,
+            random.Random(0)
+        )
+
+        self.assertEqual(
+            {
+                'text': {'value': 'm31 m31', 'matchType': 'ALL'},
+                'username': 'user20',
+                'user_id': 20,
+                'users': {'value': [{'id': 20}]},
+                'similar_to_image_id': 10,
+                'telescope': {'value': [{'id': 30, 'name': 'Telescope 30'}], 'matchType': 'ALL'},
+                'camera': 'Camera 40',
+                'mount_ids': '50,50',
+                'subject_type': 'DEEP_SKY',
+            },
+            resolved
+        )
+
+    def test_resolve_missing_from_corpus(self):
+        self.assertIsNone(SearchReplayService.resolve({'software_ids': '$software'}, dict(software=[]), random.Random()))
+
+    @override_settings(
+        SEARCH_REPLAY_RECORDING_ENABLED=True,
+        SEARCH_REPLAY_RECORDING_SAMPLE_RATE=1,
+        SEARCH_REPLAY_RECORDING_MAX_SIZE=5
+    )
+    @patch('common.services.search_replay_service.SearchReplayService._get_redis')
+    def test_record(self, get_redis):
+        redis = MagicMock()
+        get_redis.return_value = redis
+
+        SearchReplayService.record({'username': 'foo', 'subject_type': 'DEEP_SKY'})
+
+        redis.lpush.assert_called_once_with(
+            SearchReplayService.RECORDING_KEY, json.dumps({'username': '$user', 'subject_type': 'DEEP_SKY'})
+        )
+        redis.ltrim.assert_called_once_with(SearchReplayService.RECORDING_KEY, 0, 4)
+
+    @override_settings(SEARCH_REPLAY_RECORDING_ENABLED=False)
+    @patch('common.services.search_replay_service.SearchReplayService._get_redis')
+    def test_record_disabled(self, get_redis):
+        SearchReplayService.record({'subject_type': 'DEEP_SKY'})
+        get_redis.assert_not_called()
+
+    def test_instrument_filters(self):
+        original = SearchService.filter_by_subject_type
+        timings = {}
+
+        with SearchReplayService._instrument_filters(timings):
+            self.assertNotEqual(original, SearchService.filter_by_subject_type)
+
+        self.assertEqual(original, SearchService.filter_by_subject_type)
+
+    def test_summarize(self):
+        def result(latency, subject_type_time, count):
+            return dict(
+                filter_timings=dict(filter_by_subject_type=subject_type_time, filter_by_license=0),
+                build_time=latency / 2,
+                execution_time=latency / 2,
+                clauses=2,
+                query_length=10,
+                count=count,
+            )
+
+        summary = SearchReplayService.summarize(
+            [result(1, .1, 10), result(2, .2, 20), result(3, 0, 30)],
+            [{'subject_type': 'DEEP_SKY'}, {'subject_type': 'WIDE_FIELD'}, {'license': 'ALL'}]
+        )
+
+        self.assertEqual(3, summary['*']['searches'])
+        self.assertEqual(2, summary['*']['p50'])
+        self.assertEqual(3, summary['*']['p99'])
+        self.assertEqual(2, summary['subject_type']['searches'])
+        self.assertEqual(.1, summary['subject_type']['filter_p50'])
+        self.assertEqual(.2, summary['subject_type']['filter_p95'])
+        self.assertEqual(15, summary['subject_type']['count'])
+        self.assertEqual(30, summary['license']['count'])
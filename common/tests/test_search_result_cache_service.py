@@ -0,0 +1,103 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import MagicMock, patch
+
+from astrobin.models import Image
+from astrobin.tests.generators import Generators
+from common.services.search_result_cache_service import CachedSearchResults, SearchResultCacheService
+
+
+class FakeSearchQuerySet(list):
+    def count(self):
+        return len(self)
+
+
+def _fake_queryset(pks):
+    return FakeSearchQuerySet([MagicMock(pk=str(pk)) for pk in pks])
+
+
+def _fake_hydrate(self, ids):
+    return ids
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    },
+    SEARCH_RESULT_CACHE_WINDOW=4,
+    SEARCH_RESULT_CACHE_TIMEOUT=60,
+)
+class SearchResultCacheServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_canonicalize_sorts_and_strips_defaults(self):
+        user = AnonymousUser()
+
+        self.assertEqual(
+            SearchResultCacheService.canonicalize({'subject_type': 'DEEP_SKY', 'country': 'IT'}, user),
+            SearchResultCacheService.canonicalize(
+                {
+                    'country': 'IT',
+                    'subject_type': 'DEEP_SKY',
+                    'ordering': '-published',
+                    'page': 3,
+                    'page_size': 50,
+                    'text': {'value': ''},
+                    'animated': None,
+                },
+                user
+            )
+        )
+        self.assertNotEqual(
+            SearchResultCacheService.canonicalize({'ordering': '-likes'}, user),
+            SearchResultCacheService.canonicalize({}, user)
+        )
+
+    def test_canonicalize_user_dependent_filters(self):
+        user1 = Generators.user()
+        user2 = Generators.user()
+        params = {'personal_filters': {'value': ['my_likes']}}
+
+        self.assertNotEqual(
+            SearchResultCacheService.canonicalize(params, user1),
+            SearchResultCacheService.canonicalize(params, user2)
+        )
+        self.assertEqual(
+            SearchResultCacheService.canonicalize({'country': 'IT'}, user1),
+            SearchResultCacheService.canonicalize({'country': 'IT'}, user2)
+        )
+
+    @patch.object(CachedSearchResults, '_hydrate', _fake_hydrate)
+    def test_slices_across_windows(self):
+        get_queryset = MagicMock(return_value=_fake_queryset(range(1, 11)))
+        results = CachedSearchResults(Image, {}, AnonymousUser(), get_queryset)
+
+        self.assertEqual(10, results.count())
+        self.assertEqual([3, 4, 5, 6, 7], results[2:7])
+        self.assertEqual([9, 10], results[8:20])
+        get_queryset.assert_called_once()
+
+    @patch.object(CachedSearchResults, '_hydrate', _fake_hydrate)
+    def test_cache_hit_skips_queryset(self):
+        CachedSearchResults(Image, {}, AnonymousUser(), lambda: _fake_queryset(range(1, 11)))[0:4]
+
+        get_queryset = MagicMock()
+        results = CachedSearchResults(Image, {'ordering': '-published'}, AnonymousUser(), get_queryset)
+
+        self.assertEqual([1, 2, 3, 4], results[0:4])
+        self.assertEqual(10, results.count())
+        get_queryset.assert_not_called()
+
+    @override_settings(SEARCH_RESULT_CACHE_INVALIDATION_INTERVAL=10)
+    @patch.object(CachedSearchResults, '_hydrate', _fake_hydrate)
+    def test_invalidate(self):
+        CachedSearchResults(Image, {}, AnonymousUser(), lambda: _fake_queryset(range(1, 11)))[0:4]
+
+        SearchResultCacheService.invalidate()
+
+        results = CachedSearchResults(Image, {}, AnonymousUser(), lambda: _fake_queryset(range(20, 30)))
+        self.assertEqual([20, 21, 22, 23], results[0:4])
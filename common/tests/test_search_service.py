@@ -0,0 +1,52 @@
+from django.test import TestCase, override_settings
+from mock import MagicMock
+
+from astrobin_apps_platesolving import healpix
+from astrobin_apps_platesolving.services import SolutionService
+from common.services.search_service import SearchService
+
+
+class SearchServiceConeTest(TestCase):
+    def test_no_cone(self):
+        results = MagicMock()
+
+        self.assertEqual(results, SearchService.filter_by_cone({}, results))
+        results.filter.assert_not_called()
+
+    def test_invalid_cone(self):
+        results = MagicMock()
+
+        self.assertEqual(results, SearchService.filter_by_cone({'cone': {'ra': 'foo', 'dec': 1}}, results))
+        results.filter.assert_not_called()
+
+    @override_settings(SEARCH_HEALPIX_FOOTPRINTS_ENABLED=True, SEARCH_HEALPIX_MAX_QUERY_PIXELS=500)
+    def test_footprint_query(self):
+        coarse, fine = SolutionService.get_cone_pixels(84.5, -5.4, 0.5, 500)
+        results = MagicMock()
+
+        filtered = SearchService.filter_by_cone({'cone': {'ra': 84.5, 'dec': -5.4, 'radius': 0.5}}, results)
+
+        results.filter.assert_called_once_with(footprint_healpix_32__in=coarse)
+        results.filter.return_value.filter.assert_called_once_with(
+            footprint_healpix_256__in=fine + [healpix.OMITTED]
+        )
+        self.assertEqual(results.filter.return_value.filter.return_value, filtered)
+
+    @override_settings(SEARCH_HEALPIX_FOOTPRINTS_ENABLED=True, SEARCH_HEALPIX_MAX_QUERY_PIXELS=10)
+    def test_footprint_query_falls_back_to_bounding_box_for_large_cones(self):
+        results = MagicMock()
+
+        SearchService.filter_by_cone({'cone': {'ra': 180, 'dec': 0, 'radius': 30}}, results)
+
+        results.filter.assert_called_once_with(coord_dec_min__lte=30, coord_dec_max__gte=-30)
+
+    @override_settings(SEARCH_HEALPIX_FOOTPRINTS_ENABLED=False)
+    def test_bounding_box_query(self):
+        results = MagicMock()
+
+        SearchService.filter_by_cone({'cone': {'ra': 180, 'dec': 0, 'radius': 1}}, results)
+
+        results.filter.assert_called_once_with(coord_dec_min__lte=1, coord_dec_max__gte=-1)
+        ra_filter = results.filter.return_value.filter.call_args[1]
+        self.assertAlmostEqual(181, ra_filter['coord_ra_min__lte'], places=2)
+        self.assertAlmostEqual(179, ra_filter['coord_ra_max__gte'], places=2)